@@ -10,7 +10,7 @@ import asyncio
 import pandas as pd
 import numpy as np
 from datetime import datetime, timedelta
-from typing import Dict, List, Optional, Tuple
+from typing import Awaitable, Callable, Dict, List, Optional, Tuple, Union
 import sqlite3
 from contextlib import contextmanager
 import logging
@@ -19,6 +19,10 @@ from enum import Enum
 import yfinance as yf
 from scipy import stats
 import math
+import time
+
+from .option_chain import OptionChain, as_option_chain
+from .option_greeks import chain_summary, time_to_expiry
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
@@ -86,6 +90,49 @@ class OIAnalysis:
     bearish_oi_buildup: List[float]
 
 
+@dataclass
+class VolatilityAnalysis:
+    atm_iv: float  # %
+    iv_skew: float  # 25-delta put IV minus call IV, vol points
+    expected_move: float  # 1 standard deviation to expiry
+    net_gamma_exposure: float
+    signal: str
+    explanation: str
+
+
+# Underlyings covered by the scanner; override with the FNO_UNIVERSE env var (comma separated)
+DEFAULT_FNO_UNIVERSE = [
+    "NIFTY", "BANKNIFTY", "FINNIFTY", "MIDCPNIFTY",
+    "RELIANCE", "TCS", "HDFCBANK", "INFY", "ICICIBANK", "HINDUNILVR", "BHARTIARTL", "ITC",
+    "SBIN", "LT", "KOTAKBANK", "AXISBANK", "BAJFINANCE", "ASIANPAINT", "MARUTI", "HCLTECH",
+    "SUNPHARMA", "TITAN", "ULTRACEMCO", "WIPRO", "NESTLEIND", "TATAMOTORS", "TATASTEEL", "POWERGRID",
+    "NTPC", "ONGC", "M&M", "ADANIENT", "ADANIPORTS", "JSWSTEEL", "COALINDIA", "BAJAJFINSV",
+    "TECHM", "GRASIM", "HINDALCO", "INDUSINDBK", "DRREDDY", "CIPLA", "BRITANNIA", "EICHERMOT",
+    "HEROMOTOCO", "APOLLOHOSP", "DIVISLAB", "BPCL", "SBILIFE", "HDFCLIFE", "TATACONSUM", "UPL",
+]
+
+
+@dataclass
+class ScanDelta:
+    """One change in a symbol's options picture between scans"""
+    symbol: str
+    kind: str  # initial, new_resistance, new_support, pcr_regime, max_pain_shift, sentiment
+    detail: str
+    previous: Optional[object] = None
+    current: Optional[object] = None
+
+
+@dataclass
+class ScanResult:
+    """Outcome of one scan over the universe"""
+    started_at: datetime
+    elapsed_seconds: float
+    analyzed: List['AbidHassanAnalysis']
+    unchanged: List[str]
+    failed: Dict[str, str]
+    deltas: List[ScanDelta]
+
+
 @dataclass
 class AbidHassanAnalysis:
     symbol: str
@@ -99,6 +146,7 @@ class AbidHassanAnalysis:
     key_levels: Dict[str, float]
     risk_reward_setup: Dict[str, float]
     market_commentary: str
+    volatility_analysis: Optional[VolatilityAnalysis] = None
 
 
 class OptionChainAnalyzer:
@@ -107,15 +155,9 @@ class OptionChainAnalyzer:
     def __init__(self):
         self.logger = logging.getLogger(__name__)
         
-    def calculate_pcr(self, option_data: List[OptionChainData]) -> float:
+    def calculate_pcr(self, option_data: Union[List[OptionChainData], OptionChain]) -> float:
         """Calculate Put-Call Ratio based on Open Interest"""
-        total_put_oi = sum(data.put_oi for data in option_data)
-        total_call_oi = sum(data.call_oi for data in option_data)
-        
-        if total_call_oi == 0:
-            return float('inf')
-        
-        return total_put_oi / total_call_oi
+        return as_option_chain(option_data).pcr()
     
     def analyze_pcr_sentiment(self, pcr: float) -> PCRAnalysis:
         """Analyze PCR following Abid Hassan's contrarian institutional logic"""
@@ -160,34 +202,9 @@ class OptionChainAnalyzer:
                 confidence=0.50
             )
     
-    def calculate_max_pain(self, option_data: List[OptionChainData]) -> float:
-        """Calculate Max Pain - strike where option sellers have least loss"""
-        max_pain_values = {}
-        
-        for data in option_data:
-            strike = data.strike
-            total_pain = 0
-            
-            # Calculate pain for this strike price
-            for other_data in option_data:
-                other_strike = other_data.strike
-                
-                # Call pain calculation
-                if strike > other_strike:
-                    call_pain = (strike - other_strike) * other_data.call_oi
-                    total_pain += call_pain
-                
-                # Put pain calculation  
-                if strike < other_strike:
-                    put_pain = (other_strike - strike) * other_data.put_oi
-                    total_pain += put_pain
-            
-            max_pain_values[strike] = total_pain
-        
-        # Find strike with minimum total pain
-        if max_pain_values:
-            return min(max_pain_values.items(), key=lambda x: x[1])[0]
-        return 0.0
+    def calculate_max_pain(self, option_data: Union[List[OptionChainData], OptionChain]) -> float:
+        """Calculate Max Pain - strike where option sellers have least loss (O(n log n), prefix sums)"""
+        return as_option_chain(option_data).max_pain()
     
     def analyze_max_pain(self, max_pain_strike: float, current_price: float) -> MaxPainAnalysis:
         """Analyze Max Pain implications following Hassan's framework"""
@@ -220,38 +237,27 @@ class OptionChainAnalyzer:
             explanation=explanation
         )
     
-    def analyze_oi_patterns(self, option_data: List[OptionChainData], current_price: float) -> OIAnalysis:
+    def analyze_oi_patterns(self, option_data: Union[List[OptionChainData], OptionChain], current_price: float) -> OIAnalysis:
         """Analyze Open Interest patterns for support/resistance identification"""
-        # Sort by strike price
-        sorted_data = sorted(option_data, key=lambda x: x.strike)
+        chain = as_option_chain(option_data)
+        
+        # High Call OI above price = Resistance (institutions selling calls),
+        # high Put OI below price = Support (institutions selling puts)
+        levels = chain.oi_levels(current_price, percentile=80)
+        resistance_levels = chain.strike[levels['resistance']].tolist()
+        support_levels = chain.strike[levels['support']].tolist()
+        
+        # OI changes for directional bias
+        bearish_oi_buildup = chain.strike[levels['bearish_buildup']].tolist()
+        bullish_oi_buildup = chain.strike[levels['bullish_buildup']].tolist()
         
-        resistance_levels = []
-        support_levels = []
         key_observations = []
-        bullish_oi_buildup = []
-        bearish_oi_buildup = []
-        
-        # Find high OI concentrations
-        call_oi_threshold = np.percentile([d.call_oi for d in sorted_data], 80)
-        put_oi_threshold = np.percentile([d.put_oi for d in sorted_data], 80)
-        
-        for data in sorted_data:
-            # High Call OI = Resistance (institutions selling calls)
-            if data.call_oi > call_oi_threshold and data.strike > current_price:
-                resistance_levels.append(data.strike)
-                key_observations.append(f"Strong Call OI at {data.strike} ({data.call_oi:,}) - Resistance expected")
-            
-            # High Put OI = Support (institutions selling puts)  
-            if data.put_oi > put_oi_threshold and data.strike < current_price:
-                support_levels.append(data.strike)
-                key_observations.append(f"Strong Put OI at {data.strike} ({data.put_oi:,}) - Support expected")
-            
-            # Analyze OI changes for directional bias
-            if data.call_change_oi > 0 and data.strike > current_price:
-                bearish_oi_buildup.append(data.strike)
-            
-            if data.put_change_oi > 0 and data.strike < current_price:
-                bullish_oi_buildup.append(data.strike)
+        for i in np.flatnonzero(levels['resistance'] | levels['support']):
+            strike = chain.strike[i].item()
+            if levels['resistance'][i]:
+                key_observations.append(f"Strong Call OI at {strike} ({int(chain.call_oi[i]):,}) - Resistance expected")
+            else:
+                key_observations.append(f"Strong Put OI at {strike} ({int(chain.put_oi[i]):,}) - Support expected")
         
         # Determine institutional positioning
         if len(bullish_oi_buildup) > len(bearish_oi_buildup):
@@ -262,22 +268,66 @@ class OptionChainAnalyzer:
             positioning = "Balanced institutional positioning - No clear directional bias"
         
         return OIAnalysis(
-            resistance_levels=sorted(resistance_levels)[:3],  # Top 3
-            support_levels=sorted(support_levels, reverse=True)[:3],  # Top 3
+            resistance_levels=resistance_levels[:3],  # Nearest 3 above price
+            support_levels=support_levels[::-1][:3],  # Nearest 3 below price
             key_observations=key_observations,
             institutional_positioning=positioning,
             bullish_oi_buildup=bullish_oi_buildup,
             bearish_oi_buildup=bearish_oi_buildup
         )
 
+    
+    def analyze_volatility(self, option_data: Union[List[OptionChainData], OptionChain], current_price: float,
+                           years_to_expiry: float = None) -> Optional[VolatilityAnalysis]:
+        """IV, skew and gamma exposure from the chain's option prices (Black-Scholes)"""
+        chain = as_option_chain(option_data)
+        if len(chain) == 0 or current_price <= 0:
+            return None
+        
+        summary = chain_summary(chain, current_price, years_to_expiry or time_to_expiry())
+        if math.isnan(summary['atm_iv']):
+            return None
+        
+        # Call gamma outweighing put gamma: hedging flows lean against the move (range-bound);
+        # put-heavy gamma: hedging chases the move (trending, volatile)
+        if summary['net_gamma_exposure'] >= 0:
+            signal = "Positive Gamma - Range Bound"
+            explanation = "Call gamma outweighs put gamma; hedging flows on this OI should dampen moves."
+        else:
+            signal = "Negative Gamma - Volatile"
+            explanation = "Put-heavy gamma: hedging flows can accelerate moves, especially on the downside."
+        
+        if summary['skew_25d'] > 3:
+            explanation += " Puts carry a clear volatility premium - downside protection in demand."
+        
+        return VolatilityAnalysis(
+            atm_iv=summary['atm_iv'],
+            iv_skew=summary['skew_25d'],
+            expected_move=summary['expected_move'],
+            net_gamma_exposure=summary['net_gamma_exposure'],
+            signal=signal,
+            explanation=explanation
+        )
+
 
 class AbidHassanAnalyzer:
     """Main analyzer implementing Abid Hassan's complete methodology"""
     
-    def __init__(self, db_path: str = "data/agency.db"):
+    def __init__(self, db_path: str = "data/agency.db", universe: List[str] = None, max_concurrency: int = 16,
+                 chain_provider: Optional[Callable[[str], Awaitable[Tuple[OptionChain, float]]]] = None):
         self.db_path = db_path
         self.option_analyzer = OptionChainAnalyzer()
         self.logger = logging.getLogger(__name__)
+        
+        # Scanner settings
+        env_universe = os.getenv('FNO_UNIVERSE')
+        self.universe = universe or ([s.strip() for s in env_universe.split(',') if s.strip()]
+                                     if env_universe else list(DEFAULT_FNO_UNIVERSE))
+        self.max_concurrency = max_concurrency
+        self.chain_provider = chain_provider or self.fetch_option_chain
+        self.price_tolerance = 0.001  # Re-analyze an unchanged chain once price moves 0.1%
+        self._scan_state: Dict[str, Tuple[str, float, AbidHassanAnalysis]] = {}
+        
         self.initialize_database()
     
     def initialize_database(self):
@@ -453,6 +503,13 @@ class AbidHassanAnalyzer:
             support_str = ", ".join([f"₹{level:,.0f}" for level in analysis.oi_analysis.support_levels])
             commentary.append(f"Key Support Levels: {support_str}")
         
+        # Volatility
+        volatility = analysis.volatility_analysis
+        if volatility:
+            commentary.append(f"\n🌡️ Volatility: ATM IV {volatility.atm_iv:.1f}%, skew {volatility.iv_skew:+.1f} pts, "
+                              f"expected move ±₹{volatility.expected_move:,.0f} - {volatility.signal}")
+            commentary.append(volatility.explanation)
+        
         # Overall view and strategy
         commentary.append(f"\n🧠 Abid Hassan Style Analysis:")
         commentary.append(f"Overall Sentiment: {analysis.overall_sentiment.value.replace('_', ' ').title()}")
@@ -465,59 +522,70 @@ class AbidHassanAnalyzer:
         
         return "\n".join(commentary)
     
+    async def fetch_option_chain(self, symbol: str) -> Tuple[OptionChain, float]:
+        """Option chain and spot price for a symbol (this would integrate with Kite MCP)"""
+        option_data = self.get_sample_option_data(symbol)
+        current_price = 19500 if symbol == "NIFTY" else 45000
+        return OptionChain.from_records(option_data), current_price
+    
+    def analyze_chain(self, symbol: str, chain: OptionChain, current_price: float) -> AbidHassanAnalysis:
+        """Run the full methodology on an option chain (no I/O)"""
+        # PCR Analysis
+        pcr = self.option_analyzer.calculate_pcr(chain)
+        pcr_analysis = self.option_analyzer.analyze_pcr_sentiment(pcr)
+        
+        # Max Pain Analysis  
+        max_pain_strike = self.option_analyzer.calculate_max_pain(chain)
+        max_pain_analysis = self.option_analyzer.analyze_max_pain(max_pain_strike, current_price)
+        
+        # OI Pattern Analysis
+        oi_analysis = self.option_analyzer.analyze_oi_patterns(chain, current_price)
+        
+        # Overall sentiment and strategy
+        overall_sentiment = self.determine_overall_sentiment(pcr_analysis, max_pain_analysis, oi_analysis)
+        recommended_strategy = self.recommend_strategy(overall_sentiment)
+        
+        # Key levels
+        key_levels = {
+            'current_price': current_price,
+            'max_pain': max_pain_strike,
+            'immediate_resistance': oi_analysis.resistance_levels[0] if oi_analysis.resistance_levels else current_price * 1.02,
+            'immediate_support': oi_analysis.support_levels[0] if oi_analysis.support_levels else current_price * 0.98
+        }
+        
+        # Risk-reward setup
+        risk_reward_setup = {
+            'upside_target': key_levels['immediate_resistance'],
+            'downside_target': key_levels['immediate_support'],
+            'risk_reward_ratio': abs(key_levels['immediate_resistance'] - current_price) / abs(current_price - key_levels['immediate_support']) if key_levels['immediate_support'] != current_price else 1.0
+        }
+        
+        analysis = AbidHassanAnalysis(
+            symbol=symbol,
+            current_price=current_price,
+            analysis_time=datetime.now(),
+            pcr_analysis=pcr_analysis,
+            max_pain_analysis=max_pain_analysis,
+            oi_analysis=oi_analysis,
+            overall_sentiment=overall_sentiment,
+            recommended_strategy=recommended_strategy,
+            key_levels=key_levels,
+            risk_reward_setup=risk_reward_setup,
+            market_commentary=""
+        )
+        
+        # Volatility picture from the same chain
+        analysis.volatility_analysis = self.option_analyzer.analyze_volatility(chain, current_price)
+        
+        # Generate commentary
+        analysis.market_commentary = self.generate_market_commentary(analysis)
+        return analysis
+    
     async def analyze_symbol(self, symbol: str) -> AbidHassanAnalysis:
         """Perform complete Abid Hassan style analysis for a symbol"""
         try:
-            # Get option chain data (this would integrate with Kite MCP)
-            option_data = self.get_sample_option_data(symbol)
-            current_price = 19500 if symbol == "NIFTY" else 45000
-            
-            # PCR Analysis
-            pcr = self.option_analyzer.calculate_pcr(option_data)
-            pcr_analysis = self.option_analyzer.analyze_pcr_sentiment(pcr)
-            
-            # Max Pain Analysis  
-            max_pain_strike = self.option_analyzer.calculate_max_pain(option_data)
-            max_pain_analysis = self.option_analyzer.analyze_max_pain(max_pain_strike, current_price)
-            
-            # OI Pattern Analysis
-            oi_analysis = self.option_analyzer.analyze_oi_patterns(option_data, current_price)
-            
-            # Overall sentiment and strategy
-            overall_sentiment = self.determine_overall_sentiment(pcr_analysis, max_pain_analysis, oi_analysis)
-            recommended_strategy = self.recommend_strategy(overall_sentiment)
-            
-            # Key levels
-            key_levels = {
-                'current_price': current_price,
-                'max_pain': max_pain_strike,
-                'immediate_resistance': oi_analysis.resistance_levels[0] if oi_analysis.resistance_levels else current_price * 1.02,
-                'immediate_support': oi_analysis.support_levels[0] if oi_analysis.support_levels else current_price * 0.98
-            }
-            
-            # Risk-reward setup
-            risk_reward_setup = {
-                'upside_target': key_levels['immediate_resistance'],
-                'downside_target': key_levels['immediate_support'],
-                'risk_reward_ratio': abs(key_levels['immediate_resistance'] - current_price) / abs(current_price - key_levels['immediate_support']) if key_levels['immediate_support'] != current_price else 1.0
-            }
-            
-            analysis = AbidHassanAnalysis(
-                symbol=symbol,
-                current_price=current_price,
-                analysis_time=datetime.now(),
-                pcr_analysis=pcr_analysis,
-                max_pain_analysis=max_pain_analysis,
-                oi_analysis=oi_analysis,
-                overall_sentiment=overall_sentiment,
-                recommended_strategy=recommended_strategy,
-                key_levels=key_levels,
-                risk_reward_setup=risk_reward_setup,
-                market_commentary=""
-            )
-            
-            # Generate commentary
-            analysis.market_commentary = self.generate_market_commentary(analysis)
+            chain, current_price = await self.chain_provider(symbol)
+            analysis = self.analyze_chain(symbol, chain, current_price)
             
             # Store in database
             await self.save_analysis(analysis)
@@ -530,15 +598,22 @@ class AbidHassanAnalyzer:
     
     async def save_analysis(self, analysis: AbidHassanAnalysis):
         """Save analysis to database"""
+        self.save_analyses([analysis])
+    
+    def save_analyses(self, analyses: List[AbidHassanAnalysis]):
+        """Save a batch of analyses in one transaction"""
+        if not analyses:
+            return
+        
         with sqlite3.connect(self.db_path) as conn:
             cursor = conn.cursor()
             
-            cursor.execute('''
+            cursor.executemany('''
                 INSERT INTO abid_hassan_analysis 
                 (symbol, current_price, pcr, pcr_sentiment, max_pain_strike, 
                  overall_sentiment, recommended_strategy, market_commentary, analysis_data)
                 VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
-            ''', (
+            ''', [(
                 analysis.symbol,
                 analysis.current_price,
                 analysis.pcr_analysis.pcr,
@@ -548,29 +623,144 @@ class AbidHassanAnalyzer:
                 analysis.recommended_strategy.value,
                 analysis.market_commentary,
                 json.dumps(asdict(analysis), default=str)
-            ))
+            ) for analysis in analyses])
             
             conn.commit()
-            self.logger.info(f"Analysis saved for {analysis.symbol}")
+            self.logger.info(f"Analysis saved for {', '.join(a.symbol for a in analyses[:5])}"
+                             f"{f' and {len(analyses) - 5} more' if len(analyses) > 5 else ''}")
     
     async def get_daily_analysis(self, symbols: List[str] = None) -> List[AbidHassanAnalysis]:
-        """Generate daily analysis for multiple symbols"""
+        """Generate daily analysis for multiple symbols (concurrently, in input order)"""
         if symbols is None:
             symbols = ["NIFTY", "BANKNIFTY"]
         
-        analyses = []
-        for symbol in symbols:
+        semaphore = asyncio.Semaphore(self.max_concurrency)
+        
+        async def analyze(symbol):
+            async with semaphore:
+                try:
+                    analysis = await self.analyze_symbol(symbol)
+                    self.logger.info(f"Completed analysis for {symbol}")
+                    return analysis
+                except Exception as e:
+                    self.logger.error(f"Failed to analyze {symbol}: {e}")
+                    return None
+        
+        results = await asyncio.gather(*(analyze(symbol) for symbol in symbols))
+        return [analysis for analysis in results if analysis is not None]
+    
+    async def scan(self, symbols: List[str] = None) -> ScanResult:
+        """
+        Scanner mode: fetch every chain in the universe with bounded concurrency,
+        skip symbols whose chain fingerprint and price are unchanged since the
+        last scan, and report only what changed.
+        """
+        symbols = symbols or self.universe
+        started_at = datetime.now()
+        start = time.perf_counter()
+        semaphore = asyncio.Semaphore(self.max_concurrency)
+        
+        async def fetch(symbol):
+            async with semaphore:
+                return await self.chain_provider(symbol)
+        
+        fetched = await asyncio.gather(*(fetch(symbol) for symbol in symbols), return_exceptions=True)
+        
+        analyzed, unchanged, failed, deltas = [], [], {}, []
+        for symbol, outcome in zip(symbols, fetched):
+            if isinstance(outcome, Exception):
+                failed[symbol] = str(outcome)
+                self.logger.error(f"Failed to fetch option chain for {symbol}: {outcome}")
+                continue
+            
+            chain, current_price = outcome
+            fingerprint = chain.fingerprint()
+            previous = self._scan_state.get(symbol)
+            if previous and self._is_unchanged(previous, chain, fingerprint, current_price):
+                unchanged.append(symbol)
+                continue
+            
             try:
-                analysis = await self.analyze_symbol(symbol)
-                analyses.append(analysis)
-                self.logger.info(f"Completed analysis for {symbol}")
+                analysis = self.analyze_chain(symbol, chain, current_price)
             except Exception as e:
+                failed[symbol] = str(e)
                 self.logger.error(f"Failed to analyze {symbol}: {e}")
-        
-        return analyses
+                continue
+            
+            deltas.extend(self.diff_analyses(previous[2] if previous else None, analysis))
+            self._scan_state[symbol] = (fingerprint, current_price, analysis)
+            analyzed.append(analysis)
+        
+        self.save_analyses(analyzed)
+        
+        result = ScanResult(
+            started_at=started_at,
+            elapsed_seconds=time.perf_counter() - start,
+            analyzed=analyzed,
+            unchanged=unchanged,
+            failed=failed,
+            deltas=deltas
+        )
+        self.logger.info(f"Scanned {len(symbols)} symbols in {result.elapsed_seconds:.2f}s: "
+                         f"{len(analyzed)} re-analyzed, {len(unchanged)} unchanged, "
+                         f"{len(failed)} failed, {len(deltas)} deltas")
+        return result
+    
+    def _is_unchanged(self, previous: Tuple[str, float, AbidHassanAnalysis], chain: OptionChain,
+                      fingerprint: str, current_price: float) -> bool:
+        """Same chain, price within tolerance and on the same side of every strike"""
+        previous_fingerprint, previous_price, _ = previous
+        if fingerprint != previous_fingerprint:
+            return False
+        if abs(current_price - previous_price) > previous_price * self.price_tolerance:
+            return False
+        return (np.searchsorted(chain.strike, current_price) == np.searchsorted(chain.strike, previous_price) and
+                np.searchsorted(chain.strike, current_price, side='right') ==
+                np.searchsorted(chain.strike, previous_price, side='right'))
+    
+    def diff_analyses(self, previous: Optional[AbidHassanAnalysis], current: AbidHassanAnalysis) -> List[ScanDelta]:
+        """What changed between two analyses of the same symbol"""
+        symbol = current.symbol
+        if previous is None:
+            return [ScanDelta(symbol, 'initial',
+                              f"{symbol}: PCR {current.pcr_analysis.pcr:.2f}, max pain {current.max_pain_analysis.max_pain_strike}",
+                              current=current.overall_sentiment.value)]
+        
+        deltas = []
+        for level in sorted(set(current.oi_analysis.resistance_levels) - set(previous.oi_analysis.resistance_levels)):
+            deltas.append(ScanDelta(symbol, 'new_resistance', f"{symbol}: new call OI resistance at {level}",
+                                    current=level))
+        for level in sorted(set(current.oi_analysis.support_levels) - set(previous.oi_analysis.support_levels)):
+            deltas.append(ScanDelta(symbol, 'new_support', f"{symbol}: new put OI support at {level}",
+                                    current=level))
+        
+        if current.pcr_analysis.signal != previous.pcr_analysis.signal:
+            deltas.append(ScanDelta(symbol, 'pcr_regime',
+                                    f"{symbol}: PCR {previous.pcr_analysis.pcr:.2f} -> {current.pcr_analysis.pcr:.2f} "
+                                    f"({previous.pcr_analysis.signal} -> {current.pcr_analysis.signal})",
+                                    previous=previous.pcr_analysis.signal, current=current.pcr_analysis.signal))
+        
+        previous_max_pain = previous.max_pain_analysis.max_pain_strike
+        current_max_pain = current.max_pain_analysis.max_pain_strike
+        if current_max_pain != previous_max_pain:
+            deltas.append(ScanDelta(symbol, 'max_pain_shift',
+                                    f"{symbol}: max pain {previous_max_pain} -> {current_max_pain}",
+                                    previous=previous_max_pain, current=current_max_pain))
+        
+        if current.overall_sentiment != previous.overall_sentiment:
+            deltas.append(ScanDelta(symbol, 'sentiment',
+                                    f"{symbol}: sentiment {previous.overall_sentiment.value} -> {current.overall_sentiment.value}",
+                                    previous=previous.overall_sentiment.value, current=current.overall_sentiment.value))
+        return deltas
+    
+    @staticmethod
+    def is_market_open(now: datetime = None) -> bool:
+        """Market hours (9:15 AM to 3:30 PM IST)"""
+        now = now or datetime.now()
+        return 9 <= now.hour < 15 or (now.hour == 15 and now.minute <= 30)
     
     async def run_continuous_analysis(self, symbols: List[str] = None, interval_minutes: int = 15):
-        """Run continuous analysis like Abid Hassan's daily show"""
+        """Run continuous analysis like Abid Hassan's daily show; only changed symbols are re-analyzed and printed"""
         if symbols is None:
             symbols = ["NIFTY", "BANKNIFTY"]
         
@@ -578,18 +768,16 @@ class AbidHassanAnalyzer:
         
         while True:
             try:
-                current_time = datetime.now()
-                
-                # Only analyze during market hours (9:15 AM to 3:30 PM IST)
-                if 9 <= current_time.hour < 15 or (current_time.hour == 15 and current_time.minute <= 30):
-                    analyses = await self.get_daily_analysis(symbols)
+                if self.is_market_open():
+                    result = await self.scan(symbols)
                     
-                    for analysis in analyses:
+                    for analysis in result.analyzed:
                         print(f"\n{'='*50}")
                         print(analysis.market_commentary)
                         print(f"{'='*50}")
                     
-                    self.logger.info(f"Completed analysis cycle for {len(analyses)} symbols")
+                    self.logger.info(f"Completed analysis cycle: {len(result.analyzed)} updated, "
+                                     f"{len(result.unchanged)} unchanged")
                 else:
                     self.logger.info("Market closed - waiting for next session")
                 
@@ -599,6 +787,33 @@ class AbidHassanAnalyzer:
             except Exception as e:
                 self.logger.error(f"Error in continuous analysis: {e}")
                 await asyncio.sleep(60)
+    
+    async def run_continuous_scan(self, interval_seconds: int = 60, on_deltas: Callable[[List[ScanDelta]], None] = None):
+        """Scan the whole F&O universe every interval_seconds and emit only the deltas"""
+        self.logger.info(f"Starting F&O scanner over {len(self.universe)} underlyings every {interval_seconds}s")
+        
+        while True:
+            cycle_start = time.perf_counter()
+            try:
+                if self.is_market_open():
+                    result = await self.scan()
+                    if on_deltas:
+                        on_deltas(result.deltas)
+                    else:
+                        for delta in result.deltas:
+                            print(f"Δ {delta.detail}")
+                    
+                    if result.elapsed_seconds > interval_seconds:
+                        self.logger.warning(f"Scan took {result.elapsed_seconds:.1f}s, longer than the "
+                                            f"{interval_seconds}s cadence")
+                else:
+                    self.logger.info("Market closed - waiting for next session")
+                
+            except Exception as e:
+                self.logger.error(f"Error in continuous scan: {e}")
+            
+            # Keep a fixed cadence regardless of how long the scan took
+            await asyncio.sleep(max(1.0, interval_seconds - (time.perf_counter() - cycle_start)))
 
 
 async def main():
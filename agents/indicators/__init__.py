@@ -0,0 +1,24 @@
+#!/usr/bin/env python3
+"""
+Indicator Kernels
+NumPy versions of the TA-Lib indicators the agents use, computed on
+(symbols x bars) arrays so a whole universe is one array pass; a 1-D series is
+one symbol. Lookbacks and seeding follow TA-Lib, so each output equals TA-Lib's
+to floating point rounding. Rows may start with NaN (symbols listed later) but
+must not have gaps after their first bar.
+
+streaming_indicators keeps the bar-by-bar versions of the same set.
+"""
+
+from .momentum import adx, directional_movement, macd, rsi, stoch
+from .smoothing import ema, sma
+from .technical import technical_indicators
+from .volatility import atr, bbands, true_range
+from .volume import obv
+from .zones import RSI_OVERBOUGHT, RSI_OVERSOLD, RSI_STRONG, RSI_WEAK, rsi_zone
+
+__all__ = [
+    'adx', 'atr', 'bbands', 'directional_movement', 'ema', 'macd', 'obv', 'rsi', 'sma', 'stoch',
+    'technical_indicators', 'true_range', 'rsi_zone',
+    'RSI_OVERSOLD', 'RSI_WEAK', 'RSI_STRONG', 'RSI_OVERBOUGHT',
+]
@@ -0,0 +1,120 @@
+#!/usr/bin/env python3
+"""
+Momentum indicators: RSI, MACD, stochastic and ADX, with TA-Lib's lookbacks
+and seeding (outputs start on the same bar as TA-Lib's).
+"""
+
+from typing import Tuple
+
+import numpy as np
+
+from .smoothing import EPSILON, as_rows, first_valid, recurse, restore, rolling_sum, wilder, window_mean
+from .volatility import true_range
+
+
+def _deltas(x: np.ndarray) -> np.ndarray:
+    delta = np.full_like(x, np.nan)
+    delta[:, 1:] = np.diff(x, axis=1)
+    return delta
+
+
+def rsi(close, period: int = 14) -> np.ndarray:
+    """Wilder RSI: average gain and loss seeded with the mean of the first period changes"""
+    close, single = as_rows(close)
+    delta = _deltas(close)
+    seed_at = first_valid(close) + period
+    gain = wilder(np.where(delta > 0, delta, np.where(np.isnan(delta), np.nan, 0.0)), period, seed_at)
+    loss = wilder(np.where(delta < 0, -delta, np.where(np.isnan(delta), np.nan, 0.0)), period, seed_at)
+    total = gain + loss
+    with np.errstate(divide='ignore', invalid='ignore'):
+        out = np.where(np.abs(total) < EPSILON, 0.0, 100 * (gain / total))
+    return restore(np.where(np.isnan(total), np.nan, out), single)
+
+
+def macd(close, fast: int = 12, slow: int = 26, signal: int = 9) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    MACD line, signal line and histogram. As in TA-Lib the fast EMA is seeded
+    on the fast bars ending where the slow EMA is seeded, and all three outputs
+    start slow + signal - 2 bars in.
+    """
+    close, single = as_rows(close)
+    seed_at = first_valid(close) + slow - 1
+    slow_ema = recurse(close, window_mean(close, seed_at, slow), seed_at, 1 - 2 / (slow + 1), 2 / (slow + 1))
+    fast_ema = recurse(close, window_mean(close, seed_at, fast), seed_at, 1 - 2 / (fast + 1), 2 / (fast + 1))
+    line = fast_ema - slow_ema
+    signal_at = seed_at + signal - 1
+    signal_line = recurse(line, window_mean(line, signal_at, signal), signal_at, 1 - 2 / (signal + 1),
+                          2 / (signal + 1))
+    line = np.where(np.isnan(signal_line), np.nan, line)
+    return restore(line, single), restore(signal_line, single), restore(line - signal_line, single)
+
+
+def rolling_extreme(x: np.ndarray, period: int, pick) -> np.ndarray:
+    """np.maximum / np.minimum over the last period values"""
+    out = x.copy()
+    for lag in range(1, period):
+        out[:, lag:] = pick(out[:, lag:], x[:, :-lag])
+    out[:, :period - 1] = np.nan
+    return out
+
+
+def stoch(high, low, close, fastk: int = 5, slowk: int = 3, slowd: int = 3) -> Tuple[np.ndarray, np.ndarray]:
+    """Slow stochastic %K and %D (SMA smoothing)"""
+    high, single = as_rows(high)
+    low, close = as_rows(low)[0], as_rows(close)[0]
+    highest = rolling_extreme(high, fastk, np.maximum)
+    lowest = rolling_extreme(low, fastk, np.minimum)
+    scale = (highest - lowest) / 100.0
+    with np.errstate(divide='ignore', invalid='ignore'):
+        fast = np.where(scale != 0, (close - lowest) / scale, np.where(np.isnan(scale), np.nan, 0.0))
+    slow_k = rolling_sum(fast, slowk) / slowk
+    slow_d = rolling_sum(slow_k, slowd) / slowd
+    return restore(np.where(np.isnan(slow_d), np.nan, slow_k), single), restore(slow_d, single)
+
+
+def directional_movement(high: np.ndarray, low: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """+DM and -DM per bar (NaN on a row's first bar)"""
+    up, down = _deltas(high), -_deltas(low)
+    plus = np.where((up > 0) & (up > down), up, 0.0)
+    minus = np.where((down > 0) & (up < down), down, 0.0)
+    missing = np.isnan(up) | np.isnan(down)
+    return np.where(missing, np.nan, plus), np.where(missing, np.nan, minus)
+
+
+def adx(high, low, close, period: int = 14) -> np.ndarray:
+    """
+    Wilder ADX: DM and true range summed over period - 1 bars then smoothed,
+    DX averaged over period bars, then Wilder-smoothed. A bar whose DX is
+    undefined (no range) keeps the previous ADX.
+    """
+    high, single = as_rows(high)
+    low, close = as_rows(low)[0], as_rows(close)[0]
+    plus_dm, minus_dm = directional_movement(high, low)
+    tr = true_range(high, low, close)
+    start = first_valid(close)
+    sums_at = start + period - 1  # period - 1 raw values after the first bar
+    decay = 1 - 1 / period
+    smoothed = [recurse(values, window_mean(values, sums_at, period - 1) * (period - 1), sums_at, decay, 1.0)
+                for values in (plus_dm, minus_dm, tr)]
+    plus_sum, minus_sum, tr_sum = smoothed
+
+    columns = np.arange(close.shape[1])[None, :]
+    with np.errstate(divide='ignore', invalid='ignore'):
+        plus_di, minus_di = 100 * (plus_sum / tr_sum), 100 * (minus_sum / tr_sum)
+        di_sum = plus_di + minus_di
+        dx = 100 * (np.abs(minus_di - plus_di) / di_sum)
+    defined = (np.abs(tr_sum) >= EPSILON) & (np.abs(di_sum) >= EPSILON)
+    dx = np.where(defined & (columns > sums_at[:, None]), dx, np.nan)
+
+    adx_at = start + 2 * period - 1
+    seed = window_mean(np.nan_to_num(dx), adx_at, period)
+    out = recurse(np.nan_to_num(dx), seed, adx_at, decay, 1 / period)
+    # Rows with an undefined DX after the seed hold their ADX there: walk those bar by bar
+    after = columns > adx_at[:, None]
+    for row in np.flatnonzero((np.isnan(dx) & after).any(axis=1)):
+        value = out[row, adx_at[row]]
+        for t in range(adx_at[row] + 1, close.shape[1]):
+            if not np.isnan(dx[row, t]):
+                value = ((value * (period - 1)) + dx[row, t]) / period
+            out[row, t] = value
+    return restore(out, single)
@@ -0,0 +1,95 @@
+#!/usr/bin/env python3
+"""
+Moving averages and the recursive filters the other kernels are built on.
+Arrays are (symbols x bars) or a single 1-D series; a row may start with NaN
+(a symbol listed later) and is computed from its first value onward.
+"""
+
+from typing import Tuple
+
+import numpy as np
+from scipy.signal import lfilter
+
+EPSILON = 1e-14  # TA_IS_ZERO threshold of the TA-Lib build in use
+
+
+def as_rows(x) -> Tuple[np.ndarray, bool]:
+    """float64 (rows x bars) view of x and whether x was one series"""
+    x = np.asarray(x, dtype=np.float64)
+    return (x[None, :], True) if x.ndim == 1 else (x, False)
+
+
+def restore(out: np.ndarray, single: bool) -> np.ndarray:
+    return out[0] if single else out
+
+
+def first_valid(x: np.ndarray) -> np.ndarray:
+    """Column of each row's first non-NaN value; the row length when it has none"""
+    valid = ~np.isnan(x)
+    return np.where(valid.any(axis=1), valid.argmax(axis=1), x.shape[1])
+
+
+def window_mean(x: np.ndarray, end: np.ndarray, length: int) -> np.ndarray:
+    """Mean of each row's length values ending at column end (NaN where end is past the row)"""
+    rows = np.flatnonzero(end < x.shape[1])
+    out = np.full(len(x), np.nan)
+    if len(rows):
+        columns = end[rows, None] - np.arange(length - 1, -1, -1)
+        out[rows] = x[rows[:, None], columns].sum(axis=1) / length
+    return out
+
+
+def recurse(x: np.ndarray, seed: np.ndarray, seed_at: np.ndarray, decay: float, gain: float) -> np.ndarray:
+    """
+    y[seed_at] = seed, then y[t] = decay * y[t-1] + gain * x[t] along each row;
+    NaN before the seed. Rows seeded on the same column share one filter call.
+    """
+    out = np.full_like(x, np.nan)
+    bars = x.shape[1]
+    for at in np.unique(seed_at):
+        if at >= bars:
+            continue
+        rows = np.flatnonzero((seed_at == at) & ~np.isnan(seed))
+        if not len(rows):
+            continue
+        out[rows, at] = seed[rows]
+        if at + 1 < bars:
+            out[rows, at + 1:] = lfilter([gain], [1, -decay], x[rows, at + 1:], axis=1,
+                                         zi=(decay * seed[rows])[:, None])[0]
+    return out
+
+
+def rolling_sum(x: np.ndarray, period: int) -> np.ndarray:
+    """Sum of the last period values, NaN until a row has period values"""
+    if x.shape[1] < period:
+        return np.full_like(x, np.nan)
+    present = ~np.isnan(x)
+    # Running totals of values less each row's first value keep the differences exact enough
+    shift = np.nan_to_num(x[np.arange(len(x)), np.minimum(first_valid(x), x.shape[1] - 1)])[:, None]
+    zero = np.zeros((len(x), 1))
+    totals = np.hstack([zero, np.cumsum(np.where(present, x - shift, 0.0), axis=1)])
+    counts = np.hstack([zero, np.cumsum(present, axis=1)])
+    sums = totals[:, period:] - totals[:, :-period] + period * shift
+    full = counts[:, period:] - counts[:, :-period] == period
+    out = np.full_like(x, np.nan)
+    out[:, period - 1:] = np.where(full, sums, np.nan)
+    return out
+
+
+def sma(x, period: int = 30) -> np.ndarray:
+    """Simple moving average"""
+    x, single = as_rows(x)
+    return restore(rolling_sum(x, period) / period, single)
+
+
+def ema(x, period: int = 30) -> np.ndarray:
+    """Exponential moving average (k = 2 / (period + 1)) seeded with the SMA of the first period values"""
+    x, single = as_rows(x)
+    seed_at = first_valid(x) + period - 1
+    return restore(recurse(x, window_mean(x, seed_at, period), seed_at, 1 - 2 / (period + 1), 2 / (period + 1)),
+                   single)
+
+
+def wilder(x: np.ndarray, period: int, seed_at: np.ndarray) -> np.ndarray:
+    """Wilder smoothing ((prev * (period - 1) + x) / period) seeded with the mean of the period values ending at seed_at"""
+    return recurse(x, window_mean(x, seed_at, period), seed_at, (period - 1) / period, 1 / period)
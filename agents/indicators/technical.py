@@ -0,0 +1,39 @@
+#!/usr/bin/env python3
+"""
+The indicator set TechnicalAnalysisAgent reports, for one symbol or a whole
+universe in one pass.
+"""
+
+from typing import Dict
+
+import numpy as np
+
+from .momentum import adx, macd, rsi, stoch
+from .smoothing import ema, sma
+from .volatility import atr, bbands
+from .volume import obv
+
+
+def technical_indicators(high, low, close, volume) -> Dict[str, np.ndarray]:
+    """Every series keyed by TechnicalAnalysisAgent's indicator names"""
+    macd_line, macd_signal, macd_histogram = macd(close)
+    upper, middle, lower = bbands(close, 20)
+    slow_k, slow_d = stoch(high, low, close)
+    return {
+        'SMA_20': sma(close, 20),
+        'SMA_50': sma(close, 50),
+        'SMA_200': sma(close, 200),
+        'EMA_20': ema(close, 20),
+        'RSI': rsi(close, 14),
+        'MACD': macd_line,
+        'MACD_signal': macd_signal,
+        'MACD_histogram': macd_histogram,
+        'BB_upper': upper,
+        'BB_middle': middle,
+        'BB_lower': lower,
+        'STOCH_K': slow_k,
+        'STOCH_D': slow_d,
+        'ATR': atr(high, low, close, 14),
+        'ADX': adx(high, low, close, 14),
+        'OBV': obv(close, volume),
+    }
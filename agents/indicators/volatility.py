@@ -0,0 +1,41 @@
+#!/usr/bin/env python3
+"""
+Volatility indicators: true range, ATR and Bollinger Bands.
+"""
+
+from typing import Tuple
+
+import numpy as np
+
+from .smoothing import EPSILON, as_rows, first_valid, restore, rolling_sum, wilder
+
+
+def true_range(high: np.ndarray, low: np.ndarray, close: np.ndarray) -> np.ndarray:
+    """Greatest of high - low and the gaps from the previous close (NaN on a row's first bar)"""
+    previous = np.full_like(close, np.nan)
+    previous[:, 1:] = close[:, :-1]
+    return np.maximum(high - low, np.maximum(np.abs(high - previous), np.abs(low - previous)))
+
+
+def atr(high, low, close, period: int = 14) -> np.ndarray:
+    """Wilder average true range seeded with the mean of the first period true ranges"""
+    high, single = as_rows(high)
+    low, close = as_rows(low)[0], as_rows(close)[0]
+    return restore(wilder(true_range(high, low, close), period, first_valid(close) + period), single)
+
+
+def bbands(close, period: int = 20, deviations: float = 2.0) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Upper, middle (SMA) and lower Bollinger Bands on the population standard deviation"""
+    close, single = as_rows(close)
+    middle = rolling_sum(close, period) / period
+    # Squared deviations from each window's own mean, one lag at a time: flat windows give exactly 0
+    variance = np.full_like(close, np.nan)
+    if close.shape[1] >= period:
+        bars = close.shape[1]
+        total = np.zeros((len(close), bars - period + 1))
+        for lag in range(period):
+            deviation = close[:, period - 1 - lag:bars - lag] - middle[:, period - 1:]
+            total += deviation * deviation
+        variance[:, period - 1:] = total / period
+    width = np.where(variance < EPSILON, np.where(np.isnan(variance), np.nan, 0.0), np.sqrt(variance)) * deviations
+    return restore(middle + width, single), restore(middle, single), restore(middle - width, single)
@@ -0,0 +1,20 @@
+#!/usr/bin/env python3
+"""
+Volume indicators.
+"""
+
+import numpy as np
+
+from .smoothing import as_rows, first_valid, restore
+
+
+def obv(close, volume) -> np.ndarray:
+    """On-balance volume starting from the first bar's volume"""
+    close, single = as_rows(close)
+    volume = as_rows(volume)[0]
+    direction = np.zeros_like(close)
+    direction[:, 1:] = np.sign(np.diff(close, axis=1))
+    start = first_valid(close)
+    columns = np.arange(close.shape[1])[None, :]
+    flow = np.where(columns == start[:, None], volume, np.nan_to_num(direction * volume))
+    return restore(np.where(columns < start[:, None], np.nan, np.cumsum(flow, axis=1)), single)
@@ -0,0 +1,19 @@
+#!/usr/bin/env python3
+"""
+RSI zones shared by every module that turns an RSI reading into words.
+"""
+
+import numpy as np
+
+RSI_OVERSOLD = 30
+RSI_WEAK = 45
+RSI_STRONG = 55
+RSI_OVERBOUGHT = 70
+
+
+def rsi_zone(value):
+    """OVERSOLD (< 30), WEAK (< 45), NEUTRAL (45-55), STRONG (> 55) or OVERBOUGHT (> 70); arrays map elementwise"""
+    value = np.asarray(value, dtype=np.float64)
+    zones = np.select([value < RSI_OVERSOLD, value > RSI_OVERBOUGHT, value < RSI_WEAK, value > RSI_STRONG],
+                      ['OVERSOLD', 'OVERBOUGHT', 'WEAK', 'STRONG'], 'NEUTRAL')
+    return str(zones) if zones.ndim == 0 else zones
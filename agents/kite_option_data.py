@@ -12,6 +12,9 @@ from typing import Dict, List, Optional, Tuple
 import pandas as pd
 from dataclasses import dataclass
 
+from .option_chain import OptionChain
+from .option_chain_stream import SIDES, ChainSnapshot, OptionChainStore, _field
+
 logger = logging.getLogger(__name__)
 
 @dataclass
@@ -38,6 +41,10 @@ class KiteOptionChainFetcher:
         self.logger = logging.getLogger(__name__)
         # This would be initialized with actual Kite MCP connection
         self.kite_client = None
+        # Live chains kept current by ticks; get_chain_snapshot reads from here
+        self.chain_store = OptionChainStore()
+        self.streaming_symbols = set()  # Chains with a live tick feed
+        self.snapshot_ttl = 60  # Seconds before a chain without a feed is fetched again
         
     async def initialize_connection(self):
         """Initialize connection to Kite MCP"""
@@ -157,6 +164,49 @@ class KiteOptionChainFetcher:
             self.logger.error(f"Error fetching option chain for {symbol}: {e}")
             return {}
     
+    async def get_chain_snapshot(self, symbol: str, expiry: str = None) -> Optional[ChainSnapshot]:
+        """
+        Latest streamed chain; seeded from one full fetch the first time a chain is
+        asked for. Without a live feed for the symbol, it is fetched again once the
+        snapshot is older than snapshot_ttl seconds.
+        """
+        snapshot = self.chain_store.snapshot(symbol, expiry)
+        stale = (snapshot is not None and symbol not in self.streaming_symbols and
+                 (datetime.now() - snapshot.updated_at).total_seconds() >= self.snapshot_ttl)
+        if snapshot is None or len(snapshot.chain) == 0 or stale:
+            option_chain = await self.get_option_chain(symbol, expiry)
+            fetched = self.chain_store.load_chain(option_chain) if option_chain else None
+            # A failed refetch keeps serving the stale chain
+            snapshot = fetched or (snapshot if stale else None)
+        return snapshot
+    
+    def start_streaming(self, zerodha, instruments: List[Dict], underlyings: Dict[str, int] = None):
+        """
+        Keep chain_store current from a ZerodhaMCPIntegration live tick subscription
+        to the option contracts and their underlyings. Symbols only stop being
+        refetched once the subscription went through; returns False if it failed.
+        """
+        instruments = list(instruments)
+        registered = self.chain_store.register_instruments(instruments)
+        for symbol, token in (underlyings or {}).items():
+            self.chain_store.register_underlying(symbol, token)
+        options = [instrument for instrument in instruments if _field(instrument, 'instrument_type') in SIDES]
+        tradingsymbols = [_field(option, 'tradingsymbol') for option in options]
+        if None in tradingsymbols:
+            self.logger.warning(f"{tradingsymbols.count(None)} option instruments have no tradingsymbol, not subscribed")
+        subscription = list(dict.fromkeys([ts for ts in tradingsymbols if ts] + list(underlyings or {})))
+        try:
+            subscribed = self.chain_store.attach(zerodha, subscription)
+        except Exception as e:
+            self.logger.error(f"Live subscription to {len(subscription)} instruments failed: {e}")
+            return False
+        if subscribed is False:
+            self.logger.error(f"Live subscription to {len(subscription)} instruments was refused")
+            return False
+        self.streaming_symbols.update(_field(option, 'name') for option in options if _field(option, 'tradingsymbol'))
+        self.logger.info(f"Streaming {registered} option instruments into the chain store")
+        return subscribed
+    
     def get_next_expiry(self) -> str:
         """Get the next weekly/monthly expiry date"""
         today = datetime.now()
@@ -350,11 +400,12 @@ class AbidHassanKiteIntegration:
     async def get_real_option_data(self, symbol: str) -> List:
         """Get real option chain data for Abid Hassan analysis"""
         try:
-            # Fetch option chain from Kite
-            option_chain = await self.kite_fetcher.get_option_chain(symbol)
+            snapshot = await self.kite_fetcher.get_chain_snapshot(symbol)
+            if snapshot is None:
+                return []
             
             # Convert to Abid Hassan format
-            converted_data = await self.kite_fetcher.convert_option_chain_to_abid_format(option_chain)
+            converted_data = snapshot.to_records()
             
             self.logger.info(f"Fetched {len(converted_data)} option strikes for {symbol}")
             return converted_data
@@ -363,18 +414,30 @@ class AbidHassanKiteIntegration:
             self.logger.error(f"Error getting real option data for {symbol}: {e}")
             return []
     
+    async def chain_provider(self, symbol: str) -> Tuple[OptionChain, float]:
+        """
+        AbidHassanAnalyzer chain_provider backed by the streamed chain. The analyzer
+        keeps the chain past this call, so it is a snapshot() read: no copy here, but
+        the chain's next publish copies its whole front buffer instead of updating
+        the ticked rows in place (one full chain copy per read). Readers done with
+        the chain inside a with block should use chain_store.pinned(), which only
+        costs a copy when a publish lands while the chain is pinned.
+        """
+        snapshot = await self.kite_fetcher.get_chain_snapshot(symbol)
+        if snapshot is None:
+            raise ValueError(f"No option chain for {symbol}")
+        return snapshot.chain, snapshot.underlying_price
+    
     async def get_enhanced_analysis_data(self, symbol: str) -> Dict:
         """Get enhanced data for comprehensive analysis"""
         try:
-            # Fetch multiple data sources
-            option_data = await self.get_real_option_data(symbol)
+            # Option data and price from the same chain snapshot
+            snapshot = await self.kite_fetcher.get_chain_snapshot(symbol)
+            option_data = snapshot.to_records() if snapshot else []
+            current_price = snapshot.underlying_price if snapshot else 0
             fii_dii_data = await self.kite_fetcher.get_fii_dii_data()
             vix = await self.kite_fetcher.get_india_vix()
             
-            # Get current market price
-            option_chain = await self.kite_fetcher.get_option_chain(symbol)
-            current_price = option_chain.get("underlying_value", 0)
-            
             return {
                 "option_data": option_data,
                 "current_price": current_price,
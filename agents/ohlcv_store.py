@@ -0,0 +1,484 @@
+#!/usr/bin/env python3
+"""
+Shared OHLCV History Store
+On-disk bar history keyed by (symbol, interval) that every agent reads through
+instead of calling yf.Ticker(symbol).history() itself. Each series is a folder
+of append-only column files (int64 UTC nanoseconds plus float64 OHLCV) read
+back as NumPy memmaps, so a query only touches the pages of the window it asks
+for. A stale series fetches only the bars from its next-to-last stored bar
+onward (the last bar is re-fetched because it may still be forming), and a
+series refreshed within its interval's freshness window costs no request at
+all. The re-fetched completed bar is compared with the stored one: Yahoo
+rewrites adjusted prices after a split or dividend, and a mismatch replaces
+the whole series instead of appending to stale history.
+
+Reads and writes of a series hold a thread lock and an flock on the series'
+.lock file, so several processes can share one store; meta.json is reloaded
+when another process has replaced it. The row count in meta.json is replaced
+atomically after the column files are written, so readers never see a
+partial append.
+"""
+
+import os
+import json
+import time
+import logging
+import threading
+from contextlib import contextmanager
+from datetime import datetime, timedelta, timezone
+from typing import Dict, Iterable, List, Optional
+from urllib.parse import quote
+
+import numpy as np
+import pandas as pd
+
+try:
+    import fcntl
+except ImportError:  # Windows: series are locked within the process only
+    fcntl = None
+
+logger = logging.getLogger(__name__)
+
+COLUMNS = ('Open', 'High', 'Low', 'Close', 'Volume')
+PRICES = ('Open', 'High', 'Low', 'Close')
+
+# Relative difference between a stored and a re-fetched bar that counts as re-adjusted history
+ADJUSTMENT_TOLERANCE = 1e-5
+
+# Seconds a series counts as fresh after a successful fetch, by interval
+FRESHNESS = {
+    '1m': 60, '2m': 120, '5m': 300, '15m': 900, '30m': 1800,
+    '60m': 3600, '1h': 3600, '90m': 3600,
+    '1d': 900, '5d': 3600, '1wk': 3600, '1mo': 3600, '3mo': 3600,
+}
+
+_PERIOD_UNITS = {'d': 1, 'wk': 7, 'mo': 31, 'y': 366}
+
+
+def period_start(period: str, now: Optional[datetime] = None) -> Optional[datetime]:
+    """Earliest UTC time a yfinance period string covers ('6mo', '1y', '30d', 'ytd'); None for 'max'"""
+    now = now or datetime.now(timezone.utc)
+    if period == 'max':
+        return None
+    if period == 'ytd':
+        return datetime(now.year, 1, 1, tzinfo=timezone.utc)
+    for unit, days in _PERIOD_UNITS.items():
+        if period.endswith(unit) and period[:-len(unit)].isdigit():
+            return now - timedelta(days=int(period[:-len(unit)]) * days)
+    raise ValueError(f"Unsupported period: {period}")
+
+
+def _timestamps(index: pd.DatetimeIndex) -> np.ndarray:
+    """int64 nanoseconds; tz-aware indexes are stored in UTC"""
+    if index.tz is not None:
+        index = index.tz_convert('UTC').tz_localize(None)
+    return index.as_unit('ns').asi8
+
+
+def _as_bars(frame: pd.DataFrame) -> pd.DataFrame:
+    """Provider frame -> sorted, de-duplicated OHLCV float64 columns"""
+    frame = frame[~frame.index.duplicated(keep='last')].sort_index()
+    return pd.DataFrame({column: frame[column].astype(np.float64) if column in frame else np.nan
+                         for column in COLUMNS}, index=frame.index)
+
+
+class _Series:
+    """Column files and metadata of one (symbol, interval)"""
+
+    def __init__(self, path: str):
+        self.path = path
+        self.lock = threading.Lock()
+        self.meta = {'rows': 0, 'tz': None, 'fetched_at': 0.0, 'covered_from': None}
+        self._maps: Optional[Dict[str, np.ndarray]] = None
+        self._meta_version = None
+        self.sync()
+
+    def sync(self):
+        """Reload meta.json if it was replaced (by another process) since it was read"""
+        try:
+            stat = os.stat(os.path.join(self.path, 'meta.json'))
+        except FileNotFoundError:
+            return
+        version = (stat.st_ino, stat.st_mtime_ns)
+        if version != self._meta_version:
+            with open(os.path.join(self.path, 'meta.json')) as f:
+                self.meta.update(json.load(f))
+            self._meta_version = version
+            self._maps = None
+
+    @contextmanager
+    def locked(self, shared: bool = False):
+        """Hold the series against other threads and, through flock, other processes"""
+        with self.lock:
+            if fcntl is None:
+                self.sync()
+                yield self
+                return
+            os.makedirs(self.path, exist_ok=True)
+            with open(os.path.join(self.path, '.lock'), 'a') as handle:
+                fcntl.flock(handle, fcntl.LOCK_SH if shared else fcntl.LOCK_EX)
+                try:
+                    self.sync()
+                    yield self
+                finally:
+                    fcntl.flock(handle, fcntl.LOCK_UN)
+
+    @property
+    def rows(self) -> int:
+        return self.meta['rows']
+
+    def _file(self, name: str) -> str:
+        return os.path.join(self.path, f"{name.lower()}.bin")
+
+    def columns(self) -> Dict[str, np.ndarray]:
+        """Read-only memmaps of the committed rows"""
+        if self._maps is None:
+            rows = self.rows
+            if rows:
+                # A write interrupted after truncating leaves files shorter than meta says
+                on_disk = min(os.path.getsize(self._file(name)) // 8 if os.path.exists(self._file(name)) else 0
+                              for name in ('ts',) + COLUMNS)
+                if on_disk < rows:
+                    logger.warning(f"{self.path}: {rows - on_disk} rows missing on disk, truncating")
+                    rows = self.meta['rows'] = on_disk
+            maps = {'ts': np.memmap(self._file('ts'), dtype=np.int64, mode='r', shape=(rows,))
+                    if rows else np.empty(0, dtype=np.int64)}
+            for column in COLUMNS:
+                maps[column] = (np.memmap(self._file(column), dtype=np.float64, mode='r', shape=(rows,))
+                                if rows else np.empty(0, dtype=np.float64))
+            self._maps = maps
+        return self._maps
+
+    def overlap_start(self) -> Optional[pd.Timestamp]:
+        """Where an incremental fetch starts: the last completed bar, so it can be checked by matches()"""
+        if not self.rows:
+            return None
+        stamp = pd.Timestamp(int(self.columns()['ts'][max(self.rows - 2, 0)]))
+        return stamp.tz_localize('UTC').tz_convert(self.meta['tz']) if self.meta['tz'] else stamp
+
+    def conform(self, bars: pd.DataFrame) -> pd.DataFrame:
+        """
+        Provider bars in the stored series' timezone convention. yf.download
+        and Ticker.history can disagree on whether daily bars carry a zone: a
+        naive frame is exchange wall time, so it is localized to the series'
+        zone, and an aware frame written to a naive series keeps its wall time.
+        """
+        bars = _as_bars(bars)
+        if not self.rows:
+            return bars
+        if bars.index.tz is None and self.meta['tz']:
+            bars.index = bars.index.tz_localize(self.meta['tz'])
+        elif bars.index.tz is not None and not self.meta['tz']:
+            bars.index = bars.index.tz_localize(None)
+        return bars
+
+    def matches(self, bars: pd.DataFrame) -> bool:
+        """Whether re-fetched bars agree with the completed stored bars they overlap"""
+        if self.rows < 2 or bars.empty:
+            return True
+        bars = self.conform(bars)
+        maps = self.columns()
+        completed = maps['ts'][:-1]  # the last stored bar may have been forming
+        ts = _timestamps(bars.index)
+        at = np.searchsorted(completed, ts)
+        overlap = at < len(completed)
+        overlap[overlap] = completed[at[overlap]] == ts[overlap]
+        if not overlap.any():
+            return True
+        return all(np.allclose(maps[column][at[overlap]], bars[column].to_numpy()[overlap],
+                               rtol=ADJUSTMENT_TOLERANCE, atol=0, equal_nan=True) for column in PRICES)
+
+    def read(self, start: Optional[datetime] = None) -> pd.DataFrame:
+        """Bars at or after start (UTC) as a DataFrame in the provider's timezone"""
+        maps = self.columns()
+        first = 0
+        if start is not None and self.rows:
+            bound = pd.Timestamp(start)
+            if self.meta['tz'] is None:
+                bound = bound.tz_localize(None) if bound.tz is not None else bound
+            else:
+                bound = bound.tz_convert('UTC').tz_localize(None) if bound.tz is not None else bound
+            first = int(np.searchsorted(maps['ts'], bound.value, side='left'))
+        index = pd.to_datetime(np.array(maps['ts'][first:]))
+        if self.meta['tz']:
+            index = index.tz_localize('UTC').tz_convert(self.meta['tz'])
+        return pd.DataFrame({column: np.array(maps[column][first:]) for column in COLUMNS},
+                            index=pd.DatetimeIndex(index, name='Date'))
+
+    def write(self, bars: pd.DataFrame, replace: bool = False, covered_from: Optional[float] = None):
+        """Append bars (dropping stored bars they overlap), or replace the series"""
+        bars = _as_bars(bars) if replace else self.conform(bars)
+        if replace or not self.rows:
+            tz = bars.index.tz
+            self.meta['tz'] = str(tz) if tz is not None else None
+        ts = _timestamps(bars.index)
+
+        keep = 0
+        if not replace and self.rows and len(ts):
+            keep = int(np.searchsorted(self.columns()['ts'], ts[0], side='left'))
+        elif not replace:
+            keep = self.rows
+        self._maps = None  # release the memmaps before the files change
+
+        os.makedirs(self.path, exist_ok=True)
+        for name, values, dtype in [('ts', ts, np.int64)] + [
+                (column, bars[column].to_numpy(), np.float64) for column in COLUMNS]:
+            with open(self._file(name), 'r+b' if os.path.exists(self._file(name)) else 'w+b') as f:
+                f.truncate(keep * np.dtype(dtype).itemsize)
+                f.seek(0, os.SEEK_END)
+                f.write(np.ascontiguousarray(values, dtype=dtype).tobytes())
+
+        self.meta['rows'] = keep + len(ts)
+        self.meta['fetched_at'] = time.time()
+        if covered_from is not None or replace:
+            self.meta['covered_from'] = covered_from
+        tmp = os.path.join(self.path, 'meta.json.tmp')
+        with open(tmp, 'w') as f:
+            json.dump(self.meta, f)
+        os.replace(tmp, os.path.join(self.path, 'meta.json'))
+        stat = os.stat(os.path.join(self.path, 'meta.json'))
+        self._meta_version = (stat.st_ino, stat.st_mtime_ns)
+        return len(ts)
+
+    def touch(self):
+        """Record a fetch that returned nothing new"""
+        self.meta['fetched_at'] = time.time()
+
+
+class YFinanceProvider:
+    """Bars from Yahoo Finance"""
+
+    def fetch(self, symbol: str, interval: str, period: Optional[str] = None,
+              start: Optional[pd.Timestamp] = None) -> pd.DataFrame:
+        import yfinance as yf
+        ticker = yf.Ticker(symbol)
+        if start is not None:
+            return ticker.history(start=start, interval=interval)
+        return ticker.history(period=period, interval=interval)
+
+    def fetch_many(self, symbols: List[str], interval: str, period: Optional[str] = None,
+                   start: Optional[pd.Timestamp] = None) -> Dict[str, pd.DataFrame]:
+        """One multi-ticker request (yf.download) split back into per-symbol frames"""
+        import yfinance as yf
+        kwargs = {'start': start} if start is not None else {'period': period}
+        # ignore_tz=False keeps daily bars zoned like Ticker.history, which writes the same series
+        frame = yf.download(tickers=symbols, interval=interval, group_by="ticker", auto_adjust=True,
+                            ignore_tz=False, threads=True, progress=False, **kwargs)
+        if frame is None or frame.empty:
+            return {}
+        if not isinstance(frame.columns, pd.MultiIndex):
+            frame = pd.concat({symbols[0]: frame}, axis=1)
+        available = set(frame.columns.get_level_values(0))
+        return {symbol: frame[symbol].dropna(how='all') for symbol in symbols if symbol in available}
+
+
+class FileProvider:
+    """
+    Offline provider over CSV files named <symbol>_<interval>.csv (Date index,
+    OHLCV columns), for tests and replaying captured history without a network
+    """
+
+    def __init__(self, directory: str):
+        self.directory = directory
+        self.requests = 0
+
+    def _path(self, symbol: str, interval: str) -> str:
+        return os.path.join(self.directory, f"{quote(symbol, safe='')}_{interval}.csv")
+
+    def save(self, symbol: str, interval: str, frame: pd.DataFrame):
+        os.makedirs(self.directory, exist_ok=True)
+        if frame.index.tz is not None:
+            frame = frame.tz_convert('UTC')
+        frame.to_csv(self._path(symbol, interval), index_label='Date')
+
+    def _read(self, symbol: str, interval: str, period: Optional[str],
+              start: Optional[pd.Timestamp]) -> pd.DataFrame:
+        path = self._path(symbol, interval)
+        if not os.path.exists(path):
+            return pd.DataFrame(columns=list(COLUMNS))
+        frame = pd.read_csv(path, index_col='Date')
+        frame.index = pd.to_datetime(frame.index)
+        bound = pd.Timestamp(start) if start is not None else period_start(period)
+        if bound is None:
+            return frame
+        bound = pd.Timestamp(bound)
+        if frame.index.tz is None and bound.tz is not None:
+            bound = bound.tz_convert('UTC').tz_localize(None)
+        elif frame.index.tz is not None and bound.tz is None:
+            bound = bound.tz_localize('UTC')
+        return frame[frame.index >= bound]
+
+    def fetch(self, symbol: str, interval: str, period: Optional[str] = None,
+              start: Optional[pd.Timestamp] = None) -> pd.DataFrame:
+        self.requests += 1
+        return self._read(symbol, interval, period, start)
+
+    def fetch_many(self, symbols: List[str], interval: str, period: Optional[str] = None,
+                   start: Optional[pd.Timestamp] = None) -> Dict[str, pd.DataFrame]:
+        self.requests += 1
+        return {symbol: self._read(symbol, interval, period, start) for symbol in symbols}
+
+
+class OHLCVStore:
+    """Per-(symbol, interval) bar history shared by every agent in the process"""
+
+    def __init__(self, root: str = "data/ohlcv", provider=None, freshness: Optional[Dict[str, int]] = None):
+        self.root = root
+        self.provider = provider or YFinanceProvider()
+        self.freshness = {**FRESHNESS, **(freshness or {})}
+        self._series: Dict[tuple, _Series] = {}
+        self._lock = threading.Lock()
+        self.stats = {'requests': 0, 'fresh_hits': 0, 'bars_written': 0, 'readjusted': 0, 'errors': 0}
+
+    def _get(self, symbol: str, interval: str) -> _Series:
+        key = (symbol, interval)
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                series = _Series(os.path.join(self.root, interval, quote(symbol, safe='')))
+                self._series[key] = series
+            return series
+
+    def _plan(self, series: _Series, interval: str, wanted_from: Optional[datetime],
+              max_age: Optional[float]) -> Optional[str]:
+        """'full', 'incremental' or None (fresh enough and covers the window)"""
+        covered = series.meta['covered_from']
+        if not series.rows or (covered is not None and (wanted_from is None or wanted_from.timestamp() < covered)):
+            return 'full'
+        age = time.time() - series.meta['fetched_at']
+        limit = self.freshness.get(interval, 900) if max_age is None else max_age
+        return 'incremental' if age > limit else None
+
+    def _apply(self, series: _Series, plan: str, frame: Optional[pd.DataFrame],
+               wanted_from: Optional[datetime]) -> bool:
+        """Store fetched bars; False when an incremental fetch shows re-adjusted history"""
+        if frame is None or frame.empty:
+            series.touch()
+            return True
+        if plan == 'full':
+            written = series.write(frame, replace=True,
+                                   covered_from=None if wanted_from is None else wanted_from.timestamp())
+        elif not series.matches(frame):
+            self.stats['readjusted'] += 1
+            logger.info(f"{series.path}: provider re-adjusted stored bars (split or dividend), replacing")
+            return False
+        else:
+            written = series.write(frame)
+        self.stats['bars_written'] += written
+        return True
+
+    def history(self, symbol: str, period: str = "1y", interval: str = "1d",
+                max_age: Optional[float] = None) -> pd.DataFrame:
+        """Bars for the period, fetching only what the store is missing"""
+        wanted_from = period_start(period)
+        series = self._get(symbol, interval)
+        with series.locked():
+            plan = self._plan(series, interval, wanted_from, max_age)
+            if plan is None:
+                self.stats['fresh_hits'] += 1
+            else:
+                try:
+                    if plan == 'incremental':
+                        self.stats['requests'] += 1
+                        frame = self.provider.fetch(symbol, interval, start=series.overlap_start())
+                        if not self._apply(series, plan, frame, wanted_from):
+                            plan = 'full'
+                    if plan == 'full':
+                        self.stats['requests'] += 1
+                        frame = self.provider.fetch(symbol, interval, period=period)
+                        self._apply(series, plan, frame, wanted_from)
+                except Exception as e:
+                    self.stats['errors'] += 1
+                    logger.error(f"Error fetching {symbol} {interval} history: {e}")
+            return series.read(wanted_from)
+
+    def refresh(self, symbols: Iterable[str], period: str = "1y", interval: str = "1d",
+                max_age: Optional[float] = None) -> int:
+        """Bring many symbols up to date with at most two bulk requests; returns symbols fetched"""
+        wanted_from = period_start(period)
+        plans: Dict[str, Dict[str, _Series]] = {'incremental': {}, 'full': {}}
+        starts = {}
+        for symbol in dict.fromkeys(symbols):
+            series = self._get(symbol, interval)
+            with series.locked(shared=True):
+                plan = self._plan(series, interval, wanted_from, max_age)
+                if plan == 'incremental':
+                    starts[symbol] = series.overlap_start()
+            if plan is None:
+                self.stats['fresh_hits'] += 1
+            else:
+                plans[plan][symbol] = series
+        fetched = sum(len(group) for group in plans.values())
+
+        fetch_many = getattr(self.provider, 'fetch_many', None)
+        # Incremental first: series found re-adjusted join the full fetch
+        for plan in ('incremental', 'full'):
+            group = plans[plan]
+            if not group:
+                continue
+            try:
+                if plan == 'full':
+                    kwargs = {'period': period}
+                else:
+                    # Symbols further behind re-write a few overlapping bars; still one request
+                    kwargs = {'start': min(starts[symbol] for symbol in group)}
+                if fetch_many is not None:
+                    self.stats['requests'] += 1
+                    frames = fetch_many(list(group), interval, **kwargs)
+                else:
+                    self.stats['requests'] += len(group)
+                    frames = {symbol: self.provider.fetch(symbol, interval, **kwargs) for symbol in group}
+                for symbol, series in group.items():
+                    with series.locked():
+                        if not self._apply(series, plan, frames.get(symbol), wanted_from):
+                            plans['full'][symbol] = series
+            except Exception as e:
+                self.stats['errors'] += 1
+                logger.error(f"Error refreshing {len(group)} {interval} series: {e}")
+        return fetched
+
+    def closes(self, symbols: List[str], period: str = "1y", interval: str = "1d") -> pd.DataFrame:
+        """Close prices (dates x symbols) for many symbols after one bulk refresh"""
+        self.refresh(symbols, period, interval)
+        wanted_from = period_start(period)
+        columns = {}
+        for symbol in symbols:
+            series = self._get(symbol, interval)
+            with series.locked(shared=True):
+                bars = series.read(wanted_from) if series.rows else None
+            if bars is not None:
+                # Mixed exchanges: align on calendar date
+                index = bars.index.tz_localize(None) if bars.index.tz is not None else bars.index
+                columns[symbol] = pd.Series(bars['Close'].to_numpy(), index=index.normalize()
+                                            if interval.endswith(('d', 'wk', 'mo')) else index)
+        if not columns:
+            return pd.DataFrame()
+        return pd.DataFrame({symbol: s[~s.index.duplicated(keep='last')] for symbol, s in columns.items()})
+
+    def expire(self, symbols: Optional[Iterable[str]] = None, interval: Optional[str] = None):
+        """Mark series stale so their next read fetches new bars"""
+        wanted = None if symbols is None else set(symbols)
+        for (symbol, series_interval), series in list(self._series.items()):
+            if (wanted is None or symbol in wanted) and interval in (None, series_interval):
+                series.meta['fetched_at'] = 0.0
+
+    def last_price(self, symbol: str, max_age: Optional[float] = None) -> Optional[float]:
+        """Latest daily close (the forming bar during market hours)"""
+        bars = self.history(symbol, period="5d", interval="1d", max_age=max_age)
+        return float(bars['Close'].iloc[-1]) if not bars.empty else None
+
+    def get_stats(self) -> Dict:
+        return {**self.stats, 'series': len(self._series)}
+
+
+_default_store: Optional[OHLCVStore] = None
+_default_lock = threading.Lock()
+
+
+def get_store() -> OHLCVStore:
+    """Process-wide store under OHLCV_STORE_DIR (default data/ohlcv)"""
+    global _default_store
+    with _default_lock:
+        if _default_store is None:
+            _default_store = OHLCVStore(os.getenv("OHLCV_STORE_DIR", "data/ohlcv"))
+        return _default_store
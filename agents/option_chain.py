@@ -0,0 +1,132 @@
+#!/usr/bin/env python3
+"""
+Columnar Option Chain
+One NumPy array per field, sorted by strike, with vectorized max pain, PCR and
+OI support/resistance. Cheap enough to analyze every F&O underlying each minute.
+"""
+
+import hashlib
+from typing import Any, Dict, Iterable, List, Optional
+
+import numpy as np
+
+# Per-strike columns besides strike, in OptionChainData field order
+CHAIN_FIELDS = (
+    'call_oi', 'put_oi', 'call_volume', 'put_volume',
+    'call_iv', 'put_iv', 'call_ltp', 'put_ltp',
+    'call_change_oi', 'put_change_oi',
+)
+
+FLOAT_FIELDS = {'call_iv', 'put_iv', 'call_ltp', 'put_ltp'}
+
+
+class OptionChain:
+    """Option chain for one underlying/expiry as parallel arrays sorted by strike"""
+
+    __slots__ = ('strike',) + CHAIN_FIELDS
+
+    def __init__(self, strike, **columns):
+        # Integer strikes stay integer so levels print as they did from the dataclasses
+        strike = np.asarray(strike)
+        order = np.argsort(strike, kind='stable')
+        self.strike = strike[order]
+        for name in CHAIN_FIELDS:
+            dtype = np.float64 if name in FLOAT_FIELDS else np.int64
+            values = columns.get(name)
+            if values is None:
+                column = np.zeros(len(strike), dtype=dtype)
+            else:
+                column = np.asarray(values, dtype=dtype)[order]
+            setattr(self, name, column)
+
+    @classmethod
+    def from_records(cls, records: Iterable[Any]) -> 'OptionChain':
+        """Build from OptionChainData-like objects (anything with the field attributes)"""
+        records = list(records)
+        return cls(
+            [r.strike for r in records],
+            **{name: [getattr(r, name) for r in records] for name in CHAIN_FIELDS}
+        )
+
+    def to_records(self) -> List[Any]:
+        """Back to OptionChainData objects"""
+        from .abid_hassan_analyzer import OptionChainData
+
+        columns = [self.strike.tolist()] + [getattr(self, name).tolist() for name in CHAIN_FIELDS]
+        return [OptionChainData(*row) for row in zip(*columns)]
+
+    def __len__(self) -> int:
+        return len(self.strike)
+
+    def fingerprint(self) -> str:
+        """Content hash of every column; equal fingerprints mean an identical chain"""
+        digest = hashlib.blake2b(digest_size=16)
+        for name in self.__slots__:
+            column = np.ascontiguousarray(getattr(self, name))
+            digest.update(column.dtype.str.encode())
+            digest.update(column.tobytes())
+        return digest.hexdigest()
+
+    def pcr(self) -> float:
+        """Put-Call Ratio on open interest"""
+        total_call_oi = int(self.call_oi.sum())
+        if total_call_oi == 0:
+            return float('inf')
+        return int(self.put_oi.sum()) / total_call_oi
+
+    def pain_by_strike(self) -> np.ndarray:
+        """
+        Total writer payout if expiry settles at each strike, via prefix sums:
+        calls  sum_{x_j < K} (K - x_j) c_j = K * C_lt - (x*c)_lt
+        puts   sum_{x_j > K} (x_j - K) p_j = (x*p)_gt - K * P_gt
+        Ties contribute (K - x_j) = 0, so duplicate strikes need no special case.
+        """
+        strike = self.strike.astype(np.float64)
+        call_oi = self.call_oi.astype(np.float64)
+        put_oi = self.put_oi.astype(np.float64)
+
+        # Exclusive prefix sums (strikes strictly below) ...
+        call_below = np.cumsum(call_oi) - call_oi
+        call_value_below = np.cumsum(strike * call_oi) - strike * call_oi
+        # ... and exclusive suffix sums (strikes strictly above)
+        put_above = put_oi.sum() - np.cumsum(put_oi)
+        put_value_above = (strike * put_oi).sum() - np.cumsum(strike * put_oi)
+
+        return (strike * call_below - call_value_below) + (put_value_above - strike * put_above)
+
+    def max_pain(self) -> float:
+        """Strike where option writers pay out least (lowest strike on ties)"""
+        if len(self) == 0:
+            return 0.0
+        return self.strike[int(np.argmin(self.pain_by_strike()))].item()
+
+    def oi_levels(self, current_price: float, percentile: float = 80) -> Dict[str, np.ndarray]:
+        """
+        Boolean masks over strikes: heavy call OI above price (resistance), heavy put
+        OI below price (support), and fresh call/put writing on either side
+        """
+        above = self.strike > current_price
+        below = self.strike < current_price
+        return {
+            'resistance': (self.call_oi > np.percentile(self.call_oi, percentile)) & above,
+            'support': (self.put_oi > np.percentile(self.put_oi, percentile)) & below,
+            'bearish_buildup': (self.call_change_oi > 0) & above,
+            'bullish_buildup': (self.put_change_oi > 0) & below,
+        }
+
+    def window(self, current_price: float, strikes_each_side: int) -> 'OptionChain':
+        """Sub-chain of the strikes nearest the money"""
+        atm = int(np.searchsorted(self.strike, current_price))
+        lo = max(0, atm - strikes_each_side)
+        hi = min(len(self), atm + strikes_each_side)
+        sub = OptionChain.__new__(OptionChain)
+        for name in self.__slots__:
+            setattr(sub, name, getattr(self, name)[lo:hi])
+        return sub
+
+
+def as_option_chain(option_data: Any) -> Optional[OptionChain]:
+    """Accept an OptionChain or a list of OptionChainData"""
+    if isinstance(option_data, OptionChain):
+        return option_data
+    return OptionChain.from_records(option_data)
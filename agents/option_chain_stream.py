@@ -0,0 +1,495 @@
+#!/usr/bin/env python3
+"""
+Streaming Option Chain Store
+Per-expiry option chains held in preallocated NumPy columns and updated in place
+from Kite ticks (live via ZerodhaMCPIntegration or from a recorded feed). Only
+the strikes a tick touches are written; totals for PCR and intraday OI change are
+kept incrementally. Readers get an immutable ChainSnapshot whose OptionChain
+columns are read-only views, so nothing is copied per read.
+
+A buffer a reader may still hold is never written again. snapshot() hands out
+its buffer for good, so the next publish starts a fresh copy; readers that
+pin() and release() let the buffer be reused and only changed rows are copied.
+"""
+
+import json
+import time
+import logging
+import threading
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from datetime import date, datetime
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+
+import numpy as np
+
+from .option_chain import OptionChain
+
+logger = logging.getLogger(__name__)
+
+# Column layout of a chain buffer (OptionChain field names)
+INT_COLUMNS = ('call_oi', 'put_oi', 'call_volume', 'put_volume', 'call_change_oi', 'put_change_oi')
+FLOAT_COLUMNS = ('call_iv', 'put_iv', 'call_ltp', 'put_ltp')
+_INT = {name: i for i, name in enumerate(INT_COLUMNS)}
+_FLOAT = {name: i for i, name in enumerate(FLOAT_COLUMNS)}
+
+CALL, PUT = 0, 1
+SIDES = {'CE': CALL, 'PE': PUT}
+_PREFIX = ('call', 'put')
+
+
+def _field(option: Any, name: str, default: Any = None) -> Any:
+    if isinstance(option, dict):
+        return option.get(name, default)
+    return getattr(option, name, default)
+
+
+@dataclass(frozen=True)
+class ChainSnapshot:
+    """Consistent published state of one chain; columns are read-only views"""
+    symbol: str
+    expiry: str
+    version: int
+    updated_at: datetime
+    underlying_price: float
+    chain: OptionChain
+    total_call_oi: int
+    total_put_oi: int
+    total_call_change_oi: int
+    total_put_change_oi: int
+    _buffer: Any = field(default=None, repr=False, compare=False)
+
+    @property
+    def pcr(self) -> float:
+        if self.total_call_oi == 0:
+            return float('inf')
+        return self.total_put_oi / self.total_call_oi
+
+    def to_records(self) -> List[Any]:
+        """OptionChainData list for consumers that still want dataclasses"""
+        return self.chain.to_records()
+
+
+class _ChainBuffer:
+    """One copy of every column; a chain keeps two and flips them on publish"""
+
+    __slots__ = ('strike', 'ints', 'floats', 'pins', 'detached')
+
+    def __init__(self, strike: np.ndarray):
+        self.strike = strike
+        self.ints = np.zeros((len(INT_COLUMNS), len(strike)), dtype=np.int64)
+        self.floats = np.zeros((len(FLOAT_COLUMNS), len(strike)), dtype=np.float64)
+        self.pins = 0  # pin() readers not yet released
+        self.detached = False  # handed out by snapshot(): readers may hold it forever
+
+    def copy(self) -> '_ChainBuffer':
+        buffer = _ChainBuffer(self.strike)
+        buffer.ints[:] = self.ints
+        buffer.floats[:] = self.floats
+        return buffer
+
+    def copy_rows(self, source: '_ChainBuffer', rows: List[int]):
+        self.ints[:, rows] = source.ints[:, rows]
+        self.floats[:, rows] = source.floats[:, rows]
+
+    def pinned(self) -> bool:
+        """True while a reader may still be looking at this buffer"""
+        return self.detached or self.pins > 0
+
+    def view(self) -> OptionChain:
+        chain = OptionChain.__new__(OptionChain)
+        chain.strike = self.strike
+        for name, i in _INT.items():
+            column = self.ints[i]
+            column.flags.writeable = False
+            setattr(chain, name, column)
+        for name, i in _FLOAT.items():
+            column = self.floats[i]
+            column.flags.writeable = False
+            setattr(chain, name, column)
+        return chain
+
+
+class StreamingOptionChain:
+    """
+    One underlying/expiry. Ticks write into the back buffer; publish() swaps it
+    to the front and brings the old front up to date by copying only the rows
+    that changed (or a full copy if a reader is still holding it).
+    
+    Intraday OI change is measured from each strike's first OI of the session;
+    new_session() drops the baselines so the next day starts from zero.
+    """
+
+    def __init__(self, symbol: str, expiry: str, strikes: Iterable[float]):
+        self.symbol = symbol
+        self.expiry = expiry
+        self.underlying_price = 0.0
+        self.version = 0
+        self.updated_at = datetime.now()
+        self.session = date.today()
+        self._lock = threading.Lock()
+        self._allocate(sorted(set(strikes)))
+
+    def _allocate(self, strikes: List[float], previous: Optional[Tuple] = None):
+        # Integer strikes stay integer so levels print as they do from OptionChainData
+        integral = all(float(s).is_integer() for s in strikes)
+        strike = np.array(strikes, dtype=np.int64 if integral else np.float64)
+        strike.flags.writeable = False
+        self.rows: Dict[float, int] = {float(s): i for i, s in enumerate(strikes)}
+
+        back = _ChainBuffer(strike)
+        self._open_oi = np.zeros((2, len(strike)), dtype=np.int64)
+        self._has_open = np.zeros((2, len(strike)), dtype=bool)
+        if previous is not None:
+            # Carry existing rows over to their new positions
+            rows, old_back, open_oi, has_open = previous
+            old_rows = [rows[float(s)] for s in strikes if float(s) in rows]
+            new_rows = [i for i, s in enumerate(strikes) if float(s) in rows]
+            back.ints[:, new_rows] = old_back.ints[:, old_rows]
+            back.floats[:, new_rows] = old_back.floats[:, old_rows]
+            self._open_oi[:, new_rows] = open_oi[:, old_rows]
+            self._has_open[:, new_rows] = has_open[:, old_rows]
+
+        self._back = back
+        self._front = back.copy()
+        self._dirty = set()
+        self._price_changed = False
+        self._totals = [int(x) for x in back.ints[[_INT['call_oi'], _INT['put_oi'],
+                                                   _INT['call_change_oi'], _INT['put_change_oi']]].sum(axis=1)]
+        self._snapshot = self._make_snapshot(self._front)
+
+    def add_strikes(self, strikes: Iterable[float]):
+        """New strikes listed intraday: reallocate (rare) keeping current values"""
+        with self._lock:
+            missing = [s for s in strikes if float(s) not in self.rows]
+            if not missing:
+                return
+            # Fresh buffers, so snapshots readers already hold are untouched
+            self.version += 1
+            self._allocate(sorted(set(self.rows) | {float(s) for s in missing}),
+                           previous=(self.rows, self._back, self._open_oi, self._has_open))
+
+    def new_session(self, day: date = None):
+        """Forget the OI baselines; each strike's next OI is its open for the day"""
+        self.session = day or date.today()
+        self._has_open[:] = False
+        ints = self._back.ints
+        ints[_INT['call_change_oi']] = 0
+        ints[_INT['put_change_oi']] = 0
+        self._totals[2] = self._totals[3] = 0
+        self._dirty.update(range(len(self.rows)))
+
+    def set_underlying(self, price: float):
+        self.underlying_price = float(price)
+        self._price_changed = True
+
+    def set_open_interest(self, side: int, strike: float, oi: int, open_oi: Optional[int] = None):
+        """Record OI for one strike; the first value of the session (or open_oi) is the baseline"""
+        row = self.rows[float(strike)]
+        prefix = _PREFIX[side]
+        ints = self._back.ints
+        if open_oi is not None or not self._has_open[side, row]:
+            self._open_oi[side, row] = oi if open_oi is None else open_oi
+            self._has_open[side, row] = True
+
+        oi_col, change_col = _INT[f'{prefix}_oi'], _INT[f'{prefix}_change_oi']
+        change = int(oi) - int(self._open_oi[side, row])
+        self._totals[side] += int(oi) - int(ints[oi_col, row])
+        self._totals[2 + side] += change - int(ints[change_col, row])
+        ints[oi_col, row] = oi
+        ints[change_col, row] = change
+        self._dirty.add(row)
+
+    def set_quote(self, side: int, strike: float, last_price: Optional[float] = None,
+                  volume: Optional[int] = None, iv: Optional[float] = None):
+        row = self.rows[float(strike)]
+        prefix = _PREFIX[side]
+        if last_price is not None:
+            self._back.floats[_FLOAT[f'{prefix}_ltp'], row] = last_price
+        if volume is not None:
+            self._back.ints[_INT[f'{prefix}_volume'], row] = volume
+        if iv is not None:
+            self._back.floats[_FLOAT[f'{prefix}_iv'], row] = iv
+        self._dirty.add(row)
+
+    def apply_tick(self, side: int, strike: float, tick: Dict[str, Any]):
+        """Apply one Kite tick for the CE (side 0) or PE (side 1) at a strike"""
+        oi = tick.get('oi')
+        if oi is not None:
+            self.set_open_interest(side, strike, int(oi))
+        volume = tick.get('volume_traded', tick.get('volume'))
+        self.set_quote(side, strike, tick.get('last_price'), None if volume is None else int(volume),
+                       tick.get('implied_volatility'))
+
+    def publish(self) -> ChainSnapshot:
+        """Make the changes so far visible to readers"""
+        if not self._dirty and not self._price_changed:
+            return self._snapshot
+        rows = sorted(self._dirty)
+        self._dirty.clear()
+        self._price_changed = False
+        self.version += 1
+        self.updated_at = datetime.now()
+
+        if not rows:
+            # Only the underlying moved; the front buffer is already current
+            self._snapshot = self._make_snapshot(self._front)
+            return self._snapshot
+
+        front, previous = self._back, self._front
+        self._snapshot = self._make_snapshot(front)  # readers switch on this one assignment
+
+        if previous.pinned():
+            # A reader holds it: leave it alone and write into a fresh buffer
+            previous = front.copy()
+        else:
+            previous.copy_rows(front, rows)
+        self._front, self._back = front, previous
+        return self._snapshot
+
+    def _make_snapshot(self, buffer: _ChainBuffer) -> ChainSnapshot:
+        return ChainSnapshot(
+            symbol=self.symbol,
+            expiry=self.expiry,
+            version=self.version,
+            updated_at=self.updated_at,
+            underlying_price=self.underlying_price,
+            chain=buffer.view(),
+            total_call_oi=self._totals[0],
+            total_put_oi=self._totals[1],
+            total_call_change_oi=self._totals[2],
+            total_put_change_oi=self._totals[3],
+            _buffer=buffer
+        )
+
+    def snapshot(self) -> ChainSnapshot:
+        """Latest snapshot, safe to keep indefinitely (its buffer is never reused)"""
+        with self._lock:
+            snapshot = self._snapshot
+            snapshot._buffer.detached = True
+            return snapshot
+
+    def pin(self) -> ChainSnapshot:
+        """Latest snapshot, valid until release(); cheaper than snapshot() for short reads"""
+        with self._lock:
+            snapshot = self._snapshot
+            snapshot._buffer.pins += 1
+            return snapshot
+
+    def release(self, snapshot: ChainSnapshot):
+        with self._lock:
+            snapshot._buffer.pins -= 1
+
+
+class OptionChainStore:
+    """All streamed chains, keyed by (symbol, expiry), with Kite instrument token routing"""
+
+    def __init__(self):
+        self._chains: Dict[Tuple[str, str], StreamingOptionChain] = {}
+        self._tokens: Dict[int, Tuple[StreamingOptionChain, int, float]] = {}
+        self._underlyings: Dict[int, str] = {}
+        self._lock = threading.Lock()
+        self.session = date.today()
+        self.stats = {'ticks': 0, 'ignored': 0, 'publishes': 0}
+
+    def chain(self, symbol: str, expiry: str, strikes: Iterable[float] = ()) -> StreamingOptionChain:
+        """Get or create the chain for symbol/expiry, making sure the strikes exist"""
+        key = (symbol, expiry)
+        strikes = list(strikes)
+        chain = self._chains.get(key)
+        if chain is None:
+            chain = StreamingOptionChain(symbol, expiry, strikes)
+            self._chains[key] = chain
+        elif strikes:
+            chain.add_strikes(strikes)
+        return chain
+
+    def register_instruments(self, instruments: Iterable[Any]) -> int:
+        """Route ticks for option instruments (Kite instrument dicts or KiteOptionData)"""
+        by_chain: Dict[Tuple[str, str], List[Any]] = {}
+        for instrument in instruments:
+            if _field(instrument, 'instrument_type') in SIDES:
+                by_chain.setdefault((_field(instrument, 'name'), str(_field(instrument, 'expiry'))), []).append(instrument)
+
+        with self._lock:
+            for (symbol, expiry), options in by_chain.items():
+                chain = self.chain(symbol, expiry, [float(_field(o, 'strike')) for o in options])
+                for option in options:
+                    self._tokens[int(_field(option, 'instrument_token'))] = (
+                        chain, SIDES[_field(option, 'instrument_type')], float(_field(option, 'strike')))
+        return sum(len(options) for options in by_chain.values())
+
+    def register_underlying(self, symbol: str, instrument_token: int):
+        """Ticks for this token update underlying_price of every chain of the symbol"""
+        self._underlyings[int(instrument_token)] = symbol
+
+    def load_chain(self, option_chain: Dict[str, Any]) -> Optional[ChainSnapshot]:
+        """Seed a chain from a KiteOptionChainFetcher.get_option_chain() dict"""
+        options = option_chain.get("options", [])
+        if not options:
+            return None
+        symbol, expiry = option_chain["symbol"], str(option_chain["expiry"])
+
+        with self._lock:
+            chain = self.chain(symbol, expiry, [float(o["strike"]) for o in options])
+            with chain._lock:
+                if option_chain.get("underlying_value"):
+                    chain.set_underlying(option_chain["underlying_value"])
+                for option in options:
+                    side = SIDES.get(option.get("instrument_type"))
+                    if side is None:
+                        continue
+                    strike = float(option["strike"])
+                    oi = int(option.get("oi", 0))
+                    chain.set_open_interest(side, strike, oi, open_oi=oi - int(option.get("changeinOpenInterest", 0)))
+                    chain.set_quote(side, strike, option.get("last_price"), option.get("volume"),
+                                    option.get("impliedVolatility"))
+                    if option.get("instrument_token") is not None:
+                        self._tokens[int(option["instrument_token"])] = (chain, side, strike)
+                self.stats['publishes'] += 1
+                chain.publish()
+            return chain.snapshot()
+
+    def on_ticks(self, ticks: Iterable[Dict[str, Any]]):
+        """Apply a batch of ticks; each touched chain publishes once"""
+        touched = set()
+        with self._lock:
+            today = date.today()
+            if today != self.session:
+                self._start_session(today)
+            for tick in ticks:
+                self.stats['ticks'] += 1
+                token = tick.get('instrument_token')
+                route = self._tokens.get(token)
+                if route is not None:
+                    chain, side, strike = route
+                    with chain._lock:
+                        chain.apply_tick(side, strike, tick)
+                    touched.add(chain)
+                elif token in self._underlyings and tick.get('last_price') is not None:
+                    symbol = self._underlyings[token]
+                    for (chain_symbol, _), chain in self._chains.items():
+                        if chain_symbol == symbol:
+                            chain.set_underlying(tick['last_price'])
+                            touched.add(chain)
+                else:
+                    self.stats['ignored'] += 1
+
+            for chain in touched:
+                with chain._lock:
+                    chain.publish()
+                self.stats['publishes'] += 1
+
+    def new_session(self, day: date = None):
+        """Start a trading day: intraday OI change restarts from each strike's next OI"""
+        with self._lock:
+            self._start_session(day or date.today())
+
+    def _start_session(self, day: date):
+        # Caller holds self._lock
+        self.session = day
+        for chain in self._chains.values():
+            with chain._lock:
+                chain.new_session(day)
+                chain.publish()
+        logger.info(f"New option chain session {day}")
+
+    def on_tick(self, tick: Dict[str, Any]):
+        """Per-tick callback (ZerodhaMCPIntegration.subscribe_to_live_data)"""
+        self.on_ticks([tick])
+
+    def attach(self, zerodha, instruments: List[str]):
+        """Feed this store from a ZerodhaMCPIntegration live subscription"""
+        return zerodha.subscribe_to_live_data(instruments, self.on_tick)
+
+    def expiries(self, symbol: str) -> List[str]:
+        return sorted(expiry for chain_symbol, expiry in self._chains if chain_symbol == symbol)
+
+    def _find(self, symbol: str, expiry: str = None) -> Optional[StreamingOptionChain]:
+        """Chain for symbol/expiry; expiry defaults to the nearest one not yet expired"""
+        if expiry is None:
+            expiries = self.expiries(symbol)
+            if not expiries:
+                return None
+            today = date.today().isoformat()
+            expiry = next((e for e in expiries if e >= today), expiries[-1])
+        return self._chains.get((symbol, str(expiry)))
+
+    def snapshot(self, symbol: str, expiry: str = None) -> Optional[ChainSnapshot]:
+        """Latest published chain; expiry defaults to the nearest one not yet expired"""
+        chain = self._find(symbol, expiry)
+        return chain.snapshot() if chain else None
+
+    @contextmanager
+    def pinned(self, symbol: str, expiry: str = None) -> Iterator[Optional[ChainSnapshot]]:
+        """Latest published chain for use inside the with block only; it is not copied on release"""
+        chain = self._find(symbol, expiry)
+        snapshot = chain.pin() if chain else None
+        try:
+            yield snapshot
+        finally:
+            if snapshot is not None:
+                chain.release(snapshot)
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            **self.stats,
+            'chains': {f"{symbol} {expiry}": {'strikes': len(chain.rows), 'version': chain.version}
+                       for (symbol, expiry), chain in self._chains.items()}
+        }
+
+
+class TickRecorder:
+    """Appends tick batches to a JSON-lines file that RecordedTickFeed can replay"""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._file = open(path, 'a')
+        self._start = time.monotonic()
+
+    def write(self, entry: Dict[str, Any]):
+        """Raw entry: {"instruments": [...]}, {"underlyings": {...}} or {"chain": {...}}"""
+        self._file.write(json.dumps(entry, default=str) + '\n')
+
+    def record(self, ticks: List[Dict[str, Any]]):
+        self.write({'t': round(time.monotonic() - self._start, 6), 'ticks': ticks})
+
+    def close(self):
+        self._file.close()
+
+
+class RecordedTickFeed:
+    """Offline replay of a TickRecorder file into an OptionChainStore"""
+
+    def __init__(self, path: str):
+        self.path = path
+
+    def entries(self) -> Iterator[Dict[str, Any]]:
+        with open(self.path) as f:
+            for line in f:
+                if line.strip():
+                    yield json.loads(line)
+
+    def replay(self, store: OptionChainStore, speed: Optional[float] = None,
+               on_batch: Callable[[OptionChainStore], None] = None) -> int:
+        """Feed every entry in order; speed=None replays as fast as possible. Returns ticks fed"""
+        fed = 0
+        last_t = None
+        for entry in self.entries():
+            if 'instruments' in entry:
+                store.register_instruments(entry['instruments'])
+            if 'underlyings' in entry:
+                for symbol, token in entry['underlyings'].items():
+                    store.register_underlying(symbol, token)
+            if 'chain' in entry:
+                store.load_chain(entry['chain'])
+            if 'ticks' in entry:
+                t = entry.get('t', 0.0)
+                if speed and last_t is not None and t > last_t:
+                    time.sleep((t - last_t) / speed)
+                last_t = t
+                store.on_ticks(entry['ticks'])
+                fed += len(entry['ticks'])
+                if on_batch:
+                    on_batch(store)
+        return fed
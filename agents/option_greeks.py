@@ -0,0 +1,254 @@
+#!/usr/bin/env python3
+"""
+Vectorized Black-Scholes Greeks
+Prices, Greeks and implied volatility for whole arrays of European options at
+once: an option chain (every strike, both sides) or a book of positions.
+
+Conventions: volatility and rates are decimals (0.15 = 15%), time is in years,
+theta is per calendar day, vega and rho are per 1 percentage point.
+"""
+
+import math
+from datetime import datetime, timedelta
+from typing import Any, Dict
+
+import numpy as np
+
+try:
+    from scipy.special import ndtr as _norm_cdf
+except ImportError:  # scipy is optional; erf via frompyfunc is slower but exact
+    _erf = np.frompyfunc(math.erf, 1, 1)
+
+    def _norm_cdf(x):
+        return 0.5 * (1.0 + _erf(np.asarray(x) / math.sqrt(2.0)).astype(np.float64))
+
+DEFAULT_RATE = 0.065  # India risk-free (91-day T-bill) rate
+EXPIRY_TIME = (15, 30)  # NSE options expire at 15:30 IST
+MIN_TIME = 1.0 / (365 * 24 * 4)  # 15 minutes; keeps expiry-day maths finite
+
+_SQRT_2PI = math.sqrt(2.0 * math.pi)
+
+
+def _norm_pdf(x):
+    return np.exp(-0.5 * x * x) / _SQRT_2PI
+
+
+def time_to_expiry(expiry: Any = None, now: datetime = None) -> float:
+    """Year fraction to expiry (date, datetime or 'YYYY-MM-DD'); defaults to the next Thursday expiry"""
+    now = now or datetime.now()
+    if expiry is None:
+        days_ahead = (3 - now.weekday()) % 7
+        expiry = now.date() + timedelta(days=days_ahead)
+        if days_ahead == 0 and (now.hour, now.minute) >= EXPIRY_TIME:
+            expiry += timedelta(days=7)
+    if isinstance(expiry, str):
+        expiry = datetime.strptime(expiry[:10], "%Y-%m-%d")
+    if not isinstance(expiry, datetime):
+        expiry = datetime(expiry.year, expiry.month, expiry.day)
+    if (expiry.hour, expiry.minute) == (0, 0):
+        expiry = expiry.replace(hour=EXPIRY_TIME[0], minute=EXPIRY_TIME[1])
+    return max((expiry - now).total_seconds() / (365.0 * 86400), MIN_TIME)
+
+
+def _prepare(spot, strike, t, vol, rate, dividend, is_call):
+    spot, strike, t, vol, rate, dividend, is_call = np.broadcast_arrays(
+        np.asarray(spot, dtype=np.float64), np.asarray(strike, dtype=np.float64),
+        np.maximum(np.asarray(t, dtype=np.float64), MIN_TIME), np.asarray(vol, dtype=np.float64),
+        np.asarray(rate, dtype=np.float64), np.asarray(dividend, dtype=np.float64),
+        np.asarray(is_call, dtype=bool))
+    return spot, strike, t, vol, rate, dividend, is_call
+
+
+def _d1_d2(spot, strike, t, vol, rate, dividend):
+    sqrt_t = np.sqrt(t)
+    vol_sqrt_t = vol * sqrt_t
+    with np.errstate(divide='ignore', invalid='ignore'):
+        d1 = (np.log(spot / strike) + (rate - dividend + 0.5 * vol * vol) * t) / vol_sqrt_t
+    return d1, d1 - vol_sqrt_t, sqrt_t
+
+
+def _price(spot, strike, t, vol, rate, dividend, is_call):
+    d1, d2, _ = _d1_d2(spot, strike, t, vol, rate, dividend)
+    disc_spot = spot * np.exp(-dividend * t)
+    disc_strike = strike * np.exp(-rate * t)
+    sign = np.where(is_call, 1.0, -1.0)
+    return sign * (disc_spot * _norm_cdf(sign * d1) - disc_strike * _norm_cdf(sign * d2))
+
+
+def bs_price(spot, strike, t, vol, rate=DEFAULT_RATE, dividend=0.0, is_call=True) -> np.ndarray:
+    """Black-Scholes-Merton price; all arguments broadcast"""
+    return _price(*_prepare(spot, strike, t, vol, rate, dividend, is_call))
+
+
+def bs_greeks(spot, strike, t, vol, rate=DEFAULT_RATE, dividend=0.0, is_call=True) -> Dict[str, np.ndarray]:
+    """Price, delta, gamma, theta (per day), vega and rho (per 1%) in one pass"""
+    spot, strike, t, vol, rate, dividend, is_call = _prepare(spot, strike, t, vol, rate, dividend, is_call)
+    d1, d2, sqrt_t = _d1_d2(spot, strike, t, vol, rate, dividend)
+    sign = np.where(is_call, 1.0, -1.0)
+    q_disc = np.exp(-dividend * t)
+    r_disc = np.exp(-rate * t)
+    pdf_d1 = _norm_pdf(d1)
+    cdf_d1 = _norm_cdf(sign * d1)
+    cdf_d2 = _norm_cdf(sign * d2)
+    disc_spot = spot * q_disc
+    disc_strike = strike * r_disc
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        gamma = q_disc * pdf_d1 / (spot * vol * sqrt_t)
+    theta = (-disc_spot * pdf_d1 * vol / (2.0 * sqrt_t)
+             - sign * rate * disc_strike * cdf_d2
+             + sign * dividend * disc_spot * cdf_d1)
+    return {
+        'price': sign * (disc_spot * cdf_d1 - disc_strike * cdf_d2),
+        'delta': sign * q_disc * cdf_d1,
+        'gamma': gamma,
+        'theta': theta / 365.0,
+        'vega': disc_spot * pdf_d1 * sqrt_t / 100.0,
+        'rho': sign * disc_strike * t * cdf_d2 / 100.0,
+    }
+
+
+def implied_volatility(price, spot, strike, t, rate=DEFAULT_RATE, dividend=0.0, is_call=True,
+                       tol: float = 1e-10, max_iter: int = 100, vol_low: float = 1e-4,
+                       vol_high: float = 5.0) -> np.ndarray:
+    """
+    Implied volatility by batched Newton-Raphson (on log price of the OTM side)
+    inside a shrinking bracket; any step that leaves the bracket (or has ~zero
+    vega) bisects instead, so every option converges. NaN where the price breaks no-arbitrage bounds or needs a
+    vol outside [vol_low, vol_high].
+    """
+    spot, strike, t, _, rate, dividend, is_call = _prepare(spot, strike, t, 0.0, rate, dividend, is_call)
+    price = np.broadcast_to(np.asarray(price, dtype=np.float64), spot.shape)
+    shape = spot.shape
+    spot, strike, t, rate, dividend, is_call, price = (
+        a.ravel() for a in (spot, strike, t, rate, dividend, is_call, price))
+
+    disc_spot = spot * np.exp(-dividend * t)
+    disc_strike = strike * np.exp(-rate * t)
+    lower = np.where(is_call, np.maximum(disc_spot - disc_strike, 0.0), np.maximum(disc_strike - disc_spot, 0.0))
+    upper = np.where(is_call, disc_spot, disc_strike)
+    result = np.full(spot.shape, np.nan)
+    active = np.flatnonzero(np.isfinite(price) & (price > lower) & (price < upper))
+    if active.size == 0:
+        return result.reshape(shape)
+
+    spot, strike, t, rate, dividend, is_call, price, disc_spot, disc_strike = (
+        a[active] for a in (spot, strike, t, rate, dividend, is_call, price, disc_spot, disc_strike))
+    # Solve on the out-of-the-money side (put-call parity): its price is pure time
+    # value, and Newton on log(price) is close to linear in vol there
+    otm_call = disc_strike >= disc_spot
+    price = price + np.where(is_call & ~otm_call, disc_strike - disc_spot, 0.0) \
+        + np.where(~is_call & otm_call, disc_spot - disc_strike, 0.0)
+    sign = np.where(otm_call, 1.0, -1.0)
+    log_price = np.log(price)
+
+    # Manaster-Koehler seed, lifted by the Brenner-Subrahmanyam ATM approximation
+    log_moneyness = np.abs(np.log(spot / strike) + (rate - dividend) * t)
+    vol = np.maximum(np.sqrt(2.0 * log_moneyness / t), _SQRT_2PI * price / (disc_spot * np.sqrt(t)))
+    vol = np.clip(vol, vol_low * 2, vol_high / 2)
+    low = np.full(active.size, vol_low)
+    high = np.full(active.size, vol_high)
+    index = np.arange(active.size)
+    solved = np.full(active.size, np.nan)
+
+    for _ in range(max_iter):
+        d1, d2, sqrt_t = _d1_d2(spot[index], strike[index], t[index], vol, rate[index], dividend[index])
+        sg = sign[index]
+        model = sg * (disc_spot[index] * _norm_cdf(sg * d1) - disc_strike[index] * _norm_cdf(sg * d2))
+        diff = model - price[index]
+
+        done = np.abs(diff) <= tol * np.maximum(1.0, price[index])
+        solved[index[done]] = vol[done]
+        if done.all():
+            break
+
+        # Price is increasing in vol: shrink the bracket around the root
+        too_high = diff > 0
+        high[index] = np.where(too_high, vol, high[index])
+        low[index] = np.where(too_high, low[index], vol)
+
+        vega = disc_spot[index] * _norm_pdf(d1) * sqrt_t
+        with np.errstate(divide='ignore', invalid='ignore', over='ignore'):
+            newton = vol - (np.log(model) - log_price[index]) * model / vega
+        lo, hi = low[index], high[index]
+        step = np.where((newton > lo) & (newton < hi), newton, 0.5 * (lo + hi))
+
+        keep = ~done & (hi - lo > 1e-12)
+        index, vol = index[keep], step[keep]
+        if index.size == 0:
+            break
+
+    result[active] = solved
+    return result.reshape(shape)
+
+
+def chain_greeks(chain, spot: float, t: float, rate: float = DEFAULT_RATE,
+                 dividend: float = 0.0) -> Dict[str, np.ndarray]:
+    """
+    IV and Greeks for every strike of an OptionChain, calls and puts in one batch.
+    IV is implied from LTPs; where that fails the chain's quoted IV (in %) is used.
+    Keys are '{call,put}_{iv,price,delta,gamma,theta,vega,rho}'.
+    """
+    n = len(chain)
+    strike = np.concatenate([chain.strike, chain.strike]).astype(np.float64)
+    is_call = np.concatenate([np.ones(n, dtype=bool), np.zeros(n, dtype=bool)])
+    ltp = np.concatenate([chain.call_ltp, chain.put_ltp])
+    quoted = np.concatenate([chain.call_iv, chain.put_iv]) / 100.0
+
+    iv = implied_volatility(ltp, spot, strike, t, rate, dividend, is_call)
+    iv = np.where(np.isnan(iv) & (quoted > 0), quoted, iv)
+    greeks = bs_greeks(spot, strike, t, iv, rate, dividend, is_call)
+
+    result = {'call_iv': iv[:n], 'put_iv': iv[n:]}
+    for name, values in greeks.items():
+        result[f'call_{name}'] = values[:n]
+        result[f'put_{name}'] = values[n:]
+    return result
+
+
+def portfolio_greeks(spot, strike, t, vol, quantity, is_call, rate=DEFAULT_RATE,
+                     dividend=0.0) -> Dict[str, float]:
+    """Quantity-weighted Greek totals for a book of option positions (quantity in units, short < 0)"""
+    greeks = bs_greeks(spot, strike, t, vol, rate, dividend, is_call)
+    quantity = np.broadcast_to(np.asarray(quantity, dtype=np.float64), greeks['delta'].shape)
+    totals = {}
+    for name in ('delta', 'gamma', 'theta', 'vega', 'rho'):
+        values = quantity * greeks[name]
+        totals[name] = float(np.nansum(values))
+    totals['value'] = float(np.nansum(quantity * greeks['price']))
+    return totals
+
+
+def chain_summary(chain, spot: float, t: float, rate: float = DEFAULT_RATE,
+                  greeks: Dict[str, np.ndarray] = None) -> Dict[str, float]:
+    """
+    Volatility and exposure picture of a chain: ATM IV, 25-delta skew, expected
+    move to expiry, OI-weighted delta per side and net gamma exposure (call
+    gamma OI minus put gamma OI, per 1% move in the underlying)
+    """
+    if len(chain) == 0:
+        return {}
+    greeks = greeks or chain_greeks(chain, spot, t, rate)
+    atm = int(np.argmin(np.abs(chain.strike - spot)))
+    atm_ivs = [iv for iv in (greeks['call_iv'][atm], greeks['put_iv'][atm]) if not np.isnan(iv)]
+    atm_iv = float(np.mean(atm_ivs)) if atm_ivs else float('nan')
+
+    def iv_at_delta(side, target):
+        delta = greeks[f'{side}_delta']
+        iv = greeks[f'{side}_iv']
+        usable = ~np.isnan(delta) & ~np.isnan(iv)
+        if not usable.any():
+            return np.nan
+        return iv[usable][np.argmin(np.abs(delta[usable] - target))]
+
+    call_oi = chain.call_oi.astype(np.float64)
+    put_oi = chain.put_oi.astype(np.float64)
+    return {
+        'atm_iv': atm_iv * 100,
+        'skew_25d': float(iv_at_delta('put', -0.25) - iv_at_delta('call', 0.25)) * 100,
+        'expected_move': spot * atm_iv * math.sqrt(t) if not math.isnan(atm_iv) else float('nan'),
+        'call_delta_oi': float(np.nansum(call_oi * greeks['call_delta'])),
+        'put_delta_oi': float(np.nansum(put_oi * greeks['put_delta'])),
+        'net_gamma_exposure': float(np.nansum(call_oi * greeks['call_gamma'] - put_oi * greeks['put_gamma'])
+                                    * spot * spot * 0.01),
+    }
@@ -13,6 +13,9 @@ from dataclasses import dataclass
 from enum import Enum
 import yfinance as yf
 
+from .option_chain import as_option_chain
+from .option_greeks import chain_summary, time_to_expiry
+
 logger = logging.getLogger(__name__)
 
 
@@ -56,6 +59,7 @@ class OptionsFirstAnalysis:
     trend_strength: float
     key_insights: List[str]
     trading_implications: str
+    greeks_profile: Optional[Dict[str, float]] = None  # ATM IV, skew, delta-weighted OI, gamma exposure
 
 
 class OptionsFirstTechnicalAnalyzer:
@@ -286,9 +290,23 @@ class OptionsFirstTechnicalAnalyzer:
             self.logger.error(f"Error determining trend from options: {e}")
             return "Unknown", 0.0
     
+    def analyze_greeks_profile(self, option_data: List, current_price: float) -> Optional[Dict[str, float]]:
+        """
+        Delta-weighted OI and gamma exposure: how much directional risk option
+        writers actually carry, not just how many contracts are open
+        """
+        try:
+            chain = as_option_chain(option_data)
+            if len(chain) == 0 or current_price <= 0:
+                return None
+            return chain_summary(chain, current_price, time_to_expiry())
+        except Exception as e:
+            self.logger.error(f"Error computing Greeks profile: {e}")
+            return None
+    
     def generate_key_insights(self, levels: List[OptionsBasedLevel], 
                             positioning: InstitutionalPositioning,
-                            trend: str) -> List[str]:
+                            trend: str, greeks_profile: Optional[Dict[str, float]] = None) -> List[str]:
         """Generate key insights from options-first analysis"""
         insights = []
         
@@ -319,7 +337,15 @@ class OptionsFirstTechnicalAnalyzer:
                 insights.append(f"More institutional resistance levels ({len(resistance_levels)}) vs "
                                f"support ({len(support_levels)}) - bearish skew")
             
-            # Insight 5: Abid Hassan philosophy reminder
+            # Insight 5: Writers' net delta and gamma from option prices
+            if greeks_profile:
+                net_delta_oi = greeks_profile['call_delta_oi'] + greeks_profile['put_delta_oi']
+                writer_view = "bearish" if net_delta_oi > 0 else "bullish"
+                gamma = "dampen" if greeks_profile['net_gamma_exposure'] >= 0 else "amplify"
+                insights.append(f"Delta-weighted OI {net_delta_oi:+,.0f} - option writers are net {writer_view}; "
+                               f"gamma exposure likely to {gamma} moves (ATM IV {greeks_profile['atm_iv']:.1f}%)")
+            
+            # Insight 6: Abid Hassan philosophy reminder
             insights.append("Remember Abid's key insight: 'Big guys (institutions) are usually right. "
                            "This analysis follows their positioning, not retail sentiment.'")
             
@@ -389,10 +415,11 @@ class OptionsFirstTechnicalAnalyzer:
             primary_trend, trend_strength = self.determine_primary_trend_from_options(
                 option_data, institutional_positioning
             )
+            greeks_profile = self.analyze_greeks_profile(option_data, current_price)
             
             # Generate insights and implications
             key_insights = self.generate_key_insights(
-                options_based_levels, institutional_positioning, primary_trend
+                options_based_levels, institutional_positioning, primary_trend, greeks_profile
             )
             trading_implications = self.generate_trading_implications(
                 options_based_levels, institutional_positioning, primary_trend, current_price
@@ -407,7 +434,8 @@ class OptionsFirstTechnicalAnalyzer:
                 primary_trend=primary_trend,
                 trend_strength=trend_strength,
                 key_insights=key_insights,
-                trading_implications=trading_implications
+                trading_implications=trading_implications,
+                greeks_profile=greeks_profile
             )
             
             self.logger.info(f"Options-first analysis completed for {symbol}")
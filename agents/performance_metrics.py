@@ -0,0 +1,98 @@
+#!/usr/bin/env python3
+"""
+Portfolio Performance Metrics
+The metrics of PortfolioManagementAgent.calculate_performance_metrics computed
+for many portfolios at once on a date x portfolio value matrix. Each column
+only counts the dates that portfolio has a value for, so the numbers match the
+per-portfolio calculation.
+"""
+
+import warnings
+from typing import Dict, Iterable, Tuple
+
+import numpy as np
+import pandas as pd
+
+RISK_FREE_RATE = 0.06
+METRICS = ['total_return', 'annualized_return', 'volatility', 'sharpe_ratio', 'max_drawdown',
+           'calmar_ratio', 'win_rate', 'best_day', 'worst_day', 'current_value']
+
+
+def value_matrix(rows: Iterable[Tuple[str, str, float]]) -> pd.DataFrame:
+    """(portfolio, date, value) rows to a date x portfolio matrix, NaN where a portfolio has no row"""
+    frame = pd.DataFrame(rows, columns=['portfolio', 'date', 'value'])
+    if frame.empty:
+        return pd.DataFrame()
+    # Scatter into the matrix by position: far cheaper than pivot_table at 10^6 rows
+    date_codes, dates = pd.factorize(frame['date'])
+    portfolio_codes, portfolios = pd.factorize(frame['portfolio'])
+    matrix = np.full((len(dates), len(portfolios)), np.nan)
+    matrix[date_codes, portfolio_codes] = frame['value'].to_numpy(dtype=np.float64)  # later rows win
+    values = pd.DataFrame(matrix, index=pd.to_datetime(dates), columns=portfolios)
+    return values.sort_index()
+
+
+def merge_values(old: pd.DataFrame, new: pd.DataFrame) -> pd.DataFrame:
+    """Value matrices combined over both dates and portfolios, new values winning"""
+    index = old.index.union(new.index)
+    columns = old.columns.append(new.columns.difference(old.columns))
+    old = old.reindex(index=index, columns=columns).to_numpy()
+    new = new.reindex(index=index, columns=columns).to_numpy()
+    return pd.DataFrame(np.where(np.isnan(new), old, new), index=index, columns=columns)
+
+
+def compute_metrics(values: pd.DataFrame, risk_free_rate: float = RISK_FREE_RATE) -> pd.DataFrame:
+    """Performance metrics per column of a date x portfolio value matrix (rows = portfolios)"""
+    v = values.to_numpy(dtype=np.float64)
+    if v.size == 0:
+        return pd.DataFrame(columns=METRICS)
+    present = ~np.isnan(v)
+    filled = values.ffill().to_numpy(dtype=np.float64)
+
+    with warnings.catch_warnings(), np.errstate(divide='ignore', invalid='ignore'):
+        warnings.simplefilter('ignore', RuntimeWarning)
+        count = present.sum(axis=0)
+        first = v[present.argmax(axis=0), np.arange(v.shape[1])]
+        last = filled[-1]
+
+        # Return against the portfolio's previous row, wherever that was
+        returns = np.full_like(v, np.nan)
+        returns[1:] = filled[1:] / filled[:-1] - 1
+        returns[~present] = np.nan
+        first_row = present & (np.cumsum(present, axis=0) == 1)
+        returns[first_row] = np.nan
+        valid = ~np.isnan(returns)
+        n_returns = valid.sum(axis=0)
+
+        total_return = (last - first) / first
+        annualized_return = (1 + total_return) ** (365 / count) - 1
+        volatility = np.nanstd(returns, axis=0, ddof=1) * np.sqrt(252)
+        sharpe_ratio = np.where(volatility > 0, (annualized_return - risk_free_rate) / volatility, 0.0)
+
+        cumulative = np.cumprod(np.where(valid, 1 + returns, 1.0), axis=0)
+        running_max = np.maximum.accumulate(np.where(valid, cumulative, -np.inf), axis=0)
+        drawdown = np.where(valid, (cumulative - running_max) / running_max, np.nan)
+        max_drawdown = np.nanmin(drawdown, axis=0)
+        calmar_ratio = np.where(max_drawdown != 0, annualized_return / np.abs(max_drawdown), 0.0)
+
+        win_rate = (returns > 0).sum(axis=0) / n_returns
+        best_day = np.nanmax(returns, axis=0)
+        worst_day = np.nanmin(returns, axis=0)
+
+    return pd.DataFrame({
+        'total_return': total_return,
+        'annualized_return': annualized_return,
+        'volatility': volatility,
+        'sharpe_ratio': sharpe_ratio,
+        'max_drawdown': max_drawdown,
+        'calmar_ratio': calmar_ratio,
+        'win_rate': win_rate,
+        'best_day': best_day,
+        'worst_day': worst_day,
+        'current_value': last
+    }, index=values.columns)
+
+
+def metrics_by_portfolio(metrics: pd.DataFrame) -> Dict[str, Dict[str, float]]:
+    return {portfolio: {name: float(value) for name, value in row.items()}
+            for portfolio, row in zip(metrics.index, metrics.to_dict('records'))}
@@ -14,10 +14,18 @@ import numpy as np
 import pandas as pd
 import yfinance as yf
 from dataclasses import dataclass, asdict
-from scipy.optimize import minimize
 import warnings
 warnings.filterwarnings('ignore')
 
+try:
+    from .ohlcv_store import OHLCVStore, get_store
+    from .performance_metrics import compute_metrics, merge_values, metrics_by_portfolio, value_matrix
+    from .portfolio_optimizer import PortfolioOptimizer, min_variance_weights
+except ImportError:  # run as a script from agents/
+    from ohlcv_store import OHLCVStore, get_store
+    from performance_metrics import compute_metrics, merge_values, metrics_by_portfolio, value_matrix
+    from portfolio_optimizer import PortfolioOptimizer, min_variance_weights
+
 # Setup logging
 logging.basicConfig(
     level=logging.INFO,
@@ -57,8 +65,12 @@ class Position:
 class PortfolioManagementAgent:
     """Advanced portfolio management system"""
     
-    def __init__(self):
+    def __init__(self, history_store: Optional[OHLCVStore] = None):
         self.db_path = "data/portfolio_management.db"
+        self.history_store = history_store or get_store()
+        self.optimizer = PortfolioOptimizer(self.history_store)
+        # All-portfolio value matrix and metrics as of (MAX(id), COUNT(*)) of the performance table
+        self._metrics_cache: Optional[Dict] = None
         self.init_database()
         
         # Asset allocation strategies
@@ -174,6 +186,10 @@ class PortfolioManagementAgent:
             )
         """)
         
+        cursor.execute("""
+            CREATE INDEX IF NOT EXISTS idx_performance_portfolio_date ON performance (portfolio_id, date)
+        """)
+        
         # Rebalancing history
         cursor.execute("""
             CREATE TABLE IF NOT EXISTS rebalancing_history (
@@ -454,98 +470,80 @@ class PortfolioManagementAgent:
         
     async def optimize_portfolio(self, client_id: str) -> Dict:
         """Optimize portfolio using modern portfolio theory"""
+        results = await self.optimize_portfolios([client_id])
+        return results.get(client_id, {'status': 'error', 'message': 'Portfolio not found'})
+        
+    async def optimize_portfolios(self, client_ids: Optional[List[str]] = None) -> Dict[str, Dict]:
+        """
+        Markowitz recommendations for many clients in one pass over cached EW
+        moments, each solve warm-started from the client's current weights.
+        Holdings without enough history are listed under excluded_holdings.
+        All portfolios when client_ids is None.
+        """
         try:
-            # Get portfolio holdings
-            portfolio = await self.get_portfolio(client_id)
-            if not portfolio:
-                return {'status': 'error', 'message': 'Portfolio not found'}
+            portfolios = await self.get_portfolios(client_ids)
+            requests = []
+            for portfolio in portfolios.values():
+                weights = {}
+                for holding in portfolio['holdings']:
+                    weights[holding['symbol']] = weights.get(holding['symbol'], 0) + holding['value'] / portfolio['total_value']
+                requests.append({'client_id': portfolio['client_id'],
+                                 'target_return': portfolio['target_return'], 'weights': weights})
                 
-            # Get historical returns for holdings
-            symbols = [h['symbol'] for h in portfolio['holdings']]
-            returns_data = await self.get_historical_returns(symbols)
+            # Expected returns and covariance come from the cached EW estimate
+            loop = asyncio.get_running_loop()
+            optimized = await loop.run_in_executor(None, self.optimizer.optimize_many, requests)
             
-            # Calculate expected returns and covariance
-            expected_returns = returns_data.mean() * 252  # Annualized
-            cov_matrix = returns_data.cov() * 252
-            
-            # Optimize using Markowitz model
-            optimal_weights = await self.markowitz_optimization(
-                expected_returns, cov_matrix, portfolio['target_return']
-            )
-            
-            # Generate reallocation recommendations
-            recommendations = []
-            for i, symbol in enumerate(symbols):
-                current_weight = portfolio['holdings'][i]['value'] / portfolio['total_value']
-                optimal_weight = optimal_weights[i]
+            results = {}
+            for request in requests:
+                result = optimized[request['client_id']]
                 
-                if abs(current_weight - optimal_weight) > 0.02:  # 2% threshold
-                    recommendations.append({
-                        'symbol': symbol,
-                        'current_weight': current_weight,
-                        'optimal_weight': optimal_weight,
-                        'action': 'INCREASE' if optimal_weight > current_weight else 'DECREASE',
-                        'change': optimal_weight - current_weight
-                    })
+                # Generate reallocation recommendations
+                recommendations = []
+                for symbol, optimal_weight in zip(result['symbols'], result['weights']):
+                    current_weight = request['weights'][symbol]
+                    optimal_weight = float(optimal_weight)
                     
-            return {
-                'status': 'success',
-                'recommendations': recommendations,
-                'expected_return': float(np.dot(optimal_weights, expected_returns)),
-                'expected_risk': float(np.sqrt(np.dot(optimal_weights.T, np.dot(cov_matrix, optimal_weights))))
-            }
+                    if abs(current_weight - optimal_weight) > 0.02:  # 2% threshold
+                        recommendations.append({
+                            'symbol': symbol,
+                            'current_weight': current_weight,
+                            'optimal_weight': optimal_weight,
+                            'action': 'INCREASE' if optimal_weight > current_weight else 'DECREASE',
+                            'change': optimal_weight - current_weight
+                        })
+                        
+                results[request['client_id']] = {
+                    'status': 'success',
+                    'recommendations': recommendations,
+                    'excluded_holdings': result['dropped'],
+                    'expected_return': result['expected_return'],
+                    'expected_risk': result['expected_risk']
+                }
+            return results
             
         except Exception as e:
             logger.error(f"Error optimizing portfolio: {e}")
-            return {'status': 'error', 'message': str(e)}
+            return {client_id: {'status': 'error', 'message': str(e)} for client_id in client_ids or []}
             
     async def get_historical_returns(self, symbols: List[str]) -> pd.DataFrame:
         """Get historical returns for symbols"""
-        returns_data = pd.DataFrame()
-        
-        for symbol in symbols:
-            try:
-                stock = yf.Ticker(symbol)
-                hist = stock.history(period="1y")
-                returns = hist['Close'].pct_change().dropna()
-                returns_data[symbol] = returns
-            except:
-                continue
-                
-        return returns_data.dropna()
+        try:
+            closes = self.history_store.closes(symbols, period="1y")
+        except Exception as e:
+            logger.error(f"Error loading price history: {e}")
+            return pd.DataFrame()
+        if closes.empty:
+            return closes
+        return closes.pct_change(fill_method=None).dropna()
         
     async def markowitz_optimization(
-        self, expected_returns: pd.Series, cov_matrix: pd.DataFrame, target_return: float
+        self, expected_returns: pd.Series, cov_matrix: pd.DataFrame, target_return: float,
+        initial_weights: Optional[np.ndarray] = None
     ) -> np.ndarray:
-        """Markowitz portfolio optimization"""
-        n_assets = len(expected_returns)
-        
-        # Optimization constraints
-        constraints = [
-            {'type': 'eq', 'fun': lambda x: np.sum(x) - 1},  # Sum to 1
-            {'type': 'ineq', 'fun': lambda x: np.dot(x, expected_returns) - target_return}  # Min return
-        ]
-        
-        # Bounds (0 to 1 for each asset)
-        bounds = tuple((0, 1) for _ in range(n_assets))
-        
-        # Initial guess (equal weights)
-        x0 = np.array([1/n_assets] * n_assets)
-        
-        # Objective function (minimize portfolio variance)
-        def portfolio_variance(weights):
-            return np.dot(weights.T, np.dot(cov_matrix, weights))
-            
-        # Optimize
-        result = minimize(
-            portfolio_variance,
-            x0,
-            method='SLSQP',
-            bounds=bounds,
-            constraints=constraints
-        )
-        
-        return result.x
+        """Markowitz portfolio optimization, warm-started from initial_weights when given"""
+        return min_variance_weights(np.asarray(expected_returns), np.asarray(cov_matrix),
+                                    target_return, initial_weights)
         
     async def calculate_performance_metrics(self, client_id: str) -> Dict:
         """Calculate comprehensive performance metrics"""
@@ -555,10 +553,10 @@ class PortfolioManagementAgent:
             cursor = conn.cursor()
             
             cursor.execute("""
-                SELECT date, total_value FROM performance 
+                SELECT ?, date, total_value FROM performance 
                 WHERE portfolio_id = (SELECT id FROM portfolios WHERE client_id = ?)
                 ORDER BY date
-            """, (client_id,))
+            """, (client_id, client_id))
             
             data = cursor.fetchall()
             conn.close()
@@ -566,50 +564,51 @@ class PortfolioManagementAgent:
             if not data:
                 return {}
                 
-            # Convert to DataFrame
-            df = pd.DataFrame(data, columns=['date', 'value'])
-            df['date'] = pd.to_datetime(df['date'])
-            df.set_index('date', inplace=True)
-            
-            # Calculate returns
-            df['returns'] = df['value'].pct_change()
-            
-            # Performance metrics
-            total_return = (df['value'].iloc[-1] - df['value'].iloc[0]) / df['value'].iloc[0]
-            annualized_return = (1 + total_return) ** (365 / len(df)) - 1
-            volatility = df['returns'].std() * np.sqrt(252)
-            
-            # Sharpe ratio
-            risk_free_rate = 0.06
-            sharpe_ratio = (annualized_return - risk_free_rate) / volatility if volatility > 0 else 0
-            
-            # Maximum drawdown
-            cumulative = (1 + df['returns']).cumprod()
-            running_max = cumulative.expanding().max()
-            drawdown = (cumulative - running_max) / running_max
-            max_drawdown = drawdown.min()
-            
-            # Calmar ratio
-            calmar_ratio = annualized_return / abs(max_drawdown) if max_drawdown != 0 else 0
-            
-            # Win rate
-            positive_returns = df['returns'] > 0
-            win_rate = positive_returns.sum() / len(df['returns'].dropna())
-            
-            metrics = {
-                'total_return': total_return,
-                'annualized_return': annualized_return,
-                'volatility': volatility,
-                'sharpe_ratio': sharpe_ratio,
-                'max_drawdown': max_drawdown,
-                'calmar_ratio': calmar_ratio,
-                'win_rate': win_rate,
-                'best_day': df['returns'].max(),
-                'worst_day': df['returns'].min(),
-                'current_value': df['value'].iloc[-1]
-            }
+            return metrics_by_portfolio(compute_metrics(value_matrix(data)))[client_id]
             
-            return metrics
+        except Exception as e:
+            logger.error(f"Error calculating performance metrics: {e}")
+            return {}
+            
+    async def calculate_all_performance_metrics(self) -> Dict[str, Dict]:
+        """
+        Performance metrics for every portfolio with history, by client_id,
+        computed on one date x portfolio matrix for all columns at once. Cached
+        until the performance table changes; when rows were only appended, just
+        those rows are read and merged into the cached matrix.
+        """
+        try:
+            conn = sqlite3.connect(self.db_path)
+            cursor = conn.cursor()
+            
+            cursor.execute("SELECT MAX(id), COUNT(*) FROM performance")
+            max_id, count = cursor.fetchone()
+            cache = self._metrics_cache
+            if cache is not None and (cache['max_id'], cache['count']) == (max_id, count):
+                conn.close()
+                return cache['metrics']
+                
+            appended = cache is not None and cache['max_id'] is not None and \
+                count - cache['count'] == max_id - cache['max_id'] > 0
+            cursor.execute("""
+                SELECT portfolio_id, date, total_value FROM performance
+                WHERE id > ? ORDER BY id
+            """, (cache['max_id'] if appended else -1,))
+            data = cursor.fetchall()
+            cursor.execute("SELECT id, client_id FROM portfolios")
+            clients = dict(cursor.fetchall())
+            conn.close()
+            
+            values = value_matrix(data)
+            values = values.loc[:, values.columns.isin(list(clients))].rename(columns=clients)
+            if appended:
+                values = merge_values(cache['values'], values)
+                
+            loop = asyncio.get_running_loop()
+            metrics = await loop.run_in_executor(None, compute_metrics, values)
+            results = metrics_by_portfolio(metrics)
+            self._metrics_cache = {'max_id': max_id, 'count': count, 'values': values, 'metrics': results}
+            return results
             
         except Exception as e:
             logger.error(f"Error calculating performance metrics: {e}")
@@ -618,52 +617,59 @@ class PortfolioManagementAgent:
     async def get_current_price(self, symbol: str) -> float:
         """Get current price for a symbol"""
         try:
-            stock = yf.Ticker(symbol)
-            return stock.info.get('currentPrice', stock.history(period='1d')['Close'].iloc[-1])
+            price = yf.Ticker(symbol).info.get('currentPrice')
+            return price if price else self.history_store.last_price(symbol) or 0
         except:
             return 0
             
     async def get_portfolio(self, client_id: str) -> Dict:
         """Get portfolio details"""
+        portfolios = await self.get_portfolios([client_id])
+        return portfolios.get(client_id)
+        
+    async def get_portfolios(self, client_ids: Optional[List[str]] = None) -> Dict[str, Dict]:
+        """Portfolio details by client_id in two queries (all portfolios when client_ids is None)"""
         conn = sqlite3.connect(self.db_path)
         cursor = conn.cursor()
         
         # Get portfolio info
-        cursor.execute("""
-            SELECT * FROM portfolios WHERE client_id = ?
-        """, (client_id,))
-        
-        portfolio_data = cursor.fetchone()
-        if not portfolio_data:
-            conn.close()
-            return None
-            
-        portfolio_id = portfolio_data[0]
+        if client_ids is None:
+            cursor.execute("SELECT * FROM portfolios")
+        else:
+            placeholders = ",".join("?" * len(client_ids))
+            cursor.execute(f"SELECT * FROM portfolios WHERE client_id IN ({placeholders})", list(client_ids))
+        portfolio_rows = cursor.fetchall()
         
         # Get holdings
-        cursor.execute("""
-            SELECT * FROM holdings WHERE portfolio_id = ?
-        """, (portfolio_id,))
-        
-        holdings = cursor.fetchall()
+        holdings: Dict[int, List] = {row[0]: [] for row in portfolio_rows}
+        if holdings:
+            placeholders = ",".join("?" * len(holdings))
+            cursor.execute(f"SELECT * FROM holdings WHERE portfolio_id IN ({placeholders}) ORDER BY id",
+                           list(holdings))
+            for h in cursor.fetchall():
+                holdings[h[1]].append(h)
         conn.close()
         
         return {
-            'client_id': client_id,
-            'total_value': portfolio_data[3],
-            'cash_balance': portfolio_data[4],
-            'allocation_strategy': portfolio_data[5],
-            'holdings': [
-                {
-                    'symbol': h[2],
-                    'quantity': h[3],
-                    'buy_price': h[4],
-                    'current_price': h[5],
-                    'value': h[6],
-                    'asset_class': h[10]
-                }
-                for h in holdings
-            ]
+            portfolio_data[1]: {
+                'client_id': portfolio_data[1],
+                'total_value': portfolio_data[3],
+                'cash_balance': portfolio_data[4],
+                'allocation_strategy': portfolio_data[5],
+                'target_return': portfolio_data[7],
+                'holdings': [
+                    {
+                        'symbol': h[2],
+                        'quantity': h[3],
+                        'buy_price': h[4],
+                        'current_price': h[5],
+                        'value': h[6],
+                        'asset_class': h[10]
+                    }
+                    for h in holdings[portfolio_data[0]]
+                ]
+            }
+            for portfolio_data in portfolio_rows
         }
         
     async def store_holdings(self, client_id: str, holdings: List[Dict]):
@@ -734,6 +740,7 @@ class PortfolioManagementAgent:
                 portfolios = cursor.fetchall()
                 conn.close()
                 
+                metrics_by_client = await self.calculate_all_performance_metrics()
                 for (client_id,) in portfolios:
                     # Update portfolio values
                     portfolio = await self.get_portfolio(client_id)
@@ -743,7 +750,7 @@ class PortfolioManagementAgent:
                             holding['current_price'] = await self.get_current_price(holding['symbol'])
                             
                         # Calculate performance
-                        metrics = await self.calculate_performance_metrics(client_id)
+                        metrics = metrics_by_client.get(client_id, {})
                         logger.info(f"Portfolio {client_id}: Return={metrics.get('total_return', 0):.2%}")
                         
                 # Wait before next cycle
@@ -0,0 +1,268 @@
+#!/usr/bin/env python3
+"""
+Portfolio Optimizer
+Markowitz minimum-variance weights on exponentially weighted return moments.
+Moments are cached per universe and advanced only by the trading days added
+since the last call. Solves use analytic gradients and warm-start from the
+previous solution of the same problem or the client's current weights, and a
+batch of client portfolios shares one price load and, where trimming to a
+client's holdings keeps the same days, one moments update over their union,
+with identical problems solved once.
+"""
+
+import logging
+import threading
+import time
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+from scipy.optimize import minimize
+
+try:
+    from .risk_engine import TRADING_DAYS, ReturnsMatrix
+except ImportError:  # run as a script from agents/
+    from risk_engine import TRADING_DAYS, ReturnsMatrix
+
+logger = logging.getLogger(__name__)
+
+SEED_DAYS = 20  # Sample moments over the first days seed the exponential recursion
+
+
+@dataclass
+class EWMoments:
+    """Exponentially weighted daily mean and covariance of a returns matrix"""
+    symbols: List[str]
+    halflife: float
+    mean: np.ndarray
+    cov: np.ndarray
+    last_date: Optional[pd.Timestamp]
+    observations: int
+
+    @property
+    def decay(self) -> float:
+        return 0.5 ** (1.0 / self.halflife)
+
+    @classmethod
+    def from_returns(cls, matrix: ReturnsMatrix, halflife: float = 63) -> 'EWMoments':
+        n = len(matrix.symbols)
+        seed = matrix.returns[:SEED_DAYS]
+        if len(seed) > 1:
+            mean, cov = seed.mean(axis=0), np.atleast_2d(np.cov(seed, rowvar=False, bias=True))
+        else:
+            mean, cov = np.zeros(n), np.zeros((n, n))
+        moments = cls(list(matrix.symbols), halflife, mean, cov,
+                      matrix.dates[len(seed) - 1] if len(seed) else None, len(seed))
+        moments.update(matrix.returns[SEED_DAYS:], matrix.dates[SEED_DAYS:])
+        return moments
+
+    def update(self, returns: np.ndarray, dates: pd.DatetimeIndex):
+        """Fold in new rows (oldest first) with the incremental EW recursion"""
+        alpha = 1.0 - self.decay
+        mean, cov = self.mean, self.cov
+        for row in returns:
+            diff = row - mean
+            mean = mean + alpha * diff
+            cov = (1.0 - alpha) * (cov + alpha * np.outer(diff, diff))
+        self.mean, self.cov = mean, cov
+        if len(dates):
+            self.last_date = dates[-1]
+        self.observations += len(returns)
+
+    def annualized(self, symbols: Optional[Sequence[str]] = None) -> Tuple[np.ndarray, np.ndarray]:
+        """Annual mean vector and covariance, optionally restricted to symbols (in that order)"""
+        if symbols is None:
+            return self.mean * TRADING_DAYS, self.cov * TRADING_DAYS
+        position = {symbol: i for i, symbol in enumerate(self.symbols)}
+        idx = [position[symbol] for symbol in symbols]
+        return self.mean[idx] * TRADING_DAYS, self.cov[np.ix_(idx, idx)] * TRADING_DAYS
+
+
+def min_variance_weights(expected_returns: np.ndarray, cov: np.ndarray, target_return: float,
+                         initial_weights: Optional[np.ndarray] = None) -> np.ndarray:
+    """
+    Long-only weights summing to 1 with the least variance whose expected return
+    is at least target_return (capped at the best single asset, so the problem
+    is always feasible). Starts from initial_weights when given.
+    """
+    mu = np.asarray(expected_returns, dtype=np.float64)
+    cov = np.asarray(cov, dtype=np.float64)
+    n = len(mu)
+    if n <= 1:
+        return np.ones(n)
+    target = min(target_return, float(mu.max()))
+
+    x0 = None if initial_weights is None else np.clip(np.asarray(initial_weights, dtype=np.float64), 0, 1)
+    if x0 is None or x0.sum() <= 0:
+        x0 = np.full(n, 1.0 / n)
+    else:
+        x0 = x0 / x0.sum()
+
+    constraints = [{'type': 'eq', 'fun': lambda x: np.sum(x) - 1, 'jac': lambda x: np.ones(n)}]
+    if np.isfinite(target):
+        constraints.append({'type': 'ineq', 'fun': lambda x: x @ mu - target, 'jac': lambda x: mu})
+    result = minimize(
+        lambda x: (x @ cov @ x, 2 * (cov @ x)),
+        x0,
+        jac=True,
+        method='SLSQP',
+        bounds=[(0, 1)] * n,
+        constraints=constraints,
+        options={'ftol': 1e-10, 'maxiter': 200}
+    )
+    if not result.success:
+        logger.warning(f"Markowitz solve did not converge: {result.message}")
+    return result.x
+
+
+@dataclass
+class Frontier:
+    """Efficient frontier points, lowest return first"""
+    symbols: List[str]
+    returns: np.ndarray
+    risks: np.ndarray
+    weights: np.ndarray  # points x symbols
+
+    def weights_for(self, target_return: float) -> np.ndarray:
+        """Weights at target_return, interpolated between the neighbouring points"""
+        if target_return <= self.returns[0]:
+            return self.weights[0]
+        if target_return >= self.returns[-1]:
+            return self.weights[-1]
+        i = int(np.searchsorted(self.returns, target_return))
+        share = (target_return - self.returns[i - 1]) / (self.returns[i] - self.returns[i - 1])
+        return (1 - share) * self.weights[i - 1] + share * self.weights[i]
+
+
+def efficient_frontier(symbols: List[str], expected_returns: np.ndarray, cov: np.ndarray,
+                       points: int = 25) -> Frontier:
+    """Frontier from the minimum-variance portfolio to the best asset, each solve warm-started from the last"""
+    mu = np.asarray(expected_returns, dtype=np.float64)
+    weights = [min_variance_weights(mu, cov, -np.inf)]
+    low = float(weights[0] @ mu)
+    for target in np.linspace(low, float(mu.max()), points)[1:]:
+        weights.append(min_variance_weights(mu, cov, target, weights[-1]))
+    weights = np.array(weights)
+    returns = weights @ mu
+    risks = np.sqrt(np.maximum(np.einsum('ij,jk,ik->i', weights, cov, weights), 0.0))
+    return Frontier(list(symbols), returns, risks, weights)
+
+
+class PortfolioOptimizer:
+    """Cached EW moments per universe plus batched Markowitz solves over them"""
+
+    def __init__(self, history_store, halflife: float = 63, period: str = "1y"):
+        self.history_store = history_store
+        self.halflife = halflife
+        self.period = period
+        self._moments: Dict[Tuple[str, ...], EWMoments] = {}
+        self._frontiers: Dict[Tuple[Tuple[str, ...], int], Tuple[pd.Timestamp, Frontier]] = {}
+        self._solutions: Dict[Tuple, np.ndarray] = {}  # last solve per problem
+        self._lock = threading.Lock()
+        self.stats = {'full_builds': 0, 'incremental_updates': 0, 'up_to_date': 0,
+                      'solves': 0, 'shared_solves': 0}
+
+    def moments(self, symbols: Sequence[str], matrix: Optional[ReturnsMatrix] = None) -> EWMoments:
+        """EW moments for the universe, appending only the days since the cached estimate"""
+        key = tuple(sorted(set(symbols)))
+        if matrix is None:
+            matrix = ReturnsMatrix.from_prices(self.history_store.closes(list(key), period=self.period))
+        with self._lock:
+            cached = self._moments.get(key)
+            if (cached is not None and cached.symbols == matrix.symbols
+                    and cached.last_date is not None and cached.last_date in matrix.dates):
+                new = matrix.dates > cached.last_date
+                if new.any():
+                    cached.update(matrix.returns[new], matrix.dates[new])
+                    self.stats['incremental_updates'] += 1
+                else:
+                    self.stats['up_to_date'] += 1
+                return cached
+            moments = EWMoments.from_returns(matrix, self.halflife)
+            self._moments[key] = moments
+            self.stats['full_builds'] += 1
+            return moments
+
+    def frontier(self, symbols: Sequence[str], points: int = 25) -> Frontier:
+        """Efficient frontier for the universe, recomputed only when its moments move"""
+        moments = self.moments(symbols)
+        key = (tuple(moments.symbols), points)
+        cached = self._frontiers.get(key)
+        if cached is None or cached[0] != moments.last_date:
+            mu, cov = moments.annualized()
+            cached = (moments.last_date, efficient_frontier(moments.symbols, mu, cov, points))
+            self._frontiers[key] = cached
+        return cached[1]
+
+    def _holding_moments(self, holdings: Tuple[str, ...], closes: pd.DataFrame,
+                         union: ReturnsMatrix, shared: Optional[EWMoments]) -> Optional[EWMoments]:
+        """
+        Moments over the holdings' own history, as if the client were optimized
+        alone. The union's estimate serves when trimming to the holdings keeps
+        the same symbols' days; a holding listed recently elsewhere in the batch
+        would otherwise shorten this client's history.
+        """
+        columns = [symbol for symbol in holdings if symbol in closes.columns]
+        if not columns:
+            return None
+        matrix = ReturnsMatrix.from_prices(closes[columns].dropna(how='all'))
+        if not matrix.symbols:
+            return None
+        if shared is not None and set(matrix.symbols) <= set(shared.symbols) and matrix.dates.equals(union.dates):
+            return shared
+        return self.moments(matrix.symbols, matrix)
+
+    def optimize_many(self, portfolios: List[Dict]) -> Dict[str, Dict]:
+        """
+        Optimal weights for many portfolios ({'client_id', 'target_return',
+        'weights': {symbol: current weight}}) from one price load. Holdings
+        without enough history of their own are left out of the solve and
+        listed under 'dropped'.
+        """
+        start = time.perf_counter()
+        universe = sorted({symbol for p in portfolios for symbol in p['weights']})
+        closes = self.history_store.closes(universe, period=self.period) if universe else pd.DataFrame()
+        union = ReturnsMatrix.from_prices(closes)
+        shared = self.moments(universe, union) if union.symbols else None
+        by_holdings: Dict[Tuple[str, ...], Optional[EWMoments]] = {}
+        solved: Dict[Tuple, np.ndarray] = {}
+        results = {}
+        for portfolio in portfolios:
+            holdings = tuple(sorted(portfolio['weights']))
+            if holdings not in by_holdings:
+                by_holdings[holdings] = self._holding_moments(holdings, closes, union, shared)
+            moments = by_holdings[holdings]
+            available = set(moments.symbols) if moments else set()
+            symbols = [symbol for symbol in portfolio['weights'] if symbol in available]
+            dropped = [symbol for symbol in portfolio['weights'] if symbol not in available]
+            if dropped:
+                logger.warning(f"{portfolio['client_id']}: not enough history to optimize {dropped}")
+            if not symbols:
+                results[portfolio['client_id']] = {'symbols': [], 'weights': np.empty(0), 'dropped': dropped,
+                                                   'expected_return': 0.0, 'expected_risk': 0.0}
+                continue
+            mu, cov = moments.annualized(symbols)
+            # Same symbols over a differently trimmed history is a different problem
+            key = (tuple(moments.symbols), tuple(symbols), round(portfolio['target_return'], 6))
+            if key in solved:
+                self.stats['shared_solves'] += 1
+            else:
+                # The previous run's optimum for the same problem, else where the client is now
+                start_weights = self._solutions.get(key)
+                if start_weights is None:
+                    start_weights = np.array([portfolio['weights'][symbol] for symbol in symbols])
+                solved[key] = min_variance_weights(mu, cov, portfolio['target_return'], start_weights)
+                self._solutions[key] = solved[key]
+                self.stats['solves'] += 1
+            weights = solved[key]
+            results[portfolio['client_id']] = {
+                'symbols': symbols,
+                'weights': weights,
+                'dropped': dropped,
+                'expected_return': float(weights @ mu),
+                'expected_risk': float(np.sqrt(max(weights @ cov @ weights, 0.0)))
+            }
+        logger.info(f"Optimized {len(portfolios)} portfolios over {len(universe)} symbols "
+                    f"({len(solved)} distinct solves) in {time.perf_counter() - start:.2f}s")
+        return results
@@ -11,12 +11,20 @@ import sqlite3
 from datetime import datetime, timedelta
 from typing import Dict, List, Optional, Tuple
 import numpy as np
-import pandas as pd
 import yfinance as yf
 from dataclasses import dataclass
 import warnings
 warnings.filterwarnings('ignore')
 
+try:
+    from .option_greeks import bs_greeks, implied_volatility, portfolio_greeks, time_to_expiry
+    from .risk_engine import ReturnsMatrix, historical_var, monte_carlo_var, parametric_var
+    from .ohlcv_store import OHLCVStore, get_store
+except ImportError:  # run as a script from agents/
+    from option_greeks import bs_greeks, implied_volatility, portfolio_greeks, time_to_expiry
+    from risk_engine import ReturnsMatrix, historical_var, monte_carlo_var, parametric_var
+    from ohlcv_store import OHLCVStore, get_store
+
 # Setup logging
 logging.basicConfig(
     level=logging.INFO,
@@ -24,6 +32,9 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+# Option instrument types -> is_call
+OPTION_TYPES = {'CE': True, 'CALL': True, 'PE': False, 'PUT': False}
+
 @dataclass
 class RiskAlert:
     """Risk alert structure"""
@@ -38,8 +49,9 @@ class RiskAlert:
 class RiskComplianceAgent:
     """Comprehensive risk management and compliance system"""
     
-    def __init__(self):
+    def __init__(self, history_store: Optional[OHLCVStore] = None):
         self.db_path = "data/risk_compliance.db"
+        self.history_store = history_store or get_store()
         self.init_database()
         
         # Risk thresholds
@@ -165,20 +177,24 @@ class RiskComplianceAgent:
     async def assess_portfolio_risk(self, portfolio_id: str, holdings: List[Dict]) -> Dict:
         """Comprehensive portfolio risk assessment"""
         try:
+            # One year of aligned daily returns, shared by every price-based metric below
+            returns = await self.load_returns(holdings)
+            
             # Calculate various risk metrics
-            market_risk = await self.calculate_market_risk(holdings)
+            market_risk = await self.calculate_market_risk(holdings, returns)
             credit_risk = await self.calculate_credit_risk(holdings)
             liquidity_risk = await self.calculate_liquidity_risk(holdings)
             concentration_risk = await self.calculate_concentration_risk(holdings)
             
             # Value at Risk calculations
-            var_95, cvar_95 = await self.calculate_var(holdings)
+            var_95, cvar_95 = await self.calculate_var(holdings, returns=returns)
+            var_models = await self.calculate_var_models(holdings, returns=returns)
             
             # Portfolio Greeks
             greeks = await self.calculate_portfolio_greeks(holdings)
             
             # Correlation risk
-            correlation_risk = await self.calculate_correlation_risk(holdings)
+            correlation_risk = await self.calculate_correlation_risk(holdings, returns)
             
             # Overall risk score (weighted average)
             overall_risk = (
@@ -199,6 +215,7 @@ class RiskComplianceAgent:
                 'concentration_risk': concentration_risk,
                 'var_95': var_95,
                 'cvar_95': cvar_95,
+                'var_models': var_models,
                 'greeks': greeks,
                 'correlation_risk': correlation_risk,
                 'risk_rating': self.get_risk_rating(overall_risk)
@@ -218,38 +235,46 @@ class RiskComplianceAgent:
             logger.error(f"Error assessing portfolio risk: {e}")
             return {}
             
-    async def calculate_market_risk(self, holdings: List[Dict]) -> float:
-        """Calculate market risk exposure"""
+    async def load_returns(self, holdings: List[Dict], period: str = "1y") -> Optional[ReturnsMatrix]:
+        """Daily returns for every equity holding from the shared history store (one bulk refresh)"""
+        symbols = sorted(self.position_values(holdings))
+        if not symbols:
+            return None
         try:
-            total_value = sum(h['value'] for h in holdings)
-            
-            # Get historical volatility for each holding
-            volatilities = []
-            weights = []
+            closes = await asyncio.get_running_loop().run_in_executor(
+                None, self.history_store.closes, symbols, period)
+            return ReturnsMatrix.from_prices(closes)
+        except Exception as e:
+            logger.error(f"Error loading returns history: {e}")
+            return None
             
-            for holding in holdings:
-                symbol = holding['symbol']
-                weight = holding['value'] / total_value
-                
-                # Get historical data
-                stock = yf.Ticker(symbol)
-                hist = stock.history(period="3mo")
+    @staticmethod
+    def position_values(holdings: List[Dict]) -> Dict[str, float]:
+        """Market value per equity symbol (option legs are covered by the Greeks)"""
+        values: Dict[str, float] = {}
+        for holding in holdings:
+            option_type = str(holding.get('instrument_type', holding.get('option_type', ''))).upper()
+            if option_type not in OPTION_TYPES:
+                values[holding['symbol']] = values.get(holding['symbol'], 0.0) + holding.get('value', 0)
+        return values
+        
+    async def calculate_market_risk(self, holdings: List[Dict], returns: Optional[ReturnsMatrix] = None) -> float:
+        """Calculate market risk exposure from the last 3 months of portfolio volatility"""
+        try:
+            if returns is None:
+                returns = await self.load_returns(holdings)
+            if returns is None or len(returns) < 2:
+                return 50  # Default medium risk
                 
-                if not hist.empty:
-                    returns = hist['Close'].pct_change().dropna()
-                    volatility = returns.std() * np.sqrt(252)  # Annualized
-                    volatilities.append(volatility)
-                    weights.append(weight)
-                    
-            # Portfolio volatility
-            if volatilities:
-                portfolio_volatility = np.dot(weights, volatilities)
-                # Normalize to 0-100 scale
-                market_risk = min(100, portfolio_volatility * 100)
-            else:
-                market_risk = 50  # Default medium risk
+            recent = returns.tail(63)
+            weights = recent.weights(self.position_values(holdings))
+            if not weights.any():
+                return 50
                 
-            return market_risk
+            # Annualized volatility of the weighted portfolio (diversification included)
+            portfolio_volatility = recent.portfolio_volatility(weights)
+            # Normalize to 0-100 scale
+            return min(100, portfolio_volatility * 100)
             
         except Exception as e:
             logger.error(f"Error calculating market risk: {e}")
@@ -321,9 +346,7 @@ class RiskComplianceAgent:
                 weight = holding['value'] / total_value
                 
                 # Get trading volume
-                stock = yf.Ticker(symbol)
-                info = stock.info
-                hist = stock.history(period="1mo")
+                hist = self.history_store.history(symbol, period="1mo")
                 
                 if not hist.empty:
                     avg_volume = hist['Volume'].mean()
@@ -413,82 +436,121 @@ class RiskComplianceAgent:
             logger.error(f"Error calculating concentration risk: {e}")
             return 50
             
-    async def calculate_var(self, holdings: List[Dict], confidence_level: float = 0.95) -> Tuple[float, float]:
-        """Calculate Value at Risk and Conditional VaR"""
+    async def calculate_var(self, holdings: List[Dict], confidence_level: float = 0.95,
+                            returns: Optional[ReturnsMatrix] = None) -> Tuple[float, float]:
+        """Calculate position-weighted historical Value at Risk and Conditional VaR (1 day)"""
         try:
-            # Get portfolio returns
-            portfolio_returns = []
-            
-            for holding in holdings:
-                symbol = holding['symbol']
-                stock = yf.Ticker(symbol)
-                hist = stock.history(period="1y")
+            if returns is None:
+                returns = await self.load_returns(holdings)
+            if returns is None or len(returns) < 20:
+                return 0.05, 0.08
                 
-                if not hist.empty:
-                    returns = hist['Close'].pct_change().dropna()
-                    portfolio_returns.extend(returns.tolist())
-                    
-            if portfolio_returns:
-                # Sort returns
-                sorted_returns = sorted(portfolio_returns)
-                
-                # VaR calculation
-                var_index = int((1 - confidence_level) * len(sorted_returns))
-                var_95 = abs(sorted_returns[var_index])
-                
-                # CVaR (Expected Shortfall)
-                cvar_95 = abs(np.mean(sorted_returns[:var_index]))
-            else:
-                var_95 = 0.05
-                cvar_95 = 0.08
-                
-            return var_95, cvar_95
+            weights = returns.weights(self.position_values(holdings))
+            if not weights.any():
+                return 0.05, 0.08
+            result = historical_var(returns, weights, confidence_level)
+            return result.var, result.cvar
             
         except Exception as e:
             logger.error(f"Error calculating VaR: {e}")
             return 0.05, 0.08
             
+    async def calculate_var_models(self, holdings: List[Dict], confidence_level: float = 0.95,
+                                   returns: Optional[ReturnsMatrix] = None,
+                                   scenarios: int = 100_000) -> Dict:
+        """Historical, parametric and Monte Carlo VaR/CVaR side by side with per-holding CVaR contributions"""
+        try:
+            if returns is None:
+                returns = await self.load_returns(holdings)
+            if returns is None or len(returns) < 20:
+                return {}
+                
+            weights = returns.weights(self.position_values(holdings))
+            if not weights.any():
+                return {}
+            results = [
+                historical_var(returns, weights, confidence_level),
+                parametric_var(returns, weights, confidence_level),
+                await asyncio.get_running_loop().run_in_executor(
+                    None, monte_carlo_var, returns, weights, confidence_level, 1, scenarios)
+            ]
+            return {result.method: result.to_dict() for result in results}
+            
+        except Exception as e:
+            logger.error(f"Error calculating VaR models: {e}")
+            return {}
+            
     async def calculate_portfolio_greeks(self, holdings: List[Dict]) -> Dict:
-        """Calculate portfolio Greeks for options positions"""
-        # Simplified Greeks calculation
-        # In production, would use proper options pricing models
-        return {
-            'delta': 0.6,  # Portfolio delta
-            'gamma': 0.02,  # Portfolio gamma
-            'theta': -0.05,  # Portfolio theta
-            'vega': 0.15,  # Portfolio vega
-            'rho': 0.03  # Portfolio rho
-        }
+        """
+        Calculate portfolio Greeks for options positions with Black-Scholes, all
+        positions in one vectorized batch. Option holdings carry instrument_type
+        (CE/PE), strike, expiry, quantity (or lots * lot_size, short < 0), spot
+        and either iv (in %) or ltp to imply it from.
+        """
+        greeks = {'delta': 0.0, 'gamma': 0.0, 'theta': 0.0, 'vega': 0.0, 'rho': 0.0}
+        try:
+            options = []
+            equity_value = 0.0
+            for holding in holdings:
+                option_type = str(holding.get('instrument_type', holding.get('option_type', ''))).upper()
+                if option_type in OPTION_TYPES:
+                    options.append((holding, OPTION_TYPES[option_type]))
+                else:
+                    equity_value += holding.get('value', 0)
+            
+            greeks['delta_value'] = equity_value  # Rupee delta: equities count at full value
+            greeks['option_positions'] = 0
+            if not options:
+                return greeks
+            
+            spot = np.array([h.get('spot', h.get('underlying_price', np.nan)) for h, _ in options], dtype=float)
+            strike = np.array([h['strike'] for h, _ in options], dtype=float)
+            quantity = np.array([h.get('quantity', h.get('lots', 0) * h.get('lot_size', 1)) for h, _ in options], dtype=float)
+            is_call = np.array([is_call for _, is_call in options])
+            t = np.array([time_to_expiry(h.get('expiry')) for h, _ in options])
+            vol = np.array([h['iv'] / 100 if h.get('iv') else np.nan for h, _ in options])
+            ltp = np.array([h.get('ltp', h.get('last_price', np.nan)) for h, _ in options], dtype=float)
+            
+            # Imply volatility from price wherever it was not given
+            missing = np.isnan(vol) & ~np.isnan(ltp)
+            if missing.any():
+                vol[missing] = implied_volatility(ltp[missing], spot[missing], strike[missing], t[missing],
+                                                  is_call=is_call[missing])
+            
+            valid = ~np.isnan(vol) & ~np.isnan(spot)
+            if not valid.all():
+                skipped = [options[i][0].get('symbol', '?') for i in np.flatnonzero(~valid)]
+                logger.warning(f"No spot/volatility for {len(skipped)} option positions: {skipped[:5]}")
+            if valid.any():
+                totals = portfolio_greeks(spot[valid], strike[valid], t[valid], vol[valid],
+                                          quantity[valid], is_call[valid])
+                greeks.update({name: totals[name] for name in ('delta', 'gamma', 'theta', 'vega', 'rho')})
+                deltas = bs_greeks(spot[valid], strike[valid], t[valid], vol[valid], is_call=is_call[valid])['delta']
+                greeks['delta_value'] += float(np.sum(quantity[valid] * deltas * spot[valid]))
+                greeks['option_positions'] = int(valid.sum())
+            
+            return greeks
+            
+        except Exception as e:
+            logger.error(f"Error calculating portfolio Greeks: {e}")
+            return greeks
         
-    async def calculate_correlation_risk(self, holdings: List[Dict]) -> float:
+    async def calculate_correlation_risk(self, holdings: List[Dict], returns: Optional[ReturnsMatrix] = None) -> float:
         """Calculate correlation risk between holdings"""
         try:
             if len(holdings) < 2:
                 return 0
                 
-            # Get returns for all holdings
-            returns_data = pd.DataFrame()
-            
-            for holding in holdings[:10]:  # Limit to top 10 for performance
-                symbol = holding['symbol']
-                stock = yf.Ticker(symbol)
-                hist = stock.history(period="3mo")
-                
-                if not hist.empty:
-                    returns = hist['Close'].pct_change().dropna()
-                    returns_data[symbol] = returns
-                    
-            if returns_data.shape[1] > 1:
-                # Calculate correlation matrix
-                corr_matrix = returns_data.corr()
+            if returns is None:
+                returns = await self.load_returns(holdings)
                 
-                # Get upper triangle of correlation matrix
-                upper_triangle = corr_matrix.where(
-                    np.triu(np.ones(corr_matrix.shape), k=1).astype(bool)
-                )
+            if returns is not None and len(returns.symbols) > 1 and len(returns) > 2:
+                # Correlation matrix over the last 3 months, all holdings
+                corr_matrix = returns.tail(63).correlation()
                 
-                # Average correlation
-                avg_correlation = upper_triangle.stack().mean()
+                # Average correlation over the upper triangle
+                upper = np.triu_indices(len(corr_matrix), k=1)
+                avg_correlation = np.nanmean(corr_matrix[upper])
                 
                 # High correlation increases risk
                 if avg_correlation > 0.7:
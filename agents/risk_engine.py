@@ -0,0 +1,209 @@
+#!/usr/bin/env python3
+"""
+Portfolio Risk Engine
+One aligned daily returns matrix per assessment (single bulk download) and
+position-weighted VaR/CVaR on it: historical, parametric (variance-covariance)
+and Monte Carlo with a Cholesky-factored covariance. Losses are reported as
+positive fractions of the portfolio value.
+"""
+
+import logging
+import time
+from dataclasses import dataclass, field
+from statistics import NormalDist
+from typing import Callable, Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+TRADING_DAYS = 252
+MIN_COVERAGE = 0.5  # Symbols with fewer rows than this share of the window are dropped
+
+
+@dataclass
+class ReturnsMatrix:
+    """Daily simple returns, rows = dates (oldest first), columns = symbols"""
+    symbols: List[str]
+    dates: pd.DatetimeIndex
+    returns: np.ndarray
+
+    @classmethod
+    def from_prices(cls, prices: pd.DataFrame) -> 'ReturnsMatrix':
+        """Align closes across exchanges (short holiday gaps forward-filled) and difference them"""
+        prices = prices.sort_index().dropna(axis=1, how='all')
+        if prices.empty:
+            return cls([], pd.DatetimeIndex([]), np.empty((0, 0)))
+        coverage = prices.notna().mean()
+        prices = prices.loc[:, coverage >= MIN_COVERAGE].ffill(limit=3)
+        returns = prices.pct_change(fill_method=None).iloc[1:].dropna()
+        return cls(list(returns.columns), pd.DatetimeIndex(returns.index), returns.to_numpy(dtype=np.float64))
+
+    @classmethod
+    def download(cls, symbols: List[str], period: str = "1y",
+                 downloader: Callable = None) -> 'ReturnsMatrix':
+        """Daily closes for every symbol in one multi-ticker request"""
+        if not symbols:
+            return cls([], pd.DatetimeIndex([]), np.empty((0, 0)))
+        if downloader is None:
+            import yfinance as yf
+            downloader = yf.download
+        start = time.perf_counter()
+        frame = downloader(tickers=symbols, period=period, interval="1d", group_by="ticker",
+                           auto_adjust=True, threads=True, progress=False)
+        matrix = cls.from_prices(closes_from_download(frame, symbols))
+        missing = [symbol for symbol in symbols if symbol not in matrix.symbols]
+        logger.info(f"Returns matrix {matrix.returns.shape} for {len(symbols)} symbols in "
+                    f"{time.perf_counter() - start:.2f}s" + (f", missing {missing}" if missing else ""))
+        return matrix
+
+    def __len__(self) -> int:
+        return self.returns.shape[0]
+
+    def tail(self, days: int) -> 'ReturnsMatrix':
+        """Most recent `days` rows (e.g. 63 for ~3 months)"""
+        return ReturnsMatrix(self.symbols, self.dates[-days:], self.returns[-days:])
+
+    def weights(self, values: Dict[str, float]) -> np.ndarray:
+        """Position weights over the symbols in the matrix (holdings without history are left out)"""
+        w = np.array([values.get(symbol, 0.0) for symbol in self.symbols], dtype=np.float64)
+        total = w.sum()
+        return w / total if total else w
+
+    def mean(self) -> np.ndarray:
+        return self.returns.mean(axis=0)
+
+    def covariance(self) -> np.ndarray:
+        return np.atleast_2d(np.cov(self.returns, rowvar=False))
+
+    def correlation(self) -> np.ndarray:
+        return np.atleast_2d(np.corrcoef(self.returns, rowvar=False))
+
+    def portfolio_volatility(self, weights: np.ndarray, annualize: bool = True) -> float:
+        variance = float(weights @ self.covariance() @ weights)
+        return float(np.sqrt(max(variance, 0.0) * (TRADING_DAYS if annualize else 1)))
+
+
+def closes_from_download(frame: pd.DataFrame, symbols: List[str]) -> pd.DataFrame:
+    """Close prices (dates x symbols) from a group_by='ticker' yf.download frame"""
+    if frame is None or frame.empty:
+        return pd.DataFrame()
+    if not isinstance(frame.columns, pd.MultiIndex):
+        # Older yfinance returns flat columns for a single ticker
+        frame = pd.concat({symbols[0]: frame}, axis=1)
+    available = set(frame.columns.get_level_values(0))
+    return pd.DataFrame({symbol: frame[symbol]['Close'] for symbol in symbols
+                         if symbol in available and 'Close' in frame[symbol]})
+
+
+@dataclass
+class VaRResult:
+    """One VaR/CVaR estimate; components split CVaR by holding (they sum to cvar)"""
+    method: str
+    confidence: float
+    horizon_days: int
+    var: float
+    cvar: float
+    components: Dict[str, float] = field(default_factory=dict)
+
+    def to_dict(self) -> Dict:
+        return {
+            'method': self.method,
+            'confidence': self.confidence,
+            'horizon_days': self.horizon_days,
+            'var': self.var,
+            'cvar': self.cvar,
+            'components': self.components
+        }
+
+
+def _tail_components(asset_pnl: np.ndarray, portfolio: np.ndarray, var: float,
+                     symbols: List[str]) -> Dict[str, float]:
+    """Each holding's average loss in the scenarios at or beyond VaR"""
+    tail = portfolio <= -var
+    if not tail.any():
+        return {}
+    contributions = -asset_pnl[tail].mean(axis=0)
+    return {symbol: float(c) for symbol, c in zip(symbols, contributions)}
+
+
+def _tail_measures(portfolio: np.ndarray, confidence: float):
+    """VaR is the loss at the (1 - confidence) quantile, CVaR the mean loss at or beyond it"""
+    var = -float(np.quantile(portfolio, 1 - confidence, method='lower'))
+    cvar = -float(portfolio[portfolio <= -var].mean())
+    return var, cvar
+
+
+def historical_var(matrix: ReturnsMatrix, weights: np.ndarray, confidence: float = 0.95,
+                   horizon_days: int = 1) -> VaRResult:
+    """Full revaluation on the historical daily returns (square-root-of-time for longer horizons)"""
+    asset_pnl = matrix.returns * weights
+    portfolio = asset_pnl.sum(axis=1)
+    var, cvar = _tail_measures(portfolio, confidence)
+    components = _tail_components(asset_pnl, portfolio, var, matrix.symbols)
+    scale = np.sqrt(horizon_days)
+    return VaRResult('historical', confidence, horizon_days, var * scale, cvar * scale,
+                     {symbol: c * scale for symbol, c in components.items()})
+
+
+def parametric_var(matrix: ReturnsMatrix, weights: np.ndarray, confidence: float = 0.95,
+                   horizon_days: int = 1) -> VaRResult:
+    """Normal variance-covariance VaR; components are Euler allocations of CVaR"""
+    cov = matrix.covariance() * horizon_days
+    mu = matrix.mean() * horizon_days
+    sigma = float(np.sqrt(max(weights @ cov @ weights, 0.0)))
+    z = NormalDist().inv_cdf(confidence)
+    tail_factor = NormalDist().pdf(z) / (1 - confidence)
+    mean = float(mu @ weights)
+    var = z * sigma - mean
+    cvar = tail_factor * sigma - mean
+
+    components = {}
+    if sigma > 0:
+        marginal = cov @ weights / sigma
+        components = {symbol: float(w * (tail_factor * m - u))
+                      for symbol, w, m, u in zip(matrix.symbols, weights, marginal, mu)}
+    return VaRResult('parametric', confidence, horizon_days, var, cvar, components)
+
+
+def cholesky_factor(cov: np.ndarray) -> np.ndarray:
+    """Lower Cholesky factor, nudging the diagonal if the sample covariance is not positive definite"""
+    jitter = 0.0
+    scale = float(np.mean(np.diag(cov))) or 1.0
+    for _ in range(8):
+        try:
+            return np.linalg.cholesky(cov + jitter * np.eye(len(cov)))
+        except np.linalg.LinAlgError:
+            jitter = max(jitter * 10, scale * 1e-10)
+    # Still singular (e.g. duplicated symbols): fall back to the PSD square root
+    values, vectors = np.linalg.eigh(cov)
+    return vectors * np.sqrt(np.clip(values, 0, None))
+
+
+def monte_carlo_var(matrix: ReturnsMatrix, weights: np.ndarray, confidence: float = 0.95,
+                    horizon_days: int = 1, scenarios: int = 100_000, seed: Optional[int] = None,
+                    dtype=np.float64) -> VaRResult:
+    """
+    Correlated normal scenarios: Z (scenarios x n) @ L.T + mu with L the Cholesky
+    factor of the horizon covariance, then the same tail measures as historical
+    """
+    cov = matrix.covariance() * horizon_days
+    mu = matrix.mean() * horizon_days
+    factor = cholesky_factor(cov).astype(dtype)
+    rng = np.random.default_rng(seed)
+    shocks = rng.standard_normal((scenarios, len(weights)), dtype=dtype)
+    asset_returns = shocks @ factor.T
+    asset_returns += mu.astype(dtype)
+    asset_pnl = asset_returns * weights.astype(dtype)
+    portfolio = asset_pnl.sum(axis=1)
+    var, cvar = _tail_measures(portfolio, confidence)
+    components = _tail_components(asset_pnl, portfolio, var, matrix.symbols)
+    return VaRResult('monte_carlo', confidence, horizon_days, var, cvar, components)
+
+
+VAR_METHODS = {
+    'historical': historical_var,
+    'parametric': parametric_var,
+    'monte_carlo': monte_carlo_var,
+}
@@ -0,0 +1,370 @@
+#!/usr/bin/env python3
+"""
+Signal Rule Backtester
+The rule sets behind AITradingSignals.generate_crypto_signal and
+generate_stock_signal, written once on NumPy arrays so the live agent (one
+symbol, one bar) and the backtester (bars x symbols matrices) evaluate exactly
+the same conditions. The backtester replays a rule over stored OHLCV history:
+indicators are computed once per column, every bar where the rule fires opens a
+trade at that bar's close, and the following bars' high/low decide whether the
+target or the stop is touched first. A parameter grid only re-evaluates the
+rule and the trade walk, never the indicators. The same walk resolves the live
+agent's open signals against the bars since each was created.
+
+Indicators run over the whole stored history rather than the live 30 day
+window, with the shared kernels in agents.indicators (TA-Lib seeding, Wilder
+RSI) applied to every symbol at once.
+"""
+
+import itertools
+from dataclasses import dataclass, replace
+from typing import Dict, Iterable, List, Optional
+
+import numpy as np
+import pandas as pd
+
+try:
+    from . import indicators
+except ImportError:  # run as a script from agents/
+    import indicators
+
+BUY, SELL = 1, -1
+OUTCOMES = np.array(['open', 'target', 'stop', 'time'])
+
+# Bars in the live 30 day lookback the volume average is taken over (1h crypto, 1d stocks)
+VOLUME_WINDOW = {'crypto': 720, 'stock': 21}
+# Bars a trade may run before it is closed at the bar's close: a week of hours, a month of days
+MAX_HOLD = {'crypto': 168, 'stock': 20}
+
+
+@dataclass(frozen=True)
+class SignalRules:
+    """Thresholds and exits of the AITradingSignals rule sets"""
+    rsi_oversold: float = 30
+    rsi_overbought: float = 70
+    volume_spike_threshold: float = 1.5
+    sentiment_bullish: float = 0.6
+    sentiment_bearish: float = 0.4
+    pcr_bullish: float = 1.3
+    pcr_bearish: float = 0.7
+    stock_rsi_buy: float = 40
+    stock_rsi_sell: float = 60
+    min_confidence: float = 50
+    crypto_target: float = 0.05
+    crypto_stop: float = 0.03
+    stock_target: float = 0.03
+    stock_stop: float = 0.02
+
+    def exits(self, signal_type: str):
+        if signal_type == 'crypto':
+            return self.crypto_target, self.crypto_stop
+        return self.stock_target, self.stock_stop
+
+
+def crypto_rule(rsi, macd, macd_signal, histogram, volume_spike, sentiment,
+                rules: SignalRules = SignalRules()) -> Dict[str, np.ndarray]:
+    """RSI, MACD, volume and sentiment votes; works on scalars or broadcastable arrays"""
+    rsi, macd, macd_signal, histogram = map(np.asarray, (rsi, macd, macd_signal, histogram))
+    rsi_buy = rsi < rules.rsi_oversold
+    rsi_sell = ~rsi_buy & (rsi > rules.rsi_overbought)
+    action = np.where(rsi_buy, BUY, np.where(rsi_sell, SELL, 0))
+    confidence = np.where(rsi_buy | rsi_sell, 30, 0)
+
+    bullish = (histogram > 0) & (macd > macd_signal)
+    bearish = ~bullish & (histogram < 0) & (macd < macd_signal)
+    macd_buy = bullish & (action != SELL)
+    macd_sell = bearish & (action != BUY)
+    action = np.where(macd_buy, BUY, np.where(macd_sell, SELL, action))
+    confidence = confidence + np.where(macd_buy | macd_sell, 25, 0)
+
+    volume_spike = np.asarray(volume_spike, dtype=bool)
+    confidence = confidence + np.where(volume_spike, 20, 0)
+
+    sentiment = np.asarray(sentiment)
+    positive = sentiment > rules.sentiment_bullish
+    negative = ~positive & (sentiment < rules.sentiment_bearish)
+    confidence = confidence + np.where((positive & (action == BUY)) | (negative & (action == SELL)), 15, 0)
+
+    fire = (action != 0) & (confidence >= rules.min_confidence)
+    return {'action': np.where(fire, action, 0), 'confidence': np.minimum(confidence, 95),
+            'rsi_buy': rsi_buy, 'rsi_sell': rsi_sell, 'macd_buy': macd_buy, 'macd_sell': macd_sell,
+            'volume_spike': volume_spike, 'sentiment_positive': positive, 'sentiment_negative': negative}
+
+
+def stock_rule(pcr, rsi, rules: SignalRules = SignalRules()) -> Dict[str, np.ndarray]:
+    """Contrarian PCR vote confirmed by RSI; works on scalars or broadcastable arrays"""
+    pcr, rsi = np.asarray(pcr), np.asarray(rsi)
+    pcr_buy = pcr > rules.pcr_bullish
+    pcr_sell = ~pcr_buy & (pcr < rules.pcr_bearish)
+    action = np.where(pcr_buy, BUY, np.where(pcr_sell, SELL, 0))
+    confidence = np.where(pcr_buy | pcr_sell, 40, 0)
+
+    rsi_buy = (rsi < rules.stock_rsi_buy) & (action == BUY)
+    rsi_sell = (rsi > rules.stock_rsi_sell) & (action == SELL)
+    confidence = confidence + np.where(rsi_buy | rsi_sell, 25, 0)
+
+    fire = (action != 0) & (confidence >= rules.min_confidence)
+    return {'action': np.where(fire, action, 0), 'confidence': np.minimum(confidence, 95),
+            'pcr_buy': pcr_buy, 'pcr_sell': pcr_sell, 'rsi_buy': rsi_buy, 'rsi_sell': rsi_sell}
+
+
+def signal_levels(action, price, target: float, stop: float):
+    """Target and stop prices for BUY (+1) / SELL (-1) entries"""
+    action = np.asarray(action)
+    return price * (1 + action * target), price * (1 - action * stop)
+
+
+def trailing_volume_mean(volume: np.ndarray, window: int, min_bars: int = 4) -> np.ndarray:
+    """Mean of up to window - 1 bars before each bar (AITradingSignals.analyze_volume_pattern's average)"""
+    volume = np.asarray(volume, dtype=np.float64)
+    present = ~np.isnan(volume)
+    zero = np.zeros((1, volume.shape[1]))
+    sums = np.vstack([zero, np.cumsum(np.where(present, volume, 0), axis=0)])
+    counts = np.vstack([zero, np.cumsum(present, axis=0)])
+    rows = np.arange(len(volume))
+    lower = np.maximum(rows - (window - 1), 0)
+    total, n = sums[rows] - sums[lower], counts[rows] - counts[lower]
+    with np.errstate(divide='ignore', invalid='ignore'):
+        return np.where(n >= min_bars, total / n, np.nan)
+
+
+@dataclass
+class Bars:
+    """Aligned OHLCV matrices (bars x symbols); NaN before a symbol's first bar"""
+    index: pd.DatetimeIndex
+    symbols: List[str]
+    open: np.ndarray
+    high: np.ndarray
+    low: np.ndarray
+    close: np.ndarray
+    volume: np.ndarray
+
+    @classmethod
+    def from_frames(cls, frames: Dict[str, pd.DataFrame]) -> 'Bars':
+        frames = {symbol: frame[~frame.index.duplicated(keep='last')] for symbol, frame in frames.items()
+                  if not frame.empty}
+        symbols = list(frames)
+        index = pd.DatetimeIndex([])
+        for frame in frames.values():
+            index = index.union(frame.index)
+        matrices = {}
+        for column in ('Open', 'High', 'Low', 'Close', 'Volume'):
+            matrix = np.full((len(index), len(symbols)), np.nan)
+            for j, frame in enumerate(frames.values()):
+                matrix[index.get_indexer(frame.index), j] = frame[column].to_numpy(dtype=np.float64)
+            matrices[column] = matrix
+        # A symbol with no bar at a shared timestamp carries its last close: flat bar, no volume
+        close = pd.DataFrame(matrices['Close']).ffill().to_numpy()
+        missing = np.isnan(matrices['Close']) & ~np.isnan(close)
+        for column in ('Open', 'High', 'Low'):
+            matrices[column][missing] = close[missing]
+        matrices['Volume'][missing] = 0
+        return cls(index, symbols, matrices['Open'], matrices['High'], matrices['Low'], close,
+                   matrices['Volume'])
+
+
+def load_bars(store, symbols: Iterable[str], period: str = "5y", interval: str = "1d") -> Bars:
+    """Stored history for many symbols after one bulk refresh"""
+    symbols = list(dict.fromkeys(symbols))
+    store.refresh(symbols, period=period, interval=interval)
+    return Bars.from_frames({symbol: store.history(symbol, period=period, interval=interval)
+                             for symbol in symbols})
+
+
+@dataclass
+class BacktestResult:
+    """Every simulated trade of one rule set run"""
+    signal_type: str
+    rules: SignalRules
+    trades: pd.DataFrame
+
+    def summary(self, by: Optional[List[str]] = None) -> pd.DataFrame:
+        """Hit rate, expectancy and drawdown of closed trades (percent), per action and overall"""
+        closed = self.trades[self.trades['outcome'] != 'open']
+        rows = {}
+        groups = [('ALL', closed)] + [(key, group) for key, group in closed.groupby(by or 'action')]
+        for key, group in groups:
+            rows[key] = summarize(group)
+        return pd.DataFrame.from_dict(rows, orient='index')
+
+
+def summarize(trades: pd.DataFrame) -> Dict[str, float]:
+    """Trade statistics in the units of AITradingSignals.get_performance_stats"""
+    returns = trades['return'].to_numpy() * 100
+    if not len(returns):
+        return {'trades': 0, 'hit_rate': 0.0, 'stop_rate': 0.0, 'expectancy': 0.0, 'avg_win': 0.0,
+                'avg_loss': 0.0, 'max_drawdown': 0.0, 'avg_bars': 0.0}
+    outcome = trades['outcome'].to_numpy()
+    # One unit per trade, booked when it closes
+    equity = np.cumsum(returns[np.lexsort((trades['entry_bar'].to_numpy(), trades['exit_bar'].to_numpy()))])
+    peak = np.maximum.accumulate(np.maximum(equity, 0))
+    wins, losses = returns[returns > 0], returns[returns <= 0]
+    return {
+        'trades': len(returns),
+        'hit_rate': float((outcome == 'target').mean() * 100),
+        'stop_rate': float((outcome == 'stop').mean() * 100),
+        'expectancy': float(returns.mean()),
+        'avg_win': float(wins.mean()) if len(wins) else 0.0,
+        'avg_loss': float(losses.mean()) if len(losses) else 0.0,
+        'max_drawdown': float((equity - peak).min()),
+        'avg_bars': float((trades['exit_bar'] - trades['entry_bar']).mean()),
+    }
+
+
+def simulate_exits(bars: Bars, entry_bar: np.ndarray, column: np.ndarray, action: np.ndarray,
+                   target: np.ndarray, stop: np.ndarray, max_hold: int):
+    """Walk each trade forward bar by bar (all trades at once) until high/low touches its
+    target or stop. A bar opening beyond a level fills at the open; a bar touching both
+    levels counts as the stop. Trades still running after max_hold bars exit at that close,
+    and trades the history ends under stay open at the last close."""
+    n = len(entry_bar)
+    last = len(bars.index) - 1
+    exit_bar = np.full(n, -1)
+    exit_price = np.full(n, np.nan)
+    outcome = np.zeros(n, dtype=np.int8)
+    pending = np.arange(n)
+    for step in range(1, max_hold + 1):
+        if not len(pending):
+            break
+        row = entry_bar[pending] + step
+        ended = row > last
+        if ended.any():
+            done = pending[ended]
+            exit_bar[done], exit_price[done] = last, bars.close[last, column[done]]
+            pending, row = pending[~ended], row[~ended]
+        j, long = column[pending], action[pending] == BUY
+        high, low, open_ = bars.high[row, j], bars.low[row, j], bars.open[row, j]
+        t, s = target[pending], stop[pending]
+
+        gap_target = np.where(long, open_ >= t, open_ <= t)
+        gap_stop = np.where(long, open_ <= s, open_ >= s)
+        touch_target = np.where(long, high >= t, low <= t)
+        touch_stop = np.where(long, low <= s, high >= s)
+        stopped = gap_stop | (touch_stop & ~gap_target)
+        hit = gap_target | (touch_target & ~stopped)
+
+        done = stopped | hit
+        exit_bar[pending[done]] = row[done]
+        exit_price[pending[stopped]] = np.where(gap_stop, open_, s)[stopped]
+        exit_price[pending[hit]] = np.where(gap_target, open_, t)[hit]
+        outcome[pending[stopped]], outcome[pending[hit]] = 2, 1
+        pending = pending[~done]
+
+    if len(pending):
+        row = entry_bar[pending] + max_hold
+        expired = row <= last
+        exit_bar[pending] = np.minimum(row, last)
+        exit_price[pending] = bars.close[exit_bar[pending], column[pending]]
+        outcome[pending[expired]] = 3
+    return exit_bar, exit_price, outcome
+
+
+def resolve_signals(frames: Dict[str, pd.DataFrame], signals: pd.DataFrame) -> pd.DataFrame:
+    """First target or stop touch of open signals (id, symbol, action, target_price, stop_loss,
+    created_at in UTC) in the bars starting at or after each signal's creation. Returns the
+    resolved ones with exit_time, exit_price, hit_target and hit_stop_loss; signals whose
+    levels were never touched, or whose symbol has no bars, are left out."""
+    columns = ['id', 'symbol', 'action', 'exit_time', 'exit_price', 'hit_target', 'hit_stop_loss']
+    utc = {}
+    for symbol, frame in frames.items():
+        if frame is not None and not frame.empty:
+            index = frame.index.tz_convert('UTC').tz_localize(None) if frame.index.tz is not None else frame.index
+            utc[symbol] = frame.set_axis(index)
+    signals = signals[signals['symbol'].isin(utc)]
+    if signals.empty:
+        return pd.DataFrame(columns=columns)
+    bars = Bars.from_frames(utc)
+
+    column = pd.Index(bars.symbols).get_indexer(signals['symbol'])
+    created = pd.to_datetime(signals['created_at']).to_numpy(dtype='datetime64[ns]')
+    # The walk starts on the bar after entry_bar: the first bar opening at or after creation
+    entry_bar = np.searchsorted(bars.index.to_numpy(dtype='datetime64[ns]'), created, side='left') - 1
+    action = np.where(signals['action'].to_numpy() == 'BUY', BUY, SELL)
+    exit_bar, exit_price, outcome = simulate_exits(
+        bars, entry_bar, column, action, signals['target_price'].to_numpy(dtype=np.float64),
+        signals['stop_loss'].to_numpy(dtype=np.float64), max_hold=len(bars.index))
+
+    done = (outcome == 1) | (outcome == 2)
+    return pd.DataFrame({
+        'id': signals['id'].to_numpy()[done],
+        'symbol': signals['symbol'].to_numpy()[done],
+        'action': signals['action'].to_numpy()[done],
+        'exit_time': bars.index[exit_bar[done]],
+        'exit_price': exit_price[done],
+        'hit_target': outcome[done] == 1,
+        'hit_stop_loss': outcome[done] == 2,
+    }, columns=columns)
+
+
+class SignalBacktester:
+    """One AITradingSignals rule set replayed over aligned bars"""
+
+    def __init__(self, bars: Bars, signal_type: str = 'crypto', sentiment: Optional[Dict[str, float]] = None,
+                 pcr=None, volume_window: Optional[int] = None, max_hold: Optional[int] = None,
+                 seed: int = 0):
+        if signal_type not in ('crypto', 'stock'):
+            raise ValueError(f"Unknown signal type: {signal_type}")
+        self.bars = bars
+        self.signal_type = signal_type
+        self.max_hold = max_hold or MAX_HOLD[signal_type]
+        close = bars.close
+        self.rsi = indicators.rsi(close.T).T
+        self.macd, self.macd_signal, self.histogram = (output.T for output in indicators.macd(close.T))
+        self.volume_mean = trailing_volume_mean(bars.volume, volume_window or VOLUME_WINDOW[signal_type])
+        sentiment = sentiment or {}
+        self.sentiment = np.array([sentiment.get(symbol, 0.5) for symbol in bars.symbols])[None, :]
+        if pcr is None:
+            # Live stock signals draw a simulated PCR on every call; replay the same distribution
+            pcr = np.random.default_rng(seed).uniform(0.5, 1.8, close.shape)
+        elif isinstance(pcr, pd.DataFrame):
+            pcr = pcr.reindex(index=bars.index, columns=bars.symbols).ffill().to_numpy(dtype=np.float64)
+        self.pcr = np.asarray(pcr, dtype=np.float64)
+        # No trades during the indicator warm-up (the live MACD needs 26 closes)
+        self.ready = ~np.isnan(close) & (np.cumsum(~np.isnan(close), axis=0) >= 26)
+
+    def decisions(self, rules: SignalRules = SignalRules()) -> Dict[str, np.ndarray]:
+        """The rule evaluated on every bar of every symbol"""
+        if self.signal_type == 'crypto':
+            with np.errstate(invalid='ignore'):
+                spike = self.bars.volume > self.volume_mean * rules.volume_spike_threshold
+            decision = crypto_rule(self.rsi, self.macd, self.macd_signal, self.histogram, spike,
+                                   self.sentiment, rules)
+        else:
+            decision = stock_rule(self.pcr, np.where(np.isnan(self.rsi), 50, self.rsi), rules)
+        decision['action'] = np.where(self.ready, decision['action'], 0)
+        return decision
+
+    def run(self, rules: SignalRules = SignalRules()) -> BacktestResult:
+        decision = self.decisions(rules)
+        entry_bar, column = np.nonzero(decision['action'])
+        action = decision['action'][entry_bar, column]
+        entry_price = self.bars.close[entry_bar, column]
+        target, stop = signal_levels(action, entry_price, *rules.exits(self.signal_type))
+        exit_bar, exit_price, outcome = simulate_exits(self.bars, entry_bar, column, action, target, stop,
+                                                      self.max_hold)
+        trades = pd.DataFrame({
+            'symbol': pd.Categorical.from_codes(column, self.bars.symbols),
+            'action': np.where(action == BUY, 'BUY', 'SELL'),
+            'confidence': decision['confidence'][entry_bar, column],
+            'entry_time': self.bars.index[entry_bar],
+            'entry_bar': entry_bar,
+            'entry_price': entry_price,
+            'target_price': target,
+            'stop_loss': stop,
+            'exit_bar': exit_bar,
+            'exit_price': exit_price,
+            'outcome': OUTCOMES[outcome],
+            'return': action * (exit_price - entry_price) / entry_price,
+        })
+        return BacktestResult(self.signal_type, rules, trades)
+
+    def sweep(self, grid: Dict[str, Iterable], rules: SignalRules = SignalRules()) -> pd.DataFrame:
+        """Overall summary for every combination of the grid's SignalRules fields"""
+        names = list(grid)
+        rows = []
+        for values in itertools.product(*(list(grid[name]) for name in names)):
+            result = self.run(replace(rules, **dict(zip(names, values))))
+            closed = result.trades[result.trades['outcome'] != 'open']
+            rows.append({**dict(zip(names, values)), **summarize(closed)})
+        return pd.DataFrame(rows)
+
@@ -0,0 +1,406 @@
+#!/usr/bin/env python3
+"""
+Streaming Technical Indicators
+Bar-by-bar versions of the TA-Lib indicators TechnicalAnalysisAgent reports
+(SMA, EMA, RSI, MACD, BBANDS, STOCH, ATR, ADX, OBV). Each keeps O(1) state and
+follows TA-Lib's lookbacks, seeding and smoothing, so after the same bars the
+value equals the last element of the TA-Lib batch call to within floating point
+rounding (about 1e-12 relative).
+
+Every update takes commit=False to evaluate a still-forming bar without
+advancing the state; the next call replaces it.
+"""
+
+import math
+from collections import deque
+from typing import Dict, Optional, Tuple
+
+import pandas as pd
+
+NAN = float('nan')
+_EPSILON = 1e-14  # TA_IS_ZERO / TA_IS_ZERO_OR_NEG threshold of the TA-Lib build in use
+
+
+def _is_zero(value: float) -> bool:
+    return -_EPSILON < value < _EPSILON
+
+
+def _true_range(high: float, low: float, prev_close: float) -> float:
+    result = high - low
+    result = max(result, abs(high - prev_close))
+    return max(result, abs(low - prev_close))
+
+
+class SMA:
+    """Running-total simple moving average (TA_INT_SMA)"""
+
+    __slots__ = ('period', 'window', 'total')
+
+    def __init__(self, period: int):
+        self.period = period
+        self.window = deque(maxlen=period)
+        self.total = 0.0
+
+    def update(self, value: float, commit: bool = True) -> Optional[float]:
+        total = self.total + value
+        out = total / self.period if len(self.window) + 1 >= self.period else None
+        if commit:
+            self.window.append(value)
+            # Drop the value leaving the window now, as TA-Lib does right after each output
+            self.total = total - self.window[0] if len(self.window) == self.period else total
+        return out
+
+
+class EMA:
+    """Exponential moving average seeded with the SMA of the first period values"""
+
+    __slots__ = ('period', 'k', 'count', 'total', 'value')
+
+    def __init__(self, period: int):
+        self.period = period
+        self.k = 2.0 / (period + 1)
+        self.count = 0
+        self.total = 0.0
+        self.value: Optional[float] = None
+
+    def update(self, value: float, commit: bool = True) -> Optional[float]:
+        if self.value is not None:
+            out = ((value - self.value) * self.k) + self.value
+            if commit:
+                self.value = out
+            return out
+        total = self.total + value
+        out = total / self.period if self.count + 1 == self.period else None
+        if commit:
+            self.total, self.count, self.value = total, self.count + 1, out
+        return out
+
+
+class RSI:
+    """Wilder RSI"""
+
+    __slots__ = ('period', 'prev', 'count', 'gain', 'loss')
+
+    def __init__(self, period: int = 14):
+        self.period = period
+        self.prev: Optional[float] = None
+        self.count = 0
+        self.gain = 0.0
+        self.loss = 0.0
+
+    def update(self, value: float, commit: bool = True) -> Optional[float]:
+        if self.prev is None:
+            if commit:
+                self.prev = value
+            return None
+        diff = value - self.prev
+        n = self.period
+        gain, loss, count = self.gain, self.loss, self.count
+        if count >= n:
+            gain *= n - 1
+            loss *= n - 1
+        if diff < 0:
+            loss -= diff
+        else:
+            gain += diff
+        count += 1
+        if count >= n:
+            gain /= n
+            loss /= n
+            total = gain + loss
+            out = 100.0 * (gain / total) if not _is_zero(total) else 0.0
+        else:
+            out = None
+        if commit:
+            self.prev, self.gain, self.loss, self.count = value, gain, loss, min(count, n)
+        return out
+
+
+class MACD:
+    """
+    TA-Lib MACD: the fast EMA is seeded on the fast-period bars ending where the
+    slow EMA is seeded (not from the first bar), and the first output is
+    slow + signal - 2 bars in
+    """
+
+    __slots__ = ('fast_period', 'slow_period', 'bars', 'fast', 'slow', 'signal')
+
+    def __init__(self, fast: int = 12, slow: int = 26, signal: int = 9):
+        self.fast_period, self.slow_period = fast, slow
+        self.bars = 0
+        self.fast, self.slow, self.signal = EMA(fast), EMA(slow), EMA(signal)
+
+    def update(self, value: float, commit: bool = True) -> Optional[Tuple[float, float, float]]:
+        slow = self.slow.update(value, commit)
+        fast = self.fast.update(value, commit) if self.bars >= self.slow_period - self.fast_period else None
+        if commit:
+            self.bars += 1
+        if slow is None:
+            return None
+        macd = fast - slow
+        signal = self.signal.update(macd, commit)
+        if signal is None:
+            return None
+        return macd, signal, macd - signal
+
+
+class BBands:
+    """Bollinger Bands on an SMA middle band with population standard deviation"""
+
+    __slots__ = ('dev', 'shift', 'mean', 'shifted', 'shifted_square')
+
+    def __init__(self, period: int = 20, dev: float = 2.0):
+        self.dev = dev
+        self.shift: Optional[float] = None
+        self.mean = SMA(period)
+        # Variance from running sums of (x - first value): no cancellation at price scale
+        self.shifted = SMA(period)
+        self.shifted_square = SMA(period)
+
+    def update(self, value: float, commit: bool = True) -> Optional[Tuple[float, float, float]]:
+        shift = value if self.shift is None else self.shift
+        if commit:
+            self.shift = shift
+        middle = self.mean.update(value, commit)
+        y = value - shift
+        mean = self.shifted.update(y, commit)
+        mean_square = self.shifted_square.update(y * y, commit)
+        if middle is None:
+            return None
+        variance = mean_square - mean * mean
+        width = (math.sqrt(variance) if variance >= _EPSILON else 0.0) * self.dev
+        return middle + width, middle, middle - width
+
+
+class Stochastic:
+    """Slow stochastic: %K over fastk bars, SMA-smoothed %K and %D"""
+
+    __slots__ = ('highs', 'lows', 'slow_k', 'slow_d')
+
+    def __init__(self, fastk: int = 5, slowk: int = 3, slowd: int = 3):
+        self.highs = deque(maxlen=fastk - 1)
+        self.lows = deque(maxlen=fastk - 1)
+        self.slow_k = SMA(slowk)
+        self.slow_d = SMA(slowd)
+
+    def update(self, high: float, low: float, close: float, commit: bool = True) -> Optional[Tuple[float, float]]:
+        ready = len(self.highs) == self.highs.maxlen
+        if ready:
+            highest = max(high, max(self.highs)) if self.highs.maxlen else high
+            lowest = min(low, min(self.lows)) if self.lows.maxlen else low
+        if commit:
+            self.highs.append(high)
+            self.lows.append(low)
+        if not ready:
+            return None
+        diff = highest - lowest
+        fast_k = (close - lowest) / diff * 100.0 if diff != 0.0 else 0.0
+        k = self.slow_k.update(fast_k, commit)
+        if k is None:
+            return None
+        d = self.slow_d.update(k, commit)
+        return None if d is None else (k, d)
+
+
+class ATR:
+    """Wilder average true range seeded with the mean of the first period true ranges"""
+
+    __slots__ = ('period', 'prev_close', 'count', 'total', 'value')
+
+    def __init__(self, period: int = 14):
+        self.period = period
+        self.prev_close: Optional[float] = None
+        self.count = 0
+        self.total = 0.0
+        self.value: Optional[float] = None
+
+    def update(self, high: float, low: float, close: float, commit: bool = True) -> Optional[float]:
+        if self.prev_close is None:
+            if commit:
+                self.prev_close = close
+            return None
+        tr = _true_range(high, low, self.prev_close)
+        if self.value is not None:
+            out = ((self.value * (self.period - 1)) + tr) / self.period
+            if commit:
+                self.prev_close, self.value = close, out
+            return out
+        total = self.total + tr
+        out = total / self.period if self.count + 1 == self.period else None
+        if commit:
+            self.prev_close, self.total, self.count, self.value = close, total, self.count + 1, out
+        return out
+
+
+class ADX:
+    """Wilder ADX: period-1 bars of raw DM/TR sums, period bars of DX, then smoothing"""
+
+    __slots__ = ('period', 'prev', 'bars', 'plus_dm', 'minus_dm', 'tr', 'sum_dx', 'value')
+
+    def __init__(self, period: int = 14):
+        self.period = period
+        self.prev: Optional[Tuple[float, float, float]] = None
+        self.bars = 0  # bars after the first
+        self.plus_dm = self.minus_dm = self.tr = 0.0
+        self.sum_dx = 0.0
+        self.value: Optional[float] = None
+
+    def update(self, high: float, low: float, close: float, commit: bool = True) -> Optional[float]:
+        if self.prev is None:
+            if commit:
+                self.prev = (high, low, close)
+            return None
+        n = self.period
+        prev_high, prev_low, prev_close = self.prev
+        diff_plus, diff_minus = high - prev_high, prev_low - low
+        plus_dm, minus_dm, tr_sum = self.plus_dm, self.minus_dm, self.tr
+        bars = self.bars + 1
+        smoothing = bars >= n
+        if smoothing:
+            minus_dm -= minus_dm / n
+            plus_dm -= plus_dm / n
+        if diff_minus > 0 and diff_plus < diff_minus:
+            minus_dm += diff_minus
+        elif diff_plus > 0 and diff_plus > diff_minus:
+            plus_dm += diff_plus
+        tr = _true_range(high, low, prev_close)
+        tr_sum = tr_sum - (tr_sum / n) + tr if smoothing else tr_sum + tr
+
+        dx = None
+        if smoothing and not _is_zero(tr_sum):
+            minus_di = 100.0 * (minus_dm / tr_sum)
+            plus_di = 100.0 * (plus_dm / tr_sum)
+            di_sum = minus_di + plus_di
+            if not _is_zero(di_sum):
+                dx = 100.0 * (abs(minus_di - plus_di) / di_sum)
+
+        sum_dx, value = self.sum_dx, self.value
+        if smoothing and value is None:
+            sum_dx += dx or 0.0
+            if bars == 2 * n - 1:
+                value = sum_dx / n
+        elif value is not None and dx is not None:
+            value = ((value * (n - 1)) + dx) / n
+
+        if commit:
+            self.prev = (high, low, close)
+            self.bars, self.plus_dm, self.minus_dm, self.tr = bars, plus_dm, minus_dm, tr_sum
+            self.sum_dx, self.value = sum_dx, value
+        return value
+
+
+class OBV:
+    """On-balance volume starting from the first bar's volume"""
+
+    __slots__ = ('prev_close', 'value')
+
+    def __init__(self):
+        self.prev_close: Optional[float] = None
+        self.value = 0.0
+
+    def update(self, close: float, volume: float, commit: bool = True) -> float:
+        if self.prev_close is None:
+            out = volume
+        elif close > self.prev_close:
+            out = self.value + volume
+        elif close < self.prev_close:
+            out = self.value - volume
+        else:
+            out = self.value
+        if commit:
+            self.prev_close, self.value = close, out
+        return out
+
+
+def _value(x: Optional[float]) -> float:
+    return NAN if x is None else float(x)
+
+
+class IndicatorEngine:
+    """
+    The indicator set of TechnicalAnalysisAgent.calculate_indicators for one
+    symbol/interval, advanced one bar at a time
+    """
+
+    def __init__(self):
+        self.reset()
+
+    def reset(self):
+        self.sma_20, self.sma_50, self.sma_200 = SMA(20), SMA(50), SMA(200)
+        self.ema_20 = EMA(20)
+        self.rsi = RSI(14)
+        self.macd = MACD(12, 26, 9)
+        self.bbands = BBands(20, 2.0)
+        self.stoch = Stochastic(5, 3, 3)
+        self.atr = ATR(14)
+        self.adx = ADX(14)
+        self.obv = OBV()
+        self.bars = 0
+        self.first_timestamp: Optional[int] = None  # epoch ns of the anchor bar the state starts from
+        self.last_timestamp: Optional[int] = None  # epoch ns of the last committed bar
+        # Outputs at the last two committed bars
+        self.latest: Dict[str, float] = {}
+        self.prior: Dict[str, float] = {}
+
+    def update(self, high: float, low: float, close: float, volume: float, commit: bool = True) -> Dict[str, float]:
+        macd = self.macd.update(close, commit) or (NAN, NAN, NAN)
+        bbands = self.bbands.update(close, commit) or (NAN, NAN, NAN)
+        stoch = self.stoch.update(high, low, close, commit) or (NAN, NAN)
+        values = {
+            'SMA_20': _value(self.sma_20.update(close, commit)),
+            'SMA_50': _value(self.sma_50.update(close, commit)),
+            'SMA_200': _value(self.sma_200.update(close, commit)),
+            'EMA_20': _value(self.ema_20.update(close, commit)),
+            'RSI': _value(self.rsi.update(close, commit)),
+            'MACD': macd[0],
+            'MACD_signal': macd[1],
+            'MACD_histogram': macd[2],
+            'BB_upper': bbands[0],
+            'BB_middle': bbands[1],
+            'BB_lower': bbands[2],
+            'STOCH_K': stoch[0],
+            'STOCH_D': stoch[1],
+            'ATR': _value(self.atr.update(high, low, close, commit)),
+            'ADX': _value(self.adx.update(high, low, close, commit)),
+            'OBV': float(self.obv.update(close, volume, commit)),
+        }
+        if commit:
+            self.bars += 1
+            self.prior, self.latest = self.latest, values
+        return values
+
+    def sync(self, df: pd.DataFrame, forming: bool = True) -> Tuple[Dict[str, float], Dict[str, float]]:
+        """
+        Feed the bars of df (OHLCV, oldest first) not seen yet and return the
+        outputs at the last two bars. With forming=True the last bar is evaluated
+        but not committed, so the next sync can revise it.
+
+        The engine stays anchored on the first bar it committed: a trailing
+        window (a daily "6mo", an intraday session) that has dropped older bars
+        still continues from the last committed bar, so each sync costs only the
+        new bars. The outputs equal the batch calculation from the anchor bar
+        onward, not over df alone. The engine starts over (anchored on df's first
+        bar) only when df does not contain the last committed bar.
+        """
+        index = pd.DatetimeIndex(df.index).asi8
+        closed = len(df) - 1 if forming else len(df)
+        start = 0
+        if self.last_timestamp is not None:
+            position = int(index.searchsorted(self.last_timestamp))
+            if position < closed and index[position] == self.last_timestamp:
+                start = position + 1
+            else:
+                self.reset()
+
+        high, low = df['High'].to_numpy(float), df['Low'].to_numpy(float)
+        close, volume = df['Close'].to_numpy(float), df['Volume'].to_numpy(float)
+        for i in range(start, closed):
+            self.update(high[i], low[i], close[i], volume[i])
+        if closed > start:
+            if self.first_timestamp is None:
+                self.first_timestamp = int(index[0])
+            self.last_timestamp = int(index[closed - 1])
+
+        if forming and len(df):
+            return self.update(high[-1], low[-1], close[-1], volume[-1], commit=False), self.latest
+        return self.latest, self.prior
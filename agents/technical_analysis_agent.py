@@ -7,17 +7,29 @@ Provides trading signals, pattern recognition, and market predictions
 import asyncio
 import json
 import logging
+import multiprocessing
+import os
 import sqlite3
+import time
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
 from datetime import datetime, timedelta
 from typing import Dict, List, Optional, Tuple
 import numpy as np
 import pandas as pd
-import yfinance as yf
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 import talib
 import warnings
 warnings.filterwarnings('ignore')
 
+try:
+    from .indicators import rsi_zone, technical_indicators
+    from .ohlcv_store import OHLCVStore, get_store
+    from .streaming_indicators import IndicatorEngine
+except ImportError:  # run as a script from agents/
+    from indicators import rsi_zone, technical_indicators
+    from ohlcv_store import OHLCVStore, get_store
+    from streaming_indicators import IndicatorEngine
+
 # Setup logging
 logging.basicConfig(
     level=logging.INFO,
@@ -39,11 +51,61 @@ class TechnicalSignal:
     timestamp: datetime
     metadata: Dict
 
+SCAN_STAGES = ("fetch", "compute", "store")
+
+@dataclass
+class ScanReport:
+    """Outcome of one pipelined watchlist scan"""
+    elapsed_seconds: float
+    analyses: Dict[str, Dict]
+    failed: Dict[str, str]
+    # Per-symbol seconds in each stage, executor queueing included
+    stage_seconds: Dict[str, List[float]] = field(default_factory=lambda: {stage: [] for stage in SCAN_STAGES})
+    
+    def stage_summary(self) -> Dict[str, Dict[str, float]]:
+        summary = {}
+        for stage, seconds in self.stage_seconds.items():
+            if seconds:
+                summary[stage] = {
+                    'count': len(seconds),
+                    'mean_ms': float(np.mean(seconds)) * 1000,
+                    'p95_ms': float(np.percentile(seconds, 95)) * 1000,
+                    'max_ms': max(seconds) * 1000
+                }
+        return summary
+    
+    def describe(self, cadence_seconds: float) -> str:
+        stages = ", ".join(f"{stage} {s['mean_ms']:.0f}/{s['p95_ms']:.0f}ms"
+                           for stage, s in self.stage_summary().items())
+        return (f"Scan cycle: {len(self.analyses)} analyzed, {len(self.failed)} failed in "
+                f"{self.elapsed_seconds:.1f}s ({self.elapsed_seconds / cadence_seconds:.0%} of {cadence_seconds:.0f}s cadence); "
+                f"mean/p95 {stages}")
+
+def analyze_frame(symbol: str, df: pd.DataFrame,
+                  engine: Optional[IndicatorEngine] = None) -> Tuple[Dict, IndicatorEngine]:
+    """
+    Compute stage of a scan, run in a worker process: the analysis of one
+    symbol's bars. Returns it with the symbol's indicator engine advanced to the
+    last bar, which the parent keeps for the next cycle.
+    """
+    agent = TechnicalAnalysisAgent.__new__(TechnicalAnalysisAgent)
+    agent.indicator_engines = {} if engine is None else {symbol: engine}
+    analysis = asyncio.run(agent.build_analysis(symbol, df))
+    return analysis, agent.indicator_engines[symbol]
+
 class TechnicalAnalysisAgent:
     """Advanced technical analysis for Indian markets"""
     
-    def __init__(self):
+    def __init__(self, history_store: Optional[OHLCVStore] = None, io_workers: int = 8,
+                 compute_workers: Optional[int] = None):
         self.db_path = "data/technical_analysis.db"
+        self.history_store = history_store or get_store()
+        self.indicator_engines: Dict[str, IndicatorEngine] = {}  # daily bars, by symbol
+        # Scan pools, created on first scan; compute_workers=0 computes on threads
+        self.io_workers = io_workers
+        self.compute_workers = (os.cpu_count() or 1) if compute_workers is None else compute_workers
+        self.io_pool: Optional[ThreadPoolExecutor] = None
+        self.compute_pool: Optional[Executor] = None
         self.init_database()
         self.watchlist = [
             "RELIANCE.NS", "TCS.NS", "HDFCBANK.NS", "INFY.NS", "ICICIBANK.NS",
@@ -112,48 +174,16 @@ class TechnicalAnalysisAgent:
     async def analyze_stock(self, symbol: str) -> Dict:
         """Comprehensive technical analysis for a stock"""
         try:
-            # Fetch historical data
-            stock = yf.Ticker(symbol)
-            df = stock.history(period="6mo")
+            # Fetch historical data (shared store: only new bars hit the network)
+            df = self.history_store.history(symbol, period="6mo")
             
             if df.empty:
                 return None
                 
-            # Calculate technical indicators
-            indicators = await self.calculate_indicators(df)
-            
-            # Identify chart patterns
-            patterns = await self.identify_patterns(df)
-            
-            # Generate trading signals
-            signals = await self.generate_signals(symbol, df, indicators)
-            
-            # Calculate support and resistance levels
-            levels = await self.calculate_support_resistance(df)
-            
-            # Trend analysis
-            trend = await self.analyze_trend(df, indicators)
-            
-            # Volume analysis
-            volume_analysis = await self.analyze_volume(df)
+            analysis = await self.build_analysis(symbol, df)
             
-            # Risk metrics
-            risk_metrics = await self.calculate_risk_metrics(df)
-            
-            analysis = {
-                "symbol": symbol,
-                "current_price": float(df['Close'].iloc[-1]),
-                "indicators": indicators,
-                "patterns": patterns,
-                "signals": signals,
-                "support_resistance": levels,
-                "trend": trend,
-                "volume_analysis": volume_analysis,
-                "risk_metrics": risk_metrics,
-                "timestamp": datetime.now().isoformat()
-            }
-            
-            # Store analysis in database
+            # Store signals and analysis in database
+            self.save_signals(symbol, analysis['signals'])
             await self.store_analysis(analysis)
             
             return analysis
@@ -162,75 +192,130 @@ class TechnicalAnalysisAgent:
             logger.error(f"Error analyzing {symbol}: {e}")
             return None
             
-    async def calculate_indicators(self, df: pd.DataFrame) -> Dict:
-        """Calculate technical indicators"""
-        close = df['Close'].values
+    async def build_analysis(self, symbol: str, df: pd.DataFrame) -> Dict:
+        """Everything analyze_stock computes from the bars, without any I/O"""
+        # Calculate technical indicators
+        indicators = await self.calculate_indicators(df, symbol)
+        
+        # Identify chart patterns
+        patterns = await self.identify_patterns(df)
+        
+        # Generate trading signals
+        signals = await self.generate_signals(symbol, df, indicators)
+        
+        # Calculate support and resistance levels
+        levels = await self.calculate_support_resistance(df)
+        
+        # Trend analysis
+        trend = await self.analyze_trend(df, indicators)
+        
+        # Volume analysis
+        volume_analysis = await self.analyze_volume(df)
+        
+        # Risk metrics
+        risk_metrics = await self.calculate_risk_metrics(df)
+        
+        return {
+            "symbol": symbol,
+            "current_price": float(df['Close'].iloc[-1]),
+            "indicators": indicators,
+            "patterns": patterns,
+            "signals": signals,
+            "support_resistance": levels,
+            "trend": trend,
+            "volume_analysis": volume_analysis,
+            "risk_metrics": risk_metrics,
+            "timestamp": datetime.now().isoformat()
+        }
+        
+    async def calculate_indicators(self, df: pd.DataFrame, symbol: Optional[str] = None) -> Dict:
+        """
+        Calculate technical indicators. With a symbol, only the bars that symbol's
+        streaming engine has not seen yet are processed, and the values run from
+        the first bar the engine was fed rather than the window's (it stays
+        anchored while the trailing window slides); without one, TA-Lib runs
+        over the whole frame.
+        """
         high = df['High'].values
         low = df['Low'].values
-        volume = df['Volume'].values
+        
+        if symbol is None:
+            latest, previous = self.batch_indicators(df)
+        else:
+            engine = self.indicator_engines.setdefault(symbol, IndicatorEngine())
+            latest, previous = engine.sync(df)
         
         indicators = {}
         
         # Moving averages
-        indicators['SMA_20'] = float(talib.SMA(close, timeperiod=20)[-1])
-        indicators['SMA_50'] = float(talib.SMA(close, timeperiod=50)[-1])
-        indicators['SMA_200'] = float(talib.SMA(close, timeperiod=200)[-1]) if len(close) >= 200 else None
-        indicators['EMA_20'] = float(talib.EMA(close, timeperiod=20)[-1])
+        indicators['SMA_20'] = latest['SMA_20']
+        indicators['SMA_50'] = latest['SMA_50']
+        indicators['SMA_200'] = latest['SMA_200'] if not np.isnan(latest['SMA_200']) else None
+        indicators['EMA_20'] = latest['EMA_20']
         
         # RSI
-        rsi = talib.RSI(close, timeperiod=14)
-        indicators['RSI'] = float(rsi[-1])
-        indicators['RSI_signal'] = self.interpret_rsi(rsi[-1])
+        indicators['RSI'] = latest['RSI']
+        indicators['RSI_signal'] = self.interpret_rsi(latest['RSI'])
         
         # MACD
-        macd, macd_signal, macd_hist = talib.MACD(close)
-        indicators['MACD'] = float(macd[-1])
-        indicators['MACD_signal'] = float(macd_signal[-1])
-        indicators['MACD_histogram'] = float(macd_hist[-1])
-        indicators['MACD_crossover'] = self.check_macd_crossover(macd, macd_signal)
+        indicators['MACD'] = latest['MACD']
+        indicators['MACD_signal'] = latest['MACD_signal']
+        indicators['MACD_histogram'] = latest['MACD_histogram']
+        indicators['MACD_crossover'] = self.check_macd_crossover(
+            np.array([previous.get('MACD', np.nan), latest['MACD']]),
+            np.array([previous.get('MACD_signal', np.nan), latest['MACD_signal']])
+        )
         
         # Bollinger Bands
-        upper, middle, lower = talib.BBANDS(close, timeperiod=20)
-        indicators['BB_upper'] = float(upper[-1])
-        indicators['BB_middle'] = float(middle[-1])
-        indicators['BB_lower'] = float(lower[-1])
-        indicators['BB_signal'] = self.interpret_bollinger(close[-1], upper[-1], lower[-1])
+        indicators['BB_upper'] = latest['BB_upper']
+        indicators['BB_middle'] = latest['BB_middle']
+        indicators['BB_lower'] = latest['BB_lower']
+        indicators['BB_signal'] = self.interpret_bollinger(float(df['Close'].iloc[-1]), latest['BB_upper'], latest['BB_lower'])
         
         # Stochastic
-        slowk, slowd = talib.STOCH(high, low, close)
-        indicators['STOCH_K'] = float(slowk[-1])
-        indicators['STOCH_D'] = float(slowd[-1])
+        indicators['STOCH_K'] = latest['STOCH_K']
+        indicators['STOCH_D'] = latest['STOCH_D']
         
         # ATR (Average True Range)
-        indicators['ATR'] = float(talib.ATR(high, low, close, timeperiod=14)[-1])
+        indicators['ATR'] = latest['ATR']
         
         # ADX (Average Directional Index)
-        indicators['ADX'] = float(talib.ADX(high, low, close, timeperiod=14)[-1])
+        indicators['ADX'] = latest['ADX']
         
         # OBV (On Balance Volume)
-        indicators['OBV'] = float(talib.OBV(close, volume)[-1])
+        indicators['OBV'] = latest['OBV']
         
         # Fibonacci retracement levels
         indicators['fibonacci'] = self.calculate_fibonacci(high, low)
         
         return indicators
         
+    def batch_indicators(self, df: pd.DataFrame) -> Tuple[Dict[str, float], Dict[str, float]]:
+        """Shared indicator kernels over the whole frame: indicator values at the last two bars"""
+        close = df['Close'].values.astype(float)
+        series = technical_indicators(df['High'].values.astype(float), df['Low'].values.astype(float), close,
+                                      df['Volume'].values.astype(float))
+        latest = {name: float(values[-1]) for name, values in series.items()}
+        previous = {name: float(values[-2]) for name, values in series.items()} if len(close) > 1 else {}
+        return latest, previous
+        
     async def identify_patterns(self, df: pd.DataFrame) -> List[Dict]:
         """Identify chart patterns"""
         patterns = []
         close = df['Close'].values
         high = df['High'].values
         low = df['Low'].values
+        open_ = df['Open'].values
         
         # Candlestick patterns
         candle_patterns = {
-            'HAMMER': talib.CDLHAMMER(df['Open'], high, low, close),
-            'DOJI': talib.CDLDOJI(df['Open'], high, low, close),
-            'ENGULFING': talib.CDLENGULFING(df['Open'], high, low, close),
-            'MORNING_STAR': talib.CDLMORNINGSTAR(df['Open'], high, low, close),
-            'EVENING_STAR': talib.CDLEVENINGSTAR(df['Open'], high, low, close),
-            'THREE_WHITE_SOLDIERS': talib.CDL3WHITESOLDIERS(df['Open'], high, low, close),
-            'THREE_BLACK_CROWS': talib.CDL3BLACKCROWS(df['Open'], high, low, close)
+            'HAMMER': talib.CDLHAMMER(open_, high, low, close),
+            'DOJI': talib.CDLDOJI(open_, high, low, close),
+            'ENGULFING': talib.CDLENGULFING(open_, high, low, close),
+            'MORNING_STAR': talib.CDLMORNINGSTAR(open_, high, low, close),
+            'EVENING_STAR': talib.CDLEVENINGSTAR(open_, high, low, close),
+            'THREE_WHITE_SOLDIERS': talib.CDL3WHITESOLDIERS(open_, high, low, close),
+            'THREE_BLACK_CROWS': talib.CDL3BLACKCROWS(open_, high, low, close)
         }
         
         for pattern_name, pattern_data in candle_patterns.items():
@@ -325,10 +410,6 @@ class TechnicalAnalysisAgent:
                 'stop_loss': indicators['BB_lower'] * 0.98
             })
             
-        # Store signals in database
-        for signal in signals:
-            await self.store_signal(symbol, signal)
-            
         return signals
         
     async def calculate_support_resistance(self, df: pd.DataFrame) -> Dict:
@@ -462,12 +543,8 @@ class TechnicalAnalysisAgent:
         
     def interpret_rsi(self, rsi: float) -> str:
         """Interpret RSI value"""
-        if rsi < 30:
-            return 'OVERSOLD'
-        elif rsi > 70:
-            return 'OVERBOUGHT'
-        else:
-            return 'NEUTRAL'
+        zone = rsi_zone(rsi)
+        return zone if zone in ('OVERSOLD', 'OVERBOUGHT') else 'NEUTRAL'
             
     def check_macd_crossover(self, macd: np.ndarray, signal: np.ndarray) -> str:
         """Check for MACD crossover"""
@@ -545,14 +622,20 @@ class TechnicalAnalysisAgent:
         
     async def store_signal(self, symbol: str, signal: Dict):
         """Store trading signal in database"""
+        self.save_signals(symbol, [signal])
+        
+    def save_signals(self, symbol: str, signals: List[Dict]):
+        """Store a symbol's trading signals in one transaction"""
+        if not signals:
+            return
         conn = sqlite3.connect(self.db_path)
         cursor = conn.cursor()
         
-        cursor.execute("""
+        cursor.executemany("""
             INSERT INTO technical_signals 
             (symbol, indicator, signal, strength, price, target, stop_loss, confidence, metadata)
             VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
-        """, (
+        """, [(
             symbol,
             signal['type'],
             signal['action'],
@@ -562,35 +645,95 @@ class TechnicalAnalysisAgent:
             signal['stop_loss'],
             signal.get('confidence', signal['strength']),
             json.dumps(signal)
-        ))
+        ) for signal in signals])
         
         conn.commit()
         conn.close()
         
-    async def run_continuous_analysis(self):
+    def _pools(self) -> Tuple[ThreadPoolExecutor, Executor]:
+        if self.io_pool is None:
+            self.io_pool = ThreadPoolExecutor(max_workers=self.io_workers, thread_name_prefix="ta-io")
+        if self.compute_pool is None:
+            if self.compute_workers > 0:
+                # spawn: forking a process that already runs I/O threads can inherit held locks
+                self.compute_pool = ProcessPoolExecutor(max_workers=self.compute_workers,
+                                                        mp_context=multiprocessing.get_context("spawn"))
+            else:
+                self.compute_pool = ThreadPoolExecutor(max_workers=1, thread_name_prefix="ta-compute")
+        return self.io_pool, self.compute_pool
+        
+    def close(self):
+        """Shut down the scan pools"""
+        for pool in (self.io_pool, self.compute_pool):
+            if pool is not None:
+                pool.shutdown(wait=False, cancel_futures=True)
+        self.io_pool = self.compute_pool = None
+        
+    async def scan(self, symbols: List[str]) -> ScanReport:
+        """
+        Analyze symbols as a pipeline: history fetches on the bounded I/O pool,
+        indicator and pattern math on the compute pool, signal writes back on
+        the I/O pool. Each symbol moves to its next stage as soon as it is ready,
+        so one symbol's fetch overlaps another's compute.
+        """
+        loop = asyncio.get_running_loop()
+        io_pool, compute_pool = self._pools()
+        report = ScanReport(elapsed_seconds=0.0, analyses={}, failed={})
+        start = time.perf_counter()
+        
+        async def stage(name, pool, fn, *args):
+            began = time.perf_counter()
+            result = await loop.run_in_executor(pool, fn, *args)
+            report.stage_seconds[name].append(time.perf_counter() - began)
+            return result
+        
+        async def run(symbol):
+            try:
+                df = await stage("fetch", io_pool, self.history_store.history, symbol, "6mo")
+                if df.empty:
+                    report.failed[symbol] = "no data"
+                    return
+                analysis, engine = await stage("compute", compute_pool, analyze_frame,
+                                               symbol, df, self.indicator_engines.get(symbol))
+                self.indicator_engines[symbol] = engine
+                await stage("store", io_pool, self.save_signals, symbol, analysis['signals'])
+                await self.store_analysis(analysis)
+                report.analyses[symbol] = analysis
+            except Exception as e:
+                logger.error(f"Error analyzing {symbol}: {e}")
+                report.failed[symbol] = str(e)
+        
+        await asyncio.gather(*(run(symbol) for symbol in symbols))
+        # Keep the caller's order rather than completion order
+        report.analyses = {symbol: report.analyses[symbol] for symbol in symbols if symbol in report.analyses}
+        report.elapsed_seconds = time.perf_counter() - start
+        return report
+        
+    async def run_continuous_analysis(self, interval_seconds: int = 300):
         """Run continuous technical analysis"""
         logger.info("Starting Technical Analysis Agent...")
         
-        while True:
-            try:
-                # Analyze all stocks in watchlist
-                for symbol in self.watchlist:
-                    analysis = await self.analyze_stock(symbol)
-                    if analysis:
-                        logger.info(f"Analyzed {symbol}: {analysis['trend']['direction']}")
-                        
-                # Analyze indices
-                for index in self.indices:
-                    analysis = await self.analyze_stock(index)
-                    if analysis:
-                        logger.info(f"Index {index}: {analysis['trend']['direction']}")
+        try:
+            while True:
+                cycle_start = time.perf_counter()
+                try:
+                    # Watchlist and indices in one pipelined scan
+                    report = await self.scan(self.watchlist + self.indices)
+                    for symbol, analysis in report.analyses.items():
+                        label = "Index" if symbol in self.indices else "Analyzed"
+                        logger.info(f"{label} {symbol}: {analysis['trend']['direction']}")
+                    
+                    logger.info(report.describe(interval_seconds))
+                    if report.elapsed_seconds > interval_seconds:
+                        logger.warning(f"Scan took {report.elapsed_seconds:.0f}s, longer than the {interval_seconds}s cadence")
                         
-                # Wait before next cycle
-                await asyncio.sleep(300)  # 5 minutes
-                
-            except Exception as e:
-                logger.error(f"Error in continuous analysis: {e}")
-                await asyncio.sleep(60)
+                except Exception as e:
+                    logger.error(f"Error in continuous analysis: {e}")
+                    
+                # Wait for the rest of the cycle
+                await asyncio.sleep(max(1.0, interval_seconds - (time.perf_counter() - cycle_start)))
+        finally:
+            self.close()
 
 if __name__ == "__main__":
     agent = TechnicalAnalysisAgent()
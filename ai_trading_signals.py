@@ -13,23 +13,28 @@ from datetime import datetime, timedelta
 import time
 import os
 from typing import Dict, List, Tuple, Optional
-import yfinance as yf
 import pandas as pd
 from textblob import TextBlob
 import warnings
 warnings.filterwarnings('ignore')
 
+from agents import indicators
+from agents.ohlcv_store import OHLCVStore, get_store, period_start
+from agents.signal_backtest import (BUY, SignalBacktester, SignalRules, crypto_rule, load_bars, resolve_signals,
+                                    signal_levels, stock_rule)
+
+HOURLY_HISTORY_DAYS = 730  # yfinance keeps two years of hourly bars
+
 class AITradingSignals:
-    def __init__(self):
+    def __init__(self, history_store: Optional[OHLCVStore] = None):
         self.db_path = "data/trading_signals.db"
+        self.history_store = history_store or get_store()
         self.crypto_symbols = ['BTC-USD', 'ETH-USD', 'BNB-USD', 'SOL-USD', 'ADA-USD']
         self.stock_symbols = ['RELIANCE.NS', 'TCS.NS', 'INFY.NS', 'HDFCBANK.NS', 'ITC.NS']
         self.setup_database()
         
-        # Signal thresholds
-        self.rsi_oversold = 30
-        self.rsi_overbought = 70
-        self.volume_spike_threshold = 1.5
+        # Signal thresholds (shared with the backtester)
+        self.rules = SignalRules()
         self.price_change_threshold = 0.03  # 3%
         
     def setup_database(self):
@@ -67,42 +72,29 @@ class AITradingSignals:
             )
         ''')
         
+        # The outcome tracker reads every open signal on each pass
+        cursor.execute('CREATE INDEX IF NOT EXISTS idx_signals_status ON trading_signals (status, created_at)')
+        
         conn.commit()
         conn.close()
     
     def calculate_rsi(self, prices: List[float], period: int = 14) -> float:
-        """Calculate Relative Strength Index"""
+        """Wilder RSI at the latest price"""
         if len(prices) < period + 1:
             return 50  # Neutral if not enough data
         
-        deltas = np.diff(prices)
-        seed = deltas[:period+1]
-        up = seed[seed >= 0].sum() / period
-        down = -seed[seed < 0].sum() / period
-        
-        if down == 0:
-            return 100
-        
-        rs = up / down
-        rsi = 100 - (100 / (1 + rs))
-        
-        return rsi
+        return float(indicators.rsi(prices, period)[-1])
     
     def calculate_macd(self, prices: List[float]) -> Dict:
-        """Calculate MACD indicator"""
-        if len(prices) < 26:
+        """Calculate MACD indicator (12/26/9) at the latest price"""
+        macd, signal, histogram = indicators.macd(prices)
+        if not len(prices) or np.isnan(histogram[-1]):
             return {'macd': 0, 'signal': 0, 'histogram': 0}
         
-        exp1 = pd.Series(prices).ewm(span=12, adjust=False).mean()
-        exp2 = pd.Series(prices).ewm(span=26, adjust=False).mean()
-        macd = exp1 - exp2
-        signal = macd.ewm(span=9, adjust=False).mean()
-        histogram = macd - signal
-        
         return {
-            'macd': macd.iloc[-1],
-            'signal': signal.iloc[-1],
-            'histogram': histogram.iloc[-1]
+            'macd': float(macd[-1]),
+            'signal': float(signal[-1]),
+            'histogram': float(histogram[-1])
         }
     
     def analyze_volume_pattern(self, volumes: List[float]) -> str:
@@ -113,7 +105,7 @@ class AITradingSignals:
         avg_volume = np.mean(volumes[:-1])
         current_volume = volumes[-1]
         
-        if current_volume > avg_volume * self.volume_spike_threshold:
+        if current_volume > avg_volume * self.rules.volume_spike_threshold:
             return "volume_spike"
         elif current_volume < avg_volume * 0.5:
             return "low_volume"
@@ -136,8 +128,7 @@ class AITradingSignals:
         """Generate trading signal for crypto"""
         try:
             # Get historical data
-            ticker = yf.Ticker(symbol)
-            hist = ticker.history(period="30d", interval="1h")
+            hist = self.history_store.history(symbol, period="30d", interval="1h")
             
             if hist.empty:
                 return None
@@ -152,56 +143,32 @@ class AITradingSignals:
             volume_pattern = self.analyze_volume_pattern(volumes)
             sentiment = self.get_market_sentiment(symbol)
             
-            # Signal generation logic
-            signal = None
-            confidence = 0
+            # Signal generation logic (the same rule the backtester replays)
+            votes = crypto_rule(rsi, macd['macd'], macd['signal'], macd['histogram'],
+                                volume_pattern == "volume_spike", sentiment, self.rules)
             reasoning = []
             
-            # RSI-based signals
-            if rsi < self.rsi_oversold:
-                signal = "BUY"
-                confidence += 30
+            if votes['rsi_buy']:
                 reasoning.append(f"RSI oversold at {rsi:.1f}")
-            elif rsi > self.rsi_overbought:
-                signal = "SELL"
-                confidence += 30
+            elif votes['rsi_sell']:
                 reasoning.append(f"RSI overbought at {rsi:.1f}")
-            
-            # MACD signals
-            if macd['histogram'] > 0 and macd['macd'] > macd['signal']:
-                if signal != "SELL":
-                    signal = "BUY"
-                    confidence += 25
-                    reasoning.append("MACD bullish crossover")
-            elif macd['histogram'] < 0 and macd['macd'] < macd['signal']:
-                if signal != "BUY":
-                    signal = "SELL"
-                    confidence += 25
-                    reasoning.append("MACD bearish crossover")
-            
-            # Volume confirmation
-            if volume_pattern == "volume_spike":
-                confidence += 20
+            if votes['macd_buy']:
+                reasoning.append("MACD bullish crossover")
+            elif votes['macd_sell']:
+                reasoning.append("MACD bearish crossover")
+            if votes['volume_spike']:
                 reasoning.append("Volume spike detected")
-            
-            # Sentiment adjustment
-            if sentiment > 0.6:
-                if signal == "BUY":
-                    confidence += 15
+            if votes['sentiment_positive']:
                 reasoning.append("Positive market sentiment")
-            elif sentiment < 0.4:
-                if signal == "SELL":
-                    confidence += 15
+            elif votes['sentiment_negative']:
                 reasoning.append("Negative market sentiment")
             
-            if signal and confidence >= 50:
-                # Calculate targets
-                if signal == "BUY":
-                    target_price = current_price * 1.05  # 5% profit target
-                    stop_loss = current_price * 0.97  # 3% stop loss
-                else:
-                    target_price = current_price * 0.95  # 5% profit target
-                    stop_loss = current_price * 1.03  # 3% stop loss
+            if votes['action']:
+                signal = "BUY" if votes['action'] == BUY else "SELL"
+                confidence = int(votes['confidence'])
+                # 5% profit target, 3% stop loss
+                target_price, stop_loss = (float(level) for level in signal_levels(
+                    votes['action'], current_price, self.rules.crypto_target, self.rules.crypto_stop))
                 
                 risk_reward = abs(target_price - current_price) / abs(stop_loss - current_price)
                 
@@ -212,7 +179,7 @@ class AITradingSignals:
                     'entry_price': current_price,
                     'target_price': target_price,
                     'stop_loss': stop_loss,
-                    'confidence': min(confidence, 95),
+                    'confidence': confidence,
                     'reasoning': ' | '.join(reasoning),
                     'risk_reward_ratio': risk_reward
                 }
@@ -226,8 +193,7 @@ class AITradingSignals:
         """Generate trading signal for stocks"""
         try:
             # Similar to crypto but with market hours consideration
-            ticker = yf.Ticker(symbol)
-            hist = ticker.history(period="30d", interval="1d")
+            hist = self.history_store.history(symbol, period="30d", interval="1d")
             
             if hist.empty:
                 return None
@@ -243,39 +209,31 @@ class AITradingSignals:
             macd = self.calculate_macd(prices)
             volume_pattern = self.analyze_volume_pattern(volumes)
             
-            signal = None
-            confidence = 0
-            reasoning = []
-            
             # Apply Abid Hassan methodology
             # High PCR (>1.3) = Bullish (contrarian)
             # For demo, simulating PCR
             pcr = np.random.uniform(0.5, 1.8)
             
-            if pcr > 1.3:
-                signal = "BUY"
-                confidence += 40
+            votes = stock_rule(pcr, rsi, self.rules)
+            reasoning = []
+            
+            if votes['pcr_buy']:
                 reasoning.append(f"High PCR {pcr:.2f} - Institutional bullish")
-            elif pcr < 0.7:
-                signal = "SELL"
-                confidence += 40
+            elif votes['pcr_sell']:
                 reasoning.append(f"Low PCR {pcr:.2f} - Institutional bearish")
             
-            # Add technical confirmation
-            if rsi < 40 and signal == "BUY":
-                confidence += 25
+            # Technical confirmation
+            if votes['rsi_buy']:
                 reasoning.append(f"RSI oversold at {rsi:.1f}")
-            elif rsi > 60 and signal == "SELL":
-                confidence += 25
+            elif votes['rsi_sell']:
                 reasoning.append(f"RSI overbought at {rsi:.1f}")
             
-            if signal and confidence >= 50:
-                if signal == "BUY":
-                    target_price = current_price * 1.03  # 3% for stocks
-                    stop_loss = current_price * 0.98  # 2% stop
-                else:
-                    target_price = current_price * 0.97
-                    stop_loss = current_price * 1.02
+            if votes['action']:
+                signal = "BUY" if votes['action'] == BUY else "SELL"
+                confidence = int(votes['confidence'])
+                # 3% target, 2% stop for stocks
+                target_price, stop_loss = (float(level) for level in signal_levels(
+                    votes['action'], current_price, self.rules.stock_target, self.rules.stock_stop))
                 
                 risk_reward = abs(target_price - current_price) / abs(stop_loss - current_price)
                 
@@ -286,7 +244,7 @@ class AITradingSignals:
                     'entry_price': current_price,
                     'target_price': target_price,
                     'stop_loss': stop_loss,
-                    'confidence': min(confidence, 95),
+                    'confidence': confidence,
                     'reasoning': ' | '.join(reasoning),
                     'risk_reward_ratio': risk_reward
                 }
@@ -296,6 +254,29 @@ class AITradingSignals:
         
         return None
     
+    def backtest(self, signal_type: str = "crypto", symbols: Optional[List[str]] = None, period: Optional[str] = None,
+                 grid: Optional[Dict[str, List]] = None, max_hold: Optional[int] = None):
+        """Replay a rule set over stored history: a BacktestResult, or one summary row
+        per SignalRules combination when a grid is given. The period defaults to 5y
+        of daily bars, or all the hourly bars Yahoo serves for crypto"""
+        if symbols is None:
+            symbols = self.crypto_symbols if signal_type == "crypto" else self.stock_symbols
+        interval = "1h" if signal_type == "crypto" else "1d"
+        hourly_limit = f"{HOURLY_HISTORY_DAYS}d"
+        if period is None:
+            period = hourly_limit if interval == "1h" else "5y"
+        elif interval == "1h":
+            start = period_start(period)
+            if start is None or start < period_start(hourly_limit):
+                period = hourly_limit  # a longer hourly request returns no bars at all
+        bars = load_bars(self.history_store, symbols, period=period, interval=interval)
+        backtester = SignalBacktester(bars, signal_type,
+                                      sentiment={symbol: self.get_market_sentiment(symbol) for symbol in symbols},
+                                      max_hold=max_hold)
+        if grid:
+            return backtester.sweep(grid, self.rules)
+        return backtester.run(self.rules)
+    
     def save_signal(self, signal: Dict) -> int:
         """Save signal to database"""
         conn = sqlite3.connect(self.db_path)
@@ -322,6 +303,10 @@ class AITradingSignals:
         """Generate signals for all symbols"""
         all_signals = []
         
+        # One bulk request per interval for everything that is stale
+        self.history_store.refresh(self.crypto_symbols, period="30d", interval="1h")
+        self.history_store.refresh(self.stock_symbols, period="30d", interval="1d")
+        
         print("🔍 Analyzing Crypto Markets...")
         for symbol in self.crypto_symbols:
             signal = self.generate_crypto_signal(symbol)
@@ -368,17 +353,17 @@ class AITradingSignals:
 """
         return message
     
-    def get_active_signals(self) -> List[Dict]:
-        """Get all active signals"""
+    def get_active_signals(self, limit: Optional[int] = 10) -> List[Dict]:
+        """Get active signals, newest first (all of them when limit is None)"""
         conn = sqlite3.connect(self.db_path)
         cursor = conn.cursor()
         
-        cursor.execute('''
+        cursor.execute(f'''
             SELECT * FROM trading_signals 
             WHERE status = 'active' 
             ORDER BY created_at DESC 
-            LIMIT 10
-        ''')
+            {"" if limit is None else "LIMIT ?"}
+        ''', () if limit is None else (limit,))
         
         columns = [desc[0] for desc in cursor.description]
         signals = [dict(zip(columns, row)) for row in cursor.fetchall()]
@@ -386,61 +371,55 @@ class AITradingSignals:
         conn.close()
         return signals
     
-    def monitor_signal_performance(self):
-        """Monitor and update signal performance"""
-        active_signals = self.get_active_signals()
-        
-        for signal in active_signals:
-            try:
-                # Get current price
-                ticker = yf.Ticker(signal['symbol'])
-                current_price = ticker.history(period="1d")['Close'].iloc[-1]
-                
-                # Check if target or stop loss hit
-                if signal['action'] == "BUY":
-                    if current_price >= signal['target_price']:
-                        self.close_signal(signal['id'], True, False, current_price)
-                        print(f"🎯 Target hit for {signal['symbol']}")
-                    elif current_price <= signal['stop_loss']:
-                        self.close_signal(signal['id'], False, True, current_price)
-                        print(f"🛑 Stop loss hit for {signal['symbol']}")
-                else:  # SELL
-                    if current_price <= signal['target_price']:
-                        self.close_signal(signal['id'], True, False, current_price)
-                        print(f"🎯 Target hit for {signal['symbol']}")
-                    elif current_price >= signal['stop_loss']:
-                        self.close_signal(signal['id'], False, True, current_price)
-                        print(f"🛑 Stop loss hit for {signal['symbol']}")
-                        
-            except Exception as e:
-                print(f"Error monitoring {signal['symbol']}: {e}")
+    def monitor_signal_performance(self) -> pd.DataFrame:
+        """Close every active signal whose target or stop was touched since it was created"""
+        active_signals = self.get_active_signals(limit=None)
+        if not active_signals:
+            return pd.DataFrame()
+        signals = pd.DataFrame(active_signals)
+        
+        # Hourly bars back to the oldest open signal, one bulk refresh for every symbol
+        oldest = pd.to_datetime(signals['created_at']).min()
+        days = (pd.Timestamp.now(tz='UTC').tz_localize(None) - oldest).days + 2
+        period = f"{min(days, HOURLY_HISTORY_DAYS)}d"
+        symbols = list(signals['symbol'].unique())
+        self.history_store.refresh(symbols, period=period, interval="1h")
+        frames = {symbol: self.history_store.history(symbol, period=period, interval="1h") for symbol in symbols}
+        
+        resolved = resolve_signals(frames, signals)
+        self.close_signals([(row.id, row.hit_target, row.hit_stop_loss, row.exit_price, row.exit_time.to_pydatetime())
+                            for row in resolved.itertuples()])
+        for row in resolved.itertuples():
+            if row.hit_target:
+                print(f"🎯 Target hit for {row.symbol} at {row.exit_time}")
+            else:
+                print(f"🛑 Stop loss hit for {row.symbol} at {row.exit_time}")
+        return resolved
     
     def close_signal(self, signal_id: int, hit_target: bool, hit_stop_loss: bool, exit_price: float):
         """Close a signal and record performance"""
+        self.close_signals([(signal_id, hit_target, hit_stop_loss, exit_price, datetime.now())])
+    
+    def close_signals(self, closures: List[Tuple[int, bool, bool, float, datetime]]):
+        """Close many signals and record their performance in one transaction;
+        closures are (signal_id, hit_target, hit_stop_loss, exit_price, closed_at)"""
+        if not closures:
+            return
         conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        
-        # Get signal details
-        cursor.execute('SELECT entry_price, action FROM trading_signals WHERE id = ?', (signal_id,))
-        entry_price, action = cursor.fetchone()
-        
-        # Calculate profit/loss
-        if action == "BUY":
-            profit_loss = ((exit_price - entry_price) / entry_price) * 100
-        else:
-            profit_loss = ((entry_price - exit_price) / entry_price) * 100
-        
-        # Update signal status
-        cursor.execute('UPDATE trading_signals SET status = ? WHERE id = ?', ('closed', signal_id))
-        
-        # Record performance
-        cursor.execute('''
-            INSERT INTO signal_performance 
-            (signal_id, actual_profit_loss, hit_target, hit_stop_loss, closed_at)
-            VALUES (?, ?, ?, ?, ?)
-        ''', (signal_id, profit_loss, hit_target, hit_stop_loss, datetime.now()))
-        
-        conn.commit()
+        with conn:
+            # Profit/loss against each signal's own entry; signals already closed are skipped
+            conn.executemany('''
+                INSERT INTO signal_performance 
+                (signal_id, actual_profit_loss, hit_target, hit_stop_loss, closed_at)
+                SELECT id,
+                       CASE WHEN action = 'BUY' THEN (? - entry_price) / entry_price * 100
+                            ELSE (entry_price - ?) / entry_price * 100 END,
+                       ?, ?, ?
+                FROM trading_signals WHERE id = ? AND status = 'active'
+            ''', [(float(exit_price), float(exit_price), bool(hit_target), bool(hit_stop_loss), closed_at,
+                   int(signal_id)) for signal_id, hit_target, hit_stop_loss, exit_price, closed_at in closures])
+            conn.executemany('UPDATE trading_signals SET status = ? WHERE id = ?',
+                             [('closed', int(closure[0])) for closure in closures])
         conn.close()
     
     def get_performance_stats(self) -> Dict:
@@ -0,0 +1,164 @@
+#!/usr/bin/env python3
+"""
+Execution Router Benchmark
+Pushes a mix of CPU-bound tasks (pure Python loops) and I/O-bound tasks
+(awaited sleeps standing in for posts / API calls) through TaskQueue and
+compares inline Worker threads with one dispatcher feeding ExecutionRouter.
+Reports I/O task latency (enqueue -> result) and CPU task throughput.
+
+Usage:
+    python benchmarks/bench_execution_router.py --cpu-tasks 64 --io-tasks 400
+    python benchmarks/bench_execution_router.py --threads 8 --cpu-ms 200
+"""
+
+import os
+import sys
+import time
+import asyncio
+import argparse
+import statistics
+import threading
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from distributed_task_manager import (  # noqa: E402
+    ExecutionClass, ExecutionRouter, ResourceMonitor, Task, TaskPriority, TaskQueue, Worker, execution_class
+)
+
+
+@execution_class(ExecutionClass.CPU)
+def bench_cpu_task(task: Task) -> dict:
+    """Busy loop for roughly cpu_ms of one core"""
+    deadline = time.process_time() + task.kwargs['cpu_ms'] / 1000
+    x = 0
+    while time.process_time() < deadline:
+        x += 1
+    return {'done': time.time(), 'submitted': task.kwargs['submitted']}
+
+
+@execution_class(ExecutionClass.IO)
+async def bench_io_task(task: Task) -> dict:
+    await asyncio.sleep(task.kwargs['io_ms'] / 1000)
+    return {'done': time.time(), 'submitted': task.kwargs['submitted']}
+
+
+def make_queue():
+    import fakeredis
+    return TaskQueue(redis_client=fakeredis.FakeRedis())
+
+
+def make_worker(worker_id, task_queue, router=None):
+    monitor = ResourceMonitor()
+    monitor.cpu_threshold = 101.0  # Measure scheduling, not throttling
+    monitor.memory_threshold = 101.0
+    worker = Worker(worker_id, task_queue, monitor, router=router)
+    worker.dequeue_timeout = 0.2
+    worker.task_functions = {'bench_cpu': bench_cpu_task, 'bench_io': bench_io_task}
+    return worker
+
+
+def submit(task_queue, args):
+    """CPU tasks first, then I/O tasks trickled in while the CPU backlog is running"""
+    ids = {'bench_cpu': [], 'bench_io': []}
+    tasks = [
+        Task(id=f"cpu-{i}", name="cpu", function="bench_cpu", priority=TaskPriority.MEDIUM,
+             kwargs={'cpu_ms': args.cpu_ms, 'submitted': time.time()})
+        for i in range(args.cpu_tasks)
+    ]
+    task_queue.put_batch(tasks)
+    ids['bench_cpu'] = [t.id for t in tasks]
+
+    interval = args.io_spread / max(args.io_tasks, 1)
+    for i in range(args.io_tasks):
+        task = Task(id=f"io-{i}", name="io", function="bench_io", priority=TaskPriority.HIGH,
+                    kwargs={'io_ms': args.io_ms, 'submitted': time.time()})
+        task_queue.put(task)
+        ids['bench_io'].append(task.id)
+        time.sleep(interval)
+    return ids
+
+
+def collect(task_queue, ids, timeout):
+    """Wait for every result; returns {function: [result, ...]}"""
+    deadline = time.time() + timeout
+    results = {}
+    for function, task_ids in ids.items():
+        results[function] = []
+        for task_id in task_ids:
+            while True:
+                result = task_queue.get_result(task_id)
+                if result or time.time() > deadline:
+                    break
+                time.sleep(0.01)
+            if result:
+                results[function].append(result)
+    return results
+
+
+def report(label, results, elapsed, args):
+    io_latency = sorted((r['done'] - r['submitted']) * 1000 for r in results['bench_io'])
+    cpu_done = results['bench_cpu']
+    p50 = statistics.median(io_latency) if io_latency else float('nan')
+    p99 = io_latency[min(len(io_latency) - 1, int(len(io_latency) * 0.99))] if io_latency else float('nan')
+    cpu_rate = len(cpu_done) / elapsed
+    print(f"  {label:<12} io p50={p50:8.1f}ms  io p99={p99:8.1f}ms  (floor {args.io_ms}ms)  "
+          f"cpu={cpu_rate:6.2f} tasks/s  done={len(cpu_done)}/{args.cpu_tasks} cpu, "
+          f"{len(results['bench_io'])}/{args.io_tasks} io  elapsed={elapsed:.1f}s")
+
+
+def run_threads(args):
+    task_queue = make_queue()
+    workers = [make_worker(f"thread-{i}", task_queue) for i in range(args.threads)]
+    threads = [threading.Thread(target=w.run, daemon=True) for w in workers]
+    start = time.time()
+    for thread in threads:
+        thread.start()
+    ids = submit(task_queue, args)
+    results = collect(task_queue, ids, args.timeout)
+    elapsed = time.time() - start
+    for worker in workers:
+        worker.stop()
+    for thread in threads:
+        thread.join()
+    report(f"{args.threads} threads", results, elapsed, args)
+
+
+def run_routed(args):
+    task_queue = make_queue()
+    router = ExecutionRouter(cpu_workers=args.cpu_workers)
+    router.start()
+    worker = make_worker("dispatcher", task_queue, router=router)
+    thread = threading.Thread(target=worker.run, daemon=True)
+    start = time.time()
+    thread.start()
+    ids = submit(task_queue, args)
+    results = collect(task_queue, ids, args.timeout)
+    elapsed = time.time() - start
+    worker.stop()
+    thread.join()
+    router.shutdown()
+    report("routed", results, elapsed, args)
+    print(f"  router stats: {router.get_stats()}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare inline worker threads with the execution router")
+    parser.add_argument("--cpu-tasks", type=int, default=64)
+    parser.add_argument("--cpu-ms", type=float, default=100.0, help="CPU time per CPU task")
+    parser.add_argument("--io-tasks", type=int, default=400)
+    parser.add_argument("--io-ms", type=float, default=50.0, help="awaited time per I/O task")
+    parser.add_argument("--io-spread", type=float, default=4.0, help="seconds over which I/O tasks arrive")
+    parser.add_argument("--threads", type=int, default=os.cpu_count() or 4, help="inline worker threads")
+    parser.add_argument("--cpu-workers", type=int, default=None, help="router CPU processes")
+    parser.add_argument("--timeout", type=float, default=300.0)
+    args = parser.parse_args()
+
+    print(f"{args.cpu_tasks} CPU tasks x {args.cpu_ms}ms, {args.io_tasks} I/O tasks x {args.io_ms}ms, "
+          f"{os.cpu_count()} cores")
+    run_threads(args)
+    run_routed(args)
+
+
+if __name__ == "__main__":
+    main()
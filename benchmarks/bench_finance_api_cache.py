@@ -0,0 +1,93 @@
+#!/usr/bin/env python3
+"""
+Finance API Cache Benchmark
+Drives the finance_data_api Flask app (test client) while the offline Yahoo
+stand-in from bench_market_snapshot answers slowly, and reports request
+latency for cold, fresh, stale (revalidating) and If-None-Match requests,
+plus how many upstream downloads were made.
+
+Usage:
+    python benchmarks/bench_finance_api_cache.py --rtt-ms 2000 --requests 200
+"""
+
+import os
+import sys
+import time
+import argparse
+import statistics
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, BENCH_DIR)
+
+from bench_market_snapshot import OfflineYahoo, rtfd  # noqa: E402  (also moves cwd to a temp dir)
+
+import finance_data_api as api  # noqa: E402
+
+ENDPOINTS = ['/api/indices/indian', '/api/indices/international', '/api/currencies', '/api/commodities']
+
+
+def timed(client, path, headers=None):
+    start = time.perf_counter()
+    response = client.get(path, headers=headers or {})
+    return (time.perf_counter() - start) * 1000, response
+
+
+def summarize(label, samples):
+    samples = sorted(samples)
+    p99 = samples[min(len(samples) - 1, int(len(samples) * 0.99))]
+    print(f"  {label:<14} p50={statistics.median(samples):9.2f}ms  p99={p99:9.2f}ms  n={len(samples)}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Request latency of the snapshot cache under a slow upstream")
+    parser.add_argument("--rtt-ms", type=float, default=2000.0, help="latency of one upstream download")
+    parser.add_argument("--requests", type=int, default=200, help="requests per phase")
+    args = parser.parse_args()
+
+    rtfd.logger.setLevel("WARNING")
+    api.logger.setLevel("WARNING")
+    yahoo = OfflineYahoo(args.rtt_ms, args.rtt_ms)
+    rtfd.yf = yahoo
+    client = api.app.test_client()
+
+    cold = [timed(client, path)[0] for path in ENDPOINTS]
+    summarize("cold (first)", cold)
+
+    fresh = [timed(client, ENDPOINTS[i % len(ENDPOINTS)])[0] for i in range(args.requests)]
+    summarize("fresh", fresh)
+
+    # Age every snapshot past its TTL: requests serve stale data while one refresh
+    # per dataset runs against the slow upstream
+    for dataset in api.DATASET_TTLS:
+        api.market_cache.ttls[dataset] = 0
+    api.finance_data.snapshot_ttl = 0
+    downloads_before = yahoo.downloads
+    refreshes_before = api.market_cache.get_stats()['refreshes']
+    start = time.perf_counter()
+    stale = [timed(client, ENDPOINTS[i % len(ENDPOINTS)])[0] for i in range(args.requests)]
+    stale_seconds = time.perf_counter() - start
+    summarize("stale (SWR)", stale)
+    for dataset, ttl in api.DATASET_TTLS.items():
+        api.market_cache.ttls[dataset] = ttl
+    api.finance_data.snapshot_ttl = 30
+    time.sleep(args.rtt_ms / 1000 * 1.5)
+    print(f"    {args.requests} stale hits in {stale_seconds:.2f}s -> "
+          f"{api.market_cache.get_stats()['refreshes'] - refreshes_before} refreshes, "
+          f"{yahoo.downloads - downloads_before} upstream downloads")
+
+    etags = {path: timed(client, path)[1].headers['ETag'] for path in ENDPOINTS}
+    conditional = []
+    not_modified = 0
+    for i in range(args.requests):
+        path = ENDPOINTS[i % len(ENDPOINTS)]
+        elapsed, response = timed(client, path, {'If-None-Match': etags[path]})
+        conditional.append(elapsed)
+        not_modified += response.status_code == 304
+    summarize("If-None-Match", conditional)
+
+    print(f"  304 responses: {not_modified}/{args.requests}")
+    print(f"  cache stats: { {k: v for k, v in api.market_cache.get_stats().items() if k != 'datasets'} }")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,139 @@
+#!/usr/bin/env python3
+"""
+Market Snapshot Benchmark
+Replays the finance_data_api.cache_data() refresh (market update + the four
+fetch_* calls) against an offline stand-in for yfinance that charges a fixed
+round-trip latency per request, comparing the old per-symbol Ticker.info +
+Ticker.history loop with the bulk snapshot engine.
+
+Usage:
+    python benchmarks/bench_market_snapshot.py --rtt-ms 150 --info-ms 600
+"""
+
+import os
+import sys
+import time
+import argparse
+import tempfile
+import threading
+
+import numpy as np
+import pandas as pd
+
+# Module import opens financial_data.log and financial_data.db in the working directory
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+os.chdir(tempfile.mkdtemp(prefix="bench_market_snapshot_"))
+
+import realtime_finance_data as rtfd  # noqa: E402
+
+
+class OfflineYahoo:
+    """Minimal yfinance surface (Ticker.history/info/fast_info, download) with simulated latency"""
+
+    def __init__(self, rtt_ms: float, info_ms: float):
+        self.rtt = rtt_ms / 1000
+        self.info_latency = info_ms / 1000
+        self.lock = threading.Lock()
+        self.requests = 0
+        self.downloads = 0
+
+    def _request(self, latency):
+        with self.lock:
+            self.requests += 1
+        time.sleep(latency)
+
+    def _bars(self, symbol, days=5):
+        rng = np.random.default_rng(abs(hash(symbol)) % 2 ** 32)
+        close = 100 * np.exp(np.cumsum(rng.normal(0, 0.01, days)))
+        index = pd.bdate_range(end=pd.Timestamp.today().normalize(), periods=days)
+        return pd.DataFrame({'Open': close, 'High': close, 'Low': close, 'Close': close,
+                             'Adj Close': close, 'Volume': rng.integers(1e5, 1e7, days)}, index=index)
+
+    def Ticker(self, symbol):
+        yahoo = self
+
+        class _Ticker:
+            def history(self, period="2d"):
+                yahoo._request(yahoo.rtt)
+                return yahoo._bars(symbol)[-2:]
+
+            @property
+            def info(self):
+                yahoo._request(yahoo.info_latency)
+                return {'marketCap': 1e12}
+
+            @property
+            def fast_info(self):
+                yahoo._request(yahoo.rtt)
+                return {'marketCap': 1e12}
+
+        return _Ticker()
+
+    def download(self, tickers, period="5d", **kwargs):
+        # yfinance fans chart requests out on threads: wall clock is about one round trip
+        self._request(self.rtt)
+        with self.lock:
+            self.requests += len(tickers) - 1
+            self.downloads += 1
+        return pd.concat({symbol: self._bars(symbol) for symbol in tickers}, axis=1)
+
+
+def legacy_refresh(yahoo):
+    """The request pattern of cache_data() before the snapshot engine"""
+    def fetch(symbols, with_info):
+        for symbol in symbols:
+            ticker = yahoo.Ticker(symbol)
+            if with_info:
+                ticker.info
+            ticker.history(period="2d")
+
+    currencies = [rtfd.currency_symbol(b, t) for b, t in rtfd.CURRENCY_PAIRS]
+    # generate_market_update_content()
+    fetch(rtfd.INDIAN_INDICES, True)
+    fetch(rtfd.INTERNATIONAL_INDICES, False)
+    fetch(currencies, False)
+    fetch(rtfd.COMMODITIES, False)
+    fetch(rtfd.TOP_STOCKS['indian'], True)
+    # then cache_data() fetched the same data again
+    fetch(rtfd.INDIAN_INDICES, True)
+    fetch(rtfd.INTERNATIONAL_INDICES, False)
+    fetch(currencies, False)
+    fetch(rtfd.COMMODITIES, False)
+
+
+def snapshot_refresh(finance_data):
+    finance_data.generate_market_update_content()
+    finance_data.fetch_indian_indices()
+    finance_data.fetch_international_indices()
+    finance_data.fetch_currency_rates()
+    finance_data.fetch_commodity_prices()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare per-symbol and bulk market refreshes offline")
+    parser.add_argument("--rtt-ms", type=float, default=150.0, help="latency of one quote/history request")
+    parser.add_argument("--info-ms", type=float, default=600.0, help="latency of one Ticker.info request")
+    args = parser.parse_args()
+
+    rtfd.logger.setLevel("WARNING")
+
+    yahoo = OfflineYahoo(args.rtt_ms, args.info_ms)
+    rtfd.yf = yahoo
+    start = time.perf_counter()
+    legacy_refresh(yahoo)
+    elapsed = time.perf_counter() - start
+    print(f"  per-symbol  {elapsed:6.2f}s  sequential requests={yahoo.requests}")
+
+    yahoo = OfflineYahoo(args.rtt_ms, args.info_ms)
+    rtfd.yf = yahoo
+    finance_data = rtfd.RealTimeFinanceData()
+    start = time.perf_counter()
+    snapshot_refresh(finance_data)
+    elapsed = time.perf_counter() - start
+    print(f"  snapshot    {elapsed:6.2f}s  bulk downloads=1 "
+          f"(covering {len(rtfd.refresh_cycle_symbols())} symbols)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,109 @@
+#!/usr/bin/env python3
+"""
+OHLCV Store Benchmark
+One analysis cycle where four agents read history for the same watchlist: each
+agent fetching for itself (the old yf.Ticker().history() pattern) against the
+shared OHLCVStore cold, stale (incremental append) and fresh. A FileProvider
+with a simulated per-request latency stands in for Yahoo.
+
+Usage:
+    python benchmarks/bench_ohlcv_store.py --symbols 50 --latency 0.1
+"""
+
+import os
+import sys
+import time
+import shutil
+import argparse
+import tempfile
+
+import numpy as np
+import pandas as pd
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from agents.ohlcv_store import FileProvider, OHLCVStore  # noqa: E402
+
+# (period, interval) each agent asks for
+AGENT_READS = [("1y", "1d"), ("3mo", "1d"), ("6mo", "1d"), ("30d", "1d")]
+
+
+class SlowFileProvider(FileProvider):
+    def __init__(self, directory: str, latency: float):
+        super().__init__(directory)
+        self.latency = latency
+
+    def fetch(self, *args, **kwargs):
+        time.sleep(self.latency)
+        return super().fetch(*args, **kwargs)
+
+    def fetch_many(self, *args, **kwargs):
+        time.sleep(self.latency)
+        return super().fetch_many(*args, **kwargs)
+
+
+def make_history(provider: FileProvider, symbols, days: int, seed: int):
+    rng = np.random.default_rng(seed)
+    index = pd.bdate_range(end=pd.Timestamp.now().normalize(), periods=days, tz="UTC")
+    for symbol in symbols:
+        close = 100 * np.cumprod(1 + rng.normal(0, 0.01, days))
+        provider.save(symbol, "1d", pd.DataFrame({"Open": close, "High": close, "Low": close, "Close": close,
+                                                  "Volume": rng.integers(10**5, 10**6, days)}, index=index))
+
+
+def direct_cycle(provider, symbols):
+    for period, interval in AGENT_READS:
+        for symbol in symbols:
+            provider.fetch(symbol, interval, period=period)
+
+
+def store_cycle(store, symbols):
+    store.refresh(symbols, period="1y")
+    for period, interval in AGENT_READS:
+        for symbol in symbols:
+            store.history(symbol, period=period, interval=interval)
+
+
+def timed(label, provider, fn):
+    before = provider.requests
+    start = time.perf_counter()
+    fn()
+    print(f"  {label:<16} {time.perf_counter() - start:7.2f}s  requests={provider.requests - before}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the shared OHLCV store against per-agent fetches")
+    parser.add_argument("--symbols", type=int, default=50)
+    parser.add_argument("--days", type=int, default=500)
+    parser.add_argument("--latency", type=float, default=0.1, help="seconds per simulated request")
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    workdir = tempfile.mkdtemp(prefix="ohlcv_bench_")
+    try:
+        symbols = [f"SYM{i}.NS" for i in range(args.symbols)]
+        provider = SlowFileProvider(os.path.join(workdir, "source"), args.latency)
+        make_history(provider, symbols, args.days, args.seed)
+        print(f"{args.symbols} symbols x {len(AGENT_READS)} agents, {args.latency * 1000:.0f}ms per request")
+
+        timed("per-agent fetch", provider, lambda: direct_cycle(provider, symbols))
+        store = OHLCVStore(os.path.join(workdir, "store"), provider=provider)
+        timed("store cold", provider, lambda: store_cycle(store, symbols))
+        store.expire()  # as if the next cycle ran after the freshness window
+        timed("store stale", provider, lambda: store_cycle(store, symbols))
+        timed("store fresh", provider, lambda: store_cycle(store, symbols))
+
+        runs = 5
+        start = time.perf_counter()
+        for _ in range(runs):
+            for symbol in symbols:
+                store.history(symbol, period="6mo")
+        per_read = (time.perf_counter() - start) / (runs * len(symbols))
+        print(f"  memmap read      {per_read * 1e6:7.1f}us per 6mo window")
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,136 @@
+#!/usr/bin/env python3
+"""
+Option Chain Analytics Benchmark
+Times max pain, PCR and OI pattern analysis per chain for the old per-object
+loops versus the columnar OptionChain, across chain sizes, and the cost of a
+full F&O sweep (every underlying, every minute).
+
+Usage:
+    python benchmarks/bench_option_chain.py --strikes 21 100 200 --underlyings 220
+"""
+
+import os
+import sys
+import time
+import argparse
+
+import numpy as np
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from agents.abid_hassan_analyzer import OptionChainAnalyzer, OptionChainData  # noqa: E402
+from agents.option_chain import OptionChain  # noqa: E402
+
+
+def legacy_pcr(option_data):
+    total_put_oi = sum(data.put_oi for data in option_data)
+    total_call_oi = sum(data.call_oi for data in option_data)
+    return float('inf') if total_call_oi == 0 else total_put_oi / total_call_oi
+
+
+def legacy_max_pain(option_data):
+    """OptionChainAnalyzer.calculate_max_pain before the prefix-sum rewrite"""
+    max_pain_values = {}
+    for data in option_data:
+        strike = data.strike
+        total_pain = 0
+        for other_data in option_data:
+            other_strike = other_data.strike
+            if strike > other_strike:
+                total_pain += (strike - other_strike) * other_data.call_oi
+            if strike < other_strike:
+                total_pain += (other_strike - strike) * other_data.put_oi
+        max_pain_values[strike] = total_pain
+    return min(max_pain_values.items(), key=lambda x: x[1])[0] if max_pain_values else 0.0
+
+
+def legacy_oi_patterns(option_data, current_price):
+    sorted_data = sorted(option_data, key=lambda x: x.strike)
+    resistance, support, observations, bullish, bearish = [], [], [], [], []
+    call_threshold = np.percentile([d.call_oi for d in sorted_data], 80)
+    put_threshold = np.percentile([d.put_oi for d in sorted_data], 80)
+    for data in sorted_data:
+        if data.call_oi > call_threshold and data.strike > current_price:
+            resistance.append(data.strike)
+            observations.append(f"Strong Call OI at {data.strike} ({data.call_oi:,}) - Resistance expected")
+        if data.put_oi > put_threshold and data.strike < current_price:
+            support.append(data.strike)
+            observations.append(f"Strong Put OI at {data.strike} ({data.put_oi:,}) - Support expected")
+        if data.call_change_oi > 0 and data.strike > current_price:
+            bearish.append(data.strike)
+        if data.put_change_oi > 0 and data.strike < current_price:
+            bullish.append(data.strike)
+    return sorted(resistance)[:3], sorted(support, reverse=True)[:3], observations, bullish, bearish
+
+
+def make_chain(rng, strikes: int, spot: float = 19500.0, step: int = 50):
+    base = int(spot // step) * step
+    records = []
+    for i in range(-(strikes // 2), strikes - strikes // 2):
+        strike = base + i * step
+        oi = max(int(10000 - abs(strike - spot) / spot * 50000), 1000)
+        records.append(OptionChainData(
+            strike=strike,
+            call_oi=int(oi + rng.integers(-2000, 2000)), put_oi=int(oi + rng.integers(-2000, 2000)),
+            call_volume=oi // 10, put_volume=oi // 10, call_iv=15.0, put_iv=15.0,
+            call_ltp=10.0, put_ltp=10.0,
+            call_change_oi=int(rng.integers(-1000, 1000)), put_change_oi=int(rng.integers(-1000, 1000)),
+        ))
+    return records, spot
+
+
+def per_call_us(fn, repeats):
+    start = time.perf_counter()
+    for _ in range(repeats):
+        fn()
+    return (time.perf_counter() - start) / repeats * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark option chain analytics")
+    parser.add_argument("--strikes", type=int, nargs="+", default=[21, 100, 200])
+    parser.add_argument("--underlyings", type=int, default=220, help="F&O names in a full sweep")
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(args.seed)
+    analyzer = OptionChainAnalyzer()
+
+    for n in args.strikes:
+        records, spot = make_chain(rng, n)
+        chain = OptionChain.from_records(records)
+        repeats = max(3, 20000 // (n * n // 10 + 1))
+
+        # Same answers as before
+        assert legacy_max_pain(records) == analyzer.calculate_max_pain(chain)
+        assert legacy_pcr(records) == analyzer.calculate_pcr(chain)
+        oi = analyzer.analyze_oi_patterns(chain, spot)
+        assert legacy_oi_patterns(records, spot) == (oi.resistance_levels, oi.support_levels,
+                                                     oi.key_observations, oi.bullish_oi_buildup,
+                                                     oi.bearish_oi_buildup)
+
+        legacy = (per_call_us(lambda: legacy_max_pain(records), repeats)
+                  + per_call_us(lambda: legacy_pcr(records), repeats)
+                  + per_call_us(lambda: legacy_oi_patterns(records, spot), repeats))
+        columnar = (per_call_us(lambda: analyzer.calculate_max_pain(chain), repeats)
+                    + per_call_us(lambda: analyzer.calculate_pcr(chain), repeats)
+                    + per_call_us(lambda: analyzer.analyze_oi_patterns(chain, spot), repeats))
+        adapter = per_call_us(lambda: OptionChain.from_records(records), repeats)
+        print(f"  {n:>4} strikes  legacy={legacy:10.1f}us  columnar={columnar:8.1f}us  "
+              f"speedup={legacy / columnar:6.1f}x  (dataclass adapter +{adapter:.1f}us)")
+
+    # Full sweep: every underlying with the largest chain size
+    n = max(args.strikes)
+    chains = [OptionChain.from_records(make_chain(rng, n)[0]) for _ in range(args.underlyings)]
+    start = time.perf_counter()
+    for chain in chains:
+        chain.max_pain()
+        chain.pcr()
+        analyzer.analyze_oi_patterns(chain, 19500.0)
+    sweep = time.perf_counter() - start
+    print(f"  sweep of {args.underlyings} underlyings x {n} strikes: {sweep * 1000:.1f}ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,114 @@
+#!/usr/bin/env python3
+"""
+Streaming Option Chain Benchmark
+Applies a synthetic tick stream to one chain two ways: rebuilding the full chain
+dict and re-converting every strike per update (what get_option_chain +
+convert_option_chain_to_abid_format did), versus OptionChainStore.on_ticks with
+in-place row updates and incremental PCR. Reports per-update latency and checks
+both end in the same state.
+
+Usage:
+    python benchmarks/bench_option_chain_stream.py --strikes 101 --updates 5000 --batch 4
+"""
+
+import os
+import sys
+import time
+import random
+import asyncio
+import argparse
+import statistics
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from agents.kite_option_data import KiteOptionChainFetcher  # noqa: E402
+from agents.option_chain import OptionChain  # noqa: E402
+from agents.option_chain_stream import OptionChainStore  # noqa: E402
+
+
+def make_instruments(strikes: int):
+    base = 19500 - (strikes // 2) * 50
+    rows = []
+    for i in range(strikes):
+        for j, kind in enumerate(("CE", "PE")):
+            rows.append({"instrument_token": 10000 + 2 * i + j, "name": "NIFTY", "expiry": "2099-01-01",
+                         "strike": float(base + 50 * i), "instrument_type": kind, "oi": 0, "last_price": 0.0,
+                         "volume": 0, "changeinOpenInterest": 0, "impliedVolatility": 15.0})
+    return rows
+
+
+def make_batches(instruments, updates: int, batch: int, seed: int):
+    rng = random.Random(seed)
+    return [[{"instrument_token": rng.choice(instruments)["instrument_token"], "oi": rng.randrange(0, 200000),
+              "last_price": round(rng.uniform(0.05, 400), 2), "volume_traded": rng.randrange(0, 10**6)}
+             for _ in range(batch)] for _ in range(updates)]
+
+
+def rebuild_per_update(instruments, batches):
+    """Baseline: mutate the option dicts, then rebuild dict + OptionChainData list + PCR each update"""
+    fetcher = KiteOptionChainFetcher()
+    by_token = {o["instrument_token"]: dict(o) for o in instruments}
+    loop = asyncio.new_event_loop()
+    samples = []
+    records = None
+    for batch in batches:
+        start = time.perf_counter()
+        for tick in batch:
+            option = by_token[tick["instrument_token"]]
+            option["oi"] = tick["oi"]
+            option["last_price"] = tick["last_price"]
+            option["volume"] = tick["volume_traded"]
+        option_chain = {"symbol": "NIFTY", "expiry": "2099-01-01", "underlying_value": 19500.0,
+                        "options": [dict(o) for o in by_token.values()]}
+        records = loop.run_until_complete(fetcher.convert_option_chain_to_abid_format(option_chain))
+        OptionChain.from_records(records).pcr()
+        samples.append(time.perf_counter() - start)
+    loop.close()
+    return samples, OptionChain.from_records(records)
+
+
+def streamed(instruments, batches):
+    store = OptionChainStore()
+    store.register_instruments(instruments)
+    samples = []
+    for batch in batches:
+        start = time.perf_counter()
+        store.on_ticks(batch)
+        with store.pinned("NIFTY") as snapshot:
+            snapshot.pcr
+        samples.append(time.perf_counter() - start)
+    return samples, store.snapshot("NIFTY").chain
+
+
+def report(label, samples):
+    ordered = sorted(samples)
+    p50 = statistics.median(ordered) * 1e6
+    p99 = ordered[min(len(ordered) - 1, int(len(ordered) * 0.99))] * 1e6
+    print(f"  {label:<10} p50={p50:9.1f}us  p99={p99:9.1f}us  updates/s={len(samples) / sum(samples):10.0f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark streaming option chain updates against full rebuilds")
+    parser.add_argument("--strikes", type=int, default=101)
+    parser.add_argument("--updates", type=int, default=3000, help="tick batches")
+    parser.add_argument("--batch", type=int, default=4, help="ticks per batch")
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    instruments = make_instruments(args.strikes)
+    batches = make_batches(instruments, args.updates, args.batch, args.seed)
+    print(f"{args.strikes} strikes, {args.updates} batches of {args.batch} ticks")
+
+    baseline, rebuilt = rebuild_per_update(instruments, batches)
+    report("rebuild", baseline)
+    stream, chain = streamed(instruments, batches)
+    report("stream", stream)
+
+    same = all((getattr(rebuilt, name) == getattr(chain, name)).all()
+               for name in ("strike", "call_oi", "put_oi", "call_volume", "put_volume", "call_ltp", "put_ltp"))
+    print(f"  same final chain: {same}  speedup p50: {statistics.median(baseline) / statistics.median(stream):.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,115 @@
+#!/usr/bin/env python3
+"""
+Option Greeks Benchmark
+Implied volatility for a synthetic book of NIFTY options: a per-option scalar
+solver (scipy brentq, the usual starting point) against the batched
+Newton/bisection in agents.option_greeks, plus full-chain Greeks throughput.
+Target: 100k IV solves per second on one core.
+
+Usage:
+    python benchmarks/bench_option_greeks.py --options 200000
+    python benchmarks/bench_option_greeks.py --options 100000 --scalar 2000
+"""
+
+import os
+import sys
+import math
+import time
+import argparse
+
+import numpy as np
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from agents.option_chain import OptionChain  # noqa: E402
+from agents.option_greeks import bs_greeks, bs_price, chain_greeks, implied_volatility  # noqa: E402
+
+TARGET_SOLVES_PER_SECOND = 100_000
+
+
+def make_book(n: int, seed: int):
+    rng = np.random.default_rng(seed)
+    spot = np.full(n, 20000.0)
+    strike = np.round(rng.uniform(16000, 24000, n) / 50) * 50
+    t = rng.uniform(1 / 365, 0.5, n)
+    vol = rng.uniform(0.08, 0.6, n)
+    is_call = rng.random(n) < 0.5
+    price = bs_price(spot, strike, t, vol, is_call=is_call)
+    return spot, strike, t, vol, is_call, price
+
+
+def scalar_iv(price, spot, strike, t, is_call, rate=0.065):
+    from scipy.optimize import brentq
+
+    def objective(vol):
+        d1 = (math.log(spot / strike) + (rate + 0.5 * vol * vol) * t) / (vol * math.sqrt(t))
+        d2 = d1 - vol * math.sqrt(t)
+        cdf = lambda x: 0.5 * (1 + math.erf(x / math.sqrt(2)))
+        if is_call:
+            model = spot * cdf(d1) - strike * math.exp(-rate * t) * cdf(d2)
+        else:
+            model = strike * math.exp(-rate * t) * cdf(-d2) - spot * cdf(-d1)
+        return model - price
+
+    try:
+        return brentq(objective, 1e-4, 5.0, xtol=1e-10)
+    except ValueError:
+        return float('nan')
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark vectorized implied volatility and Greeks")
+    parser.add_argument("--options", type=int, default=200_000)
+    parser.add_argument("--scalar", type=int, default=2_000, help="options for the scalar baseline")
+    parser.add_argument("--strikes", type=int, default=101, help="strikes per chain for the chain benchmark")
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    spot, strike, t, vol, is_call, price = make_book(args.options, args.seed)
+    vega = bs_greeks(spot, strike, t, vol, is_call=is_call)['vega']
+    informative = vega > 1e-2
+
+    try:
+        m = min(args.scalar, args.options)
+        start = time.perf_counter()
+        for i in range(m):
+            scalar_iv(price[i], spot[i], strike[i], t[i], is_call[i])
+        scalar_rate = m / (time.perf_counter() - start)
+        print(f"  scalar brentq   {scalar_rate:12,.0f} solves/s  ({m:,} options)")
+    except ImportError:
+        print("  scalar brentq   skipped (scipy not installed)")
+
+    start = time.perf_counter()
+    iv = implied_volatility(price, spot, strike, t, is_call=is_call)
+    elapsed = time.perf_counter() - start
+    rate = args.options / elapsed
+    error = np.nanmax(np.abs(iv - vol)[informative])
+    verdict = "OK" if rate >= TARGET_SOLVES_PER_SECOND else "below target"
+    print(f"  batched Newton  {rate:12,.0f} solves/s  ({args.options:,} options, {verdict})  "
+          f"max |iv - vol| = {error:.1e} where vega > 0.01, unsolved = {int(np.isnan(iv).sum())}")
+
+    start = time.perf_counter()
+    bs_greeks(spot, strike, t, iv, is_call=is_call)
+    print(f"  all Greeks      {args.options / (time.perf_counter() - start):12,.0f} options/s")
+
+    # Whole chains: IV from LTP + Greeks for both sides
+    strikes = np.arange(args.strikes) * 50 + 20000 - (args.strikes // 2) * 50
+    t_chain = 5 / 365
+    chain = OptionChain(
+        strikes,
+        call_ltp=bs_price(20000, strikes, t_chain, 0.14, is_call=True),
+        put_ltp=bs_price(20000, strikes, t_chain, 0.14, is_call=False),
+        call_oi=np.full(len(strikes), 10000), put_oi=np.full(len(strikes), 10000)
+    )
+    runs = 200
+    start = time.perf_counter()
+    for _ in range(runs):
+        chain_greeks(chain, 20000, t_chain)
+    per_chain = (time.perf_counter() - start) / runs
+    print(f"  chain_greeks    {per_chain * 1000:9.2f} ms per {args.strikes}-strike chain "
+          f"({1 / per_chain:,.0f} chains/s)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,115 @@
+#!/usr/bin/env python3
+"""
+Option Scanner Benchmark
+Scans a simulated F&O universe with AbidHassanAnalyzer: the sequential per-symbol
+loop get_daily_analysis used to run, versus scan() with bounded concurrency and
+fingerprint skipping over several cycles in which only some chains change.
+
+Usage:
+    python benchmarks/bench_option_scanner.py --symbols 180 --latency-ms 150
+    python benchmarks/bench_option_scanner.py --change-probability 0.3 --cycles 5
+"""
+
+import os
+import sys
+import time
+import random
+import asyncio
+import logging
+import argparse
+import tempfile
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from agents.abid_hassan_analyzer import AbidHassanAnalyzer  # noqa: E402
+from agents.option_chain import OptionChain  # noqa: E402
+
+
+class SimulatedChainFeed:
+    """Per-symbol chains behind a fixed fetch latency; advance() perturbs a fraction of them"""
+
+    def __init__(self, symbols, strikes: int, latency_ms: float, seed: int = 42):
+        self.rng = random.Random(seed)
+        self.latency = latency_ms / 1000
+        self.fetches = 0
+        self.chains = {}
+        for i, symbol in enumerate(symbols):
+            spot = 1000.0 + 150 * i
+            step = max(5, int(spot * 0.005) // 5 * 5)
+            base = int(spot // step) * step
+            rows = [base + (k - strikes // 2) * step for k in range(strikes)]
+            self.chains[symbol] = (spot, {
+                'strike': rows,
+                'call_oi': [self.rng.randint(1000, 20000) for _ in rows],
+                'put_oi': [self.rng.randint(1000, 20000) for _ in rows],
+                'call_change_oi': [self.rng.randint(-1000, 1000) for _ in rows],
+                'put_change_oi': [self.rng.randint(-1000, 1000) for _ in rows],
+            })
+
+    def advance(self, change_probability: float) -> int:
+        changed = 0
+        for symbol, (spot, columns) in self.chains.items():
+            if self.rng.random() < change_probability:
+                k = self.rng.randrange(len(columns['strike']))
+                columns['call_oi'][k] += self.rng.randint(500, 5000)
+                columns['put_change_oi'][k] = self.rng.randint(-1000, 1000)
+                changed += 1
+        return changed
+
+    async def fetch(self, symbol: str):
+        self.fetches += 1
+        await asyncio.sleep(self.latency)
+        spot, columns = self.chains[symbol]
+        return OptionChain(columns['strike'], **{k: v for k, v in columns.items() if k != 'strike'}), spot
+
+
+async def sequential_cycle(analyzer: AbidHassanAnalyzer, symbols):
+    """Baseline: await each symbol in turn and save every analysis"""
+    for symbol in symbols:
+        await analyzer.analyze_symbol(symbol)
+
+
+async def run(args):
+    symbols = [f"SYM{i:03d}" for i in range(args.symbols)]
+    feed = SimulatedChainFeed(symbols, args.strikes, args.latency_ms, args.seed)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        analyzer = AbidHassanAnalyzer(db_path=os.path.join(tmp, "scan.db"), universe=symbols,
+                                      max_concurrency=args.concurrency, chain_provider=feed.fetch)
+
+        start = time.perf_counter()
+        await sequential_cycle(analyzer, symbols)
+        sequential = time.perf_counter() - start
+        print(f"  sequential  {sequential:7.2f}s per cycle ({len(symbols)} analyses)")
+
+        for cycle in range(args.cycles):
+            changed = feed.advance(args.change_probability) if cycle else len(symbols)
+            result = await analyzer.scan()
+            kinds = {}
+            for delta in result.deltas:
+                kinds[delta.kind] = kinds.get(delta.kind, 0) + 1
+            print(f"  scan #{cycle + 1}     {result.elapsed_seconds:7.2f}s  changed={changed:<4} "
+                  f"analyzed={len(result.analyzed):<4} unchanged={len(result.unchanged):<4} "
+                  f"deltas={dict(sorted(kinds.items()))}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark sequential analysis against the concurrent F&O scanner")
+    parser.add_argument("--symbols", type=int, default=180, help="underlyings in the universe")
+    parser.add_argument("--strikes", type=int, default=41, help="strikes per chain")
+    parser.add_argument("--latency-ms", type=float, default=150.0, help="simulated option chain fetch latency")
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--cycles", type=int, default=4)
+    parser.add_argument("--change-probability", type=float, default=0.2, help="chance a chain changes between cycles")
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    logging.getLogger('agents.abid_hassan_analyzer').setLevel(logging.WARNING)
+    print(f"{args.symbols} underlyings x {args.strikes} strikes, fetch latency {args.latency_ms}ms, "
+          f"concurrency {args.concurrency}")
+    asyncio.run(run(args))
+
+
+if __name__ == "__main__":
+    main()
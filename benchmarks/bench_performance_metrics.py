@@ -0,0 +1,109 @@
+#!/usr/bin/env python3
+"""
+Performance Metrics Benchmark
+Client reporting over many portfolios: the old loop (one query and one pandas
+frame per client) against PortfolioManagementAgent.calculate_all_performance_metrics,
+cold, cached and after one day of rows is appended, on a SQLite performance
+table.
+
+Usage:
+    python benchmarks/bench_performance_metrics.py --portfolios 1000 --days 750
+"""
+
+import os
+import sys
+import time
+import shutil
+import asyncio
+import sqlite3
+import argparse
+import tempfile
+
+import numpy as np
+import pandas as pd
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from agents.ohlcv_store import OHLCVStore  # noqa: E402
+from agents.portfolio_management_agent import PortfolioManagementAgent  # noqa: E402
+
+
+def populate(db_path: str, portfolios: int, days: int, seed: int):
+    rng = np.random.default_rng(seed)
+    dates = [d.strftime("%Y-%m-%d") for d in pd.bdate_range("2022-01-03", periods=days)]
+    conn = sqlite3.connect(db_path)
+    conn.executemany("INSERT INTO portfolios (client_id, name) VALUES (?, ?)",
+                     [(f"C{i}", f"C{i}") for i in range(portfolios)])
+    for i in range(portfolios):
+        values = 100000 * np.cumprod(1 + rng.normal(0.0004, 0.01, days))
+        conn.executemany("INSERT INTO performance (portfolio_id, date, total_value) VALUES (?, ?, ?)",
+                         [(i + 1, date, float(value)) for date, value in zip(dates, values)])
+    conn.commit()
+    conn.close()
+
+
+def per_client(db_path: str, portfolios: int):
+    """The old calculate_performance_metrics body, once per client"""
+    for i in range(portfolios):
+        conn = sqlite3.connect(db_path)
+        data = conn.execute("""
+            SELECT date, total_value FROM performance
+            WHERE portfolio_id = (SELECT id FROM portfolios WHERE client_id = ?)
+            ORDER BY date
+        """, (f"C{i}",)).fetchall()
+        conn.close()
+        df = pd.DataFrame(data, columns=['date', 'value'])
+        df['date'] = pd.to_datetime(df['date'])
+        df.set_index('date', inplace=True)
+        df['returns'] = df['value'].pct_change()
+        total_return = (df['value'].iloc[-1] - df['value'].iloc[0]) / df['value'].iloc[0]
+        annualized_return = (1 + total_return) ** (365 / len(df)) - 1
+        volatility = df['returns'].std() * np.sqrt(252)
+        cumulative = (1 + df['returns']).cumprod()
+        running_max = cumulative.expanding().max()
+        max_drawdown = ((cumulative - running_max) / running_max).min()
+        _ = (annualized_return - 0.06) / volatility, annualized_return / abs(max_drawdown)
+        _ = (df['returns'] > 0).sum() / len(df['returns'].dropna()), df['returns'].max(), df['returns'].min()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark batched performance metrics against per-client frames")
+    parser.add_argument("--portfolios", type=int, default=1000)
+    parser.add_argument("--days", type=int, default=750)
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    workdir = tempfile.mkdtemp(prefix="metrics_bench_")
+    cwd = os.getcwd()
+    try:
+        os.chdir(workdir)  # the agent's database lives under data/
+        os.makedirs("data")
+        agent = PortfolioManagementAgent(history_store=OHLCVStore(os.path.join(workdir, "store")))
+        populate(agent.db_path, args.portfolios, args.days, args.seed)
+        print(f"{args.portfolios} portfolios x {args.days} days")
+
+        start = time.perf_counter()
+        per_client(agent.db_path, args.portfolios)
+        print(f"  per-client frames  {time.perf_counter() - start:7.2f}s")
+
+        for label in ("batch, cold", "batch, cached"):
+            start = time.perf_counter()
+            metrics = asyncio.run(agent.calculate_all_performance_metrics())
+            print(f"  {label:<18} {time.perf_counter() - start:7.3f}s  ({len(metrics)} portfolios)")
+
+        conn = sqlite3.connect(agent.db_path)  # tonight's values for every portfolio
+        conn.executemany("INSERT INTO performance (portfolio_id, date, total_value) VALUES (?, '2030-01-01', 100000)",
+                         [(i + 1,) for i in range(args.portfolios)])
+        conn.commit()
+        conn.close()
+        start = time.perf_counter()
+        asyncio.run(agent.calculate_all_performance_metrics())
+        print(f"  batch, +1 day      {time.perf_counter() - start:7.3f}s")
+    finally:
+        os.chdir(cwd)
+        shutil.rmtree(workdir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,173 @@
+#!/usr/bin/env python3
+"""
+Platform Transport Benchmark
+Runs a local HTTP stub of the LinkedIn / Telegram / Twitter endpoints the posters
+use and compares bare requests.post calls against the pooled PlatformTransport.
+The stub counts TCP connections and can add a per-connection delay to stand in
+for the TCP + TLS handshake that keep-alive avoids.
+
+Usage:
+    python benchmarks/bench_platform_transport.py --posts 200 --handshake-ms 40
+    python benchmarks/bench_platform_transport.py --serve --port 8765   # stub only
+"""
+
+import os
+import sys
+import json
+import time
+import argparse
+import statistics
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlparse
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+import requests  # noqa: E402
+from platform_transport import PlatformTransport  # noqa: E402
+
+
+class StubPlatformServer(ThreadingHTTPServer):
+    """Keep-alive HTTP/1.1 stub answering the platform endpoints used by the posters"""
+
+    daemon_threads = True
+
+    def __init__(self, port: int = 0, handshake_ms: float = 0.0, latency_ms: float = 0.0):
+        super().__init__(('127.0.0.1', port), StubPlatformHandler)
+        self.handshake_ms = handshake_ms
+        self.latency_ms = latency_ms
+        self.lock = threading.Lock()
+        self.connections = 0
+        self.requests = {}
+
+    @property
+    def base_url(self) -> str:
+        return f"http://127.0.0.1:{self.server_address[1]}"
+
+    def count(self, path: str):
+        with self.lock:
+            self.requests[path] = self.requests.get(path, 0) + 1
+
+    def reset(self):
+        with self.lock:
+            self.connections = 0
+            self.requests = {}
+
+
+class StubPlatformHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+    disable_nagle_algorithm = True  # headers and body are separate writes
+
+    def setup(self):
+        super().setup()
+        with self.server.lock:
+            self.server.connections += 1
+        if self.server.handshake_ms:
+            time.sleep(self.server.handshake_ms / 1000)
+
+    def log_message(self, format, *args):
+        pass
+
+    def _reply(self, status: int, body: dict):
+        if self.server.latency_ms:
+            time.sleep(self.server.latency_ms / 1000)
+        payload = json.dumps(body).encode()
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def do_GET(self):
+        path = urlparse(self.path).path
+        self.server.count(path)
+        if path == '/v2/userinfo':
+            self._reply(200, {"sub": "stub-user"})
+        elif path.endswith('/getChat'):
+            self._reply(200, {"ok": True, "result": {"id": -1001234567890}})
+        else:
+            self._reply(404, {"error": "not found"})
+
+    def do_POST(self):
+        length = int(self.headers.get('Content-Length') or 0)
+        self.rfile.read(length)
+        path = urlparse(self.path).path
+        self.server.count(path)
+        if path in ('/v2/ugcPosts', '/v2/shares'):
+            self._reply(201, {"id": "urn:li:share:stub"})
+        elif path.endswith('/sendMessage'):
+            self._reply(200, {"ok": True, "result": {"message_id": 1}})
+        elif path == '/2/tweets':
+            self._reply(201, {"data": {"id": "1"}})
+        elif path == '/oauth2/token':
+            self._reply(200, {"access_token": "stub-bearer"})
+        else:
+            self._reply(404, {"error": "not found"})
+
+
+def bare_post_cycle(base_url: str):
+    """What the posters did before: userinfo lookup + post, each on a fresh connection"""
+    headers = {'Authorization': 'Bearer stub', 'X-Restli-Protocol-Version': '2.0.0'}
+    user = requests.get(f"{base_url}/v2/userinfo", headers=headers, timeout=10)
+    author = f"urn:li:person:{user.json()['sub']}"
+    requests.post(f"{base_url}/v2/ugcPosts", headers=headers, json={"author": author}, timeout=10)
+    requests.post(f"{base_url}/botstub/sendMessage", json={"chat_id": "@AIFinanceNews2024", "text": "x"}, timeout=10)
+
+
+def pooled_post_cycle(transport: PlatformTransport):
+    """Same posts through the shared transport"""
+    headers = {'Authorization': 'Bearer stub', 'X-Restli-Protocol-Version': '2.0.0'}
+    author = transport.linkedin_person_urn('stub')
+    transport.post('linkedin', transport.url('linkedin', '/v2/ugcPosts'), headers=headers, json={"author": author})
+    chat_id = transport.telegram_chat_id('stub', '@AIFinanceNews2024')
+    transport.post('telegram', transport.url('telegram', '/botstub/sendMessage'), json={"chat_id": chat_id, "text": "x"})
+
+
+def measure(server: StubPlatformServer, label: str, cycle, posts: int):
+    server.reset()
+    samples = []
+    for _ in range(posts):
+        start = time.perf_counter()
+        cycle()
+        samples.append(time.perf_counter() - start)
+    samples.sort()
+    p50 = statistics.median(samples) * 1000
+    p99 = samples[min(len(samples) - 1, int(len(samples) * 0.99))] * 1000
+    total_requests = sum(server.requests.values())
+    print(f"  {label:<7} p50={p50:7.2f}ms  p99={p99:7.2f}ms  "
+          f"requests={total_requests:<5} connections={server.connections}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure HTTP connection reuse for platform posters offline")
+    parser.add_argument("--posts", type=int, default=200, help="LinkedIn + Telegram post cycles per run")
+    parser.add_argument("--handshake-ms", type=float, default=40.0, help="simulated per-connection handshake cost")
+    parser.add_argument("--latency-ms", type=float, default=5.0, help="simulated per-request server latency")
+    parser.add_argument("--port", type=int, default=0)
+    parser.add_argument("--serve", action="store_true", help="only run the stub server")
+    args = parser.parse_args()
+
+    server = StubPlatformServer(args.port, args.handshake_ms, args.latency_ms)
+
+    if args.serve:
+        print(f"Stub platform API on {server.base_url} "
+              f"(set LINKEDIN_API_BASE / TELEGRAM_API_BASE / TWITTER_API_BASE to this URL)")
+        server.serve_forever()
+        return
+
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    print(f"Stub on {server.base_url}: handshake={args.handshake_ms}ms latency={args.latency_ms}ms")
+
+    measure(server, "bare", lambda: bare_post_cycle(server.base_url), args.posts)
+
+    transport = PlatformTransport(base_urls={p: server.base_url for p in ("linkedin", "telegram", "twitter")})
+    measure(server, "pooled", lambda: pooled_post_cycle(transport), args.posts)
+    print(f"  transport stats: {transport.get_stats()}")
+
+    transport.close()
+    server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
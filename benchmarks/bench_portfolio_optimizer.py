@@ -0,0 +1,115 @@
+#!/usr/bin/env python3
+"""
+Portfolio Optimizer Benchmark
+Nightly rebalancing for many clients over one stock universe: the old per-client
+path (returns loaded per client, sample covariance, cold SLSQP from equal
+weights with numerical gradients) against PortfolioOptimizer.optimize_many on
+cached EW moments, first cold and then the next night with one new day.
+
+Usage:
+    python benchmarks/bench_portfolio_optimizer.py --clients 500 --universe 50
+"""
+
+import os
+import sys
+import time
+import shutil
+import argparse
+import tempfile
+
+import numpy as np
+import pandas as pd
+from scipy.optimize import minimize
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from agents.ohlcv_store import FileProvider, OHLCVStore  # noqa: E402
+from agents.portfolio_optimizer import PortfolioOptimizer  # noqa: E402
+
+
+def make_history(provider: FileProvider, symbols, days: int, seed: int):
+    rng = np.random.default_rng(seed)
+    index = pd.bdate_range(end=pd.Timestamp.now().normalize(), periods=days, tz="UTC")
+    market = rng.normal(0.0004, 0.01, days)
+    for symbol in symbols:
+        close = 100 * np.cumprod(1 + market * rng.uniform(0.5, 1.5) + rng.normal(0.0003, 0.015, days))
+        provider.save(symbol, "1d", pd.DataFrame({"Open": close, "High": close, "Low": close, "Close": close,
+                                                  "Volume": 10**6}, index=index))
+
+
+def make_clients(symbols, count: int, seed: int):
+    """Half the clients follow one of five model portfolios, the rest hold their own picks"""
+    rng = np.random.default_rng(seed)
+    models = [list(rng.choice(symbols, 5, replace=False)) for _ in range(5)]
+    clients = []
+    for i in range(count):
+        held = models[i % 5] if i % 2 else list(rng.choice(symbols, int(rng.integers(5, 16)), replace=False))
+        values = rng.uniform(0.5, 1.5, len(held))
+        clients.append({'client_id': f"C{i}", 'target_return': float(rng.choice([0.10, 0.12, 0.15])),
+                        'weights': dict(zip(held, values / values.sum() * 0.95))})
+    return clients
+
+
+def per_client(store, clients):
+    for client in clients:
+        symbols = list(client['weights'])
+        returns = store.closes(symbols, period="1y").pct_change(fill_method=None).dropna()
+        mu, cov = returns.mean() * 252, returns.cov() * 252
+        n = len(mu)
+        minimize(lambda w: np.dot(w.T, np.dot(cov, w)), np.array([1 / n] * n), method='SLSQP',
+                 bounds=tuple((0, 1) for _ in range(n)),
+                 constraints=[{'type': 'eq', 'fun': lambda x: np.sum(x) - 1},
+                              {'type': 'ineq', 'fun': lambda x: np.dot(x, mu) - client['target_return']}])
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark batched warm-started Markowitz against per-client solves")
+    parser.add_argument("--clients", type=int, default=500)
+    parser.add_argument("--universe", type=int, default=50)
+    parser.add_argument("--days", type=int, default=260)
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    workdir = tempfile.mkdtemp(prefix="optimizer_bench_")
+    try:
+        symbols = [f"SYM{i}.NS" for i in range(args.universe)]
+        provider = FileProvider(os.path.join(workdir, "source"))
+        make_history(provider, symbols, args.days + 1, args.seed)
+        full = {symbol: provider.fetch(symbol, "1d", period="max") for symbol in symbols}
+        for symbol, frame in full.items():  # tonight's history lacks tomorrow's bar
+            provider.save(symbol, "1d", frame.iloc[:-1])
+        store = OHLCVStore(os.path.join(workdir, "store"), provider=provider)
+        store.refresh(symbols)
+        clients = make_clients(symbols, args.clients, args.seed)
+        print(f"{args.clients} clients over {args.universe} symbols")
+
+        start = time.perf_counter()
+        per_client(store, clients)
+        print(f"  per-client cold SLSQP    {time.perf_counter() - start:7.2f}s")
+
+        optimizer = PortfolioOptimizer(store)
+        start = time.perf_counter()
+        optimizer.optimize_many(clients)
+        print(f"  batch, cold moments      {time.perf_counter() - start:7.2f}s  "
+              f"solves={optimizer.stats['solves']} shared={optimizer.stats['shared_solves']}")
+
+        for symbol, frame in full.items():
+            provider.save(symbol, "1d", frame)
+        store.expire()
+        store.refresh(symbols)
+        start = time.perf_counter()
+        optimizer.optimize_many(clients)
+        print(f"  batch, next night        {time.perf_counter() - start:7.2f}s  "
+              f"incremental_updates={optimizer.stats['incremental_updates']}")
+
+        start = time.perf_counter()
+        frontier = optimizer.frontier(symbols, points=25)
+        print(f"  efficient frontier       {time.perf_counter() - start:7.2f}s  "
+              f"({len(frontier.returns)} points, return {frontier.returns[0]:.1%}..{frontier.returns[-1]:.1%})")
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,159 @@
+#!/usr/bin/env python3
+"""
+Posting Queue Benchmark
+Seeds posting_queue.db with historical rows and reports p50/p99 latency of
+enqueue (add_to_queue) and dequeue (get_next_items_to_post + execute_post)
+before and after the QUEUE_MIGRATIONS indexes.
+
+Usage:
+    python benchmarks/bench_posting_queue.py --rows 1000000 --ops 500
+"""
+
+import os
+import sys
+import time
+import random
+import shutil
+import sqlite3
+import argparse
+import tempfile
+import statistics
+from datetime import datetime, timedelta
+
+# Module import creates posting_queue.db in the working directory - keep it out of the repo
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+os.chdir(tempfile.mkdtemp(prefix="bench_posting_queue_"))
+
+import centralized_posting_queue as cpq  # noqa: E402
+
+PLATFORMS = [cpq.Platform.LINKEDIN.value, cpq.Platform.TWITTER.value, cpq.Platform.TELEGRAM.value]
+
+# Schema as it was before QUEUE_MIGRATIONS
+PRE_MIGRATION_INDEXES = [
+    "CREATE INDEX IF NOT EXISTS idx_content_hash ON queue(content_hash)",
+    "CREATE INDEX IF NOT EXISTS idx_status_platform ON queue(status, platform)",
+    "CREATE INDEX IF NOT EXISTS idx_scheduled_for ON queue(scheduled_for)",
+]
+
+# get_queue_position before the single range-count rewrite
+LEGACY_POSITION_SQL = """
+    SELECT COUNT(*) FROM queue
+    WHERE status IN ('pending', 'approved')
+    AND (priority > (SELECT priority FROM queue WHERE id = ?)
+         OR (priority = (SELECT priority FROM queue WHERE id = ?)
+             AND created_at < (SELECT created_at FROM queue WHERE id = ?)))
+"""
+
+
+def seed(db_path: str, rows: int, pending: int):
+    """Seed a pre-migration database with mostly posted history and a pending backlog"""
+    now = datetime.now()
+    statuses = ["posted"] * 90 + ["failed"] * 6 + ["rejected"] * 4
+
+    conn = sqlite3.connect(db_path)
+    try:
+        conn.execute("""
+            CREATE TABLE IF NOT EXISTS queue (
+                id TEXT PRIMARY KEY, content TEXT NOT NULL, platform TEXT NOT NULL,
+                content_hash TEXT NOT NULL, priority INTEGER NOT NULL, status TEXT NOT NULL,
+                created_at TEXT NOT NULL, scheduled_for TEXT, posted_at TEXT,
+                retry_count INTEGER DEFAULT 0, max_retries INTEGER DEFAULT 3,
+                source TEXT NOT NULL, metadata TEXT, error_message TEXT
+            )
+        """)
+        for statement in PRE_MIGRATION_INDEXES:
+            conn.execute(statement)
+
+        def generate():
+            for i in range(rows):
+                created = now - timedelta(seconds=random.randint(3600 * 25, 3600 * 24 * 365))
+                status = "pending" if i < pending else random.choice(statuses)
+                posted = (created + timedelta(minutes=5)).isoformat() if status == "posted" else None
+                yield (
+                    f"hist_{i}", f"historical post {i}", random.choice(PLATFORMS),
+                    f"{i:016x}", random.randint(1, 4), status, created.isoformat(),
+                    None, posted, 0, 3, "benchmark", "{}", None,
+                )
+
+        conn.executemany("INSERT INTO queue VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)", generate())
+        conn.commit()
+    finally:
+        conn.close()
+
+
+def percentiles(samples):
+    ordered = sorted(samples)
+    p50 = statistics.median(ordered)
+    p99 = ordered[min(len(ordered) - 1, int(len(ordered) * 0.99))]
+    return p50 * 1000, p99 * 1000
+
+
+def run(queue: cpq.CentralizedPostingQueue, ops: int, label: str, legacy_position: bool = False):
+    """Time enqueue and dequeue round trips against an already seeded queue"""
+    if legacy_position:
+        def get_queue_position(item_id):
+            with queue._connect() as conn:
+                return conn.execute(LEGACY_POSITION_SQL, (item_id,) * 3).fetchone()[0] + 1
+        queue.get_queue_position = get_queue_position
+
+    queue.min_gap_minutes = 0
+    queue.platform_limits = {p: {"daily": 10 ** 9, "hourly": 10 ** 9} for p in PLATFORMS}
+    for platform in PLATFORMS:
+        setattr(queue, f"post_to_{platform}", lambda content: (True, "Posted successfully"))
+
+    enqueue, dequeue = [], []
+    for i in range(ops):
+        start = time.perf_counter()
+        queue.add_to_queue(f"{label} benchmark content {i} {random.random()}", random.choice(PLATFORMS),
+                           priority=random.choice(list(cpq.Priority)), source="benchmark")
+        enqueue.append(time.perf_counter() - start)
+
+    for _ in range(ops):
+        start = time.perf_counter()
+        items = queue.get_next_items_to_post(1)
+        if items:
+            queue.execute_post(items[0])
+        dequeue.append(time.perf_counter() - start)
+
+    for name, samples in (("enqueue", enqueue), ("dequeue", dequeue)):
+        p50, p99 = percentiles(samples)
+        print(f"  {label:<7} {name:<8} p50={p50:8.3f}ms  p99={p99:8.3f}ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark posting queue enqueue/dequeue latency")
+    parser.add_argument("--rows", type=int, default=1_000_000, help="historical rows to seed")
+    parser.add_argument("--pending", type=int, default=2_000, help="pending backlog within seeded rows")
+    parser.add_argument("--ops", type=int, default=500, help="enqueue/dequeue operations per run")
+    parser.add_argument("--engine", choices=cpq.CentralizedPostingQueue.ENGINES, default="ledger")
+    args = parser.parse_args()
+
+    print(f"Seeding {args.rows:,} rows ({args.pending:,} pending)...")
+    seed("before.db", args.rows, args.pending)
+    shutil.copy("before.db", "after.db")
+    print(f"Engine: {args.engine}")
+
+    # Before: pre-migration indexes and the correlated-subquery queue position
+    queue = cpq.CentralizedPostingQueue(db_path="before.db", engine=args.engine)
+    with queue._connect() as conn:
+        for target, statements in cpq.QUEUE_MIGRATIONS:
+            for statement in statements:
+                if statement.startswith("CREATE INDEX"):
+                    index_name = statement.split()[5]
+                    conn.execute(f"DROP INDEX IF EXISTS {index_name}")
+        for statement in PRE_MIGRATION_INDEXES:
+            conn.execute(statement)
+        conn.execute("PRAGMA user_version = 0")
+        conn.commit()
+    run(queue, args.ops, "before", legacy_position=True)
+
+    # After: migrated schema
+    start = time.perf_counter()
+    queue = cpq.CentralizedPostingQueue(db_path="after.db", engine=args.engine)
+    print(f"  migration took {time.perf_counter() - start:.2f}s")
+    run(queue, args.ops, "after")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,121 @@
+#!/usr/bin/env python3
+"""
+Signal Backtest Benchmark
+Replaying the AITradingSignals crypto rule over years of stored bars: a per-bar
+loop in the style of generate_crypto_signal (a trailing window per bar, pandas
+EMAs, one trade walked forward at a time) on a few symbols and extrapolated,
+against SignalBacktester on every symbol at once, for one run and a parameter
+grid sweep.
+
+Usage:
+    python benchmarks/bench_signal_backtest.py --symbols 100 --years 5
+"""
+
+import os
+import sys
+import time
+import shutil
+import argparse
+import tempfile
+
+import numpy as np
+import pandas as pd
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from agents.ohlcv_store import FileProvider, OHLCVStore  # noqa: E402
+from agents import indicators  # noqa: E402
+from agents.signal_backtest import SignalBacktester, crypto_rule, load_bars  # noqa: E402
+
+GRID = {
+    'rsi_oversold': [25, 30, 35],
+    'rsi_overbought': [65, 70, 75],
+    'volume_spike_threshold': [1.5, 2.0],
+    'crypto_target': [0.03, 0.05, 0.08],
+    'crypto_stop': [0.02, 0.03],
+}
+
+
+def make_history(provider: FileProvider, symbols, days: int, seed: int):
+    rng = np.random.default_rng(seed)
+    index = pd.date_range(end=pd.Timestamp.now().normalize(), periods=days, freq="D", tz="UTC")
+    for symbol in symbols:
+        close = 100 * np.cumprod(1 + rng.normal(0.0003, 0.03, days))
+        open_ = close * (1 + rng.normal(0, 0.01, days))
+        high = np.maximum(open_, close) * (1 + rng.uniform(0, 0.03, days))
+        low = np.minimum(open_, close) * (1 - rng.uniform(0, 0.03, days))
+        volume = rng.uniform(1e6, 2e6, days) * np.where(rng.random(days) < 0.1, 3, 1)
+        provider.save(symbol, "1d", pd.DataFrame({"Open": open_, "High": high, "Low": low, "Close": close,
+                                                  "Volume": volume}, index=index))
+
+
+def per_bar(bars, columns, window: int = 30, max_hold: int = 20):
+    """The live rule evaluated bar by bar on a trailing window, each trade walked separately"""
+    trades = 0
+    for j in columns:
+        close, volume = bars.close[:, j], bars.volume[:, j]
+        for t in range(26, len(close)):
+            prices = pd.Series(close[max(0, t - window + 1):t + 1])
+            macd = prices.ewm(span=12, adjust=False).mean() - prices.ewm(span=26, adjust=False).mean()
+            signal = macd.ewm(span=9, adjust=False).mean()
+            rsi = indicators.rsi(prices.to_numpy())[-1]
+            volumes = volume[max(0, t - window + 1):t + 1]
+            spike = volumes[-1] > np.mean(volumes[:-1]) * 1.5
+            votes = crypto_rule(rsi, macd.iloc[-1], signal.iloc[-1], macd.iloc[-1] - signal.iloc[-1], spike, 0.5)
+            if votes['action']:
+                trades += 1
+                target, stop = close[t] * 1.05, close[t] * 0.97
+                for row in range(t + 1, min(t + max_hold + 1, len(close))):
+                    if bars.low[row, j] <= stop or bars.high[row, j] >= target:
+                        break
+    return trades
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the vectorized signal backtester against a per-bar loop")
+    parser.add_argument("--symbols", type=int, default=100)
+    parser.add_argument("--years", type=int, default=5)
+    parser.add_argument("--loop-symbols", type=int, default=3, help="symbols the per-bar loop runs on")
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    workdir = tempfile.mkdtemp(prefix="backtest_bench_")
+    try:
+        symbols = [f"COIN{i}-USD" for i in range(args.symbols)]
+        provider = FileProvider(os.path.join(workdir, "source"))
+        make_history(provider, symbols, args.years * 365, args.seed)
+        store = OHLCVStore(os.path.join(workdir, "store"), provider=provider)
+        store.refresh(symbols, period="max")
+
+        start = time.perf_counter()
+        bars = load_bars(store, symbols, period="max")
+        print(f"{len(bars.symbols)} symbols x {len(bars.index)} bars, loaded in {time.perf_counter() - start:.2f}s")
+
+        start = time.perf_counter()
+        per_bar(bars, range(args.loop_symbols))
+        elapsed = time.perf_counter() - start
+        print(f"  per-bar loop        {elapsed:8.2f}s for {args.loop_symbols} symbols  "
+              f"(~{elapsed / args.loop_symbols * args.symbols:.0f}s for all)")
+
+        start = time.perf_counter()
+        backtester = SignalBacktester(bars, 'crypto')
+        print(f"  indicators          {time.perf_counter() - start:8.3f}s")
+
+        start = time.perf_counter()
+        result = backtester.run()
+        print(f"  one run             {time.perf_counter() - start:8.3f}s  ({len(result.trades)} trades)")
+        print(result.summary().round(2).to_string())
+
+        combinations = int(np.prod([len(values) for values in GRID.values()]))
+        start = time.perf_counter()
+        sweep = backtester.sweep(GRID)
+        print(f"  grid sweep          {time.perf_counter() - start:8.2f}s  ({combinations} rule sets)")
+        best = sweep.sort_values('expectancy', ascending=False).head(3)
+        print(best.round(3).to_string(index=False))
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,97 @@
+#!/usr/bin/env python3
+"""
+Source Fan-out Benchmark
+Verification latency over a watchlist with simulated, heavy-tailed site
+latencies: the old fetch_all_sources shape (four async sources gathered, then
+two blocking sources run one after the other on the event loop) against
+fan_out waiting for every source under deadlines, and fan_out returning at a
+3-source quorum.
+
+Usage:
+    python benchmarks/bench_source_fanout.py --symbols 50
+"""
+
+import os
+import sys
+import time
+import asyncio
+import argparse
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from source_fanout import fan_out  # noqa: E402
+
+ASYNC_SOURCES = ['MoneyControl', 'EconomicTimes', 'GoogleFinance', 'NSE']
+SYNC_SOURCES = ['YahooFinance', 'TradingView']
+
+
+def latency(rng, scale: float) -> float:
+    """Mostly fast, occasionally a multi-second stall"""
+    return float(rng.lognormal(np.log(0.15), 0.5) + (rng.uniform(2, 6) if rng.random() < 0.08 else 0.0)) * scale
+
+
+def make_sources(rng, scale: float, executor):
+    loop = asyncio.get_running_loop()
+    price = 100.0
+
+    def make_async(name, delay):
+        async def fetch():
+            await asyncio.sleep(delay)
+            return {'source': name, 'price': price * (1 + rng.normal(0, 0.0005)), 'success': True}
+        return fetch
+
+    def make_sync(name, delay):
+        def fetch():
+            time.sleep(delay)
+            return {'source': name, 'price': price * (1 + rng.normal(0, 0.0005)), 'success': True}
+        return fetch
+
+    async_sources = {name: make_async(name, latency(rng, scale)) for name in ASYNC_SOURCES}
+    sync_sources = {name: make_sync(name, latency(rng, scale)) for name in SYNC_SOURCES}
+    wrapped = {name: (lambda fetch=fetch: loop.run_in_executor(executor, fetch)) for name, fetch in sync_sources.items()}
+    return async_sources, sync_sources, {**async_sources, **wrapped}
+
+
+async def verify(mode: str, rng, scale: float, executor, deadline: float) -> float:
+    start = time.perf_counter()
+    async_sources, sync_sources, all_sources = make_sources(rng, scale, executor)
+    if mode == 'sequential':
+        await asyncio.gather(*(fetch() for fetch in async_sources.values()))
+        for fetch in sync_sources.values():
+            fetch()  # blocks the loop, as fetch_all_sources did
+    elif mode == 'fan-out':
+        await fan_out(all_sources, deadline=deadline)
+    else:
+        await fan_out(all_sources, deadline=deadline, quorum=3)
+    return time.perf_counter() - start
+
+
+async def watchlist(mode: str, symbols: int, seed: int, scale: float, deadline: float):
+    rng = np.random.default_rng(seed)
+    with ThreadPoolExecutor(max_workers=2 * symbols) as executor:
+        start = time.perf_counter()
+        latencies = await asyncio.gather(*(verify(mode, rng, scale, executor, deadline) for _ in range(symbols)))
+        return np.array(latencies), time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark quorum fan-out against sequential source verification")
+    parser.add_argument("--symbols", type=int, default=50)
+    parser.add_argument("--scale", type=float, default=0.1, help="multiplier on simulated site latencies")
+    parser.add_argument("--deadline", type=float, default=3.0, help="per-source deadline before scaling")
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    print(f"{args.symbols} symbols, 6 sources each, latencies x{args.scale}")
+    for mode in ('sequential', 'fan-out', 'quorum'):
+        latencies, wall = asyncio.run(watchlist(mode, args.symbols, args.seed, args.scale, args.deadline * args.scale))
+        print(f"  {mode:<11} p50 {np.percentile(latencies, 50):6.3f}s  p99 {np.percentile(latencies, 99):6.3f}s  "
+              f"watchlist {wall:6.2f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,85 @@
+#!/usr/bin/env python3
+"""
+Streaming Indicators Benchmark
+One analysis cycle over an NSE 500 sized watchlist at 1-minute bars: every
+symbol gets one new bar, then its indicators are refreshed either by TA-Lib
+over the whole history (TechnicalAnalysisAgent.batch_indicators) or by the
+symbol's IndicatorEngine consuming just the new bar. Checks the two agree.
+
+Usage:
+    python benchmarks/bench_streaming_indicators.py --symbols 500 --bars 1875 --cycles 5
+"""
+
+import os
+import sys
+import time
+import argparse
+import statistics
+
+import numpy as np
+import pandas as pd
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from agents.streaming_indicators import IndicatorEngine  # noqa: E402
+from agents.technical_analysis_agent import TechnicalAnalysisAgent  # noqa: E402
+
+
+def make_history(symbols: int, bars: int, seed: int):
+    rng = np.random.default_rng(seed)
+    index = pd.date_range("2024-01-01 09:15", periods=bars, freq="min")
+    frames = []
+    for _ in range(symbols):
+        close = 1000 * np.cumprod(1 + rng.normal(0, 0.001, bars))
+        frames.append(pd.DataFrame({"Open": close, "High": close * (1 + rng.uniform(0, 0.001, bars)),
+                                    "Low": close * (1 - rng.uniform(0, 0.001, bars)), "Close": close,
+                                    "Volume": rng.integers(0, 10**5, bars).astype(float)}, index=index))
+    return frames
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark incremental indicators against full TA-Lib recomputation")
+    parser.add_argument("--symbols", type=int, default=500)
+    parser.add_argument("--bars", type=int, default=1875, help="history per symbol (5 sessions of 1m bars)")
+    parser.add_argument("--cycles", type=int, default=5)
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    total = args.bars + args.cycles
+    frames = make_history(args.symbols, total, args.seed)
+    agent = TechnicalAnalysisAgent.__new__(TechnicalAnalysisAgent)
+    engines = [IndicatorEngine() for _ in frames]
+
+    start = time.perf_counter()
+    for engine, frame in zip(engines, frames):
+        engine.sync(frame.iloc[:args.bars])
+    print(f"{args.symbols} symbols x {args.bars} bars, warm-up {time.perf_counter() - start:.2f}s")
+
+    batch_times, stream_times = [], []
+    worst = 0.0
+    for cycle in range(1, args.cycles + 1):
+        end = args.bars + cycle
+        windows = [frame.iloc[:end] for frame in frames]
+
+        start = time.perf_counter()
+        batch = [agent.batch_indicators(window)[0] for window in windows]
+        batch_times.append(time.perf_counter() - start)
+
+        start = time.perf_counter()
+        streamed = [engine.sync(window)[0] for engine, window in zip(engines, windows)]
+        stream_times.append(time.perf_counter() - start)
+
+        for expected, actual in zip(batch, streamed):
+            for name, value in expected.items():
+                if not np.isnan(value):
+                    worst = max(worst, abs(actual[name] - value) / max(1.0, abs(value)))
+
+    print(f"  TA-Lib full history  {statistics.median(batch_times) * 1000:8.1f} ms per cycle")
+    print(f"  streaming engine     {statistics.median(stream_times) * 1000:8.1f} ms per cycle  "
+          f"({statistics.median(stream_times) / args.symbols * 1e6:.0f}us per symbol)")
+    print(f"  max relative difference {worst:.1e}")
+
+
+if __name__ == "__main__":
+    main()
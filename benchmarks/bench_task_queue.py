@@ -0,0 +1,118 @@
+#!/usr/bin/env python3
+"""
+Task Queue Benchmark
+Compares the old pickle + per-task key protocol (ZADD/SET, then ZPOPMIN/GET/DELETE)
+with TaskQueue.put_batch + the atomic Lua get_batch and ack, against fakeredis or a real Redis.
+
+Usage:
+    python benchmarks/bench_task_queue.py --tasks 50000 --batch 32
+    python benchmarks/bench_task_queue.py --redis-url redis://localhost:6379/15
+"""
+
+import os
+import sys
+import time
+import pickle
+import argparse
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from distributed_task_manager import Task, TaskPriority, TaskQueue, msgpack  # noqa: E402
+
+TARGET_TASKS_PER_SECOND = 10_000
+
+
+def make_client(redis_url: str):
+    if redis_url:
+        import redis
+        client = redis.Redis.from_url(redis_url)
+    else:
+        import fakeredis
+        client = fakeredis.FakeRedis()
+    client.flushdb()
+    return client
+
+
+def make_tasks(count: int):
+    priorities = list(TaskPriority)
+    return [
+        Task(id=f"bench-{i}", name="bench", function="market_data_fetch",
+             kwargs={"symbol": "NIFTY"}, priority=priorities[i % len(priorities)])
+        for i in range(count)
+    ]
+
+
+def legacy_protocol(client, tasks):
+    """Baseline: what TaskQueue.put/get did before get_batch"""
+    queue_name = "ai_finance_tasks:priority"
+    start = time.perf_counter()
+    for task in tasks:
+        score = task.priority.value + (time.time() / 1000000)
+        client.zadd(queue_name, {task.id: score})
+        client.set(f"ai_finance_tasks:task:{task.id}", pickle.dumps(task), ex=3600)
+    enqueued = time.perf_counter()
+
+    received = 0
+    round_trips = 2 * len(tasks)
+    while True:
+        result = client.zpopmin(queue_name, 1)
+        round_trips += 1
+        if not result:
+            break
+        task_id = result[0][0].decode('utf-8')
+        data = client.get(f"ai_finance_tasks:task:{task_id}")
+        if data:
+            pickle.loads(data)
+            client.delete(f"ai_finance_tasks:task:{task_id}")
+            round_trips += 2
+            received += 1
+    return enqueued - start, time.perf_counter() - enqueued, received, round_trips
+
+
+def batched_protocol(task_queue: TaskQueue, tasks, batch: int):
+    start = time.perf_counter()
+    for i in range(0, len(tasks), batch):
+        task_queue.put_batch(tasks[i:i + batch])
+    enqueued = time.perf_counter()
+
+    received = 0
+    round_trips = -(-len(tasks) // batch)  # one MULTI pipeline per put_batch
+    while True:
+        popped = task_queue.get_batch(batch)
+        round_trips += 1
+        if not popped:
+            break
+        task_queue.ack(*(task.id for task in popped))
+        round_trips += 1
+        received += len(popped)
+    return enqueued - start, time.perf_counter() - enqueued, received, round_trips
+
+
+def report(label, enqueue_s, dequeue_s, received, round_trips):
+    total = enqueue_s + dequeue_s
+    rate = received / total if total else 0
+    verdict = "OK" if rate >= TARGET_TASKS_PER_SECOND else "below target"
+    print(f"  {label:<18} enqueue={received / enqueue_s:9.0f}/s  dequeue={received / dequeue_s:9.0f}/s  "
+          f"end-to-end={rate:9.0f}/s ({verdict})  round trips/task={round_trips / max(received, 1):.2f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark TaskQueue enqueue/dequeue protocols")
+    parser.add_argument("--tasks", type=int, default=50_000)
+    parser.add_argument("--batch", type=int, default=32, help="get_batch size")
+    parser.add_argument("--redis-url", default=None, help="real Redis instead of fakeredis (DB is flushed)")
+    args = parser.parse_args()
+
+    tasks = make_tasks(args.tasks)
+    print(f"{args.tasks:,} tasks, serializer={'msgpack' if msgpack else 'json'}, "
+          f"backend={'redis' if args.redis_url else 'fakeredis'}")
+
+    report("pickle+3 calls", *legacy_protocol(make_client(args.redis_url), tasks))
+
+    task_queue = TaskQueue(redis_client=make_client(args.redis_url))
+    report(f"batch of {args.batch}", *batched_protocol(task_queue, tasks, args.batch))
+
+
+if __name__ == "__main__":
+    main()
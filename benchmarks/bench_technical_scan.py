@@ -0,0 +1,99 @@
+#!/usr/bin/env python3
+"""
+Technical Scan Benchmark
+One TechnicalAnalysisAgent cycle over a watchlist whose history is stale (every
+symbol needs a fetch): the old sequential analyze_stock loop against the
+pipelined scan with a bounded I/O pool and a process pool for the math. A
+FileProvider with a simulated per-request latency stands in for Yahoo.
+
+Usage:
+    python benchmarks/bench_technical_scan.py --symbols 100 --latency 0.2 --io-workers 16
+"""
+
+import os
+import sys
+import time
+import shutil
+import asyncio
+import argparse
+import tempfile
+
+import numpy as np
+import pandas as pd
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from agents.ohlcv_store import FileProvider, OHLCVStore  # noqa: E402
+from agents.technical_analysis_agent import TechnicalAnalysisAgent  # noqa: E402
+
+
+class SlowFileProvider(FileProvider):
+    def __init__(self, directory: str, latency: float):
+        super().__init__(directory)
+        self.latency = latency
+
+    def fetch(self, *args, **kwargs):
+        time.sleep(self.latency)
+        return super().fetch(*args, **kwargs)
+
+
+def make_history(provider: FileProvider, symbols, days: int, seed: int):
+    rng = np.random.default_rng(seed)
+    index = pd.bdate_range(end=pd.Timestamp.now().normalize(), periods=days, tz="UTC")
+    for symbol in symbols:
+        close = 100 * np.cumprod(1 + rng.normal(0, 0.015, days))
+        provider.save(symbol, "1d", pd.DataFrame({"Open": close, "High": close * 1.01, "Low": close * 0.99,
+                                                  "Close": close, "Volume": rng.integers(10**5, 10**6, days)},
+                                                 index=index))
+
+
+async def sequential_cycle(agent, symbols):
+    for symbol in symbols:
+        await agent.analyze_stock(symbol)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the pipelined watchlist scan against the sequential loop")
+    parser.add_argument("--symbols", type=int, default=100)
+    parser.add_argument("--days", type=int, default=300)
+    parser.add_argument("--latency", type=float, default=0.2, help="seconds per simulated request")
+    parser.add_argument("--io-workers", type=int, default=16)
+    parser.add_argument("--compute-workers", type=int, default=None)
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    workdir = tempfile.mkdtemp(prefix="ta_scan_bench_")
+    cwd = os.getcwd()
+    try:
+        os.chdir(workdir)  # the agent's database lives under data/
+        os.makedirs("data")
+        symbols = [f"SYM{i}.NS" for i in range(args.symbols)]
+        provider = SlowFileProvider(os.path.join(workdir, "source"), args.latency)
+        make_history(provider, symbols, args.days, args.seed)
+        print(f"{args.symbols} symbols, {args.latency * 1000:.0f}ms per fetch")
+
+        agent = TechnicalAnalysisAgent(OHLCVStore(os.path.join(workdir, "sequential"), provider=provider))
+        start = time.perf_counter()
+        asyncio.run(sequential_cycle(agent, symbols))
+        print(f"  sequential loop  {time.perf_counter() - start:7.2f}s")
+
+        agent = TechnicalAnalysisAgent(OHLCVStore(os.path.join(workdir, "scan"), provider=provider),
+                                       io_workers=args.io_workers, compute_workers=args.compute_workers)
+        try:
+            asyncio.run(agent.scan(symbols[:1]))  # start the worker processes
+            report = asyncio.run(agent.scan(symbols[1:]))
+            print(f"  pipelined scan   {report.elapsed_seconds:7.2f}s  "
+                  f"(io_workers={agent.io_workers}, compute_workers={agent.compute_workers})")
+            for stage, summary in report.stage_summary().items():
+                print(f"    {stage:<8} mean {summary['mean_ms']:7.1f}ms  p95 {summary['p95_ms']:7.1f}ms  "
+                      f"max {summary['max_ms']:7.1f}ms")
+        finally:
+            agent.close()
+    finally:
+        os.chdir(cwd)
+        shutil.rmtree(workdir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
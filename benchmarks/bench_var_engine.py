@@ -0,0 +1,120 @@
+#!/usr/bin/env python3
+"""
+VaR Engine Benchmark
+Synthetic portfolio history with a simulated per-request download latency: the
+old per-holding loop (one history request each for market risk, VaR and
+correlation, pooled unweighted returns) against one bulk ReturnsMatrix shared by
+all three, plus Monte Carlo throughput at 100k scenarios.
+
+Usage:
+    python benchmarks/bench_var_engine.py --holdings 40 --latency 0.2
+    python benchmarks/bench_var_engine.py --holdings 200 --scenarios 100000
+"""
+
+import os
+import sys
+import time
+import argparse
+
+import numpy as np
+import pandas as pd
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from agents.risk_engine import ReturnsMatrix, historical_var, monte_carlo_var, parametric_var  # noqa: E402
+
+
+def make_prices(holdings: int, days: int, seed: int) -> pd.DataFrame:
+    rng = np.random.default_rng(seed)
+    market = rng.normal(0.0004, 0.01, days)
+    beta = rng.uniform(0.6, 1.4, holdings)
+    returns = market[:, None] * beta + rng.normal(0, 0.012, (days, holdings))
+    dates = pd.bdate_range("2024-01-01", periods=days)
+    return pd.DataFrame(100 * np.cumprod(1 + returns, axis=0), index=dates,
+                        columns=[f"SYM{i}.NS" for i in range(holdings)])
+
+
+class SimulatedFeed:
+    """Stands in for Yahoo: every request costs `latency` seconds regardless of ticker count"""
+
+    def __init__(self, prices: pd.DataFrame, latency: float):
+        self.prices = prices
+        self.latency = latency
+        self.requests = 0
+
+    def history(self, symbol: str, days: int) -> pd.Series:
+        self.requests += 1
+        time.sleep(self.latency)
+        return self.prices[symbol].iloc[-days:]
+
+    def download(self, tickers, **kwargs) -> pd.DataFrame:
+        self.requests += 1
+        time.sleep(self.latency)
+        return pd.concat({s: pd.DataFrame({"Close": self.prices[s]}) for s in tickers}, axis=1)
+
+
+def legacy(feed: SimulatedFeed, symbols, values):
+    """Per-holding requests for each metric, unweighted pooled VaR"""
+    total = sum(values.values())
+    vols = [feed.history(s, 63).pct_change().dropna().std() * np.sqrt(252) * values[s] / total for s in symbols]
+    pooled = sorted(r for s in symbols for r in feed.history(s, 252).pct_change().dropna().tolist())
+    index = int(0.05 * len(pooled))
+    var = abs(pooled[index])
+    frame = pd.DataFrame({s: feed.history(s, 63).pct_change().dropna() for s in symbols[:10]})
+    frame.corr()
+    return sum(vols), var
+
+
+def engine(feed: SimulatedFeed, symbols, values, scenarios: int):
+    matrix = ReturnsMatrix.download(symbols, downloader=feed.download)
+    weights = matrix.weights(values)
+    vol = matrix.tail(63).portfolio_volatility(weights)
+    matrix.tail(63).correlation()
+    hist = historical_var(matrix, weights)
+    parametric_var(matrix, weights)
+    monte_carlo_var(matrix, weights, scenarios=scenarios, seed=0)
+    return vol, hist.var
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the shared-returns VaR engine against per-holding fetches")
+    parser.add_argument("--holdings", type=int, default=40)
+    parser.add_argument("--days", type=int, default=253)
+    parser.add_argument("--latency", type=float, default=0.2, help="seconds per simulated history request")
+    parser.add_argument("--scenarios", type=int, default=100_000)
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    prices = make_prices(args.holdings, args.days, args.seed)
+    symbols = list(prices.columns)
+    rng = np.random.default_rng(args.seed)
+    values = dict(zip(symbols, rng.uniform(10_000, 200_000, len(symbols))))
+    print(f"{args.holdings} holdings, {args.days} days, {args.latency * 1000:.0f}ms per request")
+
+    feed = SimulatedFeed(prices, args.latency)
+    start = time.perf_counter()
+    old_vol, old_var = legacy(feed, symbols, values)
+    print(f"  per-holding  {time.perf_counter() - start:7.2f}s  requests={feed.requests:4d}  "
+          f"vol={old_vol:.3f} (weighted avg)  VaR95={old_var:.4f} (pooled)")
+
+    feed = SimulatedFeed(prices, args.latency)
+    start = time.perf_counter()
+    vol, var = engine(feed, symbols, values, args.scenarios)
+    print(f"  shared matrix {time.perf_counter() - start:6.2f}s  requests={feed.requests:4d}  "
+          f"vol={vol:.3f} (portfolio)     VaR95={var:.4f} (weighted)")
+
+    matrix = ReturnsMatrix.from_prices(prices)
+    weights = matrix.weights(values)
+    for dtype in (np.float64, np.float32):
+        runs = 5
+        start = time.perf_counter()
+        for _ in range(runs):
+            monte_carlo_var(matrix, weights, scenarios=args.scenarios, seed=0, dtype=dtype)
+        elapsed = (time.perf_counter() - start) / runs
+        print(f"  monte carlo {np.dtype(dtype).name:<8} {elapsed * 1000:8.1f} ms per {args.scenarios:,} scenarios "
+              f"x {len(symbols)} holdings")
+
+
+if __name__ == "__main__":
+    main()
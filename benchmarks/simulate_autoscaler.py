@@ -0,0 +1,235 @@
+#!/usr/bin/env python3
+"""
+Autoscaler Simulation
+Replays a synthetic load trace (quiet -> market open burst -> steady -> news spike
+-> overnight batch) through a simulated worker pool driven by the autoscaler
+policies in distributed_task_manager, and reports throughput, p99 queue wait per
+priority and the worker-count timeline for each policy.
+
+Usage:
+    python benchmarks/simulate_autoscaler.py
+    python benchmarks/simulate_autoscaler.py --policies resource queue_latency --cores 8 --seed 7
+"""
+
+import os
+import sys
+import heapq
+import random
+import argparse
+from collections import defaultdict
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from distributed_task_manager import (  # noqa: E402
+    DistributedTaskManager, LatencyHistogram, ScalingObservation, TaskPriority, build_autoscaler
+)
+
+# function -> (priority, mean service seconds)
+FUNCTIONS = {
+    'system_health_check': (TaskPriority.CRITICAL, 0.05),
+    'market_data_fetch': (TaskPriority.HIGH, 1.2),
+    'content_generation': (TaskPriority.MEDIUM, 2.0),
+    'telegram_post': (TaskPriority.LOW, 2.5),
+    'analytics_update': (TaskPriority.BATCH, 1.0),
+    'database_cleanup': (TaskPriority.BATCH, 3.5),
+}
+
+# (name, duration seconds, arrivals per second per function)
+TRACE = [
+    ("quiet", 600, {'system_health_check': 0.02, 'market_data_fetch': 0.2, 'telegram_post': 0.1}),
+    ("market open", 300, {'system_health_check': 0.05, 'market_data_fetch': 2.0,
+                          'content_generation': 0.6, 'telegram_post': 0.6}),
+    ("steady", 900, {'system_health_check': 0.02, 'market_data_fetch': 0.8,
+                     'content_generation': 0.3, 'telegram_post': 0.3}),
+    ("news spike", 120, {'system_health_check': 0.2, 'market_data_fetch': 1.0, 'telegram_post': 2.0}),
+    ("overnight", 600, {'system_health_check': 0.02, 'analytics_update': 0.4, 'database_cleanup': 0.2}),
+]
+
+
+def generate_arrivals(rng: random.Random):
+    """Poisson arrivals for the whole trace: (time, function, service seconds)"""
+    arrivals = []
+    start = 0.0
+    for _, duration, rates in TRACE:
+        for function, rate in rates.items():
+            t = start
+            while True:
+                t += rng.expovariate(rate)
+                if t >= start + duration:
+                    break
+                mean = FUNCTIONS[function][1]
+                service = rng.lognormvariate(0, 0.5) * mean / 1.133  # E[lognormal(0, 0.5)] = 1.133
+                arrivals.append((t, function, service))
+        start += duration
+    arrivals.sort()
+    return arrivals, start
+
+
+def resource_recommendation(cpu_percent: float, cores: int) -> int:
+    """Same rule as ResourceMonitor.get_recommended_worker_count (memory held constant)"""
+    if cpu_percent > 80:
+        return max(1, cores // 2)
+    return min(cores - 1, 8)
+
+
+def simulate(policy: str, config: dict, arrivals, end_time: float, cores: int,
+             initial_workers: int, startup_delay: float, dt: float = 0.1):
+    sim_config = dict(config)
+    sim_config['autoscaler'] = dict(config.get('autoscaler', {}), policy=policy)
+    autoscaler = build_autoscaler(sim_config)
+
+    # worker: [ready_at, busy_until, retiring]
+    workers = [[0.0, 0.0, False] for _ in range(initial_workers)]
+    pending = []  # heap of (priority, arrival, seq, function, service)
+    histograms = defaultdict(LatencyHistogram)
+    waits = defaultdict(list)
+    running = []  # heap of (finish, function, service)
+    timeline = []
+    scale_events = 0
+    worker_seconds = 0.0
+    completed = 0
+    next_arrival = 0
+    next_eval = autoscaler.evaluation_interval
+    seq = 0
+    t = 0.0
+
+    while t < end_time or pending or running:
+        # Arrivals
+        while next_arrival < len(arrivals) and arrivals[next_arrival][0] <= t:
+            arrived, function, service = arrivals[next_arrival]
+            heapq.heappush(pending, (FUNCTIONS[function][0].value, arrived, seq, function, service))
+            seq += 1
+            next_arrival += 1
+
+        # Completions
+        while running and running[0][0] <= t:
+            _, function, service = heapq.heappop(running)
+            histograms[function].record(service)
+            completed += 1
+
+        # Retiring workers leave once idle
+        workers = [w for w in workers if not (w[2] and w[1] <= t)]
+
+        # Dispatch highest priority first
+        for worker in workers:
+            if not pending:
+                break
+            if worker[2] or worker[0] > t or worker[1] > t:
+                continue
+            priority, arrived, _, function, service = heapq.heappop(pending)
+            waits[TaskPriority(priority)].append(t - arrived)
+            worker[1] = t + service
+            heapq.heappush(running, (worker[1], function, service))
+
+        active = [w for w in workers if not w[2]]
+        worker_seconds += len(workers) * dt
+
+        # Autoscaler evaluation
+        if t >= next_eval:
+            busy = sum(1 for w in workers if w[1] > t)
+            cpu = min(100.0, 100.0 * busy / cores)
+            depth = {p: 0 for p in TaskPriority}
+            for entry in pending:
+                depth[TaskPriority(entry[0])] += 1
+            observation = ScalingObservation(
+                current_workers=len(active),
+                depth_by_priority=depth,
+                service_times=dict(histograms),
+                cpu_percent=cpu,
+                memory_percent=50.0,
+                recommended_workers=resource_recommendation(cpu, cores),
+                timestamp=t,
+            )
+            target = autoscaler.desired_workers(observation)
+            if target > len(active):
+                workers.extend([t + startup_delay, 0.0, False] for _ in range(target - len(active)))
+                scale_events += 1
+            elif target < len(active):
+                # Idle workers retire first, busy ones finish their task
+                for worker in sorted(active, key=lambda w: w[1])[:len(active) - target]:
+                    worker[2] = True
+                scale_events += 1
+            timeline.append((t, target, sum(depth.values())))
+            next_eval += autoscaler.evaluation_interval
+
+        t += dt
+        if t > end_time * 3:
+            break
+
+    return {
+        'completed': completed,
+        'throughput': completed / max(t, 1e-9),
+        'waits': waits,
+        'timeline': timeline,
+        'scale_events': scale_events,
+        'worker_seconds': worker_seconds,
+        'makespan': t,
+    }
+
+
+def quantile(samples, q):
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * q))]
+
+
+def print_timeline(timeline, end_time):
+    """Worker count at each change, annotated with trace phase"""
+    boundaries = []
+    start = 0
+    for name, duration, _ in TRACE:
+        boundaries.append((start, name))
+        start += duration
+
+    def phase(t):
+        current = TRACE[-1][0] if t >= end_time else boundaries[0][1]
+        for boundary, name in boundaries:
+            if t >= boundary:
+                current = name
+        return current
+
+    last = None
+    changes = []
+    for t, workers, depth in timeline:
+        if workers != last:
+            changes.append(f"{t:6.0f}s {workers:>2}w (depth {depth:>3}, {phase(t)})")
+            last = workers
+    for line in changes:
+        print(f"      {line}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Replay a synthetic load trace against autoscaler policies")
+    parser.add_argument("--policies", nargs="+", default=["resource", "queue_latency"])
+    parser.add_argument("--cores", type=int, default=8)
+    parser.add_argument("--initial-workers", type=int, default=2)
+    parser.add_argument("--startup-delay", type=float, default=2.0, help="seconds before a new worker takes tasks")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--config", default=None, help="task manager config (defaults to config/task_manager_config.json)")
+    parser.add_argument("--timeline", action="store_true", help="print worker-count changes")
+    args = parser.parse_args()
+
+    config = DistributedTaskManager._load_config(args.config)
+    arrivals, end_time = generate_arrivals(random.Random(args.seed))
+    print(f"Trace: {len(arrivals):,} tasks over {end_time:.0f}s, {args.cores} cores")
+
+    for policy in args.policies:
+        result = simulate(policy, config, arrivals, end_time, args.cores,
+                          args.initial_workers, args.startup_delay)
+        print(f"\n  policy={policy}")
+        print(f"    completed={result['completed']:,}  throughput={result['throughput']:.2f}/s  "
+              f"makespan={result['makespan']:.0f}s  worker-seconds={result['worker_seconds']:.0f}  "
+              f"scale events={result['scale_events']}")
+        for priority in TaskPriority:
+            samples = result['waits'].get(priority, [])
+            print(f"    {priority.name:<8} n={len(samples):<6} p50 wait={quantile(samples, 0.5):7.2f}s  "
+                  f"p99 wait={quantile(samples, 0.99):7.2f}s")
+        if args.timeline:
+            print("    worker timeline:")
+            print_timeline(result['timeline'], end_time)
+
+
+if __name__ == "__main__":
+    main()
@@ -10,16 +10,18 @@ import json
 import hashlib
 import sqlite3
 import time
-import requests
 import tweepy
 from datetime import datetime, timedelta
+from collections import OrderedDict, defaultdict, deque
+from concurrent.futures import ThreadPoolExecutor
 from typing import Dict, List, Optional, Tuple
 from dataclasses import dataclass, asdict
 from enum import Enum
-from threading import Lock
+from threading import Lock, local
 import logging
 from openai import OpenAI
 from dotenv import load_dotenv
+from platform_transport import get_transport
 
 load_dotenv()
 
@@ -71,15 +73,101 @@ class QueueItem:
     metadata: Dict
     error_message: Optional[str] = None
 
+# Versioned schema migrations, applied in order and tracked via PRAGMA user_version
+QUEUE_MIGRATIONS = [
+    (1, [
+        # Duplicate check: content_hash + platform + status
+        "CREATE INDEX IF NOT EXISTS idx_queue_hash_platform_status ON queue(content_hash, platform, status)",
+        # Rate limits / last post: platform + status + posted_at
+        "CREATE INDEX IF NOT EXISTS idx_queue_platform_status_posted ON queue(platform, status, posted_at)",
+        # Queue position and cleanup: status + priority + created_at (+ scheduled_for filter)
+        "CREATE INDEX IF NOT EXISTS idx_queue_status_priority_created "
+        "ON queue(status, priority, created_at, scheduled_for)",
+        # Dequeue: partial index already in ORDER BY order, so LIMIT stops after the first rows
+        "CREATE INDEX IF NOT EXISTS idx_queue_ready ON queue(priority DESC, created_at) "
+        "WHERE status IN ('pending', 'approved')",
+        # Superseded by idx_queue_hash_platform_status
+        "DROP INDEX IF EXISTS idx_content_hash",
+        "ANALYZE queue",
+    ]),
+]
+
+class RateLimitLedger:
+    """
+    In-memory sliding window of posted timestamps per platform.
+    Answers hourly/daily counts and last-post time without touching SQLite.
+    """
+    
+    def __init__(self):
+        self._lock = Lock()
+        self._hourly: Dict[str, deque] = defaultdict(deque)
+        self._daily: Dict[str, deque] = defaultdict(deque)
+        self._last_post: Dict[str, datetime] = {}
+    
+    def rebuild(self, posted_rows: List[Tuple[str, str]], last_posts: Dict[str, str]):
+        """Replace ledger state from (platform, posted_at) rows ordered by posted_at"""
+        with self._lock:
+            self._hourly.clear()
+            self._daily.clear()
+            self._last_post = {
+                platform: datetime.fromisoformat(posted_at)
+                for platform, posted_at in last_posts.items() if posted_at
+            }
+            for platform, posted_at in posted_rows:
+                ts = datetime.fromisoformat(posted_at)
+                self._hourly[platform].append(ts)
+                self._daily[platform].append(ts)
+    
+    def record_post(self, platform: str, posted_at: datetime):
+        """Register a successful post"""
+        with self._lock:
+            self._hourly[platform].append(posted_at)
+            self._daily[platform].append(posted_at)
+            last = self._last_post.get(platform)
+            if last is None or posted_at > last:
+                self._last_post[platform] = posted_at
+    
+    def snapshot(self, platform: str, now: Optional[datetime] = None) -> Tuple[int, int, Optional[datetime]]:
+        """Return (hourly_count, daily_count, last_post_time) for a platform"""
+        now = now or datetime.now()
+        hour_ago = now - timedelta(hours=1)
+        day_ago = now - timedelta(days=1)
+        
+        with self._lock:
+            hourly = self._hourly[platform]
+            while hourly and hourly[0] <= hour_ago:
+                hourly.popleft()
+            daily = self._daily[platform]
+            while daily and daily[0] <= day_ago:
+                daily.popleft()
+            return len(hourly), len(daily), self._last_post.get(platform)
+
 class CentralizedPostingQueue:
     """
     Centralized queue system that prevents duplicates and coordinates all posting
+    
+    Engines:
+        ledger - one WAL connection per thread, rate limits answered from an
+                 in-memory RateLimitLedger that takes in new posting_history
+                 rows as they appear (default)
+        legacy - fresh connection and COUNT(*) queries for every check
     """
     
-    def __init__(self):
-        self.db_path = 'posting_queue.db'
+    ENGINES = ("ledger", "legacy")
+    
+    def __init__(self, db_path: str = 'posting_queue.db', engine: Optional[str] = None):
+        self.db_path = db_path
+        self.engine = engine or os.getenv('POSTING_QUEUE_ENGINE', 'ledger')
+        if self.engine not in self.ENGINES:
+            raise ValueError(f"Unknown queue engine: {self.engine}")
         self.lock = Lock()
+        self._local = local()
+        # One long-lived thread per platform lane, so each keeps its connection across runs
+        self._lanes: Dict[str, ThreadPoolExecutor] = {}
+        self.ledger = RateLimitLedger() if self.engine == "ledger" else None
+        self._ledger_rowid = 0  # last posting_history rowid applied to the ledger
         self.min_gap_minutes = 30  # Minimum gap between posts
+        self.post_delay_seconds = 2  # Pause between consecutive posts on the same platform
         self.platform_limits = {
             Platform.LINKEDIN.value: {"daily": 50, "hourly": 10},  # Increased for testing
             Platform.TWITTER.value: {"daily": 100, "hourly": 20},  # Increased for testing
@@ -90,11 +178,71 @@ class CentralizedPostingQueue:
         self.init_database()
         self.init_api_clients()
         
-        logger.info("Centralized Posting Queue initialized")
+        logger.info(f"Centralized Posting Queue initialized (engine: {self.engine})")
+    
+    def _connect(self) -> sqlite3.Connection:
+        """Return this thread's persistent connection, or a fresh one in legacy mode"""
+        if self.ledger is None:
+            return sqlite3.connect(self.db_path)
+        
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.db_path)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+            self._local.data_version = None
+        return conn
+    
+    def refresh_ledger(self):
+        """Rebuild the in-memory rate-limit ledger from the database"""
+        if self.ledger is None:
+            return
+        
+        day_ago = (datetime.now() - timedelta(days=1)).isoformat()
+        conn = self._connect()
+        
+        # Held across read + rebuild so a concurrent execute_post cannot be counted twice
+        with self.lock:
+            posted_rows = []
+            last_posts = {}
+            for platform in self.platform_limits:
+                posted_rows.extend(conn.execute("""
+                    SELECT platform, posted_at FROM queue
+                    WHERE platform = ? AND status = 'posted' AND posted_at > ?
+                    ORDER BY posted_at ASC
+                """, (platform, day_ago)).fetchall())
+                last_posts[platform] = conn.execute("""
+                    SELECT MAX(posted_at) FROM queue
+                    WHERE platform = ? AND status = 'posted'
+                """, (platform,)).fetchone()[0]
+            self.ledger.rebuild(posted_rows, last_posts)
+            # Later posts are picked up from posting_history past this rowid
+            self._ledger_rowid = conn.execute("SELECT COALESCE(MAX(rowid), 0) FROM posting_history").fetchone()[0]
+            self._local.data_version = conn.execute("PRAGMA data_version").fetchone()[0]
+    
+    def _apply_new_posts(self, conn: sqlite3.Connection):
+        """Add posting_history rows written since the ledger last looked; caller holds self.lock"""
+        rows = conn.execute("""
+            SELECT rowid, platform, posted_at FROM posting_history
+            WHERE rowid > ? AND success ORDER BY rowid
+        """, (self._ledger_rowid,)).fetchall()
+        for rowid, platform, posted_at in rows:
+            self.ledger.record_post(platform, datetime.fromisoformat(posted_at))
+            self._ledger_rowid = rowid
+    
+    def _sync_ledger(self):
+        """Apply posts another connection has written since this thread last looked"""
+        conn = self._connect()
+        version = conn.execute("PRAGMA data_version").fetchone()[0]
+        if version != self._local.data_version:
+            with self.lock:
+                self._apply_new_posts(conn)
+            self._local.data_version = version
     
     def init_database(self):
         """Initialize SQLite database with proper schema"""
-        with sqlite3.connect(self.db_path) as conn:
+        with self._connect() as conn:
             conn.execute("""
                 CREATE TABLE IF NOT EXISTS queue (
                     id TEXT PRIMARY KEY,
@@ -114,10 +262,6 @@ class CentralizedPostingQueue:
                 )
             """)
             
-            conn.execute("""
-                CREATE INDEX IF NOT EXISTS idx_content_hash ON queue(content_hash)
-            """)
-            
             conn.execute("""
                 CREATE INDEX IF NOT EXISTS idx_status_platform ON queue(status, platform)
             """)
@@ -139,9 +283,32 @@ class CentralizedPostingQueue:
             """)
             
             conn.commit()
+            self.migrate_database(conn)
+        
+        self.refresh_ledger()
+    
+    def migrate_database(self, conn: sqlite3.Connection) -> int:
+        """Apply pending QUEUE_MIGRATIONS and return the resulting schema version"""
+        version = conn.execute("PRAGMA user_version").fetchone()[0]
+        
+        for target, statements in QUEUE_MIGRATIONS:
+            if target <= version:
+                continue
+            with self.lock:
+                for statement in statements:
+                    conn.execute(statement)
+                conn.execute(f"PRAGMA user_version = {target}")
+                conn.commit()
+            logger.info(f"Migrated posting queue schema to version {target}")
+            version = target
+        
+        return version
     
     def init_api_clients(self):
         """Initialize API clients for all platforms"""
+        # Pooled keep-alive sessions + cached LinkedIn URN / Telegram chat ID
+        self.transport = get_transport()
+        
         # LinkedIn
         self.linkedin_token = os.getenv('LINKEDIN_ACCESS_TOKEN')
         
@@ -174,7 +341,7 @@ class CentralizedPostingQueue:
     
     def is_duplicate(self, content_hash: str, platform: str = None) -> bool:
         """Check if content is duplicate across all platforms or specific platform"""
-        with sqlite3.connect(self.db_path) as conn:
+        with self._connect() as conn:
             if platform:
                 cursor = conn.execute(
                     "SELECT COUNT(*) FROM queue WHERE content_hash = ? AND platform = ? AND status != 'failed'",
@@ -187,13 +354,16 @@ class CentralizedPostingQueue:
                 )
             return cursor.fetchone()[0] > 0
     
-    def check_rate_limits(self, platform: str) -> Dict[str, bool]:
-        """Check if platform rate limits are exceeded"""
-        now = datetime.now()
+    def _posting_stats(self, platform: str, now: datetime) -> Tuple[int, int, Optional[datetime]]:
+        """Return (hourly_count, daily_count, last_post_time) for a platform"""
+        if self.ledger is not None:
+            self._sync_ledger()
+            return self.ledger.snapshot(platform, now)
+        
         hour_ago = now - timedelta(hours=1)
         day_ago = now - timedelta(days=1)
         
-        with sqlite3.connect(self.db_path) as conn:
+        with self._connect() as conn:
             # Check hourly limit
             cursor = conn.execute("""
                 SELECT COUNT(*) FROM queue 
@@ -210,40 +380,47 @@ class CentralizedPostingQueue:
             """, (platform, day_ago.isoformat()))
             daily_count = cursor.fetchone()[0]
             
-            limits = self.platform_limits.get(platform, {"daily": 999, "hourly": 999})
-            
-            return {
-                "hourly_ok": hourly_count < limits["hourly"],
-                "daily_ok": daily_count < limits["daily"],
-                "hourly_count": hourly_count,
-                "daily_count": daily_count,
-                "hourly_limit": limits["hourly"],
-                "daily_limit": limits["daily"]
-            }
-    
-    def can_post_now(self, platform: str) -> Tuple[bool, str]:
-        """Check if we can post to platform now considering rate limits and gaps"""
-        # Check rate limits
-        limits = self.check_rate_limits(platform)
-        if not limits["hourly_ok"]:
-            return False, f"Hourly limit exceeded ({limits['hourly_count']}/{limits['hourly_limit']})"
-        if not limits["daily_ok"]:
-            return False, f"Daily limit exceeded ({limits['daily_count']}/{limits['daily_limit']})"
-        
-        # Check minimum gap
-        with sqlite3.connect(self.db_path) as conn:
             cursor = conn.execute("""
                 SELECT posted_at FROM queue 
                 WHERE platform = ? AND status = 'posted' 
                 ORDER BY posted_at DESC LIMIT 1
             """, (platform,))
             last_post = cursor.fetchone()
-            
-            if last_post:
-                last_post_time = datetime.fromisoformat(last_post[0])
-                min_next_time = last_post_time + timedelta(minutes=self.min_gap_minutes)
-                if datetime.now() < min_next_time:
-                    return False, f"Too soon. Next post allowed at {min_next_time.strftime('%H:%M:%S')}"
+        
+        last_post_time = datetime.fromisoformat(last_post[0]) if last_post else None
+        return hourly_count, daily_count, last_post_time
+    
+    def check_rate_limits(self, platform: str) -> Dict[str, bool]:
+        """Check if platform rate limits are exceeded"""
+        hourly_count, daily_count, _ = self._posting_stats(platform, datetime.now())
+        limits = self.platform_limits.get(platform, {"daily": 999, "hourly": 999})
+        
+        return {
+            "hourly_ok": hourly_count < limits["hourly"],
+            "daily_ok": daily_count < limits["daily"],
+            "hourly_count": hourly_count,
+            "daily_count": daily_count,
+            "hourly_limit": limits["hourly"],
+            "daily_limit": limits["daily"]
+        }
+    
+    def can_post_now(self, platform: str) -> Tuple[bool, str]:
+        """Check if we can post to platform now considering rate limits and gaps"""
+        now = datetime.now()
+        hourly_count, daily_count, last_post_time = self._posting_stats(platform, now)
+        limits = self.platform_limits.get(platform, {"daily": 999, "hourly": 999})
+        
+        # Check rate limits
+        if hourly_count >= limits["hourly"]:
+            return False, f"Hourly limit exceeded ({hourly_count}/{limits['hourly']})"
+        if daily_count >= limits["daily"]:
+            return False, f"Daily limit exceeded ({daily_count}/{limits['daily']})"
+        
+        # Check minimum gap
+        if last_post_time:
+            min_next_time = last_post_time + timedelta(minutes=self.min_gap_minutes)
+            if now < min_next_time:
+                return False, f"Too soon. Next post allowed at {min_next_time.strftime('%H:%M:%S')}"
         
         return True, "OK"
     
@@ -289,7 +466,7 @@ class CentralizedPostingQueue:
         
         # Insert into database
         with self.lock:
-            with sqlite3.connect(self.db_path) as conn:
+            with self._connect() as conn:
                 conn.execute("""
                     INSERT INTO queue VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
                 """, (
@@ -313,21 +490,27 @@ class CentralizedPostingQueue:
     
     def get_queue_position(self, item_id: str) -> int:
         """Get position of item in queue"""
-        with sqlite3.connect(self.db_path) as conn:
+        with self._connect() as conn:
+            row = conn.execute(
+                "SELECT priority, created_at FROM queue WHERE id = ?", (item_id,)
+            ).fetchone()
+            if not row:
+                return 1
+            
+            priority, created_at = row
+            # Two range seeks on idx_queue_status_priority_created per status
             cursor = conn.execute("""
                 SELECT COUNT(*) FROM queue 
                 WHERE status IN ('pending', 'approved') 
-                AND (priority > (SELECT priority FROM queue WHERE id = ?) 
-                     OR (priority = (SELECT priority FROM queue WHERE id = ?) 
-                         AND created_at < (SELECT created_at FROM queue WHERE id = ?)))
-            """, (item_id, item_id, item_id))
+                AND (priority > ? OR (priority = ? AND created_at < ?))
+            """, (priority, priority, created_at))
             return cursor.fetchone()[0] + 1
     
     def get_next_items_to_post(self, limit: int = 10) -> List[QueueItem]:
         """Get next items ready to post, respecting priority and scheduling"""
         now = datetime.now().isoformat()
         
-        with sqlite3.connect(self.db_path) as conn:
+        with self._connect() as conn:
             cursor = conn.execute("""
                 SELECT * FROM queue 
                 WHERE status IN ('pending', 'approved') 
@@ -357,25 +540,20 @@ class CentralizedPostingQueue:
             return False, "LinkedIn token not configured"
         
         try:
-            # Get user ID
+            # Get user URN (cached after the first successful lookup)
+            author_urn = self.transport.linkedin_person_urn(self.linkedin_token)
+            if not author_urn:
+                return False, "LinkedIn auth failed: could not resolve user URN"
+            
             headers = {
                 'Authorization': f'Bearer {self.linkedin_token}',
-                'X-Restli-Protocol-Version': '2.0.0'
+                'X-Restli-Protocol-Version': '2.0.0',
+                'Content-Type': 'application/json'
             }
             
-            user_response = requests.get(
-                'https://api.linkedin.com/v2/userinfo',
-                headers=headers
-            )
-            
-            if user_response.status_code != 200:
-                return False, f"LinkedIn auth failed: {user_response.status_code}"
-            
-            user_id = user_response.json().get('sub')
-            
             # Post content
             post_data = {
-                "author": f"urn:li:person:{user_id}",
+                "author": author_urn,
                 "lifecycleState": "PUBLISHED",
                 "specificContent": {
                     "com.linkedin.ugc.ShareContent": {
@@ -390,9 +568,9 @@ class CentralizedPostingQueue:
                 }
             }
             
-            headers['Content-Type'] = 'application/json'
-            response = requests.post(
-                'https://api.linkedin.com/v2/ugcPosts',
+            response = self.transport.post(
+                'linkedin',
+                self.transport.url('linkedin', '/v2/ugcPosts'),
                 headers=headers,
                 json=post_data
             )
@@ -400,6 +578,8 @@ class CentralizedPostingQueue:
             if response.status_code in [200, 201]:
                 return True, "Posted successfully"
             else:
+                if response.status_code == 401:
+                    self.transport.invalidate_identity('linkedin')
                 return False, f"LinkedIn API error: {response.status_code}"
                 
         except Exception as e:
@@ -428,7 +608,7 @@ class CentralizedPostingQueue:
             return False, "Telegram token not configured"
         
         try:
-            url = f"https://api.telegram.org/bot{self.telegram_token}/sendMessage"
+            url = self.transport.url('telegram', f"/bot{self.telegram_token}/sendMessage")
             
             # Add channel link if not present
             text = content
@@ -436,12 +616,12 @@ class CentralizedPostingQueue:
                 text += '\n\n📊 Follow: @AIFinanceNews2024'
             
             payload = {
-                'chat_id': self.telegram_channel,
+                'chat_id': self.transport.telegram_chat_id(self.telegram_token, self.telegram_channel),
                 'text': text[:4096],  # Telegram limit
                 'parse_mode': 'HTML'
             }
             
-            response = requests.post(url, json=payload)
+            response = self.transport.post('telegram', url, json=payload)
             
             if response.status_code == 200:
                 result = response.json()
@@ -477,20 +657,21 @@ class CentralizedPostingQueue:
         
         # Update database
         with self.lock:
-            with sqlite3.connect(self.db_path) as conn:
+            with self._connect() as conn:
                 if success:
+                    posted_at = datetime.now()
                     conn.execute("""
                         UPDATE queue 
                         SET status = 'posted', posted_at = ?, error_message = NULL
                         WHERE id = ?
-                    """, (datetime.now().isoformat(), item.id))
+                    """, (posted_at.isoformat(), item.id))
                     
                     # Add to history
                     conn.execute("""
                         INSERT INTO posting_history VALUES (?, ?, ?, ?, ?, ?)
                     """, (
                         f"hist_{item.id}", item.content_hash, item.platform,
-                        datetime.now().isoformat(), item.source, True
+                        posted_at.isoformat(), item.source, True
                     ))
                     
                 else:
@@ -505,12 +686,62 @@ class CentralizedPostingQueue:
                     """, (new_retry_count, new_status, message, item.id))
                 
                 conn.commit()
+                
+                if success and self.ledger is not None:
+                    self._apply_new_posts(conn)
         
         return success, message
     
+    def _run_lane(self, platform: str, lane_items: List[Tuple[int, QueueItem]]) -> Tuple[List, Dict]:
+        """Post one platform's items in order, enforcing that platform's gap and limits"""
+        lane_start = time.time()
+        wait_seconds = 0.0
+        blocked_reason = None
+        outcomes = []
+        stats = {"items": len(lane_items), "successful": 0, "failed": 0, "skipped": 0}
+        
+        for position, (index, item) in enumerate(lane_items):
+            if blocked_reason:
+                # Rate limit or gap already hit on this lane - the rest cannot post this run
+                success, message = False, blocked_reason
+            else:
+                if position > 0:
+                    time.sleep(self.post_delay_seconds)
+                    wait_seconds += self.post_delay_seconds
+                
+                logger.info(f"Processing {item.id} for {item.platform}")
+                success, message = self.execute_post(item)
+            
+            if success:
+                outcome = "successful"
+                logger.info(f"✅ Posted {item.id} to {item.platform}")
+            elif "Too soon" in message or "limit exceeded" in message:
+                outcome = "skipped"
+                blocked_reason = message
+                logger.info(f"⏸️ Skipped {item.id}: {message}")
+            else:
+                outcome = "failed"
+                logger.error(f"❌ Failed {item.id}: {message}")
+            
+            stats[outcome] += 1
+            outcomes.append((index, outcome, {
+                "item_id": item.id,
+                "platform": item.platform,
+                "success": success,
+                "message": message,
+                "source": item.source
+            }))
+        
+        elapsed = time.time() - lane_start
+        stats["elapsed_seconds"] = round(elapsed, 3)
+        stats["wait_seconds"] = round(wait_seconds, 3)
+        stats["posts_per_minute"] = round(stats["successful"] * 60 / elapsed, 2) if elapsed > 0 else 0.0
+        return outcomes, stats
+    
     def process_queue(self, max_items: int = 5) -> Dict:
-        """Process pending items in queue"""
+        """Process pending items in queue, one concurrent lane per platform"""
         logger.info("Processing posting queue...")
+        start = time.time()
         
         items = self.get_next_items_to_post(max_items)
         results = {
@@ -518,44 +749,57 @@ class CentralizedPostingQueue:
             "successful": 0,
             "failed": 0,
             "skipped": 0,
-            "details": []
+            "details": [],
+            "lanes": {}
         }
         
-        for item in items:
+        # Platforms have independent limits, so each gets its own lane; order is kept within a lane
+        lanes: Dict[str, List[Tuple[int, QueueItem]]] = OrderedDict()
+        for index, item in enumerate(items):
+            lanes.setdefault(item.platform, []).append((index, item))
+        
+        outcomes = []
+        futures = {
+            platform: self._lane(platform).submit(self._run_lane, platform, lane_items)
+            for platform, lane_items in lanes.items()
+        }
+        for platform, future in futures.items():
+            lane_outcomes, lane_stats = future.result()
+            outcomes.extend(lane_outcomes)
+            results["lanes"][platform] = lane_stats
+        
+        for _, outcome, detail in sorted(outcomes, key=lambda entry: entry[0]):
             results["processed"] += 1
-            
-            logger.info(f"Processing {item.id} for {item.platform}")
-            
-            success, message = self.execute_post(item)
-            
-            if success:
-                results["successful"] += 1
-                logger.info(f"✅ Posted {item.id} to {item.platform}")
-            else:
-                if "Too soon" in message or "limit exceeded" in message:
-                    results["skipped"] += 1
-                    logger.info(f"⏸️ Skipped {item.id}: {message}")
-                else:
-                    results["failed"] += 1
-                    logger.error(f"❌ Failed {item.id}: {message}")
-            
-            results["details"].append({
-                "item_id": item.id,
-                "platform": item.platform,
-                "success": success,
-                "message": message,
-                "source": item.source
-            })
-            
-            # Rate limiting between posts
-            time.sleep(2)
+            results[outcome] += 1
+            results["details"].append(detail)
         
+        results["elapsed_seconds"] = round(time.time() - start, 3)
         logger.info(f"Queue processing complete: {results['successful']} posted, {results['failed']} failed, {results['skipped']} skipped")
         return results
     
+    def _lane(self, platform: str) -> ThreadPoolExecutor:
+        """The platform's single-thread lane, started on first use"""
+        with self.lock:
+            executor = self._lanes.get(platform)
+            if executor is None:
+                executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix=f"post-lane-{platform}")
+                self._lanes[platform] = executor
+            return executor
+    
+    def close(self):
+        """Stop the lane threads (their connections close with them) and this thread's connection"""
+        with self.lock:
+            lanes, self._lanes = list(self._lanes.values()), {}
+        for executor in lanes:
+            executor.shutdown(wait=True)
+        conn = getattr(self._local, 'conn', None)
+        if conn is not None:
+            conn.close()
+            self._local.conn = None
+    
     def get_queue_status(self) -> Dict:
         """Get comprehensive queue status"""
-        with sqlite3.connect(self.db_path) as conn:
+        with self._connect() as conn:
             # Count by status
             cursor = conn.execute("""
                 SELECT status, COUNT(*) 
@@ -638,7 +882,7 @@ class CentralizedPostingQueue:
         """Clean up old processed items"""
         cutoff_date = (datetime.now() - timedelta(days=days_old)).isoformat()
         
-        with sqlite3.connect(self.db_path) as conn:
+        with self._connect() as conn:
             cursor = conn.execute("""
                 DELETE FROM queue 
                 WHERE status IN ('posted', 'failed') 
@@ -647,13 +891,14 @@ class CentralizedPostingQueue:
             
             deleted_count = cursor.rowcount
             conn.commit()
-            
+        
+        self.refresh_ledger()
         logger.info(f"Cleaned up {deleted_count} old queue items")
         return deleted_count
     
     def approve_item(self, item_id: str) -> bool:
         """Approve a pending item for posting"""
-        with sqlite3.connect(self.db_path) as conn:
+        with self._connect() as conn:
             cursor = conn.execute("""
                 UPDATE queue 
                 SET status = 'approved'
@@ -664,7 +909,7 @@ class CentralizedPostingQueue:
     
     def reject_item(self, item_id: str, reason: str = "Manual rejection") -> bool:
         """Reject a pending item"""
-        with sqlite3.connect(self.db_path) as conn:
+        with self._connect() as conn:
             cursor = conn.execute("""
                 UPDATE queue 
                 SET status = 'rejected', error_message = ?
@@ -675,7 +920,7 @@ class CentralizedPostingQueue:
     
     def get_pending_for_approval(self) -> List[QueueItem]:
         """Get all items pending approval"""
-        with sqlite3.connect(self.db_path) as conn:
+        with self._connect() as conn:
             cursor = conn.execute("""
                 SELECT * FROM queue 
                 WHERE status = 'pending'
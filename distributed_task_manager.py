@@ -15,8 +15,11 @@ Purpose: Optimize resource usage for AI Finance Agency automation
 """
 
 import asyncio
+import importlib
+import io
 import json
 import logging
+import math
 import multiprocessing as mp
 import os
 import pickle
@@ -28,15 +31,21 @@ import sqlite3
 import threading
 import time
 import uuid
-from collections import defaultdict
-from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
-from dataclasses import dataclass, asdict, field
+from collections import defaultdict, deque
+from concurrent.futures import CancelledError, Future, ThreadPoolExecutor, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from dataclasses import dataclass, field, fields
 from datetime import datetime, timedelta
 from enum import Enum
 from typing import Dict, List, Optional, Any, Callable, Tuple
 import subprocess
 import signal
 
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
+
 # Configure logging
 logging.basicConfig(
     level=logging.INFO,
@@ -88,10 +97,11 @@ class Task:
     error: Optional[str] = None
     worker_id: Optional[str] = None
     execution_time: float = 0.0
+    queued_at: Optional[float] = None  # Epoch seconds when last put on the queue
 
     def to_dict(self) -> Dict:
-        """Convert task to dictionary for serialization"""
-        data = asdict(self)
+        """Convert task to dictionary for serialization (shallow - nested values are shared)"""
+        data = {f.name: getattr(self, f.name) for f in fields(self)}
         data['priority'] = self.priority.value
         data['status'] = self.status.value
         data['created_at'] = self.created_at.isoformat()
@@ -118,6 +128,9 @@ class ResourceMonitor:
         self.memory_threshold = 85.0  # Throttle at 85% memory
         self.monitoring = True
         self.stats = defaultdict(list)
+        self.throttle_check_interval = 5.0  # Seconds a throttle decision is reused
+        self._throttle_checked_at = 0.0
+        self._throttling = False
         
     def get_system_stats(self) -> Dict[str, float]:
         """Get current system resource usage"""
@@ -140,17 +153,29 @@ class ResourceMonitor:
             return {}
     
     def should_throttle(self) -> bool:
-        """Check if system should throttle task execution"""
-        stats = self.get_system_stats()
+        """
+        Check if system should throttle task execution.
+        Non-blocking: CPU is sampled since the previous check and the answer is
+        cached for throttle_check_interval, so the worker loop never stalls here.
+        """
+        now = time.time()
+        if now - self._throttle_checked_at < self.throttle_check_interval:
+            return self._throttling
         
-        cpu_high = stats.get('cpu_percent', 0) > self.cpu_threshold
-        memory_high = stats.get('memory_percent', 0) > self.memory_threshold
+        try:
+            cpu_high = psutil.cpu_percent(interval=None) > self.cpu_threshold
+            memory_high = psutil.virtual_memory().percent > self.memory_threshold
+            self._throttling = cpu_high or memory_high
+        except Exception as e:
+            logger.error(f"Error checking throttle state: {e}")
         
-        return cpu_high or memory_high
+        self._throttle_checked_at = now
+        return self._throttling
     
-    def get_recommended_worker_count(self) -> int:
+    def get_recommended_worker_count(self, stats: Dict[str, float] = None) -> int:
         """Get recommended number of workers based on system resources"""
-        stats = self.get_system_stats()
+        if stats is None:
+            stats = self.get_system_stats()
         cpu_count = mp.cpu_count()
         
         # Base worker count on CPU cores
@@ -181,16 +206,189 @@ class ResourceMonitor:
             if len(self.stats[key]) > 1000:
                 self.stats[key] = self.stats[key][-1000:]
 
+# Atomically pop up to ARGV[1] task ids and their payloads in one round trip.
+# Popped ids are leased until ARGV[2] (epoch seconds): they move to the processing
+# set, with their original score kept so an expired lease goes back in its place.
+# The payload stays until the task is acked.
+# KEYS[1] = priority sorted set, KEYS[2] = payload hash,
+# KEYS[3] = processing sorted set (lease deadlines), KEYS[4] = leased score hash
+DEQUEUE_BATCH_SCRIPT = """
+local entries = redis.call('ZRANGE', KEYS[1], 0, tonumber(ARGV[1]) - 1, 'WITHSCORES')
+if #entries == 0 then
+    return {}
+end
+local ids = {}
+for i = 1, #entries, 2 do
+    ids[#ids + 1] = entries[i]
+end
+redis.call('ZREM', KEYS[1], unpack(ids))
+local payloads = redis.call('HMGET', KEYS[2], unpack(ids))
+local out = {}
+for i, id in ipairs(ids) do
+    if payloads[i] then
+        redis.call('ZADD', KEYS[3], ARGV[2], id)
+        redis.call('HSET', KEYS[4], id, entries[2 * i])
+    end
+    out[#out + 1] = id
+    out[#out + 1] = payloads[i]
+end
+return out
+"""
+
+# Release the leases on ARGV ids once their tasks finished. The payload is only
+# deleted if the task was not queued again meanwhile (a retry re-puts the same id).
+# KEYS[1] = processing set, KEYS[2] = leased score hash, KEYS[3] = priority set, KEYS[4] = payload hash
+ACK_SCRIPT = """
+for _, id in ipairs(ARGV) do
+    redis.call('ZREM', KEYS[1], id)
+    redis.call('HDEL', KEYS[2], id)
+    if not redis.call('ZSCORE', KEYS[3], id) then
+        redis.call('HDEL', KEYS[4], id)
+    end
+end
+return #ARGV
+"""
+
+# Put up to ARGV[2] tasks whose lease expired before ARGV[1] back in the queue
+# at their original score. Returns the ids that were re-queued.
+# KEYS as for ACK_SCRIPT
+REQUEUE_EXPIRED_SCRIPT = """
+local ids = redis.call('ZRANGEBYSCORE', KEYS[1], '-inf', ARGV[1], 'LIMIT', 0, tonumber(ARGV[2]))
+local requeued = {}
+for _, id in ipairs(ids) do
+    local score = redis.call('HGET', KEYS[2], id)
+    redis.call('ZREM', KEYS[1], id)
+    redis.call('HDEL', KEYS[2], id)
+    if score and redis.call('HEXISTS', KEYS[4], id) == 1 and not redis.call('ZSCORE', KEYS[3], id) then
+        redis.call('ZADD', KEYS[3], score, id)
+        requeued[#requeued + 1] = id
+    end
+end
+return requeued
+"""
+
+# Lease the id BZPOPMIN handed us and fetch its payload.
+# KEYS[1] = payload hash, KEYS[2] = processing set, KEYS[3] = leased score hash;
+# ARGV = id, lease deadline, score it was popped at
+CLAIM_SCRIPT = """
+local payload = redis.call('HGET', KEYS[1], ARGV[1])
+if payload then
+    redis.call('ZADD', KEYS[2], ARGV[2], ARGV[1])
+    redis.call('HSET', KEYS[3], ARGV[1], ARGV[3])
+end
+return payload
+"""
+
+# Re-queue ARGV[1] at score ARGV[2] if its payload is in neither the queue nor the
+# processing set: a worker died between BZPOPMIN and CLAIM_SCRIPT.
+# KEYS[1] = payload hash, KEYS[2] = priority set, KEYS[3] = processing set
+REQUEUE_ORPHAN_SCRIPT = """
+if redis.call('HEXISTS', KEYS[1], ARGV[1]) == 1
+        and not redis.call('ZSCORE', KEYS[2], ARGV[1])
+        and not redis.call('ZSCORE', KEYS[3], ARGV[1]) then
+    redis.call('ZADD', KEYS[2], ARGV[2], ARGV[1])
+    return 1
+end
+return 0
+"""
+
+# Width of one priority band in the sorted-set score (larger than any epoch timestamp)
+PRIORITY_SCORE_SPAN = 1e10
+
+def dumps_payload(obj: Any) -> bytes:
+    """
+    Serialize a task dict or result with msgpack when available, JSON otherwise.
+    Raises TypeError for values neither can encode rather than storing their str().
+    """
+    if msgpack is not None:
+        return msgpack.packb(obj, use_bin_type=True)
+    return json.dumps(obj).encode('utf-8')
+
+def loads_payload(data: bytes) -> Any:
+    """Inverse of dumps_payload; detects the format so mixed deployments keep working"""
+    if data[:1] in (b'{', b'[', b'"') or msgpack is None:
+        return json.loads(data)
+    return msgpack.unpackb(data, raw=False)
+
+class _LegacyTaskUnpickler(pickle.Unpickler):
+    """Reads Tasks pickled by the pre-msgpack queue, which name __main__ when it ran as a script"""
+    
+    def find_class(self, module, name):
+        if module == '__main__' and name in ('Task', 'TaskPriority', 'TaskStatus'):
+            return globals()[name]
+        return super().find_class(module, name)
+
+def loads_legacy_task(data: bytes) -> 'Task':
+    """Task from a payload the pre-msgpack queue stored under <prefix>:task:<id>"""
+    return _LegacyTaskUnpickler(io.BytesIO(data)).load()
+
+class LatencyHistogram:
+    """Log-bucketed latency histogram (seconds) that merges cheaply across processes"""
+    
+    # Upper bucket bounds in seconds; the last bucket is open-ended
+    BOUNDS = [0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0, 300.0]
+    
+    def __init__(self):
+        self.counts = [0] * (len(self.BOUNDS) + 1)
+        self.total = 0.0
+    
+    @classmethod
+    def bucket_index(cls, seconds: float) -> int:
+        for index, bound in enumerate(cls.BOUNDS):
+            if seconds <= bound:
+                return index
+        return len(cls.BOUNDS)
+    
+    @classmethod
+    def from_hash(cls, raw: Dict) -> 'LatencyHistogram':
+        """Build from the Redis hash written by TaskQueue.record_service_time"""
+        histogram = cls()
+        for key, value in raw.items():
+            key = key.decode('utf-8') if isinstance(key, bytes) else key
+            if key == 'sum':
+                histogram.total = float(value)
+            else:
+                histogram.counts[int(key)] = int(value)
+        return histogram
+    
+    def record(self, seconds: float):
+        self.counts[self.bucket_index(seconds)] += 1
+        self.total += seconds
+    
+    @property
+    def count(self) -> int:
+        return sum(self.counts)
+    
+    def mean(self) -> float:
+        count = self.count
+        return self.total / count if count else 0.0
+    
+    def quantile(self, q: float) -> float:
+        """Upper bound of the bucket holding the q-th quantile"""
+        count = self.count
+        if not count:
+            return 0.0
+        rank = q * count
+        seen = 0
+        for index, bucket_count in enumerate(self.counts):
+            seen += bucket_count
+            if seen >= rank:
+                return self.BOUNDS[index] if index < len(self.BOUNDS) else self.BOUNDS[-1]
+        return self.BOUNDS[-1]
+
 class TaskQueue:
     """Redis-based distributed task queue with prioritization"""
     
-    def __init__(self, redis_host='localhost', redis_port=6379, redis_db=0):
+    MAX_BATCH = 1000  # Keeps Lua unpack() well inside its stack limit
+    
+    def __init__(self, redis_host='localhost', redis_port=6379, redis_db=0, redis_client=None,
+                 lease_seconds: float = 900):
         try:
-            self.redis_client = redis.Redis(
+            self.redis_client = redis_client or redis.Redis(
                 host=redis_host, 
                 port=redis_port, 
                 db=redis_db,
-                decode_responses=False  # Keep binary for pickle
+                decode_responses=False  # Payloads are binary msgpack
             )
             # Test connection
             self.redis_client.ping()
@@ -202,26 +400,140 @@ class TaskQueue:
         
         self.queue_prefix = "ai_finance_tasks"
         self.result_prefix = "ai_finance_results"
+        self.queue_name = f"{self.queue_prefix}:priority"
+        # Payloads live in one hash without TTL so a queued task can never lose its body
+        self.payload_key = f"{self.queue_prefix}:payloads"
+        # Dequeued but not yet acked: lease deadlines, and the scores to re-queue them at
+        self.processing_key = f"{self.queue_prefix}:processing"
+        self.leased_key = f"{self.queue_prefix}:leased"
+        self.lease_seconds = lease_seconds  # Longer than any task runs, or it runs twice
+        self._orphan_candidates = set()
+        self.wakeup_key = f"{self.queue_prefix}:wakeup_ms"
+        self.wakeup_samples = 1000
+        self._wakeup_ms = deque(maxlen=self.wakeup_samples)
+        self._service_times: Dict[str, LatencyHistogram] = {}
+        
+        if self.redis_client:
+            self._dequeue_batch = self.redis_client.register_script(DEQUEUE_BATCH_SCRIPT)
+            self._claim = self.redis_client.register_script(CLAIM_SCRIPT)
+            self._requeue_orphan = self.redis_client.register_script(REQUEUE_ORPHAN_SCRIPT)
+            self.upgrade_pickled_tasks()
+            self.migrate_scores()
+            self._ack = self.redis_client.register_script(ACK_SCRIPT)
+            self._requeue_expired = self.redis_client.register_script(REQUEUE_EXPIRED_SCRIPT)
+    
+    @staticmethod
+    def score(priority: TaskPriority, queued_at: float) -> float:
+        """
+        Sorted-set score: priority band first, enqueue time (FIFO) within the band.
+        Bands are PRIORITY_SCORE_SPAN wide so depth per priority is a single ZCOUNT.
+        """
+        return priority.value * PRIORITY_SCORE_SPAN + queued_at
+    
+    def legacy_task_key(self, task_id) -> str:
+        """Where the pre-msgpack queue kept a task's pickled payload"""
+        if isinstance(task_id, bytes):
+            task_id = task_id.decode('utf-8')
+        return f"{self.queue_prefix}:task:{task_id}"
+    
+    def upgrade_pickled_tasks(self) -> int:
+        """
+        Move tasks queued by the pre-msgpack queue (a pickled Task under
+        :task:<id>, no entry in the payload hash) into the payload hash, so
+        get_batch does not drop them. Cheap to call when nothing is left.
+        """
+        try:
+            members = self.redis_client.zrange(self.queue_name, 0, -1)
+            missing = []
+            for start in range(0, len(members), self.MAX_BATCH):
+                chunk = members[start:start + self.MAX_BATCH]
+                payloads = self.redis_client.hmget(self.payload_key, chunk)
+                missing.extend(task_id for task_id, payload in zip(chunk, payloads) if payload is None)
+            if not missing:
+                return 0
+            
+            upgraded = 0
+            for start in range(0, len(missing), self.MAX_BATCH):
+                chunk = missing[start:start + self.MAX_BATCH]
+                legacy = self.redis_client.mget([self.legacy_task_key(task_id) for task_id in chunk])
+                pipe = self.redis_client.pipeline(transaction=True)
+                for task_id, data in zip(chunk, legacy):
+                    if data is None:
+                        continue  # Expired (the old keys had a 1h TTL); get_batch drops it
+                    try:
+                        payload = dumps_payload(loads_legacy_task(data).to_dict())
+                    except Exception as e:
+                        logger.error(f"Could not upgrade pickled task {task_id.decode('utf-8')}: {e}")
+                        continue
+                    # NX: a task put again by an upgraded worker meanwhile keeps its payload
+                    pipe.hsetnx(self.payload_key, task_id, payload)
+                    pipe.delete(self.legacy_task_key(task_id))
+                    upgraded += 1
+                pipe.execute()
+            logger.info(f"Upgraded {upgraded} of {len(missing)} queued tasks from pickled payloads")
+            return upgraded
+        except Exception as e:
+            logger.error(f"Error upgrading pickled tasks: {e}")
+            return 0
+    
+    def migrate_scores(self) -> int:
+        """
+        Re-score tasks queued under the old priority + queued_at / 1e6 scores. Those all
+        fall below the first band, so they would be served before every new task
+        whatever their priority. Cheap to call when there is nothing to migrate.
+        """
+        try:
+            old = self.redis_client.zrangebyscore(self.queue_name, '-inf', f"({PRIORITY_SCORE_SPAN}",
+                                                  withscores=True)
+            if not old:
+                return 0
+            
+            scores = {}
+            task_ids = [task_id for task_id, _ in old]
+            payloads = self.redis_client.hmget(self.payload_key, task_ids)
+            # Tasks the pickle-based queue left behind (upgrade_pickled_tasks moves them on connect)
+            legacy = self.redis_client.mget([self.legacy_task_key(task_id) for task_id in task_ids])
+            for (task_id, old_score), payload, pickled in zip(old, payloads, legacy):
+                if payload:
+                    priority = Task.from_dict(loads_payload(payload)).priority
+                elif pickled:
+                    priority = loads_legacy_task(pickled).priority
+                else:
+                    continue  # get_batch drops it
+                queued_at = (old_score - priority.value) * 1000000
+                scores[task_id] = self.score(priority, queued_at)
+            if scores:
+                # XX: a task dequeued meanwhile is not put back
+                self.redis_client.zadd(self.queue_name, scores, xx=True)
+            logger.info(f"Re-scored {len(scores)} of {len(old)} tasks queued under the old score format")
+            return len(scores)
+        except Exception as e:
+            logger.error(f"Error re-scoring queued tasks: {e}")
+            return 0
     
     def put(self, task: Task) -> bool:
         """Add task to queue"""
         try:
             if self.redis_client:
-                # Use priority as score for sorted set
-                queue_name = f"{self.queue_prefix}:priority"
-                task_data = pickle.dumps(task)
-                
+                task.queued_at = time.time()
                 # Lower priority number = higher priority in queue
-                score = task.priority.value + (time.time() / 1000000)  # Add timestamp for FIFO within priority
+                score = self.score(task.priority, task.queued_at)
                 
-                self.redis_client.zadd(queue_name, {task.id: score})
-                self.redis_client.set(f"{self.queue_prefix}:task:{task.id}", task_data, ex=3600)  # Expire in 1 hour
+                # Payload first, then the index entry, in one MULTI round trip.
+                # A task put back by its worker (retry, shutdown) gives up its lease.
+                pipe = self.redis_client.pipeline(transaction=True)
+                pipe.hset(self.payload_key, task.id, dumps_payload(task.to_dict()))
+                pipe.zadd(self.queue_name, {task.id: score})
+                pipe.zrem(self.processing_key, task.id)
+                pipe.hdel(self.leased_key, task.id)
+                pipe.execute()
                 
-                logger.info(f"Queued task {task.id} with priority {task.priority.name}")
+                logger.debug(f"Queued task {task.id} with priority {task.priority.name}")
                 return True
             else:
                 # Fallback to memory queue
-                priority_score = (task.priority.value, time.time(), task.id)
+                task.queued_at = time.time()
+                priority_score = (task.priority.value, task.queued_at, task.id)
                 self._memory_queue.put((priority_score, task))
                 return True
                 
@@ -229,38 +541,267 @@ class TaskQueue:
             logger.error(f"Error adding task to queue: {e}")
             return False
     
-    def get(self, timeout: int = 10) -> Optional[Task]:
-        """Get next highest priority task from queue"""
+    def put_batch(self, tasks: List[Task]) -> bool:
+        """Add many tasks in a single round trip"""
+        if not self.redis_client:
+            return all(self.put(task) for task in tasks)
+        
+        try:
+            if not tasks:
+                return True
+            
+            now = time.time()
+            payloads = {}
+            scores = {}
+            for offset, task in enumerate(tasks):
+                task.queued_at = now
+                payloads[task.id] = dumps_payload(task.to_dict())
+                # Same FIFO-within-priority score as put(), kept increasing across the batch
+                scores[task.id] = self.score(task.priority, now + offset * 1e-5)
+            
+            pipe = self.redis_client.pipeline(transaction=True)
+            pipe.hset(self.payload_key, mapping=payloads)
+            pipe.zadd(self.queue_name, scores)
+            pipe.zrem(self.processing_key, *scores)
+            pipe.hdel(self.leased_key, *scores)
+            pipe.execute()
+            logger.debug(f"Queued batch of {len(tasks)} tasks")
+            return True
+        except Exception as e:
+            logger.error(f"Error adding task batch to queue: {e}")
+            return False
+    
+    def get_batch(self, n: int = 1, timeout: float = 0) -> List[Task]:
+        """
+        Atomically pop up to n highest-priority tasks.
+        With timeout > 0, block (BZPOPMIN) until a task arrives or the timeout expires.
+        Popped tasks are leased for lease_seconds: ack() them when they are done, or
+        requeue_expired() puts them back in the queue.
+        """
+        n = max(1, min(n, self.MAX_BATCH))
+        tasks = []
+        
         try:
             if self.redis_client:
-                queue_name = f"{self.queue_prefix}:priority"
-                
-                # Get highest priority task (lowest score)
-                result = self.redis_client.zpopmin(queue_name, 1)
-                
-                if result:
-                    task_id, _ = result[0]
-                    task_id = task_id.decode('utf-8')
-                    
-                    # Get task data
-                    task_data = self.redis_client.get(f"{self.queue_prefix}:task:{task_id}")
-                    if task_data:
-                        task = pickle.loads(task_data)
-                        self.redis_client.delete(f"{self.queue_prefix}:task:{task_id}")
-                        return task
+                flat = self._dequeue_batch(
+                    keys=[self.queue_name, self.payload_key, self.processing_key, self.leased_key],
+                    args=[n, time.time() + self.lease_seconds]
+                )
+                for task_id, payload in zip(flat[0::2], flat[1::2]):
+                    if not payload:
+                        logger.error(f"Task {task_id.decode('utf-8')} had no payload, dropped")
+                        continue
+                    tasks.append(Task.from_dict(loads_payload(payload)))
                 
-                return None
+                if not flat and timeout > 0:
+                    # Lowest score wins, so a CRITICAL task wakes us ahead of everything else
+                    popped = self.redis_client.bzpopmin(self.queue_name, timeout=timeout)
+                    if popped:
+                        # Not atomic with the pop: requeue_orphans() covers a crash in between
+                        _, task_id, score = popped
+                        payload = self._claim(
+                            keys=[self.payload_key, self.processing_key, self.leased_key],
+                            args=[task_id, time.time() + self.lease_seconds, repr(score)]
+                        )
+                        if payload:
+                            task = Task.from_dict(loads_payload(payload))
+                            self.record_wakeup(task)
+                            tasks.append(task)
+                        else:
+                            logger.error(f"Task {task_id.decode('utf-8')} had no payload, dropped")
             else:
-                # Fallback to memory queue
-                try:
-                    _, task = self._memory_queue.get(timeout=timeout)
-                    return task
-                except queue.Empty:
-                    return None
+                block = timeout > 0
+                while len(tasks) < n:
+                    try:
+                        if block:
+                            _, task = self._memory_queue.get(timeout=timeout)
+                            self.record_wakeup(task)
+                            block = False
+                        else:
+                            _, task = self._memory_queue.get_nowait()
+                    except queue.Empty:
+                        break
+                    tasks.append(task)
                     
         except Exception as e:
-            logger.error(f"Error getting task from queue: {e}")
-            return None
+            logger.error(f"Error getting tasks from queue: {e}")
+        
+        return tasks
+    
+    def get(self, timeout: int = 10) -> Optional[Task]:
+        """Get next highest priority task from queue, blocking up to timeout seconds"""
+        tasks = self.get_batch(1, timeout=timeout)
+        return tasks[0] if tasks else None
+    
+    def ack(self, *task_ids: str):
+        """Release the leases of finished tasks and drop their payloads"""
+        if not self.redis_client or not task_ids:
+            return
+        try:
+            self._ack(keys=[self.processing_key, self.leased_key, self.queue_name, self.payload_key],
+                      args=list(task_ids))
+        except Exception as e:
+            logger.error(f"Error acking tasks {task_ids}: {e}")
+    
+    def requeue_expired(self, limit: int = 1000) -> int:
+        """Put tasks whose lease ran out (their worker died or hung) back in the queue"""
+        if not self.redis_client:
+            return 0
+        try:
+            requeued = self._requeue_expired(
+                keys=[self.processing_key, self.leased_key, self.queue_name, self.payload_key],
+                args=[time.time(), limit]
+            )
+        except Exception as e:
+            logger.error(f"Error re-queueing expired leases: {e}")
+            return 0
+        for task_id in requeued:
+            logger.warning(f"Lease on task {task_id.decode('utf-8')} expired, re-queued")
+        return len(requeued)
+    
+    def requeue_orphans(self) -> int:
+        """
+        Re-queue payloads that are neither queued nor leased. Only the gap between
+        BZPOPMIN and its claim leaves one, and only for a moment, so an id is
+        re-queued when two consecutive calls find it orphaned.
+        """
+        if not self.redis_client:
+            return 0
+        try:
+            pipe = self.redis_client.pipeline(transaction=True)
+            pipe.hlen(self.payload_key)
+            pipe.zcard(self.queue_name)
+            pipe.zcard(self.processing_key)
+            payloads, queued, leased = pipe.execute()
+            if payloads <= queued + leased:
+                # Every payload is accounted for
+                self._orphan_candidates = set()
+                return 0
+            
+            orphans = set()
+            task_ids = list(self.redis_client.hkeys(self.payload_key))
+            for start in range(0, len(task_ids), self.MAX_BATCH):
+                chunk = task_ids[start:start + self.MAX_BATCH]
+                pipe = self.redis_client.pipeline(transaction=False)
+                for task_id in chunk:
+                    pipe.zscore(self.queue_name, task_id)
+                    pipe.zscore(self.processing_key, task_id)
+                scores = pipe.execute()
+                orphans.update(task_id for task_id, queued_score, leased_score
+                               in zip(chunk, scores[0::2], scores[1::2])
+                               if queued_score is None and leased_score is None)
+            
+            confirmed = sorted(orphans & self._orphan_candidates)
+            self._orphan_candidates = orphans - set(confirmed)
+            if not confirmed:
+                return 0
+            requeued = 0
+            for task_id, payload in zip(confirmed, self.redis_client.hmget(self.payload_key, confirmed)):
+                if not payload:
+                    continue
+                task = Task.from_dict(loads_payload(payload))
+                score = self.score(task.priority, task.queued_at or time.time())
+                if self._requeue_orphan(keys=[self.payload_key, self.queue_name, self.processing_key],
+                                        args=[task_id, repr(score)]):
+                    logger.warning(f"Task {task_id.decode('utf-8')} was orphaned mid-dequeue, re-queued")
+                    requeued += 1
+            return requeued
+        except Exception as e:
+            logger.error(f"Error re-queueing orphaned tasks: {e}")
+            return 0
+    
+    def record_wakeup(self, task: Task):
+        """Record how long a blocked dequeue took to hand over a newly queued task"""
+        if task.queued_at is None:
+            return
+        
+        latency_ms = max(0.0, (time.time() - task.queued_at) * 1000)
+        try:
+            if self.redis_client:
+                # Shared across worker processes so the manager can report it
+                pipe = self.redis_client.pipeline(transaction=False)
+                pipe.lpush(self.wakeup_key, f"{latency_ms:.3f}")
+                pipe.ltrim(self.wakeup_key, 0, self.wakeup_samples - 1)
+                pipe.execute()
+            else:
+                self._wakeup_ms.append(latency_ms)
+        except Exception as e:
+            logger.error(f"Error recording wakeup latency: {e}")
+    
+    def get_wakeup_stats(self) -> Dict[str, float]:
+        """Dequeue wakeup latency over the most recent blocked dequeues (ms)"""
+        try:
+            if self.redis_client:
+                samples = [float(v) for v in self.redis_client.lrange(self.wakeup_key, 0, -1)]
+            else:
+                samples = list(self._wakeup_ms)
+        except Exception as e:
+            logger.error(f"Error reading wakeup latency: {e}")
+            samples = []
+        
+        if not samples:
+            return {'count': 0, 'p50_ms': 0.0, 'p99_ms': 0.0, 'max_ms': 0.0}
+        
+        samples.sort()
+        return {
+            'count': len(samples),
+            'p50_ms': round(samples[len(samples) // 2], 3),
+            'p99_ms': round(samples[min(len(samples) - 1, int(len(samples) * 0.99))], 3),
+            'max_ms': round(samples[-1], 3)
+        }
+    
+    def get_depth_by_priority(self) -> Dict[TaskPriority, int]:
+        """Number of queued tasks in each priority band"""
+        try:
+            if self.redis_client:
+                pipe = self.redis_client.pipeline(transaction=False)
+                for priority in TaskPriority:
+                    low = priority.value * PRIORITY_SCORE_SPAN
+                    pipe.zcount(self.queue_name, low, f"({low + PRIORITY_SCORE_SPAN}")
+                return dict(zip(TaskPriority, pipe.execute()))
+            else:
+                depth = {priority: 0 for priority in TaskPriority}
+                for (priority_value, _, _), _ in list(self._memory_queue.queue):
+                    depth[TaskPriority(priority_value)] += 1
+                return depth
+        except Exception as e:
+            logger.error(f"Error getting queue depth: {e}")
+            return {priority: 0 for priority in TaskPriority}
+    
+    def record_service_time(self, function: str, seconds: float):
+        """Add one execution time to the per-function service-time histogram"""
+        try:
+            if self.redis_client:
+                # Shared across worker processes, one pipeline per task
+                key = f"{self.queue_prefix}:service:{function}"
+                pipe = self.redis_client.pipeline(transaction=False)
+                pipe.sadd(f"{self.queue_prefix}:service_functions", function)
+                pipe.hincrby(key, str(LatencyHistogram.bucket_index(seconds)), 1)
+                pipe.hincrbyfloat(key, "sum", seconds)
+                pipe.execute()
+            else:
+                self._service_times.setdefault(function, LatencyHistogram()).record(seconds)
+        except Exception as e:
+            logger.error(f"Error recording service time for {function}: {e}")
+    
+    def get_service_histograms(self) -> Dict[str, 'LatencyHistogram']:
+        """Cumulative service-time histogram per task function"""
+        try:
+            if self.redis_client:
+                functions = sorted(f.decode('utf-8') for f in
+                                   self.redis_client.smembers(f"{self.queue_prefix}:service_functions"))
+                pipe = self.redis_client.pipeline(transaction=False)
+                for function in functions:
+                    pipe.hgetall(f"{self.queue_prefix}:service:{function}")
+                return {
+                    function: LatencyHistogram.from_hash(raw)
+                    for function, raw in zip(functions, pipe.execute())
+                }
+            else:
+                return dict(self._service_times)
+        except Exception as e:
+            logger.error(f"Error reading service histograms: {e}")
+            return {}
     
     def get_queue_size(self) -> int:
         """Get current queue size"""
@@ -276,7 +817,7 @@ class TaskQueue:
         """Store task result"""
         try:
             if self.redis_client:
-                result_data = pickle.dumps(result)
+                result_data = dumps_payload(result)
                 self.redis_client.set(f"{self.result_prefix}:{task_id}", result_data, ex=ttl)
         except Exception as e:
             logger.error(f"Error storing result for task {task_id}: {e}")
@@ -287,38 +828,323 @@ class TaskQueue:
             if self.redis_client:
                 result_data = self.redis_client.get(f"{self.result_prefix}:{task_id}")
                 if result_data:
-                    return pickle.loads(result_data)
+                    return loads_payload(result_data)
         except Exception as e:
             logger.error(f"Error getting result for task {task_id}: {e}")
         return None
 
+class ExecutionClass(Enum):
+    """Where a task function runs under the execution router"""
+    IO = "io"              # Network-bound, awaited on the router's asyncio loop
+    CPU = "cpu"            # Compute-bound, runs in the warm process pool
+    BLOCKING = "blocking"  # Synchronous disk/system calls, runs on a thread pool
+
+def execution_class(kind: ExecutionClass):
+    """Declare the execution class of a task function"""
+    def decorator(func):
+        func.execution_class = kind
+        return func
+    return decorator
+
+def get_execution_class(func: Callable) -> ExecutionClass:
+    """Declared execution class, BLOCKING for undeclared functions"""
+    return getattr(func, 'execution_class', ExecutionClass.BLOCKING)
+
+# Task function implementations. CPU-class functions are shipped to pool
+# processes, so they live at module level (picklable by reference) and only
+# get the task.
+@execution_class(ExecutionClass.CPU)
+def _content_generation_task(task: Task) -> Dict:
+    """Content generation task"""
+    logger.info(f"Generating content for task {task.id}")
+    
+    # Simulate content generation with controlled resource usage
+    time.sleep(random.uniform(1, 3))  # Simulated work
+    
+    return {
+        'content': f"Generated content for {task.kwargs.get('topic', 'finance')}",
+        'word_count': random.randint(100, 500),
+        'timestamp': datetime.now().isoformat()
+    }
+
+@execution_class(ExecutionClass.IO)
+async def _market_data_task(task: Task) -> Dict:
+    """Market data fetching task"""
+    logger.info(f"Fetching market data for task {task.id}")
+    
+    # Simulate API call with rate limiting
+    await asyncio.sleep(random.uniform(0.5, 2.0))
+    
+    return {
+        'symbol': task.kwargs.get('symbol', 'NIFTY'),
+        'price': random.uniform(18000, 19000),
+        'change': random.uniform(-100, 100),
+        'timestamp': datetime.now().isoformat()
+    }
+
+@execution_class(ExecutionClass.IO)
+async def _telegram_post_task(task: Task) -> Dict:
+    """Telegram posting task"""
+    logger.info(f"Posting to Telegram for task {task.id}")
+    
+    # Simulate posting with network delay
+    await asyncio.sleep(random.uniform(1, 4))
+    
+    return {
+        'channel': task.kwargs.get('channel', '@AIFinanceNews2024'),
+        'message_id': random.randint(1000, 9999),
+        'status': 'posted',
+        'timestamp': datetime.now().isoformat()
+    }
+
+@execution_class(ExecutionClass.CPU)
+def _analytics_task(task: Task) -> Dict:
+    """Analytics update task"""
+    logger.info(f"Updating analytics for task {task.id}")
+    
+    time.sleep(random.uniform(0.5, 1.5))
+    
+    return {
+        'metrics_updated': ['views', 'subscribers', 'engagement'],
+        'timestamp': datetime.now().isoformat()
+    }
+
+@execution_class(ExecutionClass.BLOCKING)
+def _database_cleanup_task(task: Task) -> Dict:
+    """Database cleanup task"""
+    logger.info(f"Running database cleanup for task {task.id}")
+    
+    # Simulate cleanup
+    time.sleep(random.uniform(2, 5))
+    
+    return {
+        'tables_cleaned': ['old_sessions', 'temp_data'],
+        'records_deleted': random.randint(10, 100),
+        'timestamp': datetime.now().isoformat()
+    }
+
+def _init_cpu_worker(niceness: int):
+    """Pool process setup: leave shutdown to the manager and yield to the I/O loop"""
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    signal.signal(signal.SIGTERM, signal.SIG_DFL)
+    if niceness:
+        os.nice(niceness)
+
+def _warm_up(delay: float) -> int:
+    """No-op pool task; the delay keeps each call on its own process"""
+    time.sleep(delay)
+    return os.getpid()
+
+async def _run_io(func: Callable, task: Task) -> Any:
+    """Await an IO-class function, pushing plain sync functions to the loop's executor"""
+    if asyncio.iscoroutinefunction(func):
+        return await func(task)
+    return await asyncio.get_running_loop().run_in_executor(None, func, task)
+
+class ExecutionRouter:
+    """
+    Runs task functions by execution class: CPU work on a warm ProcessPoolExecutor,
+    IO coroutines on one asyncio loop, blocking calls on a thread pool. Each class
+    has its own in-flight limit, so a burst of CPU work cannot delay posts.
+    """
+    
+    def __init__(self, cpu_workers: int = None, io_concurrency: int = 64, blocking_threads: int = 4,
+                 cpu_backlog: int = 2, cpu_niceness: int = 5):
+        self.cpu_workers = cpu_workers or max(1, (os.cpu_count() or 2) - 1)
+        self.cpu_backlog = cpu_backlog
+        self.blocking_threads = blocking_threads
+        self.cpu_niceness = cpu_niceness
+        self.limits = {
+            ExecutionClass.CPU: self.cpu_workers * cpu_backlog,  # Queued in the pool, not in Redis
+            ExecutionClass.IO: io_concurrency,
+            ExecutionClass.BLOCKING: blocking_threads,
+        }
+        
+        self._lock = threading.Lock()
+        self._capacity = threading.Condition(self._lock)
+        self._pool_lock = threading.Lock()  # One dispatcher restarts a broken pool
+        self._in_flight = {kind: 0 for kind in ExecutionClass}
+        self._completed = {kind: 0 for kind in ExecutionClass}
+        
+        self.process_pool: Optional[ProcessPoolExecutor] = None
+        self.thread_pool: Optional[ThreadPoolExecutor] = None
+        self.loop: Optional[asyncio.AbstractEventLoop] = None
+        self._loop_thread: Optional[threading.Thread] = None
+    
+    def start(self):
+        """Start the pools and the IO loop; pool processes are spawned up front"""
+        if self.process_pool is not None:
+            return
+        
+        self._start_process_pool()
+        self.thread_pool = ThreadPoolExecutor(max_workers=self.blocking_threads, thread_name_prefix="task-blocking")
+        self.loop = asyncio.new_event_loop()
+        self._loop_thread = threading.Thread(target=self._run_loop, name="task-io-loop", daemon=True)
+        self._loop_thread.start()
+        
+        logger.info(f"Execution router started: {self.cpu_workers} CPU processes, "
+                    f"{self.limits[ExecutionClass.IO]} IO slots, {self.blocking_threads} blocking threads")
+    
+    def _start_process_pool(self):
+        # Spawned, not forked: a restart happens while dispatcher and loop threads
+        # hold locks that a forked child would inherit in their held state
+        self.process_pool = ProcessPoolExecutor(
+            max_workers=self.cpu_workers, mp_context=mp.get_context('spawn'),
+            initializer=_init_cpu_worker, initargs=(self.cpu_niceness,)
+        )
+        # Start and import now so the first CPU task does not pay for it
+        pids = set(self.process_pool.map(_warm_up, [0.05] * self.cpu_workers))
+        logger.info(f"Warmed {len(pids)} CPU worker processes")
+    
+    def _restart_process_pool(self, broken: ProcessPoolExecutor):
+        """Replace a broken pool, unless another dispatcher already has"""
+        with self._pool_lock:
+            if self.process_pool is not broken:
+                return
+            logger.error("CPU process pool broke, restarting it")
+            broken.shutdown(wait=False)
+            self._start_process_pool()
+    
+    def resize(self, cpu_workers: int):
+        """
+        Run CPU work on cpu_workers processes: a warm pool of the new size replaces
+        the current one, and calls already in the old pool finish there
+        """
+        cpu_workers = max(1, cpu_workers)
+        with self._pool_lock:
+            if self.process_pool is None or cpu_workers == self.cpu_workers:
+                return
+            old = self.process_pool
+            self.cpu_workers = cpu_workers
+            self._start_process_pool()
+            old.shutdown(wait=False)
+        with self._capacity:
+            self.limits[ExecutionClass.CPU] = cpu_workers * self.cpu_backlog
+            self._capacity.notify_all()
+        logger.info(f"Resized CPU pool to {cpu_workers} processes")
+    
+    def _run_loop(self):
+        asyncio.set_event_loop(self.loop)
+        self.loop.run_forever()
+    
+    def try_submit(self, func: Callable, task: Task) -> Optional[Future]:
+        """Submit func(task) to its execution class, or return None if that class is full"""
+        kind = get_execution_class(func)
+        with self._lock:
+            if self._in_flight[kind] >= self.limits[kind]:
+                return None
+            self._in_flight[kind] += 1
+        
+        try:
+            if kind is ExecutionClass.CPU:
+                pool = self.process_pool
+                try:
+                    future = pool.submit(func, task)
+                except BrokenProcessPool:
+                    self._restart_process_pool(pool)
+                    future = self.process_pool.submit(func, task)
+                except RuntimeError:
+                    if pool is self.process_pool:
+                        raise
+                    future = self.process_pool.submit(func, task)  # Resized meanwhile
+            elif kind is ExecutionClass.IO:
+                future = asyncio.run_coroutine_threadsafe(_run_io(func, task), self.loop)
+            else:
+                future = self.thread_pool.submit(func, task)
+        except Exception:
+            self._release(kind)
+            raise
+        
+        future.add_done_callback(lambda _: self._release(kind))
+        return future
+    
+    def _release(self, kind: ExecutionClass):
+        with self._capacity:
+            self._in_flight[kind] -= 1
+            self._completed[kind] += 1
+            self._capacity.notify_all()
+    
+    def wait_for_capacity(self, timeout: float):
+        """Block until any submitted call finishes (or timeout)"""
+        with self._capacity:
+            self._capacity.wait(timeout)
+    
+    def in_flight(self) -> int:
+        with self._lock:
+            return sum(self._in_flight.values())
+    
+    def get_stats(self) -> Dict[str, Dict[str, int]]:
+        """In-flight, limit and completed count per execution class"""
+        with self._lock:
+            return {
+                kind.value: {
+                    'in_flight': self._in_flight[kind],
+                    'limit': self.limits[kind],
+                    'completed': self._completed[kind],
+                }
+                for kind in ExecutionClass
+            }
+    
+    def shutdown(self, wait: bool = True):
+        """Stop accepting work; with wait, let in-flight calls finish first"""
+        if self.process_pool is None:
+            return
+        
+        self.thread_pool.shutdown(wait=wait)
+        self.process_pool.shutdown(wait=wait)
+        
+        if wait:
+            deadline = time.time() + 30
+            while self.in_flight() and time.time() < deadline:
+                self.wait_for_capacity(0.5)
+        self.loop.call_soon_threadsafe(self.loop.stop)
+        self._loop_thread.join(timeout=5)
+        self.loop.close()
+        
+        self.process_pool = None
+        logger.info("Execution router stopped")
+
 class Worker:
-    """Individual worker process for executing tasks"""
+    """
+    Pulls tasks from the queue and executes them. Without a router tasks run one
+    at a time in this process; with a router the worker only dispatches and
+    tasks run concurrently according to their execution class.
+    """
     
-    def __init__(self, worker_id: str, task_queue: TaskQueue, resource_monitor: ResourceMonitor):
+    def __init__(self, worker_id: str, task_queue: TaskQueue, resource_monitor: ResourceMonitor,
+                 prefetch: int = 1, router: ExecutionRouter = None):
         self.worker_id = worker_id
         self.task_queue = task_queue
         self.resource_monitor = resource_monitor
+        self.router = router
+        # Tasks pulled per dequeue round trip. Buffered tasks are held out of the queue,
+        # so a CRITICAL task queued meanwhile waits behind them: keep this small.
+        self.prefetch = prefetch
+        self.dequeue_timeout = 2  # Seconds blocked per dequeue, bounds shutdown latency
+        self.max_deferred = 64  # Tasks held back while their execution class is full
+        self._prefetched = deque()
+        self._deferred = deque()
+        self._stats_lock = threading.Lock()
         self.is_running = False
         self.current_task = None
         self.tasks_completed = 0
         self.tasks_failed = 0
         self.start_time = time.time()
         
-        # Task function registry
+        # Task function registry; execution class comes from each function's declaration
         self.task_functions = {
-            'content_generation': self._content_generation_task,
-            'market_data_fetch': self._market_data_task,
-            'telegram_post': self._telegram_post_task,
-            'analytics_update': self._analytics_task,
+            'content_generation': _content_generation_task,
+            'market_data_fetch': _market_data_task,
+            'telegram_post': _telegram_post_task,
+            'analytics_update': _analytics_task,
             'system_health_check': self._health_check_task,
-            'database_cleanup': self._database_cleanup_task,
+            'database_cleanup': _database_cleanup_task,
         }
     
     def run(self):
         """Main worker loop"""
         self.is_running = True
-        logger.info(f"Worker {self.worker_id} started")
+        logger.info(f"Worker {self.worker_id} started ({'routed' if self.router else 'inline'})")
         
         while self.is_running:
             try:
@@ -328,23 +1154,23 @@ class Worker:
                     time.sleep(5)
                     continue
                 
-                # Get next task
-                task = self.task_queue.get(timeout=10)
-                if not task:
+                if self.router:
+                    self._dispatch_round()
+                    continue
+                
+                # Get next task, refilling the local prefetch buffer in one round trip.
+                # When the queue is empty this blocks in Redis instead of polling.
+                if not self._prefetched:
+                    self._prefetched.extend(self.task_queue.get_batch(self.prefetch, timeout=self.dequeue_timeout))
+                if not self._prefetched:
                     continue
+                task = self._prefetched.popleft()
                 
                 self.current_task = task
                 logger.info(f"Worker {self.worker_id} executing task {task.id}: {task.name}")
                 
                 # Execute task
-                success = self._execute_task(task)
-                
-                if success:
-                    self.tasks_completed += 1
-                    logger.info(f"Worker {self.worker_id} completed task {task.id}")
-                else:
-                    self.tasks_failed += 1
-                    logger.error(f"Worker {self.worker_id} failed task {task.id}")
+                self._count_outcome(task, self._execute_task(task))
                 
                 self.current_task = None
                 
@@ -358,8 +1184,81 @@ class Worker:
                 logger.error(f"Worker {self.worker_id} error: {e}")
                 time.sleep(1)
         
+        # Hand back anything prefetched or deferred but not started
+        for pending in (self._deferred, self._prefetched):
+            while pending:
+                self.task_queue.put(pending.popleft())
+        
         logger.info(f"Worker {self.worker_id} stopped. Completed: {self.tasks_completed}, Failed: {self.tasks_failed}")
     
+    def _dispatch_round(self):
+        """Hand queued tasks to the router without waiting for them to finish"""
+        # Tasks whose class was full go first, in arrival order
+        for _ in range(len(self._deferred)):
+            task = self._deferred.popleft()
+            if not self._dispatch(task):
+                self._deferred.append(task)
+        
+        if len(self._deferred) >= self.max_deferred:
+            self.router.wait_for_capacity(self.dequeue_timeout)
+            return
+        
+        # Only block in Redis when nothing is waiting on router capacity
+        timeout = 0 if self._deferred else self.dequeue_timeout
+        tasks = self.task_queue.get_batch(self.prefetch, timeout=timeout)
+        for task in tasks:
+            if not self._dispatch(task):
+                self._deferred.append(task)
+        
+        if not tasks and self._deferred:
+            self.router.wait_for_capacity(self.dequeue_timeout)
+    
+    def _dispatch(self, task: Task) -> bool:
+        """Submit one task to the router; False if its execution class is full"""
+        func = self.task_functions.get(task.function)
+        if func is None:
+            self._count_outcome(task, self._execute_task(task))
+            return True
+        
+        start_time = time.time()
+        future = self.router.try_submit(func, task)
+        if future is None:
+            return False
+        
+        task.status = TaskStatus.RUNNING
+        task.worker_id = self.worker_id
+        logger.info(f"Worker {self.worker_id} dispatched task {task.id}: {task.name} "
+                    f"({get_execution_class(func).value})")
+        future.add_done_callback(lambda done: self._finish_dispatched(task, start_time, done))
+        return True
+    
+    def _finish_dispatched(self, task: Task, start_time: float, future: Future):
+        """Completion callback for routed tasks; runs on the executor's thread"""
+        try:
+            try:
+                result = future.result()
+            except (Exception, CancelledError) as e:
+                self._fail_task(task, e)
+                self._count_outcome(task, False)
+            else:
+                self._complete_task(task, result)
+                self._count_outcome(task, True)
+        except Exception as e:
+            logger.error(f"Worker {self.worker_id} could not finish task {task.id}: {e}")
+        finally:
+            self._record_execution(task, start_time)
+    
+    def _count_outcome(self, task: Task, success: bool):
+        with self._stats_lock:
+            if success:
+                self.tasks_completed += 1
+            else:
+                self.tasks_failed += 1
+        if success:
+            logger.info(f"Worker {self.worker_id} completed task {task.id}")
+        else:
+            logger.error(f"Worker {self.worker_id} failed task {task.id}")
+    
     def _execute_task(self, task: Task) -> bool:
         """Execute a single task"""
         start_time = time.time()
@@ -386,13 +1285,11 @@ class Worker:
             
             try:
                 # Execute the task function
-                result = func(task)
-                task.result = result
-                task.status = TaskStatus.COMPLETED
-                
-                # Store result in queue
-                self.task_queue.set_result(task.id, result)
-                
+                if asyncio.iscoroutinefunction(func):
+                    result = asyncio.run(func(task))
+                else:
+                    result = func(task)
+                self._complete_task(task, result)
                 return True
                 
             finally:
@@ -400,78 +1297,41 @@ class Worker:
                 os.setpriority(os.PRIO_PROCESS, 0, original_priority)
                 
         except Exception as e:
-            task.error = str(e)
-            task.status = TaskStatus.FAILED
-            logger.error(f"Task {task.id} failed: {e}")
-            
-            # Retry logic
-            if task.retry_count < task.max_retries:
-                task.retry_count += 1
-                task.status = TaskStatus.RETRY
-                
-                # Add back to queue with delay
-                task.scheduled_time = datetime.now() + timedelta(seconds=30 * task.retry_count)
-                self.task_queue.put(task)
-                logger.info(f"Task {task.id} scheduled for retry {task.retry_count}/{task.max_retries}")
-            
+            self._fail_task(task, e)
             return False
         
         finally:
-            task.execution_time = time.time() - start_time
+            self._record_execution(task, start_time)
     
-    # Task function implementations
-    def _content_generation_task(self, task: Task) -> Dict:
-        """Content generation task"""
-        logger.info(f"Generating content for task {task.id}")
-        
-        # Simulate content generation with controlled resource usage
-        time.sleep(random.uniform(1, 3))  # Simulated work
+    def _complete_task(self, task: Task, result: Any):
+        task.result = result
+        task.status = TaskStatus.COMPLETED
         
-        return {
-            'content': f"Generated content for {task.kwargs.get('topic', 'finance')}",
-            'word_count': random.randint(100, 500),
-            'timestamp': datetime.now().isoformat()
-        }
+        # Store result in queue
+        self.task_queue.set_result(task.id, result)
     
-    def _market_data_task(self, task: Task) -> Dict:
-        """Market data fetching task"""
-        logger.info(f"Fetching market data for task {task.id}")
-        
-        # Simulate API call with rate limiting
-        time.sleep(random.uniform(0.5, 2.0))
-        
-        return {
-            'symbol': task.kwargs.get('symbol', 'NIFTY'),
-            'price': random.uniform(18000, 19000),
-            'change': random.uniform(-100, 100),
-            'timestamp': datetime.now().isoformat()
-        }
-    
-    def _telegram_post_task(self, task: Task) -> Dict:
-        """Telegram posting task"""
-        logger.info(f"Posting to Telegram for task {task.id}")
-        
-        # Simulate posting with network delay
-        time.sleep(random.uniform(1, 4))
-        
-        return {
-            'channel': task.kwargs.get('channel', '@AIFinanceNews2024'),
-            'message_id': random.randint(1000, 9999),
-            'status': 'posted',
-            'timestamp': datetime.now().isoformat()
-        }
+    def _fail_task(self, task: Task, error: BaseException):
+        task.error = str(error)
+        task.status = TaskStatus.FAILED
+        logger.error(f"Task {task.id} failed: {error}")
+        
+        # Retry logic
+        if task.retry_count < task.max_retries:
+            task.retry_count += 1
+            task.status = TaskStatus.RETRY
+            
+            # Add back to queue with delay
+            task.scheduled_time = datetime.now() + timedelta(seconds=30 * task.retry_count)
+            self.task_queue.put(task)
+            logger.info(f"Task {task.id} scheduled for retry {task.retry_count}/{task.max_retries}")
     
-    def _analytics_task(self, task: Task) -> Dict:
-        """Analytics update task"""
-        logger.info(f"Updating analytics for task {task.id}")
-        
-        time.sleep(random.uniform(0.5, 1.5))
-        
-        return {
-            'metrics_updated': ['views', 'subscribers', 'engagement'],
-            'timestamp': datetime.now().isoformat()
-        }
+    def _record_execution(self, task: Task, start_time: float):
+        task.execution_time = time.time() - start_time
+        self.task_queue.record_service_time(task.function, task.execution_time)
+        # Done either way (a retry was already queued again), so release the lease
+        self.task_queue.ack(task.id)
     
+    @execution_class(ExecutionClass.BLOCKING)
     def _health_check_task(self, task: Task) -> Dict:
         """System health check task"""
         logger.info(f"Running health check for task {task.id}")
@@ -484,32 +1344,171 @@ class Worker:
             'timestamp': datetime.now().isoformat()
         }
     
-    def _database_cleanup_task(self, task: Task) -> Dict:
-        """Database cleanup task"""
-        logger.info(f"Running database cleanup for task {task.id}")
-        
-        # Simulate cleanup
-        time.sleep(random.uniform(2, 5))
-        
-        return {
-            'tables_cleaned': ['old_sessions', 'temp_data'],
-            'records_deleted': random.randint(10, 100),
-            'timestamp': datetime.now().isoformat()
-        }
-    
     def stop(self):
         """Stop worker gracefully"""
         self.is_running = False
 
+@dataclass
+class ScalingObservation:
+    """Everything an autoscaler policy sees at one evaluation"""
+    current_workers: int
+    depth_by_priority: Dict[TaskPriority, int]
+    service_times: Dict[str, LatencyHistogram]
+    cpu_percent: float = 0.0
+    memory_percent: float = 0.0
+    recommended_workers: Optional[int] = None
+    timestamp: float = field(default_factory=time.time)
+
+class ResourceAutoscaler:
+    """Original behaviour: follow ResourceMonitor.get_recommended_worker_count()"""
+    
+    def __init__(self, min_workers: int = 1, max_workers: int = 12, evaluation_interval: float = 30, **_):
+        self.min_workers = min_workers
+        self.max_workers = max_workers
+        self.evaluation_interval = evaluation_interval
+    
+    def desired_workers(self, observation: ScalingObservation) -> int:
+        target = observation.recommended_workers or observation.current_workers
+        return max(self.min_workers, min(self.max_workers, target))
+
+class QueueLatencyAutoscaler:
+    """
+    Sizes the pool from backlog per priority, observed service times and throughput,
+    capped by CPU/memory pressure. Hysteresis (streaks, a dead band and a scale-down
+    cooldown) keeps it from flapping around the boundary.
+    
+    desired = completions/s * mean service / target_utilization      (steady-state load)
+            + sum over priorities of depth * mean service / drain target  (backlog)
+    """
+    
+    def __init__(self, min_workers: int = 1, max_workers: int = 8, evaluation_interval: float = 30,
+                 target_utilization: float = 0.75, target_drain_seconds: Optional[Dict[str, float]] = None,
+                 default_service_seconds: float = 2.0, scale_up_after: int = 1, scale_down_after: int = 3,
+                 scale_down_band: float = 0.25, max_step_up: int = 4, max_step_down: int = 1,
+                 cooldown_seconds: float = 60, cpu_threshold: float = 90.0, memory_threshold: float = 85.0, **_):
+        self.min_workers = min_workers
+        self.max_workers = max_workers
+        self.evaluation_interval = evaluation_interval
+        self.target_utilization = target_utilization
+        drain = {"CRITICAL": 5, "HIGH": 30, "MEDIUM": 120, "LOW": 300, "BATCH": 900}
+        drain.update(target_drain_seconds or {})
+        self.target_drain_seconds = {TaskPriority[name]: float(value) for name, value in drain.items()}
+        self.default_service_seconds = default_service_seconds
+        self.scale_up_after = scale_up_after
+        self.scale_down_after = scale_down_after
+        self.scale_down_band = scale_down_band
+        self.max_step_up = max_step_up
+        self.max_step_down = max_step_down
+        self.cooldown_seconds = cooldown_seconds
+        self.cpu_threshold = cpu_threshold
+        self.memory_threshold = memory_threshold
+        
+        self._up_streak = 0
+        self._down_streak = 0
+        self._last_change = 0.0
+        self._last_completed = None
+        self._last_timestamp = None
+    
+    def _load_estimate(self, observation: ScalingObservation) -> float:
+        """Workers needed for steady load plus draining the backlog within target"""
+        completed = sum(h.count for h in observation.service_times.values())
+        total_seconds = sum(h.total for h in observation.service_times.values())
+        mean_service = total_seconds / completed if completed else self.default_service_seconds
+        
+        # Throughput since the previous evaluation (histograms are cumulative)
+        busy = 0.0
+        if self._last_completed is not None and observation.timestamp > self._last_timestamp:
+            rate = max(0, completed - self._last_completed) / (observation.timestamp - self._last_timestamp)
+            busy = rate * mean_service / self.target_utilization
+        self._last_completed = completed
+        self._last_timestamp = observation.timestamp
+        
+        backlog = sum(
+            depth * mean_service / self.target_drain_seconds[priority]
+            for priority, depth in observation.depth_by_priority.items()
+        )
+        return busy + backlog
+    
+    def desired_workers(self, observation: ScalingObservation) -> int:
+        current = observation.current_workers
+        desired = max(self.min_workers, min(self.max_workers, math.ceil(self._load_estimate(observation))))
+        pressured = (observation.cpu_percent >= self.cpu_threshold or
+                     observation.memory_percent >= self.memory_threshold)
+        critical_backlog = observation.depth_by_priority.get(TaskPriority.CRITICAL, 0) > 0
+        target = current
+        
+        if desired > current and not pressured:
+            self._up_streak += 1
+            self._down_streak = 0
+            if self._up_streak >= self.scale_up_after or critical_backlog:
+                target = min(desired, current + self.max_step_up)
+        elif desired < current * (1 - self.scale_down_band) or (pressured and current > self.min_workers):
+            self._down_streak += 1
+            self._up_streak = 0
+            cooled = observation.timestamp - self._last_change >= self.cooldown_seconds
+            if self._down_streak >= self.scale_down_after and cooled:
+                target = max(min(desired, current - 1), current - self.max_step_down)
+        else:
+            # Inside the dead band - hold
+            self._up_streak = 0
+            self._down_streak = 0
+        
+        target = max(self.min_workers, min(self.max_workers, target))
+        if target != current:
+            self._last_change = observation.timestamp
+            self._up_streak = 0
+            self._down_streak = 0
+        return target
+
+# Policies selectable via "autoscaler.policy" in config/task_manager_config.json.
+# A "module:ClassName" value loads a custom policy with the same interface.
+AUTOSCALER_POLICIES = {
+    'resource': ResourceAutoscaler,
+    'queue_latency': QueueLatencyAutoscaler,
+}
+
+def build_autoscaler(config: Dict):
+    """Instantiate the autoscaler policy described by the task manager config"""
+    workers = config.get('workers', {})
+    resources = config.get('resources', {})
+    options = {
+        'min_workers': workers.get('min_count', 1),
+        'max_workers': workers.get('max_count', 8),
+        'cpu_threshold': resources.get('cpu_threshold', 90.0),
+        'memory_threshold': resources.get('memory_threshold', 85.0),
+    }
+    options.update(config.get('autoscaler', {}))
+    policy = options.pop('policy', 'queue_latency')
+    
+    if ':' in policy:
+        module_name, class_name = policy.split(':', 1)
+        policy_class = getattr(importlib.import_module(module_name), class_name)
+    else:
+        policy_class = AUTOSCALER_POLICIES[policy]
+    
+    return policy_class(**options)
+
 class DistributedTaskManager:
     """Main distributed task management system"""
     
-    def __init__(self, redis_host='localhost', redis_port=6379, redis_db=0):
+    def __init__(self, redis_host='localhost', redis_port=6379, redis_db=0, config_path: str = None):
+        self.config = self._load_config(config_path)
         self.resource_monitor = ResourceMonitor()
         self.task_queue = TaskQueue(redis_host, redis_port, redis_db)
+        self.autoscaler = build_autoscaler(self.config)
+        
+        # "process": one inline worker per process, sized by the autoscaler.
+        # "routed": dispatcher threads feeding an ExecutionRouter (CPU pool + IO loop);
+        # the autoscaler sizes its CPU pool, up to workers.router.cpu_workers processes.
+        workers_config = self.config.get('workers', {})
+        self.execution_mode = workers_config.get('execution_mode', 'process')
+        self.router_config = workers_config.get('router', {})
+        self.router: Optional[ExecutionRouter] = None
         
         self.workers = {}
         self.worker_processes = {}
+        self.dispatcher_threads = {}
+        self._worker_seq = 0
         self.is_running = False
         
         # Statistics
@@ -526,6 +1525,18 @@ class DistributedTaskManager:
         signal.signal(signal.SIGINT, self._signal_handler)
         signal.signal(signal.SIGTERM, self._signal_handler)
     
+    @staticmethod
+    def _load_config(config_path: str = None) -> Dict:
+        """Load config/task_manager_config.json (empty config if missing)"""
+        if config_path is None:
+            config_path = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'config', 'task_manager_config.json')
+        try:
+            with open(config_path) as f:
+                return json.load(f)
+        except FileNotFoundError:
+            logger.warning(f"Task manager config not found at {config_path}, using defaults")
+            return {}
+    
     def _setup_database(self):
         """Setup SQLite database for task persistence"""
         os.makedirs(os.path.dirname(self.db_path), exist_ok=True)
@@ -558,10 +1569,18 @@ class DistributedTaskManager:
                 memory_percent REAL,
                 active_workers INTEGER,
                 queue_size INTEGER,
-                tasks_per_minute REAL
+                tasks_per_minute REAL,
+                wakeup_p50_ms REAL,
+                wakeup_p99_ms REAL
             )
         """)
         
+        # Databases created before the wakeup latency metric
+        existing = {row[1] for row in cursor.execute("PRAGMA table_info(system_metrics)")}
+        for column in ('wakeup_p50_ms', 'wakeup_p99_ms'):
+            if column not in existing:
+                cursor.execute(f"ALTER TABLE system_metrics ADD COLUMN {column} REAL")
+        
         conn.commit()
         conn.close()
     
@@ -578,19 +1597,25 @@ class DistributedTaskManager:
         
         self.is_running = True
         
-        # Determine optimal number of workers
-        if num_workers is None:
-            num_workers = self.resource_monitor.get_recommended_worker_count()
-        
-        logger.info(f"Starting distributed task manager with {num_workers} workers")
+        if self.execution_mode == 'routed':
+            num_workers = num_workers or self.router_config.get('dispatchers', 1)
+            logger.info(f"Starting distributed task manager with {num_workers} dispatchers "
+                        f"(routed execution, autoscaled CPU pool)")
+            self._start_router(num_workers)
+        else:
+            # Determine optimal number of workers
+            if num_workers is None:
+                num_workers = self.resource_monitor.get_recommended_worker_count()
+            logger.info(f"Starting distributed task manager with {num_workers} workers")
         
         # Start resource monitoring thread
         self.monitor_thread = threading.Thread(target=self._monitor_resources, daemon=True)
         self.monitor_thread.start()
         
         # Start workers
-        for i in range(num_workers):
-            self._start_worker(f"worker-{i}")
+        if self.router is None:
+            for _ in range(num_workers):
+                self._start_worker(self._next_worker_id())
         
         # Start metrics collection
         self.metrics_thread = threading.Thread(target=self._collect_metrics, daemon=True)
@@ -598,11 +1623,20 @@ class DistributedTaskManager:
         
         logger.info(f"Task manager started successfully with {len(self.workers)} workers")
     
+    def _next_worker_id(self) -> str:
+        """Unique worker id, so ids are never reused after scaling down"""
+        worker_id = f"worker-{self._worker_seq}"
+        self._worker_seq += 1
+        return worker_id
+    
     def _start_worker(self, worker_id: str):
         """Start a single worker process"""
         try:
             def worker_target():
                 worker = Worker(worker_id, self.task_queue, self.resource_monitor)
+                # Finish the current task and hand back prefetched ones when scaled down
+                signal.signal(signal.SIGTERM, lambda signum, frame: worker.stop())
+                signal.signal(signal.SIGINT, signal.SIG_IGN)
                 self.workers[worker_id] = worker
                 worker.run()
             
@@ -615,65 +1649,133 @@ class DistributedTaskManager:
         except Exception as e:
             logger.error(f"Failed to start worker {worker_id}: {e}")
     
+    def _start_router(self, num_dispatchers: int):
+        """Start the execution router and the dispatcher threads that feed it"""
+        self.router = ExecutionRouter(
+            cpu_workers=self.router_config.get('cpu_workers'),
+            io_concurrency=self.router_config.get('io_concurrency', 64),
+            blocking_threads=self.router_config.get('blocking_threads', 4),
+            cpu_backlog=self.router_config.get('cpu_backlog', 2),
+            cpu_niceness=self.router_config.get('cpu_niceness', 5)
+        )
+        self.router.start()
+        
+        for _ in range(num_dispatchers):
+            worker_id = self._next_worker_id()
+            worker = Worker(worker_id, self.task_queue, self.resource_monitor, router=self.router)
+            thread = threading.Thread(target=worker.run, name=worker_id, daemon=True)
+            thread.start()
+            self.workers[worker_id] = worker
+            self.dispatcher_threads[worker_id] = thread
+            logger.info(f"Started dispatcher {worker_id}")
+    
+    def _worker_health(self) -> Tuple[int, int]:
+        """(alive, dead) across worker processes and dispatcher threads"""
+        runners = list(self.worker_processes.values()) + list(self.dispatcher_threads.values())
+        alive = sum(1 for runner in runners if runner.is_alive())
+        return alive, len(runners) - alive
+    
     def _monitor_resources(self):
-        """Monitor system resources and adjust workers"""
+        """Monitor system resources and let the autoscaler adjust workers"""
         while self.is_running:
             try:
-                # Log system stats every 30 seconds
+                # Log system stats every evaluation
                 self.resource_monitor.log_stats()
+                stats = self.resource_monitor.get_system_stats()
                 
-                # Check if we need to adjust worker count
-                current_worker_count = len(self.worker_processes)
-                recommended_count = self.resource_monitor.get_recommended_worker_count()
-                
-                if recommended_count < current_worker_count:
-                    # Scale down - stop some workers
-                    excess_workers = current_worker_count - recommended_count
-                    workers_to_stop = list(self.worker_processes.keys())[:excess_workers]
-                    
-                    for worker_id in workers_to_stop:
-                        self._stop_worker(worker_id)
-                        logger.info(f"Scaled down: stopped worker {worker_id}")
+                # Tasks whose worker died mid-task (or mid-dequeue) go back in the queue
+                self.task_queue.requeue_expired()
+                self.task_queue.requeue_orphans()
                 
-                elif recommended_count > current_worker_count and recommended_count <= 12:
-                    # Scale up - start more workers
-                    for i in range(current_worker_count, recommended_count):
-                        new_worker_id = f"worker-{i}"
-                        self._start_worker(new_worker_id)
-                        logger.info(f"Scaled up: started worker {new_worker_id}")
+                observation = ScalingObservation(
+                    current_workers=self._current_workers(),
+                    depth_by_priority=self.task_queue.get_depth_by_priority(),
+                    service_times=self._service_times(),
+                    cpu_percent=stats.get('cpu_percent', 0),
+                    memory_percent=stats.get('memory_percent', 0),
+                    recommended_workers=self.resource_monitor.get_recommended_worker_count(stats)
+                )
+                self._scale_to(self.autoscaler.desired_workers(observation))
+                if self.router:
+                    logger.debug(f"Router: {self.router.get_stats()}")
                 
-                time.sleep(30)  # Check every 30 seconds
+                time.sleep(self.autoscaler.evaluation_interval)
                 
             except Exception as e:
                 logger.error(f"Error in resource monitoring: {e}")
                 time.sleep(10)
     
+    def _current_workers(self) -> int:
+        """What the autoscaler sizes: worker processes, or the router's CPU processes"""
+        return self.router.cpu_workers if self.router else len(self.worker_processes)
+    
+    def _service_times(self) -> Dict[str, LatencyHistogram]:
+        """Service histograms of the functions that occupy what the autoscaler sizes"""
+        histograms = self.task_queue.get_service_histograms()
+        if self.router is None:
+            return histograms
+        # IO coroutines share the event loop and do not hold a pool process
+        functions = next(iter(self.workers.values())).task_functions if self.workers else {}
+        return {name: histogram for name, histogram in histograms.items()
+                if name not in functions or get_execution_class(functions[name]) is not ExecutionClass.IO}
+    
+    def _scale_to(self, target: int):
+        """Start or stop workers (or router CPU processes) until target are running"""
+        if self.router:
+            # Dispatchers only dequeue and stay at workers.router.dispatchers; the
+            # configured (or CPU-count) pool size is the ceiling
+            ceiling = self.router_config.get('cpu_workers') or max(1, (os.cpu_count() or 2) - 1)
+            self.router.resize(min(target, ceiling))
+            return
+        
+        current_worker_count = len(self.worker_processes)
+        
+        if target < current_worker_count:
+            # Scale down - stop the most recently started workers
+            workers_to_stop = list(self.worker_processes.keys())[target:]
+            for worker_id in workers_to_stop:
+                self._stop_worker(worker_id)
+                logger.info(f"Scaled down: stopped worker {worker_id}")
+        
+        elif target > current_worker_count:
+            # Scale up - start more workers
+            for _ in range(target - current_worker_count):
+                new_worker_id = self._next_worker_id()
+                self._start_worker(new_worker_id)
+                logger.info(f"Scaled up: started worker {new_worker_id}")
+    
     def _collect_metrics(self):
         """Collect and store system metrics"""
         while self.is_running:
             try:
                 stats = self.resource_monitor.get_system_stats()
                 queue_size = self.task_queue.get_queue_size()
-                active_workers = len([p for p in self.worker_processes.values() if p.is_alive()])
+                active_workers, _ = self._worker_health()
                 
                 # Calculate tasks per minute
                 uptime_minutes = (time.time() - self.start_time) / 60
                 tasks_per_minute = self.total_tasks_completed / max(uptime_minutes, 1)
                 
+                # Time from enqueue to a blocked worker receiving the task
+                wakeup = self.task_queue.get_wakeup_stats()
+                
                 # Store metrics in database
                 conn = sqlite3.connect(self.db_path)
                 cursor = conn.cursor()
                 
                 cursor.execute("""
                     INSERT INTO system_metrics 
-                    (cpu_percent, memory_percent, active_workers, queue_size, tasks_per_minute)
-                    VALUES (?, ?, ?, ?, ?)
+                    (cpu_percent, memory_percent, active_workers, queue_size, tasks_per_minute,
+                     wakeup_p50_ms, wakeup_p99_ms)
+                    VALUES (?, ?, ?, ?, ?, ?, ?)
                 """, (
                     stats.get('cpu_percent', 0),
                     stats.get('memory_percent', 0),
                     active_workers,
                     queue_size,
-                    tasks_per_minute
+                    tasks_per_minute,
+                    wakeup['p50_ms'],
+                    wakeup['p99_ms']
                 ))
                 
                 conn.commit()
@@ -788,8 +1890,7 @@ class DistributedTaskManager:
         stats = self.resource_monitor.get_system_stats()
         
         # Worker statistics
-        active_workers = len([p for p in self.worker_processes.values() if p.is_alive()])
-        dead_workers = len([p for p in self.worker_processes.values() if not p.is_alive()])
+        active_workers, dead_workers = self._worker_health()
         
         # Task statistics
         queue_size = self.task_queue.get_queue_size()
@@ -835,7 +1936,9 @@ class DistributedTaskManager:
             'workers': {
                 'active': active_workers,
                 'dead': dead_workers,
-                'total': len(self.worker_processes)
+                'total': len(self.worker_processes) + len(self.dispatcher_threads),
+                'execution_mode': self.execution_mode,
+                'execution': self.router.get_stats() if self.router else {}
             },
             'tasks': {
                 'queue_size': queue_size,
@@ -844,7 +1947,8 @@ class DistributedTaskManager:
                 'total_failed': self.total_tasks_failed,
                 'tasks_per_minute': round(tasks_per_minute, 2),
                 'avg_execution_time': round(avg_execution_time, 2),
-                'recent_by_status': recent_tasks
+                'recent_by_status': recent_tasks,
+                'wakeup_latency': self.task_queue.get_wakeup_stats()
             },
             'performance': {
                 'success_rate': round((self.total_tasks_completed / max(self.total_tasks_queued, 1)) * 100, 2),
@@ -874,6 +1978,8 @@ class DistributedTaskManager:
         workers = stats['workers']
         print(f"\n👷 WORKERS:")
         print(f"   Active: {workers['active']} | Dead: {workers['dead']} | Total: {workers['total']}")
+        for kind, usage in workers['execution'].items():
+            print(f"   {kind.upper()}: {usage['in_flight']}/{usage['limit']} in flight | {usage['completed']} done")
         
         # Task Stats
         tasks = stats['tasks']
@@ -882,6 +1988,8 @@ class DistributedTaskManager:
         print(f"   Completed: {tasks['total_completed']} | Failed: {tasks['total_failed']}")
         print(f"   Rate: {tasks['tasks_per_minute']:.2f} tasks/min")
         print(f"   Avg Execution: {tasks['avg_execution_time']:.2f}s")
+        wakeup = tasks['wakeup_latency']
+        print(f"   Dequeue Wakeup: p50 {wakeup['p50_ms']:.2f}ms | p99 {wakeup['p99_ms']:.2f}ms ({wakeup['count']} samples)")
         
         if tasks['recent_by_status']:
             print(f"   Recent (1h): {tasks['recent_by_status']}")
@@ -907,6 +2015,15 @@ class DistributedTaskManager:
         for worker_id in list(self.worker_processes.keys()):
             self._stop_worker(worker_id)
         
+        # Dispatchers hand back undispatched tasks, then in-flight work drains
+        for worker_id, thread in list(self.dispatcher_threads.items()):
+            self.workers[worker_id].stop()
+            thread.join(timeout=self.workers[worker_id].dequeue_timeout + 5)
+        self.dispatcher_threads.clear()
+        if self.router:
+            self.router.shutdown()
+            self.router = None
+        
         # Wait for monitoring thread to stop
         if hasattr(self, 'monitor_thread'):
             self.monitor_thread.join(timeout=5)
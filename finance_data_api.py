@@ -13,10 +13,11 @@ Purpose: API service for real-time financial data distribution
 from flask import Flask, jsonify, request
 from flask_cors import CORS
 import json
-from datetime import datetime, timedelta
+from datetime import datetime
 import sqlite3
 import logging
 from realtime_finance_data import RealTimeFinanceData
+from snapshot_cache import SnapshotCache, thaw
 import threading
 import schedule
 import time
@@ -36,73 +37,94 @@ CORS(app)
 # Global finance data instance
 finance_data = RealTimeFinanceData()
 
-# Cache for storing latest data
-data_cache = {
-    'market_update': None,
-    'last_updated': None,
-    'sector_data': {},
-    'currency_rates': {},
-    'commodity_prices': {}
+# Seconds before a dataset is refreshed; stale data keeps being served meanwhile
+DATASET_TTLS = {
+    'market_update': 300,
+    'indian_indices': 60,
+    'international_indices': 120,
+    'currency_rates': 120,
+    'commodity_prices': 120,
 }
 
+def serialize_indices(indices):
+    return {k: {
+        'name': v.name,
+        'price': v.current_price,
+        'change': v.change,
+        'change_percent': v.change_percent,
+        'currency': v.currency,
+        'timestamp': v.timestamp.isoformat()
+    } for k, v in indices.items()}
+
+def serialize_currencies(currencies):
+    return {k: {
+        'base': v.base,
+        'target': v.target,
+        'rate': v.rate,
+        'change': v.change,
+        'change_percent': v.change_percent,
+        'timestamp': v.timestamp.isoformat()
+    } for k, v in currencies.items()}
+
+def serialize_commodities(commodities):
+    return {k: {
+        'name': k,
+        'price': v.price,
+        'unit': v.unit,
+        'change': v.change,
+        'change_percent': v.change_percent,
+        'currency': v.currency,
+        'timestamp': v.timestamp.isoformat()
+    } for k, v in commodities.items()}
+
+# Each loader reads RealTimeFinanceData's shared market snapshot, so loaders
+# refreshing together cost one upstream download, not one per dataset.
+market_cache = SnapshotCache(
+    loaders={
+        'market_update': lambda: {'content': finance_data.generate_market_update_content()},
+        'indian_indices': lambda: serialize_indices(finance_data.fetch_indian_indices()),
+        'international_indices': lambda: serialize_indices(finance_data.fetch_international_indices()),
+        'currency_rates': lambda: serialize_currencies(finance_data.fetch_currency_rates()),
+        'commodity_prices': lambda: serialize_commodities(finance_data.fetch_commodity_prices()),
+    },
+    ttls=DATASET_TTLS
+)
+
 def cache_data():
-    """Update cache with latest financial data"""
-    try:
-        logger.info("Updating financial data cache...")
-        
-        # Generate fresh market update
-        market_update = finance_data.generate_market_update_content()
-        
-        # Fetch all data types
-        indian_indices = finance_data.fetch_indian_indices()
-        international_indices = finance_data.fetch_international_indices()
-        currencies = finance_data.fetch_currency_rates()
-        commodities = finance_data.fetch_commodity_prices()
-        
-        # Update cache
-        data_cache['market_update'] = market_update
-        data_cache['last_updated'] = datetime.now().isoformat()
-        data_cache['indian_indices'] = {k: {
-            'name': v.name,
-            'price': v.current_price,
-            'change': v.change,
-            'change_percent': v.change_percent,
-            'currency': v.currency,
-            'timestamp': v.timestamp.isoformat()
-        } for k, v in indian_indices.items()}
-        
-        data_cache['international_indices'] = {k: {
-            'name': v.name,
-            'price': v.current_price,
-            'change': v.change,
-            'change_percent': v.change_percent,
-            'currency': v.currency,
-            'timestamp': v.timestamp.isoformat()
-        } for k, v in international_indices.items()}
-        
-        data_cache['currency_rates'] = {k: {
-            'base': v.base,
-            'target': v.target,
-            'rate': v.rate,
-            'change': v.change,
-            'change_percent': v.change_percent,
-            'timestamp': v.timestamp.isoformat()
-        } for k, v in currencies.items()}
-        
-        data_cache['commodity_prices'] = {k: {
-            'name': k,
-            'price': v.price,
-            'unit': v.unit,
-            'change': v.change,
-            'change_percent': v.change_percent,
-            'currency': v.currency,
-            'timestamp': v.timestamp.isoformat()
-        } for k, v in commodities.items()}
-        
-        logger.info("Financial data cache updated successfully")
-        
-    except Exception as e:
-        logger.error(f"Error updating cache: {e}")
+    """Refresh every cached dataset (scheduler / admin refresh)"""
+    logger.info("Updating financial data cache...")
+    market_cache.refresh_all(wait=True)
+    logger.info("Financial data cache updated successfully")
+
+def last_cache_update():
+    snapshot = market_cache.peek('market_update')
+    return snapshot.as_of if snapshot else None
+
+def cached_count(dataset: str) -> int:
+    snapshot = market_cache.peek(dataset)
+    return len(snapshot.data) if snapshot else 0
+
+def snapshot_response(dataset: str):
+    """JSON response for a cached dataset, honouring If-None-Match"""
+    snapshot = market_cache.get(dataset)
+    if snapshot is None:
+        return jsonify({'error': f'{dataset} is not available yet'}), 503
+    
+    if snapshot.matches(request.headers.get('If-None-Match')):
+        response = app.response_class(status=304)
+    else:
+        response = jsonify({
+            'status': 'success',
+            'data': thaw(snapshot.data),
+            'timestamp': datetime.now().isoformat(),
+            'as_of': snapshot.as_of,
+            'version': snapshot.version,
+            'count': len(snapshot.data)
+        })
+    
+    response.headers['ETag'] = snapshot.etag
+    response.headers['Cache-Control'] = f"max-age={max(0, int(market_cache.ttl(dataset) - snapshot.age))}"
+    return response
 
 def require_api_key(f):
     """Decorator to require API key for protected endpoints"""
@@ -120,7 +142,7 @@ def health_check():
     return jsonify({
         'status': 'healthy',
         'timestamp': datetime.now().isoformat(),
-        'last_data_update': data_cache.get('last_updated'),
+        'last_data_update': last_cache_update(),
         'service': 'Real-Time Financial Data API'
     })
 
@@ -128,19 +150,15 @@ def health_check():
 def get_market_update():
     """Get formatted market update content"""
     try:
-        # Check if cache is fresh (within 5 minutes)
-        if (data_cache['last_updated'] and 
-            datetime.fromisoformat(data_cache['last_updated']) > datetime.now() - timedelta(minutes=5)):
-            content = data_cache['market_update']
-        else:
-            # Generate fresh content
-            content = finance_data.generate_market_update_content()
-            cache_data()
+        snapshot = market_cache.get('market_update')
+        if snapshot is None:
+            return jsonify({'error': 'Market update is not available yet'}), 503
         
         return jsonify({
             'status': 'success',
-            'content': content,
+            'content': snapshot.data['content'],
             'timestamp': datetime.now().isoformat(),
+            'as_of': snapshot.as_of,
             'source': 'Real-Time Financial Data System'
         })
         
@@ -152,30 +170,7 @@ def get_market_update():
 def get_indian_indices():
     """Get Indian market indices data"""
     try:
-        if 'indian_indices' in data_cache and data_cache['indian_indices']:
-            return jsonify({
-                'status': 'success',
-                'data': data_cache['indian_indices'],
-                'timestamp': datetime.now().isoformat(),
-                'count': len(data_cache['indian_indices'])
-            })
-        else:
-            # Fetch fresh data
-            indices = finance_data.fetch_indian_indices()
-            return jsonify({
-                'status': 'success',
-                'data': {k: {
-                    'name': v.name,
-                    'price': v.current_price,
-                    'change': v.change,
-                    'change_percent': v.change_percent,
-                    'currency': v.currency,
-                    'timestamp': v.timestamp.isoformat()
-                } for k, v in indices.items()},
-                'timestamp': datetime.now().isoformat(),
-                'count': len(indices)
-            })
-            
+        return snapshot_response('indian_indices')
     except Exception as e:
         logger.error(f"Error in get_indian_indices: {e}")
         return jsonify({'error': str(e)}), 500
@@ -184,30 +179,7 @@ def get_indian_indices():
 def get_international_indices():
     """Get international market indices data"""
     try:
-        if 'international_indices' in data_cache and data_cache['international_indices']:
-            return jsonify({
-                'status': 'success',
-                'data': data_cache['international_indices'],
-                'timestamp': datetime.now().isoformat(),
-                'count': len(data_cache['international_indices'])
-            })
-        else:
-            # Fetch fresh data
-            indices = finance_data.fetch_international_indices()
-            return jsonify({
-                'status': 'success',
-                'data': {k: {
-                    'name': v.name,
-                    'price': v.current_price,
-                    'change': v.change,
-                    'change_percent': v.change_percent,
-                    'currency': v.currency,
-                    'timestamp': v.timestamp.isoformat()
-                } for k, v in indices.items()},
-                'timestamp': datetime.now().isoformat(),
-                'count': len(indices)
-            })
-            
+        return snapshot_response('international_indices')
     except Exception as e:
         logger.error(f"Error in get_international_indices: {e}")
         return jsonify({'error': str(e)}), 500
@@ -216,30 +188,7 @@ def get_international_indices():
 def get_currency_rates():
     """Get currency exchange rates"""
     try:
-        if 'currency_rates' in data_cache and data_cache['currency_rates']:
-            return jsonify({
-                'status': 'success',
-                'data': data_cache['currency_rates'],
-                'timestamp': datetime.now().isoformat(),
-                'count': len(data_cache['currency_rates'])
-            })
-        else:
-            # Fetch fresh data
-            currencies = finance_data.fetch_currency_rates()
-            return jsonify({
-                'status': 'success',
-                'data': {k: {
-                    'base': v.base,
-                    'target': v.target,
-                    'rate': v.rate,
-                    'change': v.change,
-                    'change_percent': v.change_percent,
-                    'timestamp': v.timestamp.isoformat()
-                } for k, v in currencies.items()},
-                'timestamp': datetime.now().isoformat(),
-                'count': len(currencies)
-            })
-            
+        return snapshot_response('currency_rates')
     except Exception as e:
         logger.error(f"Error in get_currency_rates: {e}")
         return jsonify({'error': str(e)}), 500
@@ -248,31 +197,7 @@ def get_currency_rates():
 def get_commodity_prices():
     """Get commodity prices"""
     try:
-        if 'commodity_prices' in data_cache and data_cache['commodity_prices']:
-            return jsonify({
-                'status': 'success',
-                'data': data_cache['commodity_prices'],
-                'timestamp': datetime.now().isoformat(),
-                'count': len(data_cache['commodity_prices'])
-            })
-        else:
-            # Fetch fresh data
-            commodities = finance_data.fetch_commodity_prices()
-            return jsonify({
-                'status': 'success',
-                'data': {k: {
-                    'name': k,
-                    'price': v.price,
-                    'unit': v.unit,
-                    'change': v.change,
-                    'change_percent': v.change_percent,
-                    'currency': v.currency,
-                    'timestamp': v.timestamp.isoformat()
-                } for k, v in commodities.items()},
-                'timestamp': datetime.now().isoformat(),
-                'count': len(commodities)
-            })
-            
+        return snapshot_response('commodity_prices')
     except Exception as e:
         logger.error(f"Error in get_commodity_prices: {e}")
         return jsonify({'error': str(e)}), 500
@@ -327,7 +252,10 @@ def get_social_media_content():
     try:
         platform = request.args.get('platform', 'twitter')  # twitter, linkedin, telegram
         
-        market_update = finance_data.generate_market_update_content()
+        snapshot = market_cache.get('market_update')
+        if snapshot is None:
+            return jsonify({'error': 'Market update is not available yet'}), 503
+        market_update = snapshot.data['content']
         
         if platform == 'twitter':
             # Twitter format (character limit friendly)
@@ -426,10 +354,11 @@ def get_stats():
                 'market_data_today': market_data_today,
                 'currency_data_today': currency_data_today,
                 'commodity_data_today': commodity_data_today,
-                'cache_last_updated': data_cache.get('last_updated'),
-                'cached_indices_count': len(data_cache.get('indian_indices', {})) + len(data_cache.get('international_indices', {})),
-                'cached_currencies_count': len(data_cache.get('currency_rates', {})),
-                'cached_commodities_count': len(data_cache.get('commodity_prices', {}))
+                'cache_last_updated': last_cache_update(),
+                'cached_indices_count': cached_count('indian_indices') + cached_count('international_indices'),
+                'cached_currencies_count': cached_count('currency_rates'),
+                'cached_commodities_count': cached_count('commodity_prices'),
+                'cache': market_cache.get_stats()
             },
             'timestamp': datetime.now().isoformat()
         })
@@ -476,7 +405,7 @@ def index():
             'GET /api/admin/stats': 'Get API statistics (requires API key)'
         },
         'data_sources': ['Yahoo Finance', 'NSE', 'BSE', 'Multiple APIs'],
-        'update_frequency': '5 minutes during market hours',
+        'update_frequency': 'indices 1 minute, currencies/commodities 2 minutes, market update 5 minutes',
         'timestamp': datetime.now().isoformat()
     })
 
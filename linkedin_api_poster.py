@@ -5,10 +5,10 @@ Posts content to LinkedIn using OAuth API
 """
 
 import os
-import requests
 import json
 from datetime import datetime
 from dotenv import load_dotenv
+from platform_transport import get_transport
 
 load_dotenv()
 
@@ -16,29 +16,15 @@ load_dotenv()
 class LinkedInAPIPoster:
     def __init__(self):
         self.access_token = os.getenv('LINKEDIN_ACCESS_TOKEN')
-        self.api_base = 'https://api.linkedin.com/v2'
+        self.transport = get_transport()
+        self.api_base = self.transport.url('linkedin', '/v2')
         
     def get_profile_urn(self):
-        """Get user's LinkedIn URN (user ID)"""
-        headers = {
-            'Authorization': f'Bearer {self.access_token}',
-            'X-Restli-Protocol-Version': '2.0.0'
-        }
-        
-        # Use userinfo endpoint which requires less permissions
-        response = requests.get(
-            'https://api.linkedin.com/v2/userinfo',
-            headers=headers
-        )
-        
-        if response.status_code == 200:
-            user_data = response.json()
-            # LinkedIn URN format
-            return f"urn:li:person:{user_data.get('sub')}"
-        else:
-            print(f"Could not get profile URN: {response.text}")
-            # Use a default URN format - will be replaced with actual ID
-            return None
+        """Get user's LinkedIn URN (user ID), cached per access token"""
+        urn = self.transport.linkedin_person_urn(self.access_token)
+        if not urn:
+            print("Could not get profile URN")
+        return urn
     
     def post_content(self, text_content):
         """Post content to LinkedIn using the API"""
@@ -75,7 +61,8 @@ class LinkedInAPIPoster:
         }
         
         # Post to LinkedIn
-        response = requests.post(
+        response = self.transport.post(
+            'linkedin',
             f'{self.api_base}/ugcPosts',
             headers=headers,
             json=post_data
@@ -117,8 +104,9 @@ class LinkedInAPIPoster:
             }
         }
         
-        response = requests.post(
-            'https://api.linkedin.com/v2/shares',
+        response = self.transport.post(
+            'linkedin',
+            f'{self.api_base}/shares',
             headers=headers,
             json=post_data
         )
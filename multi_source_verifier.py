@@ -13,17 +13,48 @@ import pytz
 from typing import Dict, List, Optional
 import asyncio
 import aiohttp
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import asynccontextmanager
 from tradingview_fetcher import TradingViewFetcher
+from rate_limiter import RateLimiter
+from source_fanout import fan_out
 
 class MultiSourceVerifier:
+    SOURCES = ('MoneyControl', 'EconomicTimes', 'GoogleFinance', 'NSE', 'YahooFinance', 'TradingView')
+    
     def __init__(self):
         self.ist = pytz.timezone('Asia/Kolkata')
         self.tv_fetcher = TradingViewFetcher()
         self.sources_status = {}
+        # Requests per second and burst per site; each site is limited independently
+        self.rate_limiter = RateLimiter(rate=1.0, capacity=3, limits={
+            'NSE': (0.5, 2),
+            'TradingView': (0.5, 1),
+        })
+        # Seconds each source gets before it counts as failed
+        self.deadline = 3.0
+        self.deadlines = {'NSE': 4.0}  # cookie round trip first
+        self.watchlist_concurrency = 4  # symbols verify_watchlist has in flight at once
+        self.executor = ThreadPoolExecutor(max_workers=8, thread_name_prefix="verifier")
+    
+    def _deadline(self, source: str) -> float:
+        return self.deadlines.get(source, self.deadline)
+    
+    @asynccontextmanager
+    async def _client(self, session: Optional[aiohttp.ClientSession]):
+        """The caller's shared session, or a session for this request only"""
+        if session is not None:
+            yield session
+        else:
+            async with aiohttp.ClientSession() as own:
+                yield own
         
-    async def fetch_moneycontrol(self, symbol: str) -> Dict:
+    async def fetch_moneycontrol(self, symbol: str, session: Optional[aiohttp.ClientSession] = None,
+                                 limited: bool = True) -> Dict:
         """Fetch from MoneyControl"""
         try:
+            if limited and not await self.rate_limiter.acquire_async('MoneyControl', timeout=self._deadline('MoneyControl')):
+                return {'source': 'MoneyControl', 'success': False}
             symbol_map = {
                 'RELIANCE': 'RI',
                 'TCS': 'TCS',
@@ -35,7 +66,7 @@ class MultiSourceVerifier:
             mc_symbol = symbol_map.get(symbol, symbol)
             url = f"https://www.moneycontrol.com/india/stockpricequote/{mc_symbol}"
             
-            async with aiohttp.ClientSession() as session:
+            async with self._client(session) as session:
                 async with session.get(url) as response:
                     html = await response.text()
                     soup = BeautifulSoup(html, 'html.parser')
@@ -54,13 +85,16 @@ class MultiSourceVerifier:
         
         return {'source': 'MoneyControl', 'success': False}
     
-    async def fetch_economic_times(self, symbol: str) -> Dict:
+    async def fetch_economic_times(self, symbol: str, session: Optional[aiohttp.ClientSession] = None,
+                                   limited: bool = True) -> Dict:
         """Fetch from Economic Times"""
         try:
+            if limited and not await self.rate_limiter.acquire_async('EconomicTimes', timeout=self._deadline('EconomicTimes')):
+                return {'source': 'EconomicTimes', 'success': False}
             url = f"https://economictimes.indiatimes.com/markets/stocks/stockquotes/{symbol}"
             headers = {'User-Agent': 'Mozilla/5.0'}
             
-            async with aiohttp.ClientSession() as session:
+            async with self._client(session) as session:
                 async with session.get(url, headers=headers) as response:
                     html = await response.text()
                     # Parse ET data
@@ -79,13 +113,16 @@ class MultiSourceVerifier:
         
         return {'source': 'EconomicTimes', 'success': False}
     
-    async def fetch_google_finance(self, symbol: str) -> Dict:
+    async def fetch_google_finance(self, symbol: str, session: Optional[aiohttp.ClientSession] = None,
+                                   limited: bool = True) -> Dict:
         """Fetch from Google Finance"""
         try:
+            if limited and not await self.rate_limiter.acquire_async('GoogleFinance', timeout=self._deadline('GoogleFinance')):
+                return {'source': 'GoogleFinance', 'success': False}
             url = f"https://www.google.com/finance/quote/{symbol}:NSE"
             headers = {'User-Agent': 'Mozilla/5.0'}
             
-            async with aiohttp.ClientSession() as session:
+            async with self._client(session) as session:
                 async with session.get(url, headers=headers) as response:
                     html = await response.text()
                     
@@ -105,9 +142,11 @@ class MultiSourceVerifier:
         
         return {'source': 'GoogleFinance', 'success': False}
     
-    def fetch_yahoo_finance(self, symbol: str) -> Dict:
+    def fetch_yahoo_finance(self, symbol: str, limited: bool = True) -> Dict:
         """Fetch from Yahoo Finance"""
         try:
+            if limited and not self.rate_limiter.acquire('YahooFinance', timeout=self._deadline('YahooFinance')):
+                return {'source': 'YahooFinance', 'success': False}
             ticker = yf.Ticker(f"{symbol}.NS")
             info = ticker.history(period="1d")
             
@@ -123,9 +162,11 @@ class MultiSourceVerifier:
         
         return {'source': 'YahooFinance', 'success': False}
     
-    def fetch_tradingview(self, symbol: str) -> Dict:
+    def fetch_tradingview(self, symbol: str, limited: bool = True) -> Dict:
         """Fetch from TradingView"""
         try:
+            if limited and not self.rate_limiter.acquire('TradingView', timeout=self._deadline('TradingView')):
+                return {'source': 'TradingView', 'success': False}
             data = self.tv_fetcher.get_quote_from_tradingview(symbol)
             if data:
                 return {
@@ -141,9 +182,12 @@ class MultiSourceVerifier:
         
         return {'source': 'TradingView', 'success': False}
     
-    async def fetch_nse_official(self, symbol: str) -> Dict:
+    async def fetch_nse_official(self, symbol: str, session: Optional[aiohttp.ClientSession] = None,
+                                 limited: bool = True) -> Dict:
         """Fetch from NSE official API"""
         try:
+            if limited and not await self.rate_limiter.acquire_async('NSE', timeout=self._deadline('NSE')):
+                return {'source': 'NSE', 'success': False}
             url = f"https://www.nseindia.com/api/quote-equity?symbol={symbol}"
             headers = {
                 'User-Agent': 'Mozilla/5.0',
@@ -151,7 +195,7 @@ class MultiSourceVerifier:
                 'Accept-Language': 'en-US,en;q=0.9',
             }
             
-            async with aiohttp.ClientSession() as session:
+            async with self._client(session) as session:
                 # Get cookies first
                 await session.get("https://www.nseindia.com", headers=headers)
                 
@@ -171,40 +215,25 @@ class MultiSourceVerifier:
         
         return {'source': 'NSE', 'success': False}
     
-    async def fetch_all_sources(self, symbol: str) -> Dict:
-        """Fetch from ALL sources and aggregate"""
-        print(f"🔍 Fetching {symbol} from all sources...")
-        
-        # Create tasks for async fetching
-        tasks = [
-            self.fetch_moneycontrol(symbol),
-            self.fetch_economic_times(symbol),
-            self.fetch_google_finance(symbol),
-            self.fetch_nse_official(symbol)
-        ]
-        
-        # Run async tasks
-        async_results = await asyncio.gather(*tasks)
-        
-        # Add sync sources
-        sync_results = [
-            self.fetch_yahoo_finance(symbol),
-            self.fetch_tradingview(symbol)
-        ]
-        
-        all_results = async_results + sync_results
-        
-        # Analyze results
-        prices = []
-        sources_data = {}
-        
-        for result in all_results:
-            if result.get('success') and result.get('price'):
-                prices.append(result['price'])
-                sources_data[result['source']] = result
-                print(f"  ✅ {result['source']}: ₹{result['price']}")
-            else:
-                print(f"  ❌ {result['source']}: Failed")
+    def _sources(self, symbol: str, session: Optional[aiohttp.ClientSession] = None, limited: bool = True) -> Dict:
+        """
+        All six sources as coroutine factories; the blocking ones run on the
+        executor. limited=False when the caller already holds a rate-limit token
+        for every source.
+        """
+        loop = asyncio.get_running_loop()
+        return {
+            'MoneyControl': lambda: self.fetch_moneycontrol(symbol, session, limited),
+            'EconomicTimes': lambda: self.fetch_economic_times(symbol, session, limited),
+            'GoogleFinance': lambda: self.fetch_google_finance(symbol, session, limited),
+            'NSE': lambda: self.fetch_nse_official(symbol, session, limited),
+            'YahooFinance': lambda: loop.run_in_executor(self.executor, self.fetch_yahoo_finance, symbol, limited),
+            'TradingView': lambda: loop.run_in_executor(self.executor, self.fetch_tradingview, symbol, limited),
+        }
+    
+    def _aggregate(self, symbol: str, sources_data: Dict[str, Dict]) -> Dict:
+        """Consensus over the successful sources"""
+        prices = [result['price'] for result in sources_data.values()]
         
         if prices:
             # Calculate consensus
@@ -258,6 +287,70 @@ class MultiSourceVerifier:
             'timestamp': datetime.now(self.ist)
         }
     
+    async def fetch_all_sources(self, symbol: str) -> Dict:
+        """Fetch from ALL sources concurrently (each within its deadline) and aggregate"""
+        print(f"🔍 Fetching {symbol} from all sources...")
+        
+        outcome = await fan_out(self._sources(symbol), self.deadline, self.deadlines)
+        
+        sources_data = {}
+        for source, result in outcome.results.items():
+            if result.get('success') and result.get('price'):
+                sources_data[source] = result
+                print(f"  ✅ {source}: ₹{result['price']}")
+            else:
+                print(f"  ❌ {source}: {'Timed out' if result.get('timed_out') else 'Failed'}")
+        
+        return self._aggregate(symbol, sources_data)
+    
+    async def verify(self, symbol: str, session: Optional[aiohttp.ClientSession] = None, quorum: int = 3,
+                     tolerance: float = 0.005, limited: bool = True) -> Dict:
+        """
+        Quorum verification: returns once quorum sources agree within tolerance
+        and cancels the rest, or after the deadlines with whatever answered.
+        The aggregate covers the agreeing sources when there is a quorum.
+        """
+        outcome = await fan_out(self._sources(symbol, session, limited), self.deadline, self.deadlines,
+                                quorum, tolerance)
+        answered = {source: outcome.results[source] for source in outcome.prices}
+        agreeing = {source: answered[source] for source in outcome.agreeing}
+        data = self._aggregate(symbol, agreeing or answered)
+        data.update({
+            'quorum_reached': bool(agreeing),
+            'agreeing_sources': outcome.agreeing,
+            'timed_out': outcome.timed_out,
+            'cancelled': outcome.cancelled,
+            'elapsed': round(outcome.elapsed, 3),
+        })
+        self.sources_status[symbol] = {source: result.get('success', False)
+                                       for source, result in outcome.results.items()}
+        return data
+    
+    async def verify_watchlist(self, symbols: List[str], quorum: int = 3, tolerance: float = 0.005,
+                               session: Optional[aiohttp.ClientSession] = None) -> Dict[str, Dict]:
+        """
+        Quorum-verify a watchlist over one shared HTTP session. A bounded set of
+        workers takes symbols from a queue; each waits (without a timeout) until
+        the limiter admits one request to every site, then fans out with the
+        whole deadline left for the requests. Symbols past the rate budget wait
+        their turn instead of being turned away, so the deadlines bound each
+        verification and the rate limits bound the watchlist.
+        """
+        queue = asyncio.Queue()
+        for symbol in dict.fromkeys(symbols):
+            queue.put_nowait(symbol)
+        results = {}
+        
+        async def worker(session):
+            while not queue.empty():
+                symbol = queue.get_nowait()
+                await asyncio.gather(*(self.rate_limiter.acquire_async(source) for source in self.SOURCES))
+                results[symbol] = await self.verify(symbol, session, quorum, tolerance, limited=False)
+        
+        async with self._client(session) as session:
+            await asyncio.gather(*(worker(session) for _ in range(min(self.watchlist_concurrency, queue.qsize()))))
+        return {symbol: results[symbol] for symbol in symbols}
+    
     def generate_ultra_verified_content(self, data: Dict) -> str:
         """Generate content with multi-source verification"""
         if not data.get('verified'):
@@ -0,0 +1,187 @@
+#!/usr/bin/env python3
+"""
+Platform Transport
+Shared keep-alive HTTP sessions for LinkedIn, Twitter and Telegram posting,
+plus cached identity lookups (LinkedIn person URN, Telegram chat ID) so a post
+is a single request on a warm connection instead of handshake + lookup + post.
+"""
+
+import os
+import time
+import logging
+from threading import Lock
+from typing import Dict, Optional, Tuple
+
+import requests
+from requests.adapters import HTTPAdapter
+
+logger = logging.getLogger(__name__)
+
+# Base URLs can be pointed at a local stub (see benchmarks/bench_platform_transport.py)
+DEFAULT_BASE_URLS = {
+    "linkedin": os.getenv('LINKEDIN_API_BASE', 'https://api.linkedin.com'),
+    "twitter": os.getenv('TWITTER_API_BASE', 'https://api.twitter.com'),
+    "telegram": os.getenv('TELEGRAM_API_BASE', 'https://api.telegram.org'),
+}
+
+
+class PlatformTransport:
+    """
+    One pooled requests.Session per platform with keep-alive connections.
+    Safe to share between threads (e.g. the posting queue's platform lanes).
+    """
+
+    def __init__(self, pool_size: int = 10, timeout: float = 30.0, base_urls: Optional[Dict[str, str]] = None):
+        self.pool_size = pool_size
+        self.timeout = timeout
+        self.base_urls = dict(DEFAULT_BASE_URLS)
+        if base_urls:
+            self.base_urls.update(base_urls)
+
+        self._lock = Lock()
+        self._sessions: Dict[str, requests.Session] = {}
+        self._linkedin_urns: Dict[str, str] = {}
+        self._telegram_chat_ids: Dict[Tuple[str, str], str] = {}
+        self._stats: Dict[str, Dict[str, float]] = {}
+
+    def session(self, platform: str) -> requests.Session:
+        """Get (or lazily create) the pooled session for a platform"""
+        session = self._sessions.get(platform)
+        if session is not None:
+            return session
+
+        with self._lock:
+            if platform not in self._sessions:
+                session = requests.Session()
+                adapter = HTTPAdapter(pool_connections=2, pool_maxsize=self.pool_size)
+                session.mount('https://', adapter)
+                session.mount('http://', adapter)
+                self._sessions[platform] = session
+                self._stats[platform] = {"requests": 0, "errors": 0, "total_seconds": 0.0}
+            return self._sessions[platform]
+
+    def url(self, platform: str, path: str) -> str:
+        """Build an absolute URL for a platform API path"""
+        return f"{self.base_urls[platform].rstrip('/')}/{path.lstrip('/')}"
+
+    def request(self, platform: str, method: str, url: str, **kwargs) -> requests.Response:
+        """Send a request over the platform's pooled session, recording latency"""
+        kwargs.setdefault('timeout', self.timeout)
+        session = self.session(platform)
+        start = time.perf_counter()
+        try:
+            return session.request(method, url, **kwargs)
+        except requests.RequestException:
+            with self._lock:
+                self._stats[platform]["errors"] += 1
+            raise
+        finally:
+            elapsed = time.perf_counter() - start
+            with self._lock:
+                self._stats[platform]["requests"] += 1
+                self._stats[platform]["total_seconds"] += elapsed
+
+    def get(self, platform: str, url: str, **kwargs) -> requests.Response:
+        return self.request(platform, 'GET', url, **kwargs)
+
+    def post(self, platform: str, url: str, **kwargs) -> requests.Response:
+        return self.request(platform, 'POST', url, **kwargs)
+
+    def linkedin_person_urn(self, access_token: str) -> Optional[str]:
+        """Resolve and cache the LinkedIn person URN for an access token"""
+        urn = self._linkedin_urns.get(access_token)
+        if urn:
+            return urn
+
+        response = self.get(
+            'linkedin',
+            self.url('linkedin', '/v2/userinfo'),
+            headers={
+                'Authorization': f'Bearer {access_token}',
+                'X-Restli-Protocol-Version': '2.0.0'
+            }
+        )
+        if response.status_code != 200:
+            logger.warning(f"LinkedIn userinfo lookup failed: {response.status_code}")
+            return None
+
+        user_id = response.json().get('sub')
+        if not user_id:
+            return None
+
+        urn = f"urn:li:person:{user_id}"
+        with self._lock:
+            self._linkedin_urns[access_token] = urn
+        return urn
+
+    def telegram_chat_id(self, bot_token: str, chat: str) -> str:
+        """
+        Resolve and cache the numeric chat ID for a @channel username.
+        Falls back to the given value if the lookup fails.
+        """
+        if not str(chat).startswith('@'):
+            return chat
+
+        key = (bot_token, chat)
+        chat_id = self._telegram_chat_ids.get(key)
+        if chat_id:
+            return chat_id
+
+        try:
+            response = self.get(
+                'telegram',
+                self.url('telegram', f'/bot{bot_token}/getChat'),
+                params={'chat_id': chat}
+            )
+            result = response.json() if response.status_code == 200 else {}
+        except (requests.RequestException, ValueError) as e:
+            logger.warning(f"Telegram getChat failed for {chat}: {e}")
+            return chat
+
+        if not result.get('ok'):
+            return chat
+
+        chat_id = str(result['result']['id'])
+        with self._lock:
+            self._telegram_chat_ids[key] = chat_id
+        return chat_id
+
+    def invalidate_identity(self, platform: str):
+        """Forget cached identities for a platform (e.g. after a 401)"""
+        with self._lock:
+            if platform == 'linkedin':
+                self._linkedin_urns.clear()
+            elif platform == 'telegram':
+                self._telegram_chat_ids.clear()
+
+    def get_stats(self) -> Dict[str, Dict[str, float]]:
+        """Per-platform request count, error count and average latency"""
+        with self._lock:
+            return {
+                platform: {
+                    **stats,
+                    "avg_ms": round(stats["total_seconds"] * 1000 / stats["requests"], 3) if stats["requests"] else 0.0
+                }
+                for platform, stats in self._stats.items()
+            }
+
+    def close(self):
+        """Close all pooled sessions"""
+        with self._lock:
+            for session in self._sessions.values():
+                session.close()
+            self._sessions.clear()
+
+
+_transport: Optional[PlatformTransport] = None
+_transport_lock = Lock()
+
+
+def get_transport() -> PlatformTransport:
+    """Process-wide shared transport"""
+    global _transport
+    if _transport is None:
+        with _transport_lock:
+            if _transport is None:
+                _transport = PlatformTransport()
+    return _transport
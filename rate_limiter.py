@@ -0,0 +1,153 @@
+#!/usr/bin/env python3
+"""
+Rate Limiter
+============
+Per-source token buckets shared by the market data fetchers.
+
+Each source refills at its own rate up to a burst capacity. Acquiring a token
+reserves it under that source's lock and returns how long the caller must
+wait; the wait happens after the lock is released (time.sleep for threads,
+asyncio.sleep for coroutines), so a caller queued on one source never holds
+up callers of another source, or later callers of the same source from
+reserving their own slot. A reservation that will not be used (its coroutine
+was cancelled while waiting, or its caller gave up) is handed back with
+release(), so the debt it added does not slow down later callers.
+"""
+
+import asyncio
+import logging
+import threading
+import time
+from dataclasses import dataclass
+from typing import Callable, Dict, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class LimiterStats:
+    """Wait-time counters for one source"""
+    acquired: int = 0
+    rejected: int = 0  # acquire() calls that gave up because the wait exceeded their timeout
+    waited: int = 0  # acquisitions that had to wait at all
+    released: int = 0  # acquisitions handed back unused
+    wait_total: float = 0.0
+    wait_max: float = 0.0
+
+    def as_dict(self) -> Dict[str, float]:
+        return {
+            'acquired': self.acquired,
+            'rejected': self.rejected,
+            'waited': self.waited,
+            'released': self.released,
+            'wait_total': round(self.wait_total, 6),
+            'wait_mean': round(self.wait_total / self.acquired, 6) if self.acquired else 0.0,
+            'wait_max': round(self.wait_max, 6),
+        }
+
+
+class TokenBucket:
+    """
+    rate tokens per second up to capacity. Reservations may take the balance
+    negative: that debt is the queue, and each reservation's wait is the time
+    until the balance covers it.
+    """
+
+    def __init__(self, rate: float, capacity: float = 1.0, clock: Callable[[], float] = time.monotonic):
+        if rate <= 0 or capacity < 1:
+            raise ValueError("rate must be positive and capacity at least 1")
+        self.rate = rate
+        self.capacity = capacity
+        self.clock = clock
+        self.tokens = capacity
+        self.updated = clock()
+        self.stats = LimiterStats()
+        self._lock = threading.Lock()
+
+    def reserve(self, tokens: float = 1.0, timeout: Optional[float] = None) -> Optional[float]:
+        """Take tokens and return the seconds to wait before using them; None (nothing taken) if over timeout"""
+        with self._lock:
+            now = self.clock()
+            self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+            self.updated = now
+            wait = max(0.0, (tokens - self.tokens) / self.rate)
+            if timeout is not None and wait > timeout:
+                self.stats.rejected += 1
+                return None
+            self.tokens -= tokens
+            self.stats.acquired += 1
+            if wait > 0:
+                self.stats.waited += 1
+                self.stats.wait_total += wait
+                self.stats.wait_max = max(self.stats.wait_max, wait)
+            return wait
+
+    def release(self, tokens: float = 1.0):
+        """Hand back tokens reserved but not used, up to capacity"""
+        with self._lock:
+            now = self.clock()
+            self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate + tokens)
+            self.updated = now
+            self.stats.released += 1
+
+
+class RateLimiter:
+    """
+    Token buckets keyed by source. Sources without an entry in limits get the
+    default rate and capacity. acquire() is for threads, acquire_async() for
+    coroutines; both sleep outside every lock.
+    """
+
+    def __init__(self, rate: float = 1.0, capacity: float = 1.0,
+                 limits: Optional[Dict[str, Tuple[float, float]]] = None,
+                 clock: Callable[[], float] = time.monotonic, sleep: Callable[[float], None] = time.sleep):
+        self.rate = rate
+        self.capacity = capacity
+        self.limits = dict(limits or {})
+        self.clock = clock
+        self.sleep = sleep
+        self._buckets: Dict[str, TokenBucket] = {}
+        self._lock = threading.Lock()  # guards the bucket registry only
+
+    def bucket(self, source: str) -> TokenBucket:
+        bucket = self._buckets.get(source)
+        if bucket is None:
+            with self._lock:
+                bucket = self._buckets.get(source)
+                if bucket is None:
+                    rate, capacity = self.limits.get(source, (self.rate, self.capacity))
+                    bucket = self._buckets[source] = TokenBucket(rate, capacity, self.clock)
+        return bucket
+
+    def acquire(self, source: str, tokens: float = 1.0, timeout: Optional[float] = None) -> bool:
+        """Block the calling thread until source allows a request; False if that would take longer than timeout"""
+        wait = self.bucket(source).reserve(tokens, timeout)
+        if wait is None:
+            return False
+        if wait > 0:
+            logger.debug(f"Rate limit on {source}: waiting {wait:.2f}s")
+            self.sleep(wait)
+        return True
+
+    async def acquire_async(self, source: str, tokens: float = 1.0, timeout: Optional[float] = None) -> bool:
+        """acquire() for coroutines: yields to the event loop while waiting; cancelling it refunds the tokens"""
+        bucket = self.bucket(source)
+        wait = bucket.reserve(tokens, timeout)
+        if wait is None:
+            return False
+        if wait > 0:
+            logger.debug(f"Rate limit on {source}: waiting {wait:.2f}s")
+            try:
+                await asyncio.sleep(wait)
+            except asyncio.CancelledError:
+                bucket.release(tokens)
+                raise
+        return True
+
+    def release(self, source: str, tokens: float = 1.0):
+        """Hand back an acquisition whose request was never sent (e.g. its deadline passed)"""
+        self.bucket(source).release(tokens)
+
+    def metrics(self) -> Dict[str, Dict[str, float]]:
+        """Wait-time counters per source"""
+        return {source: bucket.stats.as_dict() for source, bucket in list(self._buckets.items())}
@@ -24,7 +24,11 @@ import asyncio
 import aiohttp
 from dataclasses import dataclass
 import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from dotenv import load_dotenv
+
+from rate_limiter import RateLimiter
 import warnings
 warnings.filterwarnings('ignore')
 
@@ -79,6 +83,120 @@ class CommodityData:
     source: str
     currency: str = "USD"
 
+# Symbols covered by one market refresh cycle
+INDIAN_INDICES = {
+    '^NSEI': 'Nifty 50',
+    '^BSESN': 'Sensex',
+    '^NSEBANK': 'Nifty Bank',
+    'NIFTYMIDCAP.NS': 'Nifty Midcap 50',
+    'NIFTYIT.NS': 'Nifty IT'
+}
+
+INTERNATIONAL_INDICES = {
+    '^GSPC': 'S&P 500',
+    '^DJI': 'Dow Jones',
+    '^IXIC': 'NASDAQ',
+    '^FTSE': 'FTSE 100',
+    '^N225': 'Nikkei 225',
+    '^HSI': 'Hang Seng'
+}
+
+CURRENCY_PAIRS = [
+    ('USD', 'INR'),
+    ('EUR', 'USD'),
+    ('GBP', 'USD'),
+    ('USD', 'JPY'),
+    ('USD', 'CAD'),
+    ('USD', 'AUD')
+]
+
+COMMODITIES = {
+    'GC=F': ('Gold', 'USD/oz'),
+    'SI=F': ('Silver', 'USD/oz'),
+    'CL=F': ('Crude Oil WTI', 'USD/barrel'),
+    'BZ=F': ('Brent Oil', 'USD/barrel'),
+    'HG=F': ('Copper', 'USD/lb'),
+    'ZC=F': ('Corn', 'USD/bushel')
+}
+
+TOP_STOCKS = {
+    'indian': {
+        'RELIANCE.NS': 'Reliance Industries',
+        'TCS.NS': 'Tata Consultancy Services',
+        'HDFCBANK.NS': 'HDFC Bank',
+        'INFY.NS': 'Infosys',
+        'ICICIBANK.NS': 'ICICI Bank',
+        'HINDUNILVR.NS': 'Hindustan Unilever',
+        'BHARTIARTL.NS': 'Bharti Airtel',
+        'ITC.NS': 'ITC Limited',
+        'SBIN.NS': 'State Bank of India',
+        'LT.NS': 'Larsen & Toubro'
+    },
+    'us': {
+        'AAPL': 'Apple Inc.',
+        'MSFT': 'Microsoft Corporation',
+        'GOOGL': 'Alphabet Inc.',
+        'AMZN': 'Amazon.com Inc.',
+        'NVDA': 'NVIDIA Corporation',
+        'TSLA': 'Tesla Inc.',
+        'META': 'Meta Platforms Inc.',
+        'BRK-B': 'Berkshire Hathaway',
+        'V': 'Visa Inc.',
+        'JNJ': 'Johnson & Johnson'
+    }
+}
+
+def currency_symbol(base: str, target: str) -> str:
+    return f"{base}{target}=X"
+
+def refresh_cycle_symbols() -> List[str]:
+    """Every symbol a full market update needs"""
+    symbols = list(INDIAN_INDICES) + list(INTERNATIONAL_INDICES) + list(COMMODITIES)
+    symbols += [currency_symbol(base, target) for base, target in CURRENCY_PAIRS]
+    for stocks in TOP_STOCKS.values():
+        symbols += list(stocks)
+    return list(dict.fromkeys(symbols))
+
+class MarketSnapshot:
+    """
+    Latest and previous daily close plus volume for many symbols, built from
+    one bulk yf.download instead of a Ticker.history call per symbol.
+    """
+    
+    def __init__(self, quotes: Dict[str, Tuple[float, float, int]], fetched_at: datetime):
+        self.quotes = quotes  # symbol -> (close, previous close, volume)
+        self.fetched_at = fetched_at
+    
+    @classmethod
+    def from_frame(cls, frame: pd.DataFrame, symbols: List[str], fetched_at: datetime = None) -> 'MarketSnapshot':
+        """Parse a group_by='ticker' download; exchanges close on different days, so NaN rows are dropped per symbol"""
+        quotes = {}
+        if frame is not None and not frame.empty:
+            if not isinstance(frame.columns, pd.MultiIndex):
+                # Older yfinance returns flat columns for a single ticker
+                frame = pd.concat({symbols[0]: frame}, axis=1)
+            available = set(frame.columns.get_level_values(0))
+            for symbol in symbols:
+                if symbol not in available:
+                    continue
+                bars = frame[symbol].dropna(subset=['Close'])
+                if bars.empty:
+                    continue
+                close = float(bars['Close'].iloc[-1])
+                prev_close = float(bars['Close'].iloc[-2]) if len(bars) > 1 else close
+                volume = bars['Volume'].iloc[-1] if 'Volume' in bars else 0
+                quotes[symbol] = (close, prev_close, int(volume) if pd.notna(volume) else 0)
+        return cls(quotes, fetched_at or datetime.now())
+    
+    def quote(self, symbol: str) -> Optional[Tuple[float, float, float, float, int]]:
+        """(price, prev_price, change, change_percent, volume) or None if the symbol is missing"""
+        if symbol not in self.quotes:
+            return None
+        price, prev_price, volume = self.quotes[symbol]
+        change = price - prev_price
+        change_percent = (change / prev_price) * 100 if prev_price else 0.0
+        return price, prev_price, change, change_percent, volume
+
 class RealTimeFinanceData:
     """
     Comprehensive real-time financial data fetcher with multiple sources
@@ -104,6 +222,16 @@ class RealTimeFinanceData:
             'bse': True,  # For Indian markets
         }
         
+        # One bulk download serves every fetch_* call within snapshot_ttl seconds
+        self.snapshot_ttl = 30
+        self.snapshot_period = "5d"  # Enough bars to find a previous close across holidays
+        self._snapshot: Optional[MarketSnapshot] = None
+        self._snapshot_lock = threading.Lock()
+        self.market_cap_ttl = 3600
+        self._market_caps: Dict[str, Tuple[float, Optional[float]]] = {}
+        # Per-source request budgets: Yahoo's bulk downloads and per-symbol lookups share one bucket
+        self.rate_limiter = RateLimiter(rate=2.0, capacity=8)
+        
         logger.info(f"Initialized with sources: {[k for k, v in self.sources.items() if v]}")
 
     def init_database(self):
@@ -164,152 +292,137 @@ class RealTimeFinanceData:
         conn.close()
         logger.info("Database initialized successfully")
 
+    def download_snapshot(self, symbols: List[str]) -> MarketSnapshot:
+        """Fetch daily bars for all symbols in a single multi-ticker request"""
+        start = time.perf_counter()
+        self.rate_limiter.acquire('yahoo')
+        frame = yf.download(
+            tickers=symbols,
+            period=self.snapshot_period,
+            interval="1d",
+            group_by="ticker",
+            auto_adjust=False,
+            threads=True,
+            progress=False
+        )
+        snapshot = MarketSnapshot.from_frame(frame, symbols)
+        missing = [symbol for symbol in symbols if symbol not in snapshot.quotes]
+        logger.info(f"Snapshot of {len(snapshot.quotes)}/{len(symbols)} symbols in "
+                    f"{time.perf_counter() - start:.2f}s" + (f", missing {missing}" if missing else ""))
+        return snapshot
+
+    def get_snapshot(self, symbols: List[str] = None, force: bool = False) -> MarketSnapshot:
+        """
+        Current market snapshot. The first caller in a refresh cycle downloads
+        every refresh-cycle symbol at once; later callers reuse it until it is
+        snapshot_ttl seconds old. Symbols outside the cycle trigger their own download.
+        """
+        cycle = refresh_cycle_symbols()
+        symbols = symbols or cycle
+        if all(symbol in cycle for symbol in symbols):
+            # Holding the lock while downloading makes concurrent callers share one request
+            with self._snapshot_lock:
+                snapshot = self._snapshot
+                stale = (snapshot is None or
+                         (datetime.now() - snapshot.fetched_at).total_seconds() >= self.snapshot_ttl)
+                if force or stale:
+                    self._snapshot = self.download_snapshot(cycle)
+                return self._snapshot
+        
+        return self.download_snapshot(symbols)
+
+    def get_market_caps(self, symbols: List[str]) -> Dict[str, Optional[float]]:
+        """Market caps via fast_info (not the slow .info), cached for market_cap_ttl seconds"""
+        now = time.time()
+        stale = [s for s in symbols if s not in self._market_caps or now - self._market_caps[s][0] > self.market_cap_ttl]
+        
+        def lookup(symbol):
+            try:
+                self.rate_limiter.acquire('yahoo')
+                return symbol, yf.Ticker(symbol).fast_info['marketCap']
+            except Exception as e:
+                logger.warning(f"Market cap lookup failed for {symbol}: {e}")
+                return symbol, None
+        
+        if stale:
+            with ThreadPoolExecutor(max_workers=min(8, len(stale))) as pool:
+                for symbol, market_cap in pool.map(lookup, stale):
+                    self._market_caps[symbol] = (now, market_cap)
+        
+        return {symbol: self._market_caps[symbol][1] for symbol in symbols}
+
+    def _market_data(self, symbols: Dict[str, str], currency: str, include_market_cap: bool = False,
+                     log_each: bool = True) -> Dict[str, MarketData]:
+        """MarketData for symbol -> name from the shared snapshot"""
+        market_data = {}
+        snapshot = self.get_snapshot(list(symbols))
+        market_caps = self.get_market_caps(list(symbols)) if include_market_cap else {}
+        
+        for symbol, name in symbols.items():
+            quote = snapshot.quote(symbol)
+            if quote is None:
+                logger.error(f"Error fetching {symbol}: not in market snapshot")
+                continue
+            
+            current_price, _, change, change_percent, volume = quote
+            market_data[symbol] = MarketData(
+                symbol=symbol,
+                name=name,
+                current_price=round(current_price, 2),
+                change=round(change, 2),
+                change_percent=round(change_percent, 2),
+                volume=volume,
+                market_cap=market_caps.get(symbol),
+                timestamp=snapshot.fetched_at,
+                source='Yahoo Finance',
+                currency=currency
+            )
+            if log_each:
+                logger.info(f"Fetched {name}: {current_price:.2f} ({change_percent:+.2f}%)")
+        
+        return market_data
+
     def fetch_indian_indices(self) -> Dict[str, MarketData]:
         """Fetch real-time Indian market indices (Nifty 50, Sensex, etc.)"""
-        indices_data = {}
-        
         try:
-            # Yahoo Finance symbols for Indian indices
-            indian_indices = {
-                '^NSEI': 'Nifty 50',
-                '^BSESN': 'Sensex',
-                '^NSEBANK': 'Nifty Bank',
-                'NIFTYMIDCAP.NS': 'Nifty Midcap 50',
-                'NIFTYIT.NS': 'Nifty IT'
-            }
-            
-            for symbol, name in indian_indices.items():
-                try:
-                    ticker = yf.Ticker(symbol)
-                    info = ticker.info
-                    hist = ticker.history(period="2d")
-                    
-                    if not hist.empty:
-                        current_price = hist['Close'].iloc[-1]
-                        prev_price = hist['Close'].iloc[-2] if len(hist) > 1 else current_price
-                        change = current_price - prev_price
-                        change_percent = (change / prev_price) * 100
-                        
-                        market_data = MarketData(
-                            symbol=symbol,
-                            name=name,
-                            current_price=round(current_price, 2),
-                            change=round(change, 2),
-                            change_percent=round(change_percent, 2),
-                            volume=int(hist['Volume'].iloc[-1]) if 'Volume' in hist else 0,
-                            market_cap=info.get('marketCap'),
-                            timestamp=datetime.now(),
-                            source='Yahoo Finance',
-                            currency='INR'
-                        )
-                        
-                        indices_data[symbol] = market_data
-                        logger.info(f"Fetched {name}: {current_price:.2f} ({change_percent:+.2f}%)")
-                        
-                except Exception as e:
-                    logger.error(f"Error fetching {symbol}: {e}")
-                    continue
-            
+            return self._market_data(INDIAN_INDICES, currency='INR')
         except Exception as e:
             logger.error(f"Error in fetch_indian_indices: {e}")
-        
-        return indices_data
+            return {}
 
     def fetch_international_indices(self) -> Dict[str, MarketData]:
         """Fetch real-time international market indices"""
-        indices_data = {}
-        
         try:
-            # International indices
-            international_indices = {
-                '^GSPC': 'S&P 500',
-                '^DJI': 'Dow Jones',
-                '^IXIC': 'NASDAQ',
-                '^FTSE': 'FTSE 100',
-                '^N225': 'Nikkei 225',
-                '^HSI': 'Hang Seng'
-            }
-            
-            for symbol, name in international_indices.items():
-                try:
-                    ticker = yf.Ticker(symbol)
-                    hist = ticker.history(period="2d")
-                    
-                    if not hist.empty:
-                        current_price = hist['Close'].iloc[-1]
-                        prev_price = hist['Close'].iloc[-2] if len(hist) > 1 else current_price
-                        change = current_price - prev_price
-                        change_percent = (change / prev_price) * 100
-                        
-                        market_data = MarketData(
-                            symbol=symbol,
-                            name=name,
-                            current_price=round(current_price, 2),
-                            change=round(change, 2),
-                            change_percent=round(change_percent, 2),
-                            volume=int(hist['Volume'].iloc[-1]) if 'Volume' in hist else 0,
-                            market_cap=None,
-                            timestamp=datetime.now(),
-                            source='Yahoo Finance',
-                            currency='USD'
-                        )
-                        
-                        indices_data[symbol] = market_data
-                        logger.info(f"Fetched {name}: {current_price:.2f} ({change_percent:+.2f}%)")
-                        
-                except Exception as e:
-                    logger.error(f"Error fetching {symbol}: {e}")
-                    continue
-            
+            return self._market_data(INTERNATIONAL_INDICES, currency='USD')
         except Exception as e:
             logger.error(f"Error in fetch_international_indices: {e}")
-        
-        return indices_data
+            return {}
 
     def fetch_currency_rates(self) -> Dict[str, CurrencyData]:
         """Fetch real-time currency exchange rates"""
         currency_data = {}
         
         try:
-            # Major currency pairs
-            currency_pairs = [
-                ('USD', 'INR'),
-                ('EUR', 'USD'),
-                ('GBP', 'USD'),
-                ('USD', 'JPY'),
-                ('USD', 'CAD'),
-                ('USD', 'AUD')
-            ]
+            symbols = {currency_symbol(base, target): (base, target) for base, target in CURRENCY_PAIRS}
+            snapshot = self.get_snapshot(list(symbols))
             
-            for base, target in currency_pairs:
-                try:
-                    # Using Yahoo Finance for currency data
-                    symbol = f"{base}{target}=X"
-                    ticker = yf.Ticker(symbol)
-                    hist = ticker.history(period="2d")
-                    
-                    if not hist.empty:
-                        current_rate = hist['Close'].iloc[-1]
-                        prev_rate = hist['Close'].iloc[-2] if len(hist) > 1 else current_rate
-                        change = current_rate - prev_rate
-                        change_percent = (change / prev_rate) * 100
-                        
-                        currency_info = CurrencyData(
-                            base=base,
-                            target=target,
-                            rate=round(current_rate, 4),
-                            change=round(change, 4),
-                            change_percent=round(change_percent, 2),
-                            timestamp=datetime.now(),
-                            source='Yahoo Finance'
-                        )
-                        
-                        currency_data[f"{base}/{target}"] = currency_info
-                        logger.info(f"Fetched {base}/{target}: {current_rate:.4f} ({change_percent:+.2f}%)")
-                        
-                except Exception as e:
-                    logger.error(f"Error fetching {base}/{target}: {e}")
+            for symbol, (base, target) in symbols.items():
+                quote = snapshot.quote(symbol)
+                if quote is None:
+                    logger.error(f"Error fetching {base}/{target}: not in market snapshot")
                     continue
+                
+                current_rate, _, change, change_percent, _ = quote
+                currency_data[f"{base}/{target}"] = CurrencyData(
+                    base=base,
+                    target=target,
+                    rate=round(current_rate, 4),
+                    change=round(change, 4),
+                    change_percent=round(change_percent, 2),
+                    timestamp=snapshot.fetched_at,
+                    source='Yahoo Finance'
+                )
+                logger.info(f"Fetched {base}/{target}: {current_rate:.4f} ({change_percent:+.2f}%)")
             
         except Exception as e:
             logger.error(f"Error in fetch_currency_rates: {e}")
@@ -321,114 +434,44 @@ class RealTimeFinanceData:
         commodity_data = {}
         
         try:
-            # Major commodities
-            commodities = {
-                'GC=F': ('Gold', 'USD/oz'),
-                'SI=F': ('Silver', 'USD/oz'),
-                'CL=F': ('Crude Oil WTI', 'USD/barrel'),
-                'BZ=F': ('Brent Oil', 'USD/barrel'),
-                'HG=F': ('Copper', 'USD/lb'),
-                'ZC=F': ('Corn', 'USD/bushel')
-            }
+            snapshot = self.get_snapshot(list(COMMODITIES))
             
-            for symbol, (name, unit) in commodities.items():
-                try:
-                    ticker = yf.Ticker(symbol)
-                    hist = ticker.history(period="2d")
-                    
-                    if not hist.empty:
-                        current_price = hist['Close'].iloc[-1]
-                        prev_price = hist['Close'].iloc[-2] if len(hist) > 1 else current_price
-                        change = current_price - prev_price
-                        change_percent = (change / prev_price) * 100
-                        
-                        commodity_info = CommodityData(
-                            commodity=name,
-                            price=round(current_price, 2),
-                            unit=unit,
-                            change=round(change, 2),
-                            change_percent=round(change_percent, 2),
-                            timestamp=datetime.now(),
-                            source='Yahoo Finance',
-                            currency='USD'
-                        )
-                        
-                        commodity_data[name] = commodity_info
-                        logger.info(f"Fetched {name}: ${current_price:.2f} ({change_percent:+.2f}%)")
-                        
-                except Exception as e:
-                    logger.error(f"Error fetching {symbol}: {e}")
+            for symbol, (name, unit) in COMMODITIES.items():
+                quote = snapshot.quote(symbol)
+                if quote is None:
+                    logger.error(f"Error fetching {symbol}: not in market snapshot")
                     continue
+                
+                current_price, _, change, change_percent, _ = quote
+                commodity_data[name] = CommodityData(
+                    commodity=name,
+                    price=round(current_price, 2),
+                    unit=unit,
+                    change=round(change, 2),
+                    change_percent=round(change_percent, 2),
+                    timestamp=snapshot.fetched_at,
+                    source='Yahoo Finance',
+                    currency='USD'
+                )
+                logger.info(f"Fetched {name}: ${current_price:.2f} ({change_percent:+.2f}%)")
             
         except Exception as e:
             logger.error(f"Error in fetch_commodity_prices: {e}")
         
         return commodity_data
 
-    def fetch_top_stocks(self, market: str = 'indian') -> Dict[str, MarketData]:
-        """Fetch top stocks data"""
+    def fetch_top_stocks(self, market: str = 'indian', include_market_cap: bool = False) -> Dict[str, MarketData]:
+        """Fetch top stocks data; market caps cost one lookup per symbol, so they are opt-in"""
         stocks_data = {}
         
         try:
-            if market == 'indian':
-                # Top Indian stocks
-                stocks = {
-                    'RELIANCE.NS': 'Reliance Industries',
-                    'TCS.NS': 'Tata Consultancy Services',
-                    'HDFCBANK.NS': 'HDFC Bank',
-                    'INFY.NS': 'Infosys',
-                    'ICICIBANK.NS': 'ICICI Bank',
-                    'HINDUNILVR.NS': 'Hindustan Unilever',
-                    'BHARTIARTL.NS': 'Bharti Airtel',
-                    'ITC.NS': 'ITC Limited',
-                    'SBIN.NS': 'State Bank of India',
-                    'LT.NS': 'Larsen & Toubro'
-                }
-            else:  # US stocks
-                stocks = {
-                    'AAPL': 'Apple Inc.',
-                    'MSFT': 'Microsoft Corporation',
-                    'GOOGL': 'Alphabet Inc.',
-                    'AMZN': 'Amazon.com Inc.',
-                    'NVDA': 'NVIDIA Corporation',
-                    'TSLA': 'Tesla Inc.',
-                    'META': 'Meta Platforms Inc.',
-                    'BRK-B': 'Berkshire Hathaway',
-                    'V': 'Visa Inc.',
-                    'JNJ': 'Johnson & Johnson'
-                }
-            
-            for symbol, name in stocks.items():
-                try:
-                    ticker = yf.Ticker(symbol)
-                    info = ticker.info
-                    hist = ticker.history(period="2d")
-                    
-                    if not hist.empty:
-                        current_price = hist['Close'].iloc[-1]
-                        prev_price = hist['Close'].iloc[-2] if len(hist) > 1 else current_price
-                        change = current_price - prev_price
-                        change_percent = (change / prev_price) * 100
-                        
-                        stock_data = MarketData(
-                            symbol=symbol,
-                            name=name,
-                            current_price=round(current_price, 2),
-                            change=round(change, 2),
-                            change_percent=round(change_percent, 2),
-                            volume=int(hist['Volume'].iloc[-1]) if 'Volume' in hist else 0,
-                            market_cap=info.get('marketCap'),
-                            timestamp=datetime.now(),
-                            source='Yahoo Finance',
-                            currency='INR' if market == 'indian' else 'USD'
-                        )
-                        
-                        stocks_data[symbol] = stock_data
-                        
-                except Exception as e:
-                    logger.error(f"Error fetching {symbol}: {e}")
-                    continue
-            
+            stocks = TOP_STOCKS['indian'] if market == 'indian' else TOP_STOCKS['us']
+            stocks_data = self._market_data(
+                stocks,
+                currency='INR' if market == 'indian' else 'USD',
+                include_market_cap=include_market_cap,
+                log_each=False
+            )
             logger.info(f"Fetched {len(stocks_data)} {market} stocks")
             
         except Exception as e:
@@ -516,25 +559,38 @@ class RealTimeFinanceData:
         
         return verified_data
 
-    def generate_market_update_content(self, timestamp: datetime = None) -> str:
-        """Generate professional market update content with real data"""
+    def fetch_market_overview(self, save: bool = True) -> Dict[str, Dict]:
+        """Every dataset in a market update, from one snapshot; optionally persisted"""
+        overview = {
+            'indian_indices': self.fetch_indian_indices(),
+            'international_indices': self.fetch_international_indices(),
+            'currencies': self.fetch_currency_rates(),
+            'commodities': self.fetch_commodity_prices(),
+            'indian_stocks': self.fetch_top_stocks('indian'),
+        }
+        
+        if save:
+            self.save_to_database(
+                market_data={**overview['indian_indices'], **overview['international_indices'],
+                             **overview['indian_stocks']},
+                currency_data=overview['currencies'],
+                commodity_data=overview['commodities']
+            )
+        
+        return overview
+
+    def generate_market_update_content(self, timestamp: datetime = None, overview: Dict[str, Dict] = None) -> str:
+        """Generate professional market update content with real data (fetched unless overview is given)"""
         if timestamp is None:
             timestamp = datetime.now()
         
-        # Fetch all data
-        indian_indices = self.fetch_indian_indices()
-        international_indices = self.fetch_international_indices()
-        currencies = self.fetch_currency_rates()
-        commodities = self.fetch_commodity_prices()
-        indian_stocks = self.fetch_top_stocks('indian')
-        
-        # Save to database
-        all_market_data = {**indian_indices, **international_indices, **indian_stocks}
-        self.save_to_database(
-            market_data=all_market_data,
-            currency_data=currencies,
-            commodity_data=commodities
-        )
+        if overview is None:
+            overview = self.fetch_market_overview()
+        indian_indices = overview['indian_indices']
+        international_indices = overview['international_indices']
+        currencies = overview['currencies']
+        commodities = overview['commodities']
+        indian_stocks = overview['indian_stocks']
         
         # Generate content
         ist_time = timestamp.strftime("%I:%M %p IST")
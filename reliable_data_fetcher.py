@@ -11,7 +11,10 @@ from datetime import datetime, timedelta
 from typing import Dict, Optional, List
 import yfinance as yf
 from functools import lru_cache
-import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from agents import indicators
+from rate_limiter import RateLimiter
 
 class ReliableDataFetcher:
     """Fetches market data from multiple sources with fallback and caching"""
@@ -19,9 +22,10 @@ class ReliableDataFetcher:
     def __init__(self):
         self.cache = {}
         self.cache_duration = 60  # Cache for 60 seconds
-        self.last_request_time = {}
-        self.min_request_interval = 2  # Minimum 2 seconds between requests per source
-        self.lock = threading.Lock()
+        self.min_request_interval = 2  # Sustained: one request per 2 seconds per source
+        # Yahoo may burst one request per index of the market overview; TradingView stays strictly spaced
+        self.rate_limiter = RateLimiter(rate=1 / self.min_request_interval, capacity=1,
+                                        limits={'yahoo': (1 / self.min_request_interval, 3)})
         
         # Indian market symbols mapping
         self.symbol_map = {
@@ -58,17 +62,8 @@ class ReliableDataFetcher:
         return (time.time() - cache_time) < self.cache_duration
     
     def _rate_limit_check(self, source: str) -> bool:
-        """Check if we can make a request to this source"""
-        with self.lock:
-            if source not in self.last_request_time:
-                self.last_request_time[source] = 0
-            
-            time_since_last = time.time() - self.last_request_time[source]
-            if time_since_last < self.min_request_interval:
-                time.sleep(self.min_request_interval - time_since_last)
-            
-            self.last_request_time[source] = time.time()
-            return True
+        """Wait for this source's token bucket; other sources are never held up"""
+        return self.rate_limiter.acquire(source)
     
     def get_live_quote(self, symbol: str) -> Dict:
         """
@@ -189,24 +184,11 @@ class ReliableDataFetcher:
     
     
     def _calculate_rsi(self, prices: List[float], period: int = 14) -> float:
-        """Calculate RSI from price data"""
+        """Wilder RSI at the latest price"""
         if len(prices) < period + 1:
             return 50.0  # Default neutral
         
-        deltas = [prices[i] - prices[i-1] for i in range(1, len(prices))]
-        gains = [d if d > 0 else 0 for d in deltas]
-        losses = [-d if d < 0 else 0 for d in deltas]
-        
-        avg_gain = sum(gains[-period:]) / period
-        avg_loss = sum(losses[-period:]) / period
-        
-        if avg_loss == 0:
-            return 100.0
-        
-        rs = avg_gain / avg_loss
-        rsi = 100 - (100 / (1 + rs))
-        
-        return rsi
+        return float(indicators.rsi(prices, period)[-1])
     
     def _get_recommendation(self, rsi: float, change: float) -> str:
         """Get recommendation based on indicators"""
@@ -255,8 +237,10 @@ class ReliableDataFetcher:
             'timestamp': datetime.now().isoformat()
         }
         
-        for index in indices:
-            data = self.get_live_quote(index)
+        with ThreadPoolExecutor(max_workers=len(indices)) as pool:
+            quotes = list(pool.map(self.get_live_quote, indices))
+        
+        for index, data in zip(indices, quotes):
             overview['indices'].append({
                 'symbol': index,
                 'name': self.symbol_map.get(index, {}).get('display', index),
@@ -0,0 +1,204 @@
+#!/usr/bin/env python3
+"""
+Snapshot Cache
+==============
+Stale-while-revalidate cache of immutable, versioned dataset snapshots.
+
+Readers always get the latest complete snapshot without taking a lock or
+waiting on upstream APIs; a snapshot past its TTL is still served while one
+background refresh (per dataset) replaces it. Only a dataset that has never
+loaded makes the caller wait. After a failed load, requests do not start
+another one for min(ttl, retry_delay) seconds, so an upstream outage is not
+retried at request rate.
+"""
+
+import hashlib
+import json
+import logging
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import dataclass
+from datetime import datetime
+from types import MappingProxyType
+from typing import Any, Callable, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+
+def freeze(value: Any) -> Any:
+    """Read-only view of nested dicts/lists so a published snapshot cannot be mutated"""
+    if isinstance(value, dict):
+        return MappingProxyType({k: freeze(v) for k, v in value.items()})
+    if isinstance(value, list):
+        return tuple(freeze(v) for v in value)
+    return value
+
+
+def thaw(value: Any) -> Any:
+    """Plain dict/list copy of a frozen value (for JSON encoding)"""
+    if isinstance(value, MappingProxyType):
+        return {k: thaw(v) for k, v in value.items()}
+    if isinstance(value, tuple):
+        return [thaw(v) for v in value]
+    return value
+
+
+def _opaque(etag: str) -> str:
+    return etag[2:] if etag.startswith('W/') else etag
+
+
+@dataclass(frozen=True)
+class Snapshot:
+    """One published version of a dataset"""
+    dataset: str
+    version: int
+    data: Any
+    etag: str
+    fetched_at: float  # time.time() when the load finished
+    load_seconds: float
+
+    @property
+    def age(self) -> float:
+        return time.time() - self.fetched_at
+
+    @property
+    def as_of(self) -> str:
+        return datetime.fromtimestamp(self.fetched_at).isoformat()
+
+    def matches(self, if_none_match: Optional[str]) -> bool:
+        """True if an If-None-Match header already names this version"""
+        if not if_none_match:
+            return False
+        # Weak comparison (RFC 7232): W/ prefixes are ignored on both sides
+        tags = [tag.strip() for tag in if_none_match.split(',')]
+        return '*' in tags or _opaque(self.etag) in {_opaque(tag) for tag in tags}
+
+
+class SnapshotCache:
+    """
+    Per-dataset loaders and TTLs. get() never blocks once a dataset has loaded;
+    refreshes are single-flight and run on a small thread pool.
+    """
+
+    def __init__(self, loaders: Dict[str, Callable[[], Any]], ttls: Dict[str, float],
+                 default_ttl: float = 300, max_workers: int = 4, retry_delay: float = 30):
+        self.loaders = dict(loaders)
+        self.ttls = dict(ttls)
+        self.default_ttl = default_ttl
+        self.retry_delay = retry_delay
+        self._snapshots: Dict[str, Snapshot] = {}
+        self._inflight: Dict[str, Future] = {}
+        self._failed_at: Dict[str, float] = {}  # time.time() of each dataset's last failed load
+        self._lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="snapshot-refresh")
+        self.stats = {'hits': 0, 'stale_hits': 0, 'misses': 0, 'refreshes': 0, 'errors': 0}
+
+    def ttl(self, dataset: str) -> float:
+        return self.ttls.get(dataset, self.default_ttl)
+
+    def backing_off(self, dataset: str) -> bool:
+        """True within min(ttl, retry_delay) seconds of the dataset's last failed load"""
+        failed_at = self._failed_at.get(dataset)
+        return failed_at is not None and time.time() - failed_at < min(self.ttl(dataset), self.retry_delay)
+
+    def peek(self, dataset: str) -> Optional[Snapshot]:
+        """Latest snapshot, whatever its age (no refresh)"""
+        return self._snapshots.get(dataset)
+
+    def get(self, dataset: str, wait_timeout: float = 60) -> Optional[Snapshot]:
+        """
+        Latest snapshot of a dataset. A stale snapshot is returned immediately and
+        refreshed in the background; with no snapshot yet, wait for the first load.
+        Shortly after a failed load neither starts another one.
+        """
+        snapshot = self._snapshots.get(dataset)
+        if snapshot is None:
+            self._count('misses')
+            if self.backing_off(dataset):
+                return None
+            try:
+                return self.refresh(dataset).result(timeout=wait_timeout)
+            except Exception as e:
+                logger.error(f"Initial load of {dataset} failed: {e}")
+                return self._snapshots.get(dataset)
+
+        if snapshot.age >= self.ttl(dataset):
+            self._count('stale_hits')
+            if not self.backing_off(dataset):
+                self.refresh(dataset)
+        else:
+            self._count('hits')
+        return snapshot
+
+    def _count(self, stat: str):
+        # Handler and refresh threads update these together; += on a dict entry is not atomic
+        with self._lock:
+            self.stats[stat] += 1
+
+    def refresh(self, dataset: str) -> Future:
+        """Start a background load unless one is already running; returns its future"""
+        with self._lock:
+            future = self._inflight.get(dataset)
+            if future is None:
+                future = self._executor.submit(self._load, dataset)
+                self._inflight[dataset] = future
+            return future
+
+    def refresh_all(self, wait: bool = True, timeout: float = 120):
+        """Refresh every dataset (e.g. from the scheduler)"""
+        futures = [self.refresh(dataset) for dataset in self.loaders]
+        if wait:
+            for future in futures:
+                try:
+                    future.result(timeout=timeout)
+                except Exception as e:
+                    logger.error(f"Refresh failed: {e}")
+
+    def _load(self, dataset: str) -> Snapshot:
+        start = time.time()
+        try:
+            data = self.loaders[dataset]()
+            if not data:
+                # An upstream outage must not replace good data with nothing
+                raise ValueError(f"{dataset} loader returned no data")
+            body = json.dumps(data, sort_keys=True, default=str).encode()
+            previous = self._snapshots.get(dataset)
+            snapshot = Snapshot(
+                dataset=dataset,
+                version=(previous.version + 1) if previous else 1,
+                data=freeze(data),
+                # Weak: the response envelope (timestamps) differs, the data does not
+                etag=f'W/"{hashlib.sha1(body).hexdigest()[:20]}"',
+                fetched_at=time.time(),
+                load_seconds=time.time() - start
+            )
+            # Publishing is a single reference swap; readers see old or new, never partial
+            self._snapshots[dataset] = snapshot
+            self._failed_at.pop(dataset, None)
+            self._count('refreshes')
+            logger.info(f"Refreshed {dataset} v{snapshot.version} in {snapshot.load_seconds:.2f}s")
+            return snapshot
+        except Exception:
+            # Keep serving the previous snapshot
+            self._failed_at[dataset] = time.time()
+            self._count('errors')
+            raise
+        finally:
+            with self._lock:
+                self._inflight.pop(dataset, None)
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            stats = dict(self.stats)
+        return {
+            **stats,
+            'datasets': {
+                name: {'version': s.version, 'age_seconds': round(s.age, 1), 'ttl': self.ttl(name),
+                       'load_seconds': round(s.load_seconds, 3), 'etag': s.etag}
+                for name, s in self._snapshots.items()
+            }
+        }
+
+    def shutdown(self):
+        self._executor.shutdown(wait=False)
@@ -0,0 +1,91 @@
+#!/usr/bin/env python3
+"""
+Source Fan-out
+==============
+Ask every price source at once and stop as soon as enough of them agree.
+
+Each source is a zero-argument coroutine factory returning a result dict with
+'success' and 'price' (wrap blocking fetchers with loop.run_in_executor). Every
+source runs under its own deadline; a source that misses it counts as failed.
+With a quorum, the fan-out returns as soon as that many successful prices lie
+within tolerance of each other and cancels the sources still running, so the
+latency is that of the quorum-th agreeing source, capped by the deadlines,
+rather than that of the slowest site.
+"""
+
+import asyncio
+import logging
+import time
+from dataclasses import dataclass, field
+from typing import Awaitable, Callable, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+Source = Callable[[], Awaitable[Dict]]
+
+
+def agreeing_sources(prices: Dict[str, float], quorum: int, tolerance: float = 0.005) -> List[str]:
+    """
+    The largest group of sources whose prices are all within tolerance (relative
+    to the lowest of them) of each other, if it has at least quorum members
+    """
+    ranked = sorted(prices.items(), key=lambda item: item[1])
+    best, low = [], 0
+    for high in range(len(ranked)):
+        while ranked[high][1] > ranked[low][1] * (1 + tolerance):
+            low += 1
+        if high - low + 1 > len(best):
+            best = ranked[low:high + 1]
+    return [source for source, _ in best] if len(best) >= quorum else []
+
+
+@dataclass
+class FanOut:
+    """What came back from one fan-out"""
+    results: Dict[str, Dict] = field(default_factory=dict)  # per answered source, in arrival order
+    agreeing: List[str] = field(default_factory=list)  # quorum members, empty if no quorum
+    timed_out: List[str] = field(default_factory=list)
+    cancelled: List[str] = field(default_factory=list)  # still running when the quorum was reached
+    elapsed: float = 0.0
+
+    @property
+    def prices(self) -> Dict[str, float]:
+        return {source: result['price'] for source, result in self.results.items()
+                if result.get('success') and result.get('price')}
+
+
+async def fan_out(sources: Dict[str, Source], deadline: float = 3.0, deadlines: Optional[Dict[str, float]] = None,
+                  quorum: Optional[int] = None, tolerance: float = 0.005) -> FanOut:
+    """Run all sources concurrently; without a quorum wait for every source (or its deadline)"""
+    start = time.perf_counter()
+    deadlines = deadlines or {}
+    tasks = {asyncio.ensure_future(asyncio.wait_for(source(), deadlines.get(name, deadline))): name
+             for name, source in sources.items()}
+    outcome = FanOut()
+    pending = set(tasks)
+    try:
+        while pending:
+            done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                name = tasks[task]
+                try:
+                    outcome.results[name] = task.result()
+                except asyncio.TimeoutError:
+                    outcome.timed_out.append(name)
+                    outcome.results[name] = {'source': name, 'success': False, 'timed_out': True}
+                except Exception as e:
+                    logger.warning(f"{name} failed: {e}")
+                    outcome.results[name] = {'source': name, 'success': False}
+            if quorum:
+                outcome.agreeing = agreeing_sources(outcome.prices, quorum, tolerance)
+                if outcome.agreeing:
+                    break
+    finally:
+        # Stragglers (or everything, if the caller was cancelled) are cancelled and reaped
+        for task in pending:
+            task.cancel()
+        outcome.cancelled = [tasks[task] for task in pending]
+        if pending:
+            await asyncio.gather(*pending, return_exceptions=True)
+    outcome.elapsed = time.perf_counter() - start
+    return outcome
@@ -21,6 +21,7 @@ class TelegramAutoPoster:
         self.api_hash = os.getenv('TELEGRAM_API_HASH')
         self.channel = os.getenv('TELEGRAM_CHANNEL_ID', '@AIFinanceNews2024')
         self.client = None
+        self.channel_entity = None  # Resolved once, reused for every post
         
     async def connect(self):
         """Connect using existing session"""
@@ -195,7 +196,9 @@ class TelegramAutoPoster:
     async def post_content(self, content):
         """Post content to channel"""
         try:
-            await self.client.send_message(self.channel, content, parse_mode='markdown')
+            if self.channel_entity is None:
+                self.channel_entity = await self.client.get_input_entity(self.channel)
+            await self.client.send_message(self.channel_entity, content, parse_mode='markdown')
             print(f"✅ Posted to {self.channel}")
             return True
         except Exception as e:
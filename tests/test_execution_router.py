@@ -0,0 +1,149 @@
+#!/usr/bin/env python3
+"""
+ExecutionRouter: routing by execution class, per-class in-flight limits,
+restarting a broken CPU pool once when several dispatchers hit it together and
+the autoscaler resizing the CPU pool in routed mode
+"""
+import sys
+import os
+import asyncio
+import threading
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+import pytest
+
+# Add parent directory to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from distributed_task_manager import (DistributedTaskManager, ExecutionClass, ExecutionRouter, LatencyHistogram,
+                                      QueueLatencyAutoscaler, ScalingObservation, Task, TaskPriority, Worker,
+                                      execution_class)
+
+
+@execution_class(ExecutionClass.CPU)
+def cpu_pid(task):
+    return os.getpid()
+
+
+@execution_class(ExecutionClass.CPU)
+def cpu_crash(task):
+    os._exit(1)
+
+
+@execution_class(ExecutionClass.IO)
+async def io_thread(task):
+    await asyncio.sleep(0.01)
+    return threading.current_thread().name
+
+
+def blocking_thread(task):  # undeclared: BLOCKING
+    return threading.current_thread().name
+
+
+@pytest.fixture
+def router():
+    router = ExecutionRouter(cpu_workers=2, io_concurrency=8, blocking_threads=1, cpu_backlog=1, cpu_niceness=0)
+    router.start()
+    yield router
+    router.shutdown()
+
+
+def make_task(n=0):
+    return Task(id=f"task-{n}", name="router", function="router")
+
+
+def test_tasks_run_where_their_class_says(router):
+    assert router.process_pool._mp_context.get_start_method() == "spawn"
+    assert router.try_submit(cpu_pid, make_task()).result(timeout=10) != os.getpid()
+    assert router.try_submit(io_thread, make_task()).result(timeout=10) == "task-io-loop"
+    assert router.try_submit(blocking_thread, make_task()).result(timeout=10).startswith("task-blocking")
+
+    router.wait_for_capacity(0.1)
+    stats = router.get_stats()
+    assert {kind: stats[kind]["completed"] for kind in ("cpu", "io", "blocking")} == {"cpu": 1, "io": 1, "blocking": 1}
+    assert router.in_flight() == 0
+
+
+def test_full_class_is_refused_without_blocking_the_others(router):
+    release = threading.Event()
+
+    def hold(task):
+        release.wait(10)
+        return "held"
+
+    held = router.try_submit(hold, make_task())
+    assert router.try_submit(hold, make_task(1)) is None  # one blocking thread
+    assert router.try_submit(io_thread, make_task(2)).result(timeout=10) == "task-io-loop"
+    assert router.get_stats()["blocking"]["in_flight"] == 1
+
+    release.set()
+    assert held.result(timeout=10) == "held"
+    router.wait_for_capacity(0.1)
+    assert router.try_submit(blocking_thread, make_task(3)).result(timeout=10)
+
+
+def test_broken_pool_is_restarted_once(router):
+    with pytest.raises(BrokenProcessPool):
+        router.try_submit(cpu_crash, make_task()).result(timeout=10)
+    broken = router.process_pool
+    # Both dispatchers get BrokenProcessPool before either has restarted the pool
+    barrier = threading.Barrier(2)
+    submit = broken.submit
+    broken.submit = lambda *args: (barrier.wait(5), submit(*args))[1]
+
+    restarts = []
+    start_pool = router._start_process_pool
+    router._start_process_pool = lambda: (restarts.append(1), start_pool())
+
+    with ThreadPoolExecutor(max_workers=2) as dispatchers:
+        futures = list(dispatchers.map(lambda n: router.try_submit(cpu_pid, make_task(n)), range(2)))
+    assert restarts == [1]
+    assert router.process_pool is not broken
+    assert all(future.result(timeout=10) != os.getpid() for future in futures)
+
+
+def test_resize_replaces_the_pool_and_cpu_limit(router):
+    old = router.process_pool
+    router.resize(1)
+    assert router.process_pool is not old and router.cpu_workers == 1
+    assert router.get_stats()["cpu"]["limit"] == 1
+    assert router.try_submit(cpu_pid, make_task()).result(timeout=10) != os.getpid()
+
+    # A dispatcher that read the pool just before a resize shut it down submits to the new one
+    resized = router.process_pool
+    old.submit = lambda *args: (setattr(router, "process_pool", resized), ProcessPoolExecutor.submit(old, *args))[1]
+    router.process_pool = old
+    assert router.try_submit(cpu_pid, make_task(1)).result(timeout=10) != os.getpid()
+    assert router.process_pool is resized
+
+
+def test_autoscaler_sizes_the_routed_cpu_pool(router):
+    manager = DistributedTaskManager.__new__(DistributedTaskManager)
+    manager.router = router
+    manager.router_config = {"cpu_workers": 2}
+    manager.worker_processes = {}
+    manager.workers = {"worker-0": Worker("worker-0", task_queue=None, resource_monitor=None, router=router)}
+
+    class Queue:
+        def get_service_histograms(self):
+            histograms = {name: LatencyHistogram() for name in ("analytics_update", "telegram_post")}
+            for _ in range(10):
+                histograms["analytics_update"].record(1.0)
+                histograms["telegram_post"].record(30.0)
+            return histograms
+
+    manager.task_queue = Queue()
+    # IO coroutines do not hold a pool process, so their latency does not count
+    assert list(manager._service_times()) == ["analytics_update"]
+
+    autoscaler = QueueLatencyAutoscaler(min_workers=1, max_workers=8, scale_down_after=1, cooldown_seconds=0)
+    idle = ScalingObservation(current_workers=manager._current_workers(),
+                              depth_by_priority={}, service_times=manager._service_times())
+    manager._scale_to(autoscaler.desired_workers(idle))
+    assert router.cpu_workers == 1 and router.get_stats()["cpu"]["limit"] == 1
+
+    backlog = ScalingObservation(current_workers=manager._current_workers(),
+                                 depth_by_priority={TaskPriority.BATCH: 9000}, service_times=manager._service_times())
+    manager._scale_to(autoscaler.desired_workers(backlog))
+    assert router.cpu_workers == 2  # capped at the configured pool size
@@ -0,0 +1,99 @@
+#!/usr/bin/env python3
+"""
+Golden tests: the NumPy indicator kernels on a (symbols x bars) universe
+against TA-Lib run one symbol at a time
+"""
+import sys
+import os
+
+import numpy as np
+import pytest
+
+# Add parent directory to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from agents import indicators
+
+talib = pytest.importorskip("talib")
+
+
+def make_universe(symbols=8, bars=600, seed=0):
+    rng = np.random.default_rng(seed)
+    close = 100 * np.cumprod(1 + rng.normal(0, 0.015, (symbols, bars)), axis=1)
+    open_ = close * (1 + rng.normal(0, 0.004, close.shape))
+    high = np.maximum(open_, close) * (1 + rng.uniform(0, 0.01, close.shape))
+    low = np.minimum(open_, close) * (1 - rng.uniform(0, 0.01, close.shape))
+    volume = rng.uniform(1e5, 3e5, close.shape)
+    # Flat stretches: zero ranges and zero changes exercise the TA-Lib zero guards
+    for array in (close, open_, high, low):
+        array[2, 200:520] = 50.0
+    close[3, :20] = close[3, 20]
+    # Symbols listed later, one too recently for the slow indicators
+    for array in (close, open_, high, low, volume):
+        array[4, :150] = np.nan
+        array[5, :bars - 30] = np.nan
+    return high, low, close, volume
+
+
+def golden(row_outputs, universe_outputs, bars_from):
+    np.testing.assert_allclose(universe_outputs[bars_from:], row_outputs[bars_from:], rtol=1e-9, atol=1e-8,
+                               equal_nan=True)
+    assert np.isnan(universe_outputs[:bars_from]).all()
+
+
+@pytest.mark.parametrize("name", ["SMA_20", "SMA_50", "SMA_200", "EMA_20", "RSI", "MACD", "MACD_signal",
+                                  "MACD_histogram", "BB_upper", "BB_middle", "BB_lower", "STOCH_K", "STOCH_D",
+                                  "ATR", "ADX", "OBV"])
+def test_universe_kernels_match_talib_per_symbol(name):
+    high, low, close, volume = make_universe()
+    universe = indicators.technical_indicators(high, low, close, volume)[name]
+    assert universe.shape == close.shape
+    for j in range(len(close)):
+        start = int(np.argmax(~np.isnan(close[j])))
+        h, l, c, v = (array[j, start:] for array in (high, low, close, volume))
+        macd = talib.MACD(c)
+        bands = talib.BBANDS(c, timeperiod=20)
+        stoch = talib.STOCH(h, l, c)
+        expected = {
+            'SMA_20': talib.SMA(c, 20), 'SMA_50': talib.SMA(c, 50), 'SMA_200': talib.SMA(c, 200),
+            'EMA_20': talib.EMA(c, 20), 'RSI': talib.RSI(c, 14),
+            'MACD': macd[0], 'MACD_signal': macd[1], 'MACD_histogram': macd[2],
+            'BB_upper': bands[0], 'BB_middle': bands[1], 'BB_lower': bands[2],
+            'STOCH_K': stoch[0], 'STOCH_D': stoch[1],
+            'ATR': talib.ATR(h, l, c, 14), 'ADX': talib.ADX(h, l, c, 14), 'OBV': talib.OBV(c, v),
+        }[name]
+        row = np.full(close.shape[1], np.nan)
+        row[start:] = expected
+        golden(row, universe[j], start)
+
+
+def test_single_series_and_rsi_zones():
+    high, low, close, volume = (array[:1] for array in make_universe())
+    np.testing.assert_allclose(indicators.rsi(close[0]), indicators.rsi(close)[0], equal_nan=True)
+    assert indicators.rsi(close[0]).shape == close[0].shape
+    # Not enough bars: all NaN, never an error
+    assert np.isnan(indicators.adx(high[0, :20], low[0, :20], close[0, :20])).all()
+    assert np.isnan(indicators.macd(close[0, :30])[0]).all()
+
+    # Latest-window Wilder RSI, not the oldest window: a series that fell and then rallied reads strong
+    series = np.concatenate([np.linspace(100, 60, 40), np.linspace(60, 90, 40)])
+    assert indicators.rsi(series)[-1] > 70 and indicators.rsi(series)[30] < 30
+
+    readings = np.array([10, 30, 44.9, 45, 50, 55, 55.1, 70, 70.1, np.nan])
+    assert list(indicators.rsi_zone(readings)) == ['OVERSOLD', 'WEAK', 'WEAK', 'NEUTRAL', 'NEUTRAL', 'NEUTRAL',
+                                                   'STRONG', 'STRONG', 'OVERBOUGHT', 'NEUTRAL']
+    assert indicators.rsi_zone(25.0) == 'OVERSOLD'
+
+
+def test_streaming_engine_agrees_with_kernels():
+    from agents.streaming_indicators import IndicatorEngine
+
+    high, low, close, volume = make_universe()
+    universe = indicators.technical_indicators(high, low, close, volume)
+    for j in (0, 2, 3):
+        engine = IndicatorEngine()
+        for t in range(close.shape[1]):
+            values = engine.update(high[j, t], low[j, t], close[j, t], volume[j, t])
+            for name, value in values.items():
+                np.testing.assert_allclose(value, universe[name][j, t], rtol=1e-9, atol=1e-8, equal_nan=True,
+                                           err_msg=f"{name} at bar {t}")
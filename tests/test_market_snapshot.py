@@ -0,0 +1,121 @@
+#!/usr/bin/env python3
+"""
+Bulk market snapshot: parsing a group_by='ticker' download, and every
+fetch_* call in a refresh cycle sharing one yf.download
+"""
+import sys
+import os
+import importlib
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+
+import numpy as np
+import pandas as pd
+import pytest
+
+for module in ("aiohttp", "dotenv"):
+    pytest.importorskip(module)
+
+# Add parent directory to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+@pytest.fixture(scope="module")
+def rtfd(tmp_path_factory):
+    # The module opens financial_data.log (and the class financial_data.db) in the working directory
+    with pytest.MonkeyPatch.context() as patch:
+        patch.chdir(tmp_path_factory.mktemp("realtime_finance_data"))
+        yield importlib.import_module("realtime_finance_data")
+
+
+def bars(closes, volumes=None):
+    index = pd.bdate_range(end="2024-06-07", periods=len(closes))
+    closes = np.asarray(closes, dtype=float)
+    volumes = np.full(len(closes), 1000.0) if volumes is None else np.asarray(volumes, dtype=float)
+    return pd.DataFrame({'Open': closes, 'High': closes, 'Low': closes, 'Close': closes,
+                         'Adj Close': closes, 'Volume': volumes}, index=index)
+
+
+class FakeYahoo:
+    """yf.download over deterministic bars; Ticker must not be used by the fetchers"""
+
+    def __init__(self):
+        self.downloads = []
+        self.lock = threading.Lock()
+
+    def download(self, tickers, period, interval, group_by, **kwargs):
+        assert group_by == "ticker" and interval == "1d"
+        with self.lock:
+            self.downloads.append(list(tickers))
+        return pd.concat({symbol: bars([100 + n, 101 + n, 102 + n]) for n, symbol in enumerate(tickers)}, axis=1)
+
+    def Ticker(self, symbol):
+        raise AssertionError(f"per-symbol request for {symbol}")
+
+
+@pytest.fixture
+def finance_data(rtfd, monkeypatch):
+    yahoo = FakeYahoo()
+    monkeypatch.setattr(rtfd, "yf", yahoo)
+    finance_data = rtfd.RealTimeFinanceData()
+    finance_data.yahoo = yahoo
+    return finance_data
+
+
+def test_from_frame_drops_holidays_per_symbol(rtfd):
+    open_market = bars([100, 101, 102], volumes=[10, 20, 30])
+    holiday = bars([50, 55, np.nan])  # closed on the last day
+    frame = pd.concat({'OPEN': open_market, 'HOLIDAY': holiday, 'EMPTY': bars([np.nan] * 3)}, axis=1)
+
+    snapshot = rtfd.MarketSnapshot.from_frame(frame, ['OPEN', 'HOLIDAY', 'EMPTY', 'MISSING'])
+    assert snapshot.quotes == {'OPEN': (102.0, 101.0, 30), 'HOLIDAY': (55.0, 50.0, 1000)}
+    price, prev_price, change, change_percent, volume = snapshot.quote('HOLIDAY')
+    assert (change, change_percent) == (5.0, 10.0)
+    assert snapshot.quote('EMPTY') is None and snapshot.quote('MISSING') is None
+
+    # Older yfinance returns flat columns for a single ticker
+    single = rtfd.MarketSnapshot.from_frame(open_market, ['OPEN'])
+    assert single.quotes == {'OPEN': (102.0, 101.0, 30)}
+    assert rtfd.MarketSnapshot.from_frame(pd.DataFrame(), ['OPEN']).quotes == {}
+
+
+def test_refresh_cycle_shares_one_download(rtfd, finance_data):
+    cycle = rtfd.refresh_cycle_symbols()
+    indian = finance_data.fetch_indian_indices()
+    international = finance_data.fetch_international_indices()
+    currencies = finance_data.fetch_currency_rates()
+    commodities = finance_data.fetch_commodity_prices()
+    assert finance_data.yahoo.downloads == [cycle]
+
+    n = cycle.index('^NSEI')
+    nifty = indian['^NSEI']
+    assert (nifty.current_price, nifty.change, nifty.currency) == (102 + n, 1.0, 'INR')
+    assert nifty.change_percent == round(100 / (101 + n), 2)
+    assert set(international) == set(rtfd.INTERNATIONAL_INDICES)
+    assert set(currencies) == {f"{base}/{target}" for base, target in rtfd.CURRENCY_PAIRS}
+    assert len(commodities) == len(rtfd.COMMODITIES)
+
+    # Concurrent callers inside the TTL reuse it
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        snapshots = list(pool.map(lambda _: finance_data.get_snapshot(), range(16)))
+    assert len({id(snapshot) for snapshot in snapshots}) == 1
+    assert len(finance_data.yahoo.downloads) == 1
+
+
+def test_snapshot_expires_and_outside_symbols_download_alone(rtfd, finance_data):
+    first = finance_data.get_snapshot()
+    first.fetched_at = datetime.now() - timedelta(seconds=finance_data.snapshot_ttl)
+    assert finance_data.get_snapshot() is not first
+    assert len(finance_data.yahoo.downloads) == 2
+
+    # Expired snapshots are refreshed once, however many callers arrive together
+    finance_data._snapshot.fetched_at -= timedelta(seconds=finance_data.snapshot_ttl)
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        list(pool.map(lambda _: finance_data.get_snapshot(['^NSEI']), range(8)))
+    assert len(finance_data.yahoo.downloads) == 3
+
+    outside = finance_data.get_snapshot(['ZOMATO.NS'])
+    assert finance_data.yahoo.downloads[-1] == ['ZOMATO.NS']
+    assert outside.quote('ZOMATO.NS')[0] == 102.0
+    assert finance_data._snapshot is not outside
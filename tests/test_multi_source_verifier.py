@@ -0,0 +1,123 @@
+#!/usr/bin/env python3
+"""
+MultiSourceVerifier against a stub HTTP session: a watchlist longer than the
+sites' rate budget is paced through the limiter rather than turned away
+"""
+import sys
+import os
+import asyncio
+import re
+import time
+from collections import defaultdict
+from urllib.parse import urlparse
+
+import pandas as pd
+import pytest
+
+for module in ("aiohttp", "bs4"):
+    pytest.importorskip(module)
+
+# Add parent directory to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import multi_source_verifier
+from rate_limiter import RateLimiter
+
+PRICES = {f"SYM{n}": 100.0 + 10 * n for n in range(12)}
+
+
+class StubResponse:
+    """What session.get() returns: awaitable (NSE's cookie call) and an async context manager"""
+
+    def __init__(self, status=200, text="", data=None):
+        self.status = status
+        self._text = text
+        self._data = data
+
+    def __await__(self):
+        yield from []
+        return self
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+    async def text(self):
+        return self._text
+
+    async def json(self):
+        return self._data
+
+
+class StubSession:
+    """Quote pages of the four HTTP sources, with the time of every request per site"""
+
+    def __init__(self):
+        self.requests = defaultdict(list)
+
+    def get(self, url, headers=None):
+        site = urlparse(url).netloc
+        self.requests[site].append(time.perf_counter())
+        symbol = next((s for s in PRICES if re.search(rf"\b{s}\b", url)), None)
+        if symbol is None:
+            return StubResponse()  # NSE home page, for cookies
+        price = PRICES[symbol]
+        if "moneycontrol" in site:
+            return StubResponse(text=f'<div class="inprice1">{price:,.2f}</div>')
+        if "economictimes" in site:
+            return StubResponse(text=f'<span data-price="{price}"></span>')
+        if "google" in site:
+            return StubResponse(text=f'<div data-last-price="{price}"></div>')
+        return StubResponse(data={'priceInfo': {'lastPrice': price}})
+
+
+class StubYahoo:
+    def Ticker(self, symbol):
+        price = PRICES[symbol.split(".")[0]]
+        return type("Ticker", (), {"history": lambda self, period: pd.DataFrame({"Close": [price]})})()
+
+
+class StubTradingView:
+    def get_quote_from_tradingview(self, symbol):
+        return {'current_price': PRICES[symbol], 'change_percent': 0.0, 'volume': 1}
+
+
+@pytest.fixture
+def verifier(monkeypatch):
+    monkeypatch.setattr(multi_source_verifier, "yf", StubYahoo())
+    verifier = multi_source_verifier.MultiSourceVerifier()
+    verifier.tv_fetcher = StubTradingView()
+    # Every site allows 40 requests a second, one at a time; a source gets 0.1s
+    verifier.rate_limiter = RateLimiter(rate=40.0, capacity=1)
+    verifier.deadline, verifier.deadlines = 0.1, {}
+    yield verifier
+    verifier.executor.shutdown()
+
+
+def test_watchlist_over_the_rate_budget_is_paced_not_rejected(verifier):
+    session = StubSession()
+    start = time.perf_counter()
+    results = asyncio.run(verifier.verify_watchlist(list(PRICES), session=session))
+    elapsed = time.perf_counter() - start
+
+    # Twelve symbols at 40/s per site: about 0.3s, not twelve failed deadlines
+    assert list(results) == list(PRICES)
+    for symbol, result in results.items():
+        assert result['quorum_reached'] and result['price'] == PRICES[symbol], symbol
+    assert 0.2 < elapsed < 2.0
+    metrics = verifier.rate_limiter.metrics()
+    assert set(metrics) == set(verifier.SOURCES)
+    assert all(stats['rejected'] == 0 and stats['acquired'] == len(PRICES) for stats in metrics.values())
+
+    # No site saw requests faster than its limit (NSE: cookie and quote per token)
+    for site, times in session.requests.items():
+        per_token = 2 if "nseindia" in site else 1
+        assert times[-1] - times[0] > (len(times) / per_token - 1) / 40 * 0.8, site
+
+
+def test_single_verification_still_takes_its_own_tokens(verifier):
+    result = asyncio.run(verifier.verify("SYM3", StubSession()))
+    assert result['quorum_reached'] and result['price'] == PRICES["SYM3"]
+    assert sum(stats['acquired'] for stats in verifier.rate_limiter.metrics().values()) >= 3
@@ -0,0 +1,178 @@
+#!/usr/bin/env python3
+"""
+Shared OHLCV store: incremental appends, freshness, bulk refresh, replacing
+re-adjusted history and sharing files between stores, against the offline
+file provider
+"""
+import sys
+import os
+import asyncio
+
+import numpy as np
+import pandas as pd
+import pytest
+
+# Add parent directory to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from agents.ohlcv_store import FileProvider, OHLCVStore, period_start
+from agents.portfolio_management_agent import PortfolioManagementAgent
+from agents.risk_compliance_agent import RiskComplianceAgent
+
+
+def make_bars(days=300, seed=0):
+    rng = np.random.default_rng(seed)
+    index = pd.bdate_range(end=pd.Timestamp.now().normalize(), periods=days, tz="UTC")
+    close = 100 * np.cumprod(1 + rng.normal(0, 0.01, days))
+    return pd.DataFrame({"Open": close, "High": close * 1.01, "Low": close * 0.99,
+                         "Close": close, "Volume": rng.integers(10**5, 10**6, days)}, index=index)
+
+
+@pytest.fixture
+def feed(tmp_path):
+    provider = FileProvider(str(tmp_path / "source"))
+    bars = make_bars()
+    for seed, symbol in enumerate(["RELIANCE.NS", "TCS.NS", "^NSEI"]):
+        provider.save(symbol, "1d", make_bars(seed=seed).iloc[:-3])
+    return provider, bars, str(tmp_path / "store")
+
+
+def test_fresh_store_makes_no_request_and_stale_fetches_only_new_bars(feed):
+    provider, bars, root = feed
+    store = OHLCVStore(root, provider=provider)
+    first = store.history("RELIANCE.NS", period="6mo")
+    assert provider.requests == 1
+    assert first.index[0] >= period_start("6mo")
+
+    # Shorter window, still fresh: served from disk
+    store.history("RELIANCE.NS", period="3mo")
+    assert provider.requests == 1 and store.stats["fresh_hits"] == 1
+
+    provider.save("RELIANCE.NS", "1d", bars)
+    before = store.stats["bars_written"]
+    updated = store.history("RELIANCE.NS", period="6mo", max_age=0)
+    assert provider.requests == 2
+    assert store.stats["bars_written"] - before == 5  # re-fetched last two bars + 3 new ones
+    assert updated.index[-1] == bars.index[-1]
+    np.testing.assert_allclose(updated["Close"], bars["Close"].iloc[-len(updated):])
+
+    # A new process reads the same files back without a request
+    reopened = OHLCVStore(root, provider=provider).history("RELIANCE.NS", period="6mo")
+    assert provider.requests == 2
+    pd.testing.assert_frame_equal(reopened, updated)
+
+    # A longer window than stored triggers one full fetch
+    assert len(store.history("RELIANCE.NS", period="1y")) > len(updated)
+    assert provider.requests == 3
+
+
+def test_bulk_closes_is_one_request_per_interval(feed):
+    provider, _, root = feed
+    store = OHLCVStore(root, provider=provider)
+    closes = store.closes(["RELIANCE.NS", "TCS.NS", "^NSEI", "MISSING.NS"], period="6mo")
+    assert list(closes.columns) == ["RELIANCE.NS", "TCS.NS", "^NSEI"]
+    assert provider.requests == 1
+    store.closes(["RELIANCE.NS", "TCS.NS"], period="6mo")
+    assert provider.requests == 1
+
+
+def test_readjusted_history_is_replaced(feed):
+    provider, bars, root = feed
+    store = OHLCVStore(root, provider=provider)
+    store.history("RELIANCE.NS", period="6mo")
+    store.closes(["TCS.NS", "^NSEI"], period="6mo")
+
+    # A 2:1 split: the provider now serves every past bar halved
+    split = bars.copy()
+    split[["Open", "High", "Low", "Close"]] /= 2
+    provider.save("RELIANCE.NS", "1d", split)
+    updated = store.history("RELIANCE.NS", period="6mo", max_age=0)
+    assert provider.requests == 4  # incremental, then the full replace
+    assert store.stats["readjusted"] == 1
+    np.testing.assert_allclose(updated["Close"], split["Close"].iloc[-len(updated):])
+
+    # In a bulk refresh only the re-adjusted symbol is fetched again in full
+    dividend = make_bars(seed=1).iloc[:-3]
+    dividend[["Open", "High", "Low", "Close"]] *= 0.99
+    provider.save("TCS.NS", "1d", dividend)
+    assert store.refresh(["TCS.NS", "^NSEI"], period="6mo", max_age=0) == 2
+    assert provider.requests == 6 and store.stats["readjusted"] == 2
+    closes = store.history("TCS.NS", period="6mo")["Close"]
+    np.testing.assert_allclose(closes, dividend["Close"].iloc[-len(closes):])
+
+
+def test_stores_sharing_a_directory_see_each_others_writes(feed):
+    provider, bars, root = feed
+    first = OHLCVStore(root, provider=provider)
+    other = OHLCVStore(root, provider=provider)  # stands in for a second process
+    assert len(first.history("RELIANCE.NS", period="6mo")) == len(other.history("RELIANCE.NS", period="6mo"))
+    assert provider.requests == 1
+
+    provider.save("RELIANCE.NS", "1d", bars)
+    other.history("RELIANCE.NS", period="6mo", max_age=0)
+    assert provider.requests == 2
+    # The first store reloads the replaced meta.json instead of reading its stale row count
+    updated = first.history("RELIANCE.NS", period="6mo")
+    assert provider.requests == 2
+    assert updated.index[-1] == bars.index[-1]
+    assert os.path.exists(os.path.join(root, "1d", "RELIANCE.NS", ".lock"))
+
+
+class ZonedProvider:
+    """Ticker.history-style aware IST bars from fetch, yf.download-style naive bars from fetch_many"""
+
+    def __init__(self, bars):
+        self.bars = bars
+
+    def _since(self, period, start):
+        bound = pd.Timestamp(start if start is not None else period_start(period))
+        if bound.tz is None:
+            bound = bound.tz_localize("Asia/Kolkata")
+        return self.bars[self.bars.index >= bound]
+
+    def fetch(self, symbol, interval, period=None, start=None):
+        return self._since(period, start)
+
+    def fetch_many(self, symbols, interval, period=None, start=None):
+        return {symbol: self._since(period, start).tz_localize(None) for symbol in symbols}
+
+
+@pytest.mark.parametrize("closes_first", [True, False])
+def test_naive_and_zoned_fetches_write_one_series(tmp_path, closes_first):
+    bars = make_bars(days=50).tz_localize(None).tz_localize("Asia/Kolkata")
+    store = OHLCVStore(str(tmp_path), provider=ZonedProvider(bars))
+    steps = ["closes", "history", "closes"] if closes_first else ["history", "closes", "history"]
+    for step in steps:
+        store.expire()
+        if step == "closes":
+            store.closes(["RELIANCE.NS"], period="1y")
+        else:
+            store.history("RELIANCE.NS", period="1y")
+
+        history = store.history("RELIANCE.NS", period="1y")
+        days = history.index.tz_localize(None) if history.index.tz is not None else history.index
+        assert list(days) == list(bars.index.tz_localize(None))
+        np.testing.assert_allclose(history["Close"], bars["Close"])
+    assert store.stats["readjusted"] == 0
+
+
+def test_agents_share_one_fetch_per_symbol(feed):
+    provider, _, root = feed
+    store = OHLCVStore(root, provider=provider)
+    risk = RiskComplianceAgent.__new__(RiskComplianceAgent)
+    risk.history_store = store
+    portfolio = PortfolioManagementAgent.__new__(PortfolioManagementAgent)
+    portfolio.history_store = store
+    holdings = [{"symbol": "RELIANCE.NS", "value": 60_000}, {"symbol": "TCS.NS", "value": 40_000}]
+
+    async def cycle():
+        returns = await risk.load_returns(holdings)
+        liquidity = await risk.calculate_liquidity_risk(holdings)
+        historical = await portfolio.get_historical_returns(["RELIANCE.NS", "TCS.NS"])
+        return returns, liquidity, historical
+
+    returns, liquidity, historical = asyncio.run(cycle())
+    assert provider.requests == 1
+    assert returns.symbols == ["RELIANCE.NS", "TCS.NS"] and len(returns) > 200
+    assert 0 <= liquidity <= 100
+    assert list(historical.columns) == ["RELIANCE.NS", "TCS.NS"]
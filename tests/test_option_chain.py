@@ -0,0 +1,77 @@
+#!/usr/bin/env python3
+"""
+Columnar option chain analytics must match the per-strike definitions
+"""
+import sys
+import os
+
+import numpy as np
+import pytest
+
+# Add parent directory to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from agents.option_chain import OptionChain
+
+
+def brute_force_pain(strikes, call_oi, put_oi):
+    """Writer payout at each strike, straight from the definition"""
+    pain = []
+    for k in strikes:
+        total = 0.0
+        for x, c, p in zip(strikes, call_oi, put_oi):
+            if k > x:
+                total += (k - x) * c
+            if k < x:
+                total += (x - k) * p
+        pain.append(total)
+    return np.array(pain)
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_max_pain_matches_definition(seed):
+    rng = np.random.default_rng(seed)
+    strikes = rng.permutation(np.arange(18000, 21000, 50))
+    call_oi = rng.integers(0, 50000, len(strikes))
+    put_oi = rng.integers(0, 50000, len(strikes))
+
+    chain = OptionChain(strikes, call_oi=call_oi, put_oi=put_oi)
+    order = np.argsort(strikes)
+    expected = brute_force_pain(strikes[order], call_oi[order], put_oi[order])
+
+    np.testing.assert_allclose(chain.pain_by_strike(), expected)
+    assert chain.max_pain() == strikes[order][np.argmin(expected)]
+
+
+def test_duplicate_and_fractional_strikes():
+    strikes = np.array([100.0, 102.5, 102.5, 105.0, 107.5])
+    call_oi = np.array([10, 5, 7, 1, 0])
+    put_oi = np.array([0, 3, 4, 8, 20])
+    chain = OptionChain(strikes, call_oi=call_oi, put_oi=put_oi)
+    np.testing.assert_allclose(chain.pain_by_strike(), brute_force_pain(strikes, call_oi, put_oi))
+
+
+def test_pcr_and_empty_chain():
+    chain = OptionChain([100, 110], call_oi=[200, 200], put_oi=[100, 500])
+    assert chain.pcr() == pytest.approx(1.5)
+    assert OptionChain([100], call_oi=[0], put_oi=[10]).pcr() == float('inf')
+    assert OptionChain([]).max_pain() == 0.0
+
+
+def test_oi_levels_split_by_current_price():
+    chain = OptionChain(
+        [90, 95, 100, 105, 110],
+        call_oi=[1, 1, 1, 1, 50], put_oi=[50, 1, 1, 1, 1],
+        call_change_oi=[5, 5, 5, 5, 5], put_change_oi=[5, 5, 5, 5, 5]
+    )
+    levels = chain.oi_levels(current_price=100)
+    assert chain.strike[levels['resistance']].tolist() == [110]
+    assert chain.strike[levels['support']].tolist() == [90]
+    assert chain.strike[levels['bearish_buildup']].tolist() == [105, 110]
+    assert chain.strike[levels['bullish_buildup']].tolist() == [90, 95]
+
+
+def test_fingerprint_tracks_content_not_order():
+    chain = OptionChain([110, 100], call_oi=[5, 7], put_oi=[1, 2])
+    assert chain.fingerprint() == OptionChain([100, 110], call_oi=[7, 5], put_oi=[2, 1]).fingerprint()
+    assert chain.fingerprint() != OptionChain([110, 100], call_oi=[5, 8], put_oi=[1, 2]).fingerprint()
@@ -0,0 +1,204 @@
+#!/usr/bin/env python3
+"""
+Streaming option chain store: incremental totals, snapshot isolation, pinned
+reads, session rollover, replay and the fetcher's refetch of unstreamed chains
+"""
+import sys
+import os
+import asyncio
+import random
+from datetime import date, timedelta
+
+import numpy as np
+import pytest
+
+# Add parent directory to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from agents.kite_option_data import KiteOptionChainFetcher
+from agents.option_chain_stream import OptionChainStore, RecordedTickFeed, TickRecorder
+
+STRIKES = [19400.0, 19450.0, 19500.0, 19550.0, 19600.0]
+
+
+def instruments():
+    rows = []
+    for i, strike in enumerate(STRIKES):
+        for j, kind in enumerate(("CE", "PE")):
+            rows.append({"instrument_token": 1000 + 2 * i + j, "name": "NIFTY", "expiry": "2099-01-01",
+                         "strike": strike, "instrument_type": kind,
+                         "tradingsymbol": f"NIFTY99JAN{int(strike)}{kind}"})
+    return rows
+
+
+def make_store():
+    store = OptionChainStore()
+    store.register_instruments(instruments())
+    store.register_underlying("NIFTY", 256265)
+    return store
+
+
+def test_incremental_totals_match_recomputation():
+    store = make_store()
+    rng = random.Random(3)
+    for _ in range(300):
+        store.on_ticks([{"instrument_token": rng.randrange(1000, 1010), "oi": rng.randrange(0, 50000),
+                         "last_price": rng.uniform(1, 200), "volume_traded": rng.randrange(0, 10**6)}
+                        for _ in range(rng.randrange(1, 6))])
+
+    snapshot = store.snapshot("NIFTY")
+    chain = snapshot.chain
+    assert snapshot.total_call_oi == int(chain.call_oi.sum())
+    assert snapshot.total_put_oi == int(chain.put_oi.sum())
+    assert snapshot.total_call_change_oi == int(chain.call_change_oi.sum())
+    assert snapshot.pcr == pytest.approx(chain.pcr())
+    assert chain.strike.dtype == np.int64
+
+
+def test_change_oi_is_measured_from_first_tick_of_day():
+    store = make_store()
+    store.on_ticks([{"instrument_token": 1004, "oi": 10000}])
+    store.on_ticks([{"instrument_token": 1004, "oi": 12500}, {"instrument_token": 256265, "last_price": 19480.5}])
+    snapshot = store.snapshot("NIFTY")
+    row = list(snapshot.chain.strike).index(19500)
+    assert snapshot.chain.call_oi[row] == 12500
+    assert snapshot.chain.call_change_oi[row] == 2500
+    assert snapshot.underlying_price == 19480.5
+
+
+def test_held_snapshot_is_not_mutated_by_later_ticks():
+    store = make_store()
+    store.on_ticks([{"instrument_token": 1000, "oi": 100}])
+    held = store.snapshot("NIFTY")
+    for oi in range(200, 2000, 100):
+        store.on_ticks([{"instrument_token": 1000, "oi": oi}])
+
+    assert held.chain.call_oi[0] == 100
+    assert held.total_call_oi == 100
+    assert store.snapshot("NIFTY").chain.call_oi[0] == 1900
+    with pytest.raises(ValueError):
+        held.chain.call_oi[0] = 5
+
+
+def test_pinned_reads_reuse_buffers_after_release():
+    store = make_store()
+    store.on_ticks([{"instrument_token": 1000, "oi": 100}])
+    buffers = set()
+    for oi in range(200, 1200, 100):
+        with store.pinned("NIFTY") as snapshot:
+            buffers.add(id(snapshot._buffer))
+            assert snapshot.chain.call_oi[0] == oi - 100
+        store.on_ticks([{"instrument_token": 1000, "oi": oi}])
+    assert len(buffers) == 2  # front and back flip; no copies
+
+    with store.pinned("NIFTY") as pinned:
+        for oi in range(2000, 2500, 100):
+            store.on_ticks([{"instrument_token": 1000, "oi": oi}])
+        assert pinned.chain.call_oi[0] == 1100  # untouched while pinned
+        assert pinned.total_call_oi == 1100
+    assert store.snapshot("NIFTY").chain.call_oi[0] == 2400
+    with store.pinned("BANKNIFTY") as missing:
+        assert missing is None
+
+
+def test_change_oi_restarts_each_session():
+    store = make_store()
+    store.on_ticks([{"instrument_token": 1004, "oi": 10000}])
+    store.on_ticks([{"instrument_token": 1004, "oi": 12500}, {"instrument_token": 1005, "oi": 800}])
+    yesterday = store.snapshot("NIFTY")
+    row = list(yesterday.chain.strike).index(19500)
+
+    store.new_session(date.today())
+    reset = store.snapshot("NIFTY")
+    assert reset.chain.call_change_oi[row] == 0 and reset.total_call_change_oi == 0
+    assert reset.chain.call_oi[row] == 12500  # OI itself carries over
+    assert yesterday.chain.call_change_oi[row] == 2500
+
+    store.on_ticks([{"instrument_token": 1004, "oi": 13000}])
+    store.on_ticks([{"instrument_token": 1004, "oi": 13400}])
+    snapshot = store.snapshot("NIFTY")
+    assert snapshot.chain.call_change_oi[row] == 400
+    assert snapshot.total_call_change_oi == 400 and snapshot.total_put_change_oi == 0
+
+    # The first tick batch on a new day rolls the session over by itself
+    store.session = date.today() - timedelta(days=1)
+    store.on_ticks([{"instrument_token": 1004, "oi": 14000}])
+    assert store.session == date.today()
+    assert store.snapshot("NIFTY").chain.call_change_oi[row] == 0
+
+
+def test_unstreamed_chain_is_refetched_after_ttl():
+    fetcher = KiteOptionChainFetcher()
+    fetches = []
+    fetch = fetcher.get_option_chain
+
+    async def counted(symbol, expiry=None):
+        fetches.append(symbol)
+        return await fetch(symbol, expiry)
+
+    fetcher.get_option_chain = counted
+
+    async def run():
+        first = await fetcher.get_chain_snapshot("NIFTY", "2099-01-01")
+        assert await fetcher.get_chain_snapshot("NIFTY", "2099-01-01") is first
+        fetcher.snapshot_ttl = 0
+        refreshed = await fetcher.get_chain_snapshot("NIFTY", "2099-01-01")
+        assert refreshed.version > first.version
+
+        # A failed subscription leaves the chain on TTL refetch
+        assert fetcher.start_streaming(Feed(fail=True), instruments(), {"NIFTY": 256265}) is False
+        assert not fetcher.streaming_symbols
+        await fetcher.get_chain_snapshot("NIFTY", "2099-01-01")
+
+        # Streamed chains are kept current by ticks, never refetched
+        feed = Feed()
+        assert fetcher.start_streaming(feed, instruments(), {"NIFTY": 256265})
+        assert feed.subscribed == [row["tradingsymbol"] for row in instruments()] + ["NIFTY"]
+        assert fetcher.streaming_symbols == {"NIFTY"}
+        await fetcher.get_chain_snapshot("NIFTY", "2099-01-01")
+
+    class Feed:
+        def __init__(self, fail=False):
+            self.fail = fail
+            self.subscribed = None
+
+        def subscribe_to_live_data(self, instruments, callback):
+            if self.fail:
+                raise ConnectionError("websocket closed")
+            self.subscribed = list(instruments)
+            return True
+
+    asyncio.run(run())
+    assert fetches == ["NIFTY", "NIFTY", "NIFTY"]
+
+
+def test_new_strike_keeps_existing_values():
+    store = make_store()
+    store.on_ticks([{"instrument_token": 1002, "oi": 700}])
+    store.register_instruments([{"instrument_token": 2000, "name": "NIFTY", "expiry": "2099-01-01",
+                                 "strike": 19425.0, "instrument_type": "CE"}])
+    store.on_ticks([{"instrument_token": 2000, "oi": 50}])
+    chain = store.snapshot("NIFTY").chain
+    assert chain.strike.tolist() == [19400, 19425, 19450, 19500, 19550, 19600]
+    assert chain.call_oi.tolist() == [0, 50, 700, 0, 0, 0]
+
+
+def test_recorded_feed_replays_to_same_state(tmp_path):
+    live = make_store()
+    path = str(tmp_path / "ticks.jsonl")
+    recorder = TickRecorder(path)
+    recorder.write({"instruments": instruments()})
+    recorder.write({"underlyings": {"NIFTY": 256265}})
+    rng = random.Random(9)
+    for _ in range(50):
+        batch = [{"instrument_token": rng.randrange(1000, 1010), "oi": rng.randrange(0, 9000)}]
+        batch.append({"instrument_token": 256265, "last_price": rng.uniform(19300, 19700)})
+        live.on_ticks(batch)
+        recorder.record(batch)
+    recorder.close()
+
+    replayed = OptionChainStore()
+    assert RecordedTickFeed(path).replay(replayed) == 100
+    a, b = live.snapshot("NIFTY"), replayed.snapshot("NIFTY")
+    assert a.chain.fingerprint() == b.chain.fingerprint()
+    assert a.underlying_price == b.underlying_price
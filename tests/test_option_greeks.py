@@ -0,0 +1,108 @@
+#!/usr/bin/env python3
+"""
+Black-Scholes Greeks and IV solver against textbook reference values
+"""
+import sys
+import os
+import asyncio
+from datetime import datetime
+
+import numpy as np
+import pytest
+
+# Add parent directory to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from agents.option_greeks import bs_greeks, bs_price, implied_volatility, portfolio_greeks, time_to_expiry
+from agents.risk_compliance_agent import RiskComplianceAgent
+
+
+def test_prices_match_hull():
+    # Hull, Options Futures and Other Derivatives, Example 15.6
+    assert bs_price(42, 40, 0.5, 0.2, 0.1, is_call=True) == pytest.approx(4.7594, abs=1e-4)
+    assert bs_price(42, 40, 0.5, 0.2, 0.1, is_call=False) == pytest.approx(0.8086, abs=1e-4)
+
+
+def test_greeks_match_hull():
+    # Hull, Chapter 19 running example (per-year theta, per-unit vega/rho in the book)
+    g = bs_greeks(49, 50, 0.3846, 0.2, 0.05, is_call=True)
+    assert g['price'] == pytest.approx(2.40, abs=5e-3)
+    assert g['delta'] == pytest.approx(0.522, abs=1e-3)
+    assert g['gamma'] == pytest.approx(0.066, abs=1e-3)
+    assert g['theta'] * 365 == pytest.approx(-4.31, abs=1e-2)
+    assert g['vega'] * 100 == pytest.approx(12.1, abs=0.05)
+    assert g['rho'] * 100 == pytest.approx(8.91, abs=1e-2)
+
+
+def test_put_call_parity_and_finite_differences():
+    rng = np.random.default_rng(1)
+    n = 500
+    S, K = rng.uniform(80, 120, n), rng.uniform(80, 120, n)
+    T, vol, q = rng.uniform(0.02, 2, n), rng.uniform(0.05, 0.8, n), rng.uniform(0, 0.03, n)
+    call = bs_greeks(S, K, T, vol, 0.06, q, True)
+    put = bs_greeks(S, K, T, vol, 0.06, q, False)
+    np.testing.assert_allclose(call['price'] - put['price'], S * np.exp(-q * T) - K * np.exp(-0.06 * T), atol=1e-9)
+
+    h = 1e-4
+    for is_call, g in ((True, call), (False, put)):
+        bump = lambda **kw: bs_price(**{**dict(spot=S, strike=K, t=T, vol=vol, rate=0.06, dividend=q,
+                                               is_call=is_call), **kw})
+        np.testing.assert_allclose(g['delta'], (bump(spot=S + h) - bump(spot=S - h)) / (2 * h), atol=1e-6)
+        np.testing.assert_allclose(g['gamma'], (bump(spot=S + 1e-2) - 2 * g['price'] + bump(spot=S - 1e-2)) / 1e-4,
+                                   atol=1e-5)
+        np.testing.assert_allclose(g['vega'], (bump(vol=vol + h) - bump(vol=vol - h)) / (2 * h) / 100, atol=1e-6)
+        np.testing.assert_allclose(g['rho'], (bump(rate=0.06 + h) - bump(rate=0.06 - h)) / (2 * h) / 100, atol=1e-6)
+        np.testing.assert_allclose(g['theta'], -(bump(t=T + h) - bump(t=T - h)) / (2 * h) / 365, atol=1e-6)
+
+
+def test_implied_volatility_round_trip():
+    rng = np.random.default_rng(7)
+    n = 20000
+    S = np.full(n, 20000.0)
+    K = rng.uniform(17000, 23000, n)
+    T = rng.uniform(1 / 365, 1.0, n)
+    vol = rng.uniform(0.05, 1.5, n)
+    is_call = rng.random(n) < 0.5
+    price = bs_price(S, K, T, vol, is_call=is_call)
+    vega = bs_greeks(S, K, T, vol, is_call=is_call)['vega']
+
+    iv = implied_volatility(price, S, K, T, is_call=is_call)
+    informative = vega > 1e-2  # Below this the price barely depends on vol
+    assert not np.isnan(iv[informative]).any()
+    np.testing.assert_allclose(iv[informative], vol[informative], atol=1e-5)
+
+
+def test_implied_volatility_rejects_arbitrage_prices():
+    iv = implied_volatility([0.5, 25.0, 150.0, 5.0], 100, [80, 80, 100, 100], 0.5, 0.0, is_call=True)
+    assert np.isnan(iv[0])  # below intrinsic
+    assert not np.isnan(iv[1])
+    assert np.isnan(iv[2])  # above the spot
+    assert bs_price(100, 100, 0.5, iv[3], 0.0) == pytest.approx(5.0, abs=1e-8)
+
+
+def test_time_to_expiry_defaults_to_next_thursday():
+    wednesday = datetime(2025, 9, 24, 10, 0)
+    assert time_to_expiry(now=wednesday) == pytest.approx((29.5 / 24) / 365)
+    assert time_to_expiry("2025-09-25", now=wednesday) == time_to_expiry(now=wednesday)
+
+
+def test_portfolio_greeks_for_holdings():
+    agent = RiskComplianceAgent.__new__(RiskComplianceAgent)
+    expiry = "2099-01-01"
+    holdings = [
+        {'symbol': 'NIFTY', 'instrument_type': 'CE', 'strike': 20000, 'expiry': expiry,
+         'quantity': 50, 'spot': 20000, 'iv': 15},
+        {'symbol': 'NIFTY', 'instrument_type': 'PE', 'strike': 20000, 'expiry': expiry,
+         'lots': -2, 'lot_size': 25, 'spot': 20000, 'iv': 15},
+        {'symbol': 'RELIANCE', 'value': 100000},
+    ]
+    greeks = asyncio.run(agent.calculate_portfolio_greeks(holdings))
+
+    t = time_to_expiry(expiry)
+    expected = portfolio_greeks(20000, 20000, t, 0.15, [50, -50], [True, False])
+    for name in ('delta', 'gamma', 'theta', 'vega', 'rho'):
+        assert greeks[name] == pytest.approx(expected[name], rel=1e-6, abs=1e-9)
+    # Long call + short put at the same strike is a synthetic future
+    assert greeks['delta'] == pytest.approx(50, rel=1e-6)
+    assert greeks['gamma'] == pytest.approx(0, abs=1e-9)
+    assert greeks['option_positions'] == 2
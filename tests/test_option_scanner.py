@@ -0,0 +1,62 @@
+#!/usr/bin/env python3
+"""
+F&O scanner: unchanged chains are skipped and only deltas are reported
+"""
+import sys
+import os
+import asyncio
+
+# Add parent directory to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from agents.abid_hassan_analyzer import AbidHassanAnalyzer
+from agents.option_chain import OptionChain
+
+STRIKES = [19000, 19100, 19200, 19300, 19400, 19500, 19600, 19700, 19800, 19900, 20000]
+
+
+def make_analyzer(tmp_path, chains):
+    async def provider(symbol):
+        if symbol not in chains:
+            raise KeyError(symbol)
+        return chains[symbol]
+
+    return AbidHassanAnalyzer(db_path=str(tmp_path / "scan.db"), universe=list(chains) + ["MISSING"],
+                              max_concurrency=4, chain_provider=provider)
+
+
+def test_scan_skips_unchanged_and_reports_deltas(tmp_path):
+    chains = {
+        "NIFTY": (OptionChain(STRIKES, call_oi=[100] * 11, put_oi=[100] * 11), 19450.0),
+        "BANKNIFTY": (OptionChain(STRIKES, call_oi=[100] * 11, put_oi=[100] * 11), 19450.0),
+    }
+    analyzer = make_analyzer(tmp_path, chains)
+
+    first = asyncio.run(analyzer.scan())
+    assert [a.symbol for a in first.analyzed] == ["NIFTY", "BANKNIFTY"]
+    assert list(first.failed) == ["MISSING"]
+    assert {d.kind for d in first.deltas} == {"initial"}
+
+    # Heavy call writing at 19800 on NIFTY only
+    call_oi = [100] * 11
+    call_oi[8] = 5000
+    chains["NIFTY"] = (OptionChain(STRIKES, call_oi=call_oi, put_oi=[100] * 11), 19450.0)
+    second = asyncio.run(analyzer.scan())
+    assert [a.symbol for a in second.analyzed] == ["NIFTY"]
+    assert second.unchanged == ["BANKNIFTY"]
+    resistance = [d for d in second.deltas if d.kind == "new_resistance"]
+    assert [d.current for d in resistance] == [19800]
+    assert all(d.symbol == "NIFTY" for d in second.deltas)
+
+    # Same chain but price crossed a strike: re-analyze
+    chains["BANKNIFTY"] = (chains["BANKNIFTY"][0], 19505.0)
+    third = asyncio.run(analyzer.scan())
+    assert [a.symbol for a in third.analyzed] == ["BANKNIFTY"]
+
+
+def test_daily_analysis_keeps_input_order(tmp_path):
+    chains = {s: (OptionChain(STRIKES, call_oi=[100] * 11, put_oi=[100] * 11), 19450.0)
+              for s in ["A", "B", "C"]}
+    analyzer = make_analyzer(tmp_path, chains)
+    analyses = asyncio.run(analyzer.get_daily_analysis(["C", "MISSING", "A", "B"]))
+    assert [a.symbol for a in analyses] == ["C", "A", "B"]
@@ -0,0 +1,107 @@
+#!/usr/bin/env python3
+"""
+Vectorized multi-portfolio performance metrics against the original
+per-portfolio pandas calculation
+"""
+import sys
+import os
+import asyncio
+import sqlite3
+
+import numpy as np
+import pandas as pd
+import pytest
+
+# Add parent directory to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from agents.ohlcv_store import OHLCVStore
+from agents.performance_metrics import METRICS, compute_metrics, metrics_by_portfolio, value_matrix
+from agents.portfolio_management_agent import PortfolioManagementAgent
+
+
+def reference_metrics(series: pd.Series) -> dict:
+    """calculate_performance_metrics as it was, for one portfolio's rows"""
+    df = series.to_frame('value')
+    df['returns'] = df['value'].pct_change()
+    total_return = (df['value'].iloc[-1] - df['value'].iloc[0]) / df['value'].iloc[0]
+    annualized_return = (1 + total_return) ** (365 / len(df)) - 1
+    volatility = df['returns'].std() * np.sqrt(252)
+    sharpe_ratio = (annualized_return - 0.06) / volatility if volatility > 0 else 0
+    cumulative = (1 + df['returns']).cumprod()
+    running_max = cumulative.expanding().max()
+    max_drawdown = ((cumulative - running_max) / running_max).min()
+    return {
+        'total_return': total_return,
+        'annualized_return': annualized_return,
+        'volatility': volatility,
+        'sharpe_ratio': sharpe_ratio,
+        'max_drawdown': max_drawdown,
+        'calmar_ratio': annualized_return / abs(max_drawdown) if max_drawdown != 0 else 0,
+        'win_rate': (df['returns'] > 0).sum() / len(df['returns'].dropna()),
+        'best_day': df['returns'].max(),
+        'worst_day': df['returns'].min(),
+        'current_value': df['value'].iloc[-1]
+    }
+
+
+def make_rows(portfolios=40, days=300, seed=0):
+    """Portfolios opened and closed on different days, with missing days in between"""
+    rng = np.random.default_rng(seed)
+    dates = pd.bdate_range("2024-01-01", periods=days)
+    rows = []
+    for p in range(portfolios):
+        start, end = sorted(rng.integers(0, days, 2))
+        kept = [d for d in range(start, end + 1) if rng.random() > 0.1]
+        values = 100000 * np.cumprod(1 + rng.normal(0.0005, 0.01, len(kept)))
+        rows += [(f"C{p}", dates[d].strftime("%Y-%m-%d"), float(v)) for d, v in zip(kept, values)]
+    return rows
+
+
+@pytest.mark.filterwarnings("ignore::RuntimeWarning")
+def test_matrix_metrics_match_per_portfolio_pandas():
+    rows = make_rows()
+    metrics = metrics_by_portfolio(compute_metrics(value_matrix(rows)))
+    frame = pd.DataFrame(rows, columns=['portfolio', 'date', 'value'])
+    frame['date'] = pd.to_datetime(frame['date'])
+    assert sorted(metrics) == sorted(frame['portfolio'].unique())
+    for portfolio, group in frame.groupby('portfolio'):
+        expected = reference_metrics(group.set_index('date')['value'])
+        assert list(metrics[portfolio]) == METRICS
+        for name in METRICS:
+            assert metrics[portfolio][name] == pytest.approx(float(expected[name]), rel=1e-9, nan_ok=True), \
+                (portfolio, name)
+
+
+def test_agent_batch_metrics_cached_until_new_rows(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    os.makedirs("data")
+    agent = PortfolioManagementAgent(history_store=OHLCVStore(str(tmp_path / "store")))
+    rows = make_rows(portfolios=5, days=60, seed=1)
+    conn = sqlite3.connect(agent.db_path)
+    for i in range(6):
+        conn.execute("INSERT INTO portfolios (client_id, name) VALUES (?, ?)", (f"C{i}", f"C{i}"))
+    conn.executemany("INSERT INTO performance (portfolio_id, date, total_value) "
+                     "VALUES ((SELECT id FROM portfolios WHERE client_id = ?), ?, ?)", rows)
+    conn.commit()
+
+    everyone = asyncio.run(agent.calculate_all_performance_metrics())
+    assert set(everyone) == {portfolio for portfolio, _, _ in rows}
+    assert "C5" not in everyone and asyncio.run(agent.calculate_performance_metrics("C5")) == {}
+    single = asyncio.run(agent.calculate_performance_metrics("C0"))
+    assert single == pytest.approx(everyone["C0"], nan_ok=True)
+    assert asyncio.run(agent.calculate_all_performance_metrics()) is everyone
+
+    conn.execute("INSERT INTO performance (portfolio_id, date, total_value) "
+                 "VALUES ((SELECT id FROM portfolios WHERE client_id = 'C5'), '2024-06-03', 1000)")
+    conn.commit()
+    conn.close()
+    refreshed = asyncio.run(agent.calculate_all_performance_metrics())
+    assert refreshed is not everyone and refreshed["C5"]["current_value"] == 1000
+
+    # Appended rows are merged into the cached matrix: same answer as a cold load
+    cold = PortfolioManagementAgent(history_store=agent.history_store)
+    expected = asyncio.run(cold.calculate_all_performance_metrics())
+    assert refreshed.keys() == expected.keys()
+    for client_id, metrics in expected.items():
+        assert refreshed[client_id] == pytest.approx(metrics, nan_ok=True), client_id
@@ -0,0 +1,64 @@
+#!/usr/bin/env python3
+"""
+PlatformTransport against the local platform stub: keep-alive connection
+reuse across threads, cached identity lookups and per-platform stats
+"""
+import sys
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+# Add parent directory to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.bench_platform_transport import StubPlatformServer
+from platform_transport import PlatformTransport
+
+
+@pytest.fixture
+def server():
+    server = StubPlatformServer()
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+@pytest.fixture
+def transport(server):
+    transport = PlatformTransport(pool_size=4, timeout=5,
+                                  base_urls={platform: server.base_url for platform in ("linkedin", "telegram")})
+    yield transport
+    transport.close()
+
+
+def test_identity_lookups_are_cached(server, transport):
+    assert transport.linkedin_person_urn("token") == "urn:li:person:stub-user"
+    assert transport.linkedin_person_urn("token") == "urn:li:person:stub-user"
+    assert transport.telegram_chat_id("bot", "@channel") == "-1001234567890"
+    assert transport.telegram_chat_id("bot", "@channel") == "-1001234567890"
+    assert transport.telegram_chat_id("bot", "12345") == "12345"  # already numeric: no lookup
+    assert server.requests == {"/v2/userinfo": 1, "/botbot/getChat": 1}
+
+    transport.invalidate_identity("linkedin")
+    transport.linkedin_person_urn("token")
+    assert server.requests["/v2/userinfo"] == 2
+
+
+def test_posts_reuse_pooled_connections(server, transport):
+    def post(n):
+        response = transport.post("telegram", transport.url("telegram", "/botbot/sendMessage"),
+                                  json={"chat_id": "1", "text": str(n)})
+        return response.status_code
+
+    with ThreadPoolExecutor(max_workers=4) as pool:
+        assert set(pool.map(post, range(40))) == {200}
+    assert server.requests["/botbot/sendMessage"] == 40
+    # At most one connection per concurrent poster, not one per post
+    assert server.connections <= 4
+
+    stats = transport.get_stats()["telegram"]
+    assert stats["requests"] == 40 and stats["errors"] == 0 and stats["avg_ms"] > 0
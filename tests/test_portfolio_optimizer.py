@@ -0,0 +1,168 @@
+#!/usr/bin/env python3
+"""
+EW covariance cache, warm-started Markowitz solves and the batched client
+optimization in PortfolioManagementAgent
+"""
+import sys
+import os
+import asyncio
+import sqlite3
+
+import numpy as np
+import pandas as pd
+import pytest
+
+# Add parent directory to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from agents.ohlcv_store import FileProvider, OHLCVStore
+from agents.portfolio_management_agent import PortfolioManagementAgent
+from agents.portfolio_optimizer import (EWMoments, PortfolioOptimizer, efficient_frontier,
+                                        min_variance_weights)
+from agents.risk_engine import ReturnsMatrix
+
+SYMBOLS = ["RELIANCE.NS", "TCS.NS", "INFY.NS", "HDFCBANK.NS", "ITC.NS"]
+
+
+def make_closes(days=200, seed=0):
+    rng = np.random.default_rng(seed)
+    index = pd.bdate_range(end=pd.Timestamp.now().normalize(), periods=days, tz="UTC")
+    market = rng.normal(0.0005, 0.01, days)
+    returns = market[:, None] * rng.uniform(0.5, 1.5, len(SYMBOLS)) + rng.normal(0.0003, 0.012, (days, len(SYMBOLS)))
+    return pd.DataFrame(100 * np.cumprod(1 + returns, axis=0), index=index, columns=SYMBOLS)
+
+
+def save(provider, closes):
+    for symbol in closes.columns:
+        close = closes[symbol]
+        provider.save(symbol, "1d", pd.DataFrame({"Open": close, "High": close, "Low": close,
+                                                  "Close": close, "Volume": 10**6}, index=closes.index))
+
+
+def test_incremental_moments_equal_a_rebuild():
+    matrix = ReturnsMatrix.from_prices(make_closes())
+    full = EWMoments.from_returns(matrix, halflife=30)
+
+    partial = EWMoments.from_returns(ReturnsMatrix(matrix.symbols, matrix.dates[:150], matrix.returns[:150]), 30)
+    partial.update(matrix.returns[150:], matrix.dates[150:])
+    np.testing.assert_allclose(partial.mean, full.mean, rtol=1e-12)
+    np.testing.assert_allclose(partial.cov, full.cov, rtol=1e-12)
+    assert partial.last_date == full.last_date and partial.observations == len(matrix)
+
+
+def test_warm_start_and_closed_form():
+    rng = np.random.default_rng(3)
+    a = rng.normal(size=(8, 8))
+    cov = a @ a.T / 8 + np.eye(8) * 0.05
+    mu = rng.uniform(0.05, 0.25, 8)
+
+    # Without a return constraint and with an interior optimum it is the closed form
+    dominant = cov + np.eye(8) * 0.5
+    inverse = np.linalg.solve(dominant, np.ones(8))
+    assert (inverse > 0).all()
+    np.testing.assert_allclose(min_variance_weights(mu, dominant, -np.inf), inverse / inverse.sum(), atol=1e-4)
+
+    target = float(np.median(mu))
+    cold = min_variance_weights(mu, cov, target)
+    warm = min_variance_weights(mu, cov, target, initial_weights=cold * 1.3 + 0.01)
+    np.testing.assert_allclose(warm, cold, atol=1e-4)
+    assert warm.sum() == pytest.approx(1) and warm @ mu >= target - 1e-8 and (warm >= -1e-10).all()
+
+    # Unreachable target: the best the universe can do rather than a failed solve
+    assert min_variance_weights(mu, cov, 10.0) @ mu == pytest.approx(mu.max(), rel=1e-6)
+
+    frontier = efficient_frontier(list("ABCDEFGH"), mu, cov, points=10)
+    assert (np.diff(frontier.returns) > 0).all() and (np.diff(frontier.risks) >= -1e-9).all()
+    np.testing.assert_allclose(frontier.weights_for(frontier.returns[4]), frontier.weights[4])
+
+
+def test_optimizer_appends_new_days_only(tmp_path):
+    provider = FileProvider(str(tmp_path / "source"))
+    closes = make_closes()
+    save(provider, closes.iloc[:-5])
+    store = OHLCVStore(str(tmp_path / "store"), provider=provider)
+    optimizer = PortfolioOptimizer(store, halflife=30)
+
+    optimizer.moments(SYMBOLS)
+    optimizer.moments(list(reversed(SYMBOLS)))
+    assert optimizer.stats["full_builds"] == 1 and optimizer.stats["up_to_date"] == 1
+
+    save(provider, closes)
+    store.expire()
+    moments = optimizer.moments(SYMBOLS)
+    assert optimizer.stats["incremental_updates"] == 1
+    rebuilt = EWMoments.from_returns(ReturnsMatrix.from_prices(store.closes(sorted(SYMBOLS))), 30)
+    np.testing.assert_allclose(moments.cov, rebuilt.cov, rtol=1e-12)
+
+    frontier = optimizer.frontier(SYMBOLS, points=5)
+    assert optimizer.frontier(SYMBOLS, points=5) is frontier
+
+
+def test_batch_keeps_each_clients_own_history(tmp_path):
+    provider = FileProvider(str(tmp_path / "source"))
+    closes = make_closes()
+    closes["IPO.NS"] = closes["TCS.NS"] * 1.1
+    closes["THIN.NS"] = closes["INFY.NS"] * 0.9
+    closes.loc[closes.index[:80], "IPO.NS"] = np.nan  # listed 120 days ago
+    closes.loc[closes.index[:160], "THIN.NS"] = np.nan  # too little history to estimate
+    for symbol in closes.columns:
+        close = closes[symbol].dropna()
+        provider.save(symbol, "1d", pd.DataFrame({"Open": close, "High": close, "Low": close,
+                                                  "Close": close, "Volume": 10**6}, index=close.index))
+    store = OHLCVStore(str(tmp_path / "store"), provider=provider)
+    clients = [
+        {"client_id": "OLD", "target_return": 0.1, "weights": {symbol: 0.2 for symbol in SYMBOLS}},
+        {"client_id": "IPO", "target_return": 0.1, "weights": {"RELIANCE.NS": 0.5, "IPO.NS": 0.5}},
+        {"client_id": "THIN", "target_return": 0.1, "weights": {"RELIANCE.NS": 0.5, "THIN.NS": 0.5}},
+    ]
+    batch = PortfolioOptimizer(store, halflife=30).optimize_many(clients)
+    for client in clients:
+        alone = PortfolioOptimizer(store, halflife=30).optimize_many([client])[client["client_id"]]
+        np.testing.assert_allclose(batch[client["client_id"]]["weights"], alone["weights"], atol=1e-6)
+        assert batch[client["client_id"]]["expected_risk"] == pytest.approx(alone["expected_risk"], rel=1e-6)
+
+    assert batch["OLD"]["symbols"] == SYMBOLS and batch["OLD"]["dropped"] == []
+    assert batch["IPO"]["symbols"] == ["RELIANCE.NS", "IPO.NS"]
+    assert batch["THIN"]["symbols"] == ["RELIANCE.NS"] and batch["THIN"]["dropped"] == ["THIN.NS"]
+    # The full-history client is estimated on every day, not the newly listed stock's
+    moments = EWMoments.from_returns(ReturnsMatrix.from_prices(closes[SYMBOLS]), 30)
+    mu, cov = moments.annualized(SYMBOLS)
+    weights = batch["OLD"]["weights"]
+    assert batch["OLD"]["expected_risk"] == pytest.approx(np.sqrt(weights @ cov @ weights), rel=1e-6)
+
+
+def test_agent_optimizes_many_clients_in_one_pass(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    os.makedirs("data")
+    provider = FileProvider(str(tmp_path / "source"))
+    save(provider, make_closes())
+    agent = PortfolioManagementAgent(history_store=OHLCVStore(str(tmp_path / "store"), provider=provider))
+
+    conn = sqlite3.connect(agent.db_path)
+    for i in range(6):
+        conn.execute("INSERT INTO portfolios (client_id, name, total_value, cash_balance, allocation_strategy, "
+                     "risk_profile, target_return, rebalance_frequency) VALUES (?, ?, 100000, 5000, 'moderate', "
+                     "'moderate', 0.10, 'quarterly')", (f"C{i}", f"C{i}"))
+    conn.commit()
+    conn.close()
+    for i in range(6):
+        held = SYMBOLS[:3] if i % 2 else SYMBOLS
+        asyncio.run(agent.store_holdings(f"C{i}", [
+            {'symbol': symbol, 'quantity': 10, 'buy_price': 100, 'current_price': 100,
+             'value': 95000 / len(held) * (1 + 0.2 * j) / 1.4, 'asset_class': 'equity'}
+            for j, symbol in enumerate(held)]))
+
+    results = asyncio.run(agent.optimize_portfolios())
+    assert sorted(results) == [f"C{i}" for i in range(6)]
+    # Two distinct holding sets: two solves, four reused
+    assert agent.optimizer.stats["solves"] == 2 and agent.optimizer.stats["shared_solves"] == 4
+    assert agent.optimizer.stats["full_builds"] == 1
+
+    single = asyncio.run(agent.optimize_portfolio("C0"))
+    assert single == results["C0"]
+    assert single["status"] == "success" and single["expected_risk"] > 0
+    assert single["excluded_holdings"] == []
+    for recommendation in single["recommendations"]:
+        assert recommendation["symbol"] in SYMBOLS
+        assert 0 <= recommendation["optimal_weight"] <= 1
+    assert asyncio.run(agent.optimize_portfolio("NOBODY"))["status"] == "error"
@@ -0,0 +1,206 @@
+#!/usr/bin/env python3
+"""
+CentralizedPostingQueue on a scratch database: the in-memory rate-limit
+ledger against the legacy COUNT(*) engine, the index migration and the
+per-platform lanes
+"""
+import sys
+import os
+import time
+import random
+import sqlite3
+import importlib
+from datetime import datetime, timedelta
+
+import pytest
+
+for module in ("tweepy", "openai", "dotenv"):
+    pytest.importorskip(module)
+
+# Add parent directory to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+PLATFORMS = ["linkedin", "twitter", "telegram"]
+
+
+@pytest.fixture(scope="module")
+def cpq(tmp_path_factory):
+    # The module opens posting_queue.log in the working directory on import
+    with pytest.MonkeyPatch.context() as patch:
+        patch.chdir(tmp_path_factory.mktemp("posting_queue"))
+        yield importlib.import_module("centralized_posting_queue")
+
+
+def make_queue(cpq, db_path, engine="ledger"):
+    queue = cpq.CentralizedPostingQueue(db_path=str(db_path), engine=engine)
+    queue.post_delay_seconds = 0
+    for platform in PLATFORMS:
+        setattr(queue, f"post_to_{platform}", lambda content: (True, "posted"))
+    return queue
+
+
+def seed_history(db_path, rows):
+    """Posted items (platform, minutes ago) written the way execute_post writes them"""
+    now = datetime.now()
+    with sqlite3.connect(db_path) as conn:
+        for n, (platform, minutes_ago) in enumerate(rows):
+            posted_at = (now - timedelta(minutes=minutes_ago)).isoformat()
+            conn.execute("INSERT INTO queue VALUES (?, ?, ?, ?, 2, 'posted', ?, NULL, ?, 0, 3, 'seed', '{}', NULL)",
+                         (f"seed_{n}", f"seed {n}", platform, f"hash{n}", posted_at, posted_at))
+            conn.execute("INSERT INTO posting_history VALUES (?, ?, ?, ?, 'seed', 1)",
+                         (f"hist_seed_{n}", f"hash{n}", platform, posted_at))
+
+
+def decisions(queue):
+    return {platform: (queue.check_rate_limits(platform), queue.can_post_now(platform)[0]) for platform in PLATFORMS}
+
+
+def test_ledger_matches_legacy_engine(cpq, tmp_path):
+    rng = random.Random(7)
+    history = [(rng.choice(PLATFORMS), rng.uniform(5, 2000)) for _ in range(200)]
+    engines = {}
+    for engine in ("ledger", "legacy"):
+        db_path = tmp_path / f"{engine}.db"
+        make_queue(cpq, db_path, engine)  # creates the schema
+        seed_history(db_path, history)
+        engines[engine] = make_queue(cpq, db_path, engine)
+        engines[engine].min_gap_minutes = 0
+        engines[engine].platform_limits["linkedin"]["hourly"] = 2
+    assert decisions(engines["ledger"]) == decisions(engines["legacy"])
+
+    # Same posts through both engines, including ones the limits turn away
+    for n in range(12):
+        platform = PLATFORMS[n % 3]
+        outcomes = []
+        for queue in engines.values():
+            added = queue.add_to_queue(f"post {n}", platform)
+            item = next(item for item in queue.get_next_items_to_post(50) if item.id == added["item_id"])
+            outcomes.append(queue.execute_post(item)[0])
+        assert outcomes[0] == outcomes[1]
+        assert decisions(engines["ledger"]) == decisions(engines["legacy"])
+
+
+def test_other_writers_are_applied_incrementally(cpq, tmp_path):
+    db_path = tmp_path / "queue.db"
+    queue = make_queue(cpq, db_path)
+    other = make_queue(cpq, db_path)  # another process or agent on the same database
+    queue.min_gap_minutes = other.min_gap_minutes = 0
+
+    rebuilds = []
+    original = queue.ledger.rebuild
+    queue.ledger.rebuild = lambda *args: (rebuilds.append(1), original(*args))
+
+    for n in range(3):
+        other.add_to_queue(f"other {n}", "twitter")  # a plain enqueue elsewhere
+        assert queue.check_rate_limits("twitter")["hourly_count"] == 0
+    for item in other.get_next_items_to_post(10):
+        assert other.execute_post(item)[0]
+    assert queue.check_rate_limits("twitter")["hourly_count"] == 3
+    assert queue.ledger.snapshot("twitter")[2] is not None
+
+    # Own posts are counted once
+    added = queue.add_to_queue("own post", "twitter")
+    item = next(item for item in queue.get_next_items_to_post(10) if item.id == added["item_id"])
+    assert queue.execute_post(item)[0]
+    assert queue.check_rate_limits("twitter")["hourly_count"] == 4
+    assert other.check_rate_limits("twitter")["hourly_count"] == 4
+    assert rebuilds == []
+
+
+def test_index_migration_and_queue_position(cpq, tmp_path):
+    db_path = tmp_path / "old.db"
+    with sqlite3.connect(db_path) as conn:
+        # A database from before QUEUE_MIGRATIONS
+        conn.execute("""
+            CREATE TABLE queue (
+                id TEXT PRIMARY KEY, content TEXT NOT NULL, platform TEXT NOT NULL,
+                content_hash TEXT NOT NULL, priority INTEGER NOT NULL, status TEXT NOT NULL,
+                created_at TEXT NOT NULL, scheduled_for TEXT, posted_at TEXT,
+                retry_count INTEGER DEFAULT 0, max_retries INTEGER DEFAULT 3,
+                source TEXT NOT NULL, metadata TEXT, error_message TEXT
+            )
+        """)
+        conn.execute("CREATE INDEX idx_content_hash ON queue(content_hash)")
+        rng = random.Random(3)
+        start = datetime(2024, 1, 1)
+        for n in range(300):
+            conn.execute("INSERT INTO queue VALUES (?, ?, ?, ?, ?, ?, ?, NULL, NULL, 0, 3, 'seed', '{}', NULL)",
+                         (f"item_{n}", f"content {n}", rng.choice(PLATFORMS), f"hash{n}", rng.randint(1, 4),
+                          rng.choice(["pending", "approved", "posted", "failed"]),
+                          (start + timedelta(seconds=rng.randint(0, 50))).isoformat()))
+
+    queue = make_queue(cpq, db_path)
+    with sqlite3.connect(db_path) as conn:
+        assert conn.execute("PRAGMA user_version").fetchone()[0] == cpq.QUEUE_MIGRATIONS[-1][0]
+        indexes = {row[0] for row in conn.execute("SELECT name FROM sqlite_master WHERE type = 'index'")}
+        assert {"idx_queue_hash_platform_status", "idx_queue_platform_status_posted",
+                "idx_queue_status_priority_created", "idx_queue_ready"} <= indexes
+        assert "idx_content_hash" not in indexes
+        # Already at the latest version: nothing is re-applied
+        assert queue.migrate_database(conn) == cpq.QUEUE_MIGRATIONS[-1][0]
+
+        legacy_sql = """
+            SELECT COUNT(*) FROM queue
+            WHERE status IN ('pending', 'approved')
+            AND (priority > (SELECT priority FROM queue WHERE id = ?)
+                 OR (priority = (SELECT priority FROM queue WHERE id = ?)
+                     AND created_at < (SELECT created_at FROM queue WHERE id = ?)))
+        """
+        for n in range(300):
+            item_id = f"item_{n}"
+            expected = conn.execute(legacy_sql, (item_id,) * 3).fetchone()[0] + 1
+            assert queue.get_queue_position(item_id) == expected
+    assert queue.get_queue_position("missing") == 1
+
+
+def test_platform_lanes_run_concurrently(cpq, tmp_path):
+    queue = make_queue(cpq, tmp_path / "lanes.db")
+    queue.min_gap_minutes = 0
+    queue.platform_limits["telegram"]["hourly"] = 1
+
+    def slow_post(content):
+        time.sleep(0.2)
+        return True, "posted"
+
+    for platform in PLATFORMS:
+        setattr(queue, f"post_to_{platform}", slow_post)
+    for n in range(6):
+        queue.add_to_queue(f"lane post {n}", PLATFORMS[n % 3])
+    order = [item.id for item in queue.get_next_items_to_post(6)]
+
+    start = time.perf_counter()
+    results = queue.process_queue(max_items=6)
+    elapsed = time.perf_counter() - start
+
+    # Two posts per lane, lanes side by side: ~0.4s rather than ~1.2s one after another
+    assert elapsed < 0.9
+    # Details come back in dequeue order whatever order the lanes finish in
+    assert [detail["item_id"] for detail in results["details"]] == order
+    # Telegram's hourly limit stops its lane after one post; the other lanes are unaffected
+    assert results["successful"] == 5 and results["skipped"] == 1
+    assert results["lanes"]["telegram"]["successful"] == 1 and results["lanes"]["telegram"]["skipped"] == 1
+    assert results["lanes"]["linkedin"]["successful"] == 2 and results["lanes"]["twitter"]["successful"] == 2
+
+
+def test_lanes_reuse_their_threads_and_connections(cpq, tmp_path, monkeypatch):
+    queue = make_queue(cpq, tmp_path / "reuse.db")
+    queue.min_gap_minutes = 0
+    for n in range(3):
+        queue.add_to_queue(f"first run {n}", PLATFORMS[n])
+    queue.process_queue(max_items=3)
+
+    connects = []
+    connect = sqlite3.connect
+
+    def counted(*args, **kwargs):
+        connects.append(args)
+        return connect(*args, **kwargs)
+
+    monkeypatch.setattr(cpq.sqlite3, "connect", counted)
+    for n in range(3):
+        queue.add_to_queue(f"second run {n}", PLATFORMS[n])
+    assert queue.process_queue(max_items=3)["successful"] == 3
+    assert connects == []
+
+    queue.close()
+    assert queue._lanes == {}
@@ -0,0 +1,132 @@
+#!/usr/bin/env python3
+"""
+Per-source token buckets: burst, refill, timeouts, refunds, wait metrics
+and independence of sources under concurrent callers
+"""
+import sys
+import os
+import asyncio
+import threading
+import time
+
+import pytest
+
+# Add parent directory to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from rate_limiter import RateLimiter, TokenBucket
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+        self.slept = []
+
+    def __call__(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.slept.append(seconds)
+
+
+def test_burst_then_queued_reservations():
+    clock = FakeClock()
+    bucket = TokenBucket(rate=2.0, capacity=3, clock=clock)
+    # The burst goes through at once, then each reservation queues behind the last
+    assert [bucket.reserve() for _ in range(5)] == [0, 0, 0, 0.5, 1.0]
+    clock.now = 10.0  # refill never exceeds capacity
+    assert [bucket.reserve() for _ in range(4)] == [0, 0, 0, 0.5]
+    # Over the timeout nothing is taken
+    assert bucket.reserve(timeout=0.9) is None
+    assert bucket.reserve(timeout=1.0) == 1.0
+    stats = bucket.stats.as_dict()
+    assert stats['acquired'] == 10 and stats['rejected'] == 1 and stats['waited'] == 4
+    assert stats['wait_total'] == pytest.approx(3.0) and stats['wait_max'] == 1.0
+    with pytest.raises(ValueError):
+        TokenBucket(rate=0)
+
+
+def test_sources_are_independent_and_reported():
+    clock = FakeClock()
+    limiter = RateLimiter(rate=0.5, capacity=1, limits={'yahoo': (0.5, 3)}, clock=clock, sleep=clock.sleep)
+    for _ in range(3):
+        assert limiter.acquire('yahoo')
+    assert limiter.acquire('tradingview')
+    assert clock.slept == []
+    assert limiter.acquire('tradingview')
+    assert clock.slept == [2.0]
+    assert not limiter.acquire('tradingview', timeout=1.0)
+    metrics = limiter.metrics()
+    assert metrics['yahoo']['waited'] == 0 and metrics['yahoo']['acquired'] == 3
+    assert metrics['tradingview'] == {'acquired': 2, 'rejected': 1, 'waited': 1, 'released': 0,
+                                      'wait_total': 2.0, 'wait_mean': 1.0, 'wait_max': 2.0}
+
+
+def test_released_reservations_are_refunded():
+    clock = FakeClock()
+    bucket = TokenBucket(rate=1.0, capacity=2, clock=clock)
+    assert [bucket.reserve() for _ in range(4)] == [0, 0, 1.0, 2.0]
+    # The two queued callers give up: the next one waits as if they never came
+    bucket.release()
+    bucket.release()
+    assert bucket.reserve() == 1.0
+    clock.now = 100.0
+    bucket.release()  # never above capacity
+    assert [bucket.reserve() for _ in range(3)] == [0, 0, 1.0]
+    assert bucket.stats.as_dict()['released'] == 3
+
+    limiter = RateLimiter(rate=1.0, capacity=1, clock=clock, sleep=clock.sleep)
+    assert limiter.acquire('nse')
+    limiter.release('nse')  # the request was never sent
+    assert limiter.acquire('nse') and clock.slept == []
+
+
+def test_waiting_thread_does_not_block_other_sources():
+    limiter = RateLimiter(rate=5.0, capacity=1)
+    limiter.acquire('slow')  # the next 'slow' caller waits 0.2s
+    waiting = threading.Thread(target=limiter.acquire, args=('slow',))
+    waiting.start()
+    time.sleep(0.02)
+    start = time.perf_counter()
+    for source in ('a', 'b', 'c'):
+        assert limiter.acquire(source)
+    assert time.perf_counter() - start < 0.05
+    waiting.join()
+
+
+def test_async_acquire_yields_to_the_event_loop():
+    limiter = RateLimiter(rate=10.0, capacity=1)
+
+    async def run():
+        start = time.perf_counter()
+        finished = {}
+
+        async def fetch(source):
+            await limiter.acquire_async(source)
+            finished.setdefault(source, []).append(time.perf_counter() - start)
+
+        await asyncio.gather(*(fetch('nse') for _ in range(3)), fetch('google'), fetch('moneycontrol'))
+        return finished
+
+    finished = asyncio.run(run())
+    assert finished['google'][0] < 0.05 and finished['moneycontrol'][0] < 0.05
+    # Three nse requests at 10/s: the third is served about 0.2s in
+    assert sorted(finished['nse'])[-1] == pytest.approx(0.2, abs=0.08)
+
+
+def test_cancelled_async_acquire_refunds_its_reservation():
+    limiter = RateLimiter(rate=5.0, capacity=1)
+
+    async def run():
+        await limiter.acquire_async('nse')
+        queued = [asyncio.ensure_future(limiter.acquire_async('nse')) for _ in range(5)]
+        await asyncio.sleep(0.01)
+        for task in queued:
+            task.cancel()
+        await asyncio.gather(*queued, return_exceptions=True)
+        start = time.perf_counter()
+        await limiter.acquire_async('nse')  # behind one request, not six
+        return time.perf_counter() - start
+
+    assert asyncio.run(run()) == pytest.approx(0.19, abs=0.08)
+    assert limiter.metrics()['nse']['released'] == 5
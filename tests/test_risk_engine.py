@@ -0,0 +1,118 @@
+#!/usr/bin/env python3
+"""
+Weighted VaR/CVaR engine: hand-computed historical tail, Monte Carlo against the
+closed form, and RiskComplianceAgent sharing one returns matrix
+"""
+import sys
+import os
+import asyncio
+
+import numpy as np
+import pandas as pd
+import pytest
+
+# Add parent directory to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from agents.risk_engine import (ReturnsMatrix, closes_from_download, historical_var,
+                                monte_carlo_var, parametric_var)
+from agents import risk_compliance_agent
+from agents.ohlcv_store import FileProvider, OHLCVStore
+from agents.risk_compliance_agent import RiskComplianceAgent
+
+
+def make_prices(days=500, seed=7):
+    rng = np.random.default_rng(seed)
+    cov = np.array([[4.0, 1.2, 0.4], [1.2, 2.25, 0.3], [0.4, 0.3, 1.0]]) * 1e-4
+    returns = rng.multivariate_normal([0.0005, 0.0003, 0.0002], cov, size=days)
+    dates = pd.bdate_range("2024-01-01", periods=days + 1)
+    prices = 100 * np.vstack([np.ones(3), np.cumprod(1 + returns, axis=0)])
+    return pd.DataFrame(prices, index=dates, columns=["A.NS", "B.NS", "C.NS"])
+
+
+def test_historical_var_is_position_weighted():
+    prices = pd.DataFrame({"A": [100, 90, 99, 99, 108.9], "B": [50, 51, 51, 45.9, 45.9]},
+                          index=pd.bdate_range("2024-01-01", periods=5))
+    matrix = ReturnsMatrix.from_prices(prices)
+    weights = matrix.weights({"A": 75_000, "B": 25_000})
+    assert weights == pytest.approx([0.75, 0.25])
+
+    # Portfolio returns: -0.07, 0.075, -0.025, 0.075 -> worst two at 50%: VaR 0.025, CVaR 0.0475
+    result = historical_var(matrix, weights, confidence=0.5)
+    assert result.var == pytest.approx(0.025)
+    assert result.cvar == pytest.approx(0.0475)
+    assert sum(result.components.values()) == pytest.approx(result.cvar)
+
+
+def test_monte_carlo_matches_parametric():
+    matrix = ReturnsMatrix.from_prices(make_prices())
+    weights = np.array([0.5, 0.3, 0.2])
+    closed = parametric_var(matrix, weights, 0.99)
+    simulated = monte_carlo_var(matrix, weights, 0.99, scenarios=200_000, seed=1)
+    assert simulated.var == pytest.approx(closed.var, rel=0.03)
+    assert simulated.cvar == pytest.approx(closed.cvar, rel=0.03)
+    assert sum(closed.components.values()) == pytest.approx(closed.cvar)
+    # Diversified portfolio sigma below the weighted average of single-asset sigmas
+    sigmas = np.sqrt(np.diag(matrix.covariance()))
+    assert matrix.portfolio_volatility(weights, annualize=False) < weights @ sigmas
+
+
+def test_closes_from_download_handles_missing_and_single_ticker():
+    prices = make_prices(days=30)
+    grouped = pd.concat({symbol: pd.DataFrame({"Close": prices[symbol]}) for symbol in prices}, axis=1)
+    closes = closes_from_download(grouped, ["A.NS", "C.NS", "ZZZ.NS"])
+    assert list(closes.columns) == ["A.NS", "C.NS"]
+    flat = closes_from_download(pd.DataFrame({"Close": prices["B.NS"]}), ["B.NS"])
+    assert list(flat.columns) == ["B.NS"]
+
+
+class CountingProvider(FileProvider):
+    """Offline history that records every fetch"""
+
+    def __init__(self, directory):
+        super().__init__(directory)
+        self.calls = []
+
+    def fetch(self, symbol, interval, period=None, start=None):
+        self.calls.append([symbol])
+        return super().fetch(symbol, interval, period, start)
+
+    def fetch_many(self, symbols, interval, period=None, start=None):
+        self.calls.append(list(symbols))
+        return super().fetch_many(symbols, interval, period, start)
+
+
+class NoFundamentals:
+    """yfinance stand-in for the credit score lookups"""
+
+    def Ticker(self, symbol):
+        return type("Ticker", (), {"info": {}})()
+
+
+def test_agent_downloads_history_once_per_assessment(tmp_path, monkeypatch):
+    prices = make_prices()
+    prices.index = pd.bdate_range(end=pd.Timestamp.now().normalize(), periods=len(prices), tz="UTC")
+    provider = CountingProvider(str(tmp_path / "source"))
+    for symbol in prices:
+        provider.save(symbol, "1d", pd.DataFrame({"Open": prices[symbol], "High": prices[symbol],
+                                                  "Low": prices[symbol], "Close": prices[symbol],
+                                                  "Volume": 10**6}))
+    monkeypatch.setattr(risk_compliance_agent, "yf", NoFundamentals())
+    monkeypatch.chdir(tmp_path)
+    os.makedirs("data")
+    agent = RiskComplianceAgent(history_store=OHLCVStore(str(tmp_path / "store"), provider=provider))
+    holdings = [{"symbol": "A.NS", "value": 50_000}, {"symbol": "B.NS", "value": 30_000},
+                {"symbol": "C.NS", "value": 20_000},
+                {"symbol": "NIFTY", "instrument_type": "CE", "strike": 20000, "value": 5_000,
+                 "spot": 20100, "iv": 14, "quantity": 50, "expiry": "2099-01-01"}]
+
+    assessment = asyncio.run(agent.assess_portfolio_risk("test", holdings))
+    # One bulk download of the equities; liquidity reads the same bars back from the store
+    assert provider.calls[0] == ["A.NS", "B.NS", "C.NS"]
+    assert all(call == ["NIFTY"] for call in provider.calls[1:])
+    assert 0 < assessment["market_risk"] < 100
+    assert assessment["correlation_risk"] == 20  # pairwise correlations ~0.2-0.4 average below 0.3
+    assert 0 < assessment["var_95"] <= assessment["cvar_95"]
+    assert set(assessment["var_models"]) == {"historical", "parametric", "monte_carlo"}
+    assert assessment["var_models"]["historical"]["var"] == pytest.approx(assessment["var_95"])
+    assert assessment["greeks"]["option_positions"] == 1
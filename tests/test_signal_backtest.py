@@ -0,0 +1,269 @@
+#!/usr/bin/env python3
+"""
+Vectorized signal rules and backtester against per-bar loops written the way
+AITradingSignals generated signals before the rules were shared
+"""
+import sys
+import os
+
+import numpy as np
+import pandas as pd
+import pytest
+
+# Add parent directory to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from agents.ohlcv_store import FileProvider, OHLCVStore
+from agents.signal_backtest import (BUY, Bars, SignalBacktester, SignalRules, crypto_rule, load_bars,
+                                    resolve_signals, simulate_exits, stock_rule, trailing_volume_mean)
+
+
+def reference_crypto(rsi, macd, signal_line, histogram, volume_spike, sentiment):
+    """generate_crypto_signal's if/else ladder"""
+    signal, confidence = None, 0
+    if rsi < 30:
+        signal, confidence = "BUY", confidence + 30
+    elif rsi > 70:
+        signal, confidence = "SELL", confidence + 30
+    if histogram > 0 and macd > signal_line:
+        if signal != "SELL":
+            signal, confidence = "BUY", confidence + 25
+    elif histogram < 0 and macd < signal_line:
+        if signal != "BUY":
+            signal, confidence = "SELL", confidence + 25
+    if volume_spike:
+        confidence += 20
+    if sentiment > 0.6:
+        if signal == "BUY":
+            confidence += 15
+    elif sentiment < 0.4:
+        if signal == "SELL":
+            confidence += 15
+    return (signal, min(confidence, 95)) if signal and confidence >= 50 else (None, 0)
+
+
+def reference_stock(pcr, rsi):
+    signal, confidence = None, 0
+    if pcr > 1.3:
+        signal, confidence = "BUY", 40
+    elif pcr < 0.7:
+        signal, confidence = "SELL", 40
+    if rsi < 40 and signal == "BUY":
+        confidence += 25
+    elif rsi > 60 and signal == "SELL":
+        confidence += 25
+    return (signal, min(confidence, 95)) if signal and confidence >= 50 else (None, 0)
+
+
+def label(action):
+    return {1: "BUY", -1: "SELL", 0: None}[int(action)]
+
+
+def test_rules_match_the_original_ladders_elementwise():
+    rng = np.random.default_rng(0)
+    n = 20000
+    rsi = rng.choice([10, 30, 50, 70, 90], n) + rng.choice([0, 0.5], n)
+    macd, signal_line = rng.normal(size=n), rng.normal(size=n)
+    histogram = np.where(rng.random(n) < 0.8, macd - signal_line, -(macd - signal_line))
+    spike = rng.random(n) < 0.3
+    sentiment = rng.choice([0.3, 0.4, 0.5, 0.6, 0.7], n)
+    votes = crypto_rule(rsi, macd, signal_line, histogram, spike, sentiment)
+    for i in range(n):
+        expected = reference_crypto(rsi[i], macd[i], signal_line[i], histogram[i], spike[i], sentiment[i])
+        assert label(votes['action'][i]) == expected[0], i
+        if expected[0]:
+            assert votes['confidence'][i] == expected[1], i
+
+    pcr = rng.uniform(0.5, 1.8, n)
+    votes = stock_rule(pcr, rsi)
+    for i in range(n):
+        expected = reference_stock(pcr[i], rsi[i])
+        assert label(votes['action'][i]) == expected[0], i
+        if expected[0]:
+            assert votes['confidence'][i] == expected[1], i
+
+    # Scalars, as the live agent calls it
+    single = crypto_rule(25.0, 1.0, 0.5, 0.5, False, 0.5)
+    assert single['action'] == BUY and single['confidence'] == 55 and single['macd_buy']
+
+
+def test_trailing_volume_mean_matches_live_lookback():
+    rng = np.random.default_rng(1)
+    volume = rng.uniform(1, 2, (60, 2))
+    mean = trailing_volume_mean(volume, window=21)
+    for t in range(60):
+        window = volume[max(0, t - 20):t + 1, 0]  # the live 21 bar lookback ending at t
+        expected = np.mean(window[:-1]) if len(window) >= 5 else np.nan
+        np.testing.assert_allclose(mean[t, 0], expected, rtol=1e-12, equal_nan=True)
+
+
+def reference_exit(bars, t, j, action, target, stop, max_hold):
+    """One trade walked forward bar by bar"""
+    last = len(bars.close) - 1
+    for row in range(t + 1, t + max_hold + 1):
+        if row > last:
+            return last, bars.close[last, j], 'open'
+        o, h, l = bars.open[row, j], bars.high[row, j], bars.low[row, j]
+        if action == BUY:
+            if o >= target:
+                return row, o, 'target'
+            if o <= stop:
+                return row, o, 'stop'
+            if l <= stop:
+                return row, stop, 'stop'
+            if h >= target:
+                return row, target, 'target'
+        else:
+            if o <= target:
+                return row, o, 'target'
+            if o >= stop:
+                return row, o, 'stop'
+            if h >= stop:
+                return row, stop, 'stop'
+            if l <= target:
+                return row, target, 'target'
+    row = t + max_hold
+    return (row, bars.close[row, j], 'time') if row <= last else (last, bars.close[last, j], 'open')
+
+
+def make_bars(days=400, symbols=6, seed=2, freq="D"):
+    rng = np.random.default_rng(seed)
+    close = 100 * np.cumprod(1 + rng.normal(0, 0.02, (days, symbols)), axis=0)
+    open_ = close * (1 + rng.normal(0, 0.01, close.shape))
+    high = np.maximum(open_, close) * (1 + rng.uniform(0, 0.02, close.shape))
+    low = np.minimum(open_, close) * (1 - rng.uniform(0, 0.02, close.shape))
+    volume = rng.uniform(1e5, 2e5, close.shape) * np.where(rng.random(close.shape) < 0.1, 3, 1)
+    index = pd.date_range("2020-01-01", periods=days, freq=freq, tz="UTC")
+    return {f"S{j}": pd.DataFrame({"Open": open_[:, j], "High": high[:, j], "Low": low[:, j],
+                                   "Close": close[:, j], "Volume": volume[:, j]}, index=index)
+            for j in range(symbols)}
+
+
+def test_exit_walk_matches_a_per_trade_loop():
+    bars = Bars.from_frames(make_bars())
+    backtester = SignalBacktester(bars, 'crypto', sentiment={"S0": 0.7, "S1": 0.3}, max_hold=15)
+    result = backtester.run()
+    trades = result.trades
+    assert len(trades) > 30 and set(trades['outcome']) >= {'target', 'stop', 'time'}
+    for trade in trades.itertuples():
+        j = bars.symbols.index(trade.symbol)
+        action = BUY if trade.action == "BUY" else -1
+        row, price, outcome = reference_exit(bars, trade.entry_bar, j, action, trade.target_price,
+                                             trade.stop_loss, 15)
+        assert (trade.exit_bar, trade.outcome) == (row, outcome)
+        assert trade.exit_price == pytest.approx(price)
+
+    # Entries are exactly the bars where the shared rule fires
+    votes = backtester.decisions()
+    assert len(trades) == np.count_nonzero(votes['action'])
+    assert (trades['entry_bar'] >= 25).all()
+
+    # A bar touching both levels is a stop; a gap through the target fills at the open
+    frame = pd.DataFrame({"Open": [100, 100, 106], "High": [100, 106, 107], "Low": [100, 96, 105],
+                          "Close": [100, 100, 106], "Volume": 1.0},
+                         index=pd.date_range("2024-01-01", periods=3, tz="UTC"))
+    tiny = Bars.from_frames({"X": frame})
+    for entry, outcome, price in ((0, 2, 97.0), (1, 1, 106.0)):
+        exit_bar, exit_price, code = simulate_exits(tiny, np.array([entry]), np.array([0]), np.array([BUY]),
+                                                    np.array([105.0]), np.array([97.0]), 5)
+        assert code[0] == outcome and exit_price[0] == price
+
+
+def test_store_backed_backtest_and_grid(tmp_path):
+    provider = FileProvider(str(tmp_path / "source"))
+    frames = make_bars(days=500, symbols=5, seed=3)
+    frames["S4"] = frames["S4"].iloc[120:]  # shorter history
+    for symbol, frame in frames.items():
+        provider.save(symbol, "1d", frame)
+    store = OHLCVStore(str(tmp_path / "store"), provider=provider)
+    bars = load_bars(store, list(frames), period="max")
+    assert bars.close.shape == (500, 5) and np.isnan(bars.close[:120, 4]).all()
+
+    backtester = SignalBacktester(bars, 'stock', seed=7)
+    result = backtester.run()
+    summary = result.summary()
+    assert list(summary.index) == ['ALL', 'BUY', 'SELL']
+    closed = result.trades[result.trades['outcome'] != 'open']
+    assert summary.loc['ALL', 'trades'] == len(closed)
+    assert summary.loc['ALL', 'expectancy'] == pytest.approx(closed['return'].mean() * 100)
+    assert summary.loc['ALL', 'max_drawdown'] <= 0
+    assert not (result.trades['symbol'].eq("S4") & (result.trades['entry_bar'] < 120)).any()
+
+    grid = {'stock_target': [0.02, 0.03, 0.05], 'stock_stop': [0.01, 0.02], 'min_confidence': [50, 70]}
+    sweep = backtester.sweep(grid)
+    assert len(sweep) == 12
+    row = sweep[(sweep['stock_target'] == 0.03) & (sweep['stock_stop'] == 0.02) & (sweep['min_confidence'] == 50)]
+    assert row['trades'].iloc[0] == summary.loc['ALL', 'trades']
+    # A PCR vote alone (40) never fires: every stock signal is RSI-confirmed, none reach 70
+    assert (result.trades['confidence'] == 65).all()
+    assert sweep.loc[sweep['min_confidence'] == 70, 'trades'].eq(0).all()
+    assert backtester.run(SignalRules(min_confidence=70)).trades.empty
+
+
+def test_open_signals_resolve_on_first_touch_since_creation():
+    rng = np.random.default_rng(5)
+    frames = make_bars(days=300, symbols=2, seed=4, freq="h")
+    frames["S1"] = frames["S1"].tz_convert("Asia/Kolkata").iloc[::3]  # another exchange, sparser bars
+    bars = Bars.from_frames({symbol: frame.set_axis(frame.index.tz_convert("UTC").tz_localize(None))
+                             for symbol, frame in frames.items()})
+    signals = []
+    for i in range(400):
+        symbol = ["S0", "S1", "NOBARS"][i % 3]
+        created = pd.Timestamp("2020-01-01") + pd.Timedelta(minutes=int(rng.integers(0, 300 * 60)))
+        action = "BUY" if rng.random() < 0.5 else "SELL"
+        entry = 100.0 if symbol == "NOBARS" else frames[symbol]["Close"].asof(created.tz_localize("UTC"))
+        entry = 100.0 if np.isnan(entry) else entry
+        width = rng.choice([0.01, 0.05, 10.0])  # 10x: never touched
+        sign = 1 if action == "BUY" else -1
+        signals.append({'id': i, 'symbol': symbol, 'action': action,
+                        'created_at': created.strftime("%Y-%m-%d %H:%M:%S"), 'target_price': entry * (1 + sign * width), 'stop_loss': entry * (1 - sign * min(width, 0.5))})
+    signals = pd.DataFrame(signals)
+    resolved = resolve_signals(frames, signals).set_index('id')
+
+    timestamps = bars.index.to_numpy()
+    for signal in signals.itertuples():
+        if signal.symbol == "NOBARS":
+            assert signal.id not in resolved.index
+            continue
+        j = bars.symbols.index(signal.symbol)
+        first = np.searchsorted(timestamps, np.datetime64(pd.Timestamp(signal.created_at)), side='left')
+        action = BUY if signal.action == "BUY" else -1
+        row, price, outcome = reference_exit(bars, first - 1, j, action, signal.target_price, signal.stop_loss,
+                                             len(timestamps))
+        if outcome in ('target', 'stop'):
+            found = resolved.loc[signal.id]
+            assert found['exit_time'] == bars.index[row] and found['exit_price'] == pytest.approx(price)
+            assert (found['hit_target'], found['hit_stop_loss']) == (outcome == 'target', outcome == 'stop')
+        else:
+            assert signal.id not in resolved.index
+    assert 0 < len(resolved) < len(signals)
+
+
+class RecordingStore(OHLCVStore):
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.periods = set()
+
+    def history(self, symbol, period="1y", interval="1d", max_age=None):
+        self.periods.add((period, interval))
+        return super().history(symbol, period, interval, max_age)
+
+
+def test_hourly_backtest_stays_within_the_served_history(tmp_path, monkeypatch):
+    pytest.importorskip("textblob")
+    monkeypatch.chdir(tmp_path)  # the signals database goes under data/
+    from ai_trading_signals import AITradingSignals
+
+    provider = FileProvider(str(tmp_path / "source"))
+    end = pd.Timestamp.now(tz="UTC").floor("h")
+    for symbol, frame in make_bars(days=24 * 60, symbols=2, seed=8, freq="h").items():
+        provider.save(symbol, "1h", frame.set_axis(pd.date_range(end=end, periods=len(frame), freq="h")))
+    store = RecordingStore(str(tmp_path / "store"), provider=provider)
+    signals = AITradingSignals(history_store=store)
+
+    # Yahoo serves 730 days of hourly bars; asking for more returns nothing
+    for period in (None, "5y", "max"):
+        assert not signals.backtest(symbols=["S0", "S1"], period=period).trades.empty
+        assert store.periods == {("730d", "1h")}
+    signals.backtest(symbols=["S0", "S1"], period="30d")
+    assert ("30d", "1h") in store.periods
@@ -0,0 +1,156 @@
+#!/usr/bin/env python3
+"""
+Stale-while-revalidate snapshot cache: weak ETag matching, single-flight
+refreshes, keeping the previous snapshot on failure, and the 304 path of
+the finance API endpoints
+"""
+import sys
+import os
+import importlib
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+# Add parent directory to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from snapshot_cache import SnapshotCache, thaw
+
+
+class Upstream:
+    """Loader that counts calls and can be made slow or failing"""
+
+    def __init__(self, delay=0.0):
+        self.delay = delay
+        self.calls = 0
+        self.data = {'NIFTY': {'price': 22000.0}}
+        self.fail = False
+
+    def __call__(self):
+        self.calls += 1
+        time.sleep(self.delay)
+        if self.fail:
+            raise ConnectionError("upstream down")
+        return self.data
+
+
+def test_etag_matching_is_weak():
+    cache = SnapshotCache({'indices': Upstream()}, ttls={'indices': 60})
+    snapshot = cache.get('indices')
+    assert snapshot.etag.startswith('W/"')
+    opaque = snapshot.etag[2:]
+    assert snapshot.matches(snapshot.etag) and snapshot.matches(opaque)
+    assert snapshot.matches(f'"other", {opaque}') and snapshot.matches('*')
+    assert not snapshot.matches('"other"') and not snapshot.matches(None)
+    assert thaw(snapshot.data) == {'NIFTY': {'price': 22000.0}}
+    cache.shutdown()
+
+
+def test_stale_snapshot_is_served_while_one_refresh_runs():
+    upstream = Upstream(delay=0.2)
+    cache = SnapshotCache({'indices': upstream}, ttls={'indices': 0})
+    first = cache.get('indices')  # cold: waits for the load
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        served = list(pool.map(lambda _: cache.get('indices'), range(32)))
+    assert time.perf_counter() - start < 0.15  # nobody waited on the upstream
+    assert all(snapshot is first for snapshot in served)
+
+    cache.refresh('indices').result(timeout=5)
+    assert upstream.calls == 2  # one refresh for all 32 stale hits
+    second = cache.peek('indices')
+    assert second.version == 2 and second.etag == first.etag  # same data, same ETag
+
+    stats = cache.get_stats()
+    assert (stats['misses'], stats['stale_hits'], stats['refreshes']) == (1, 32, 2)
+    assert stats['datasets']['indices']['version'] == 2
+    cache.shutdown()
+
+
+def test_failed_refresh_keeps_previous_snapshot():
+    upstream = Upstream()
+    cache = SnapshotCache({'indices': upstream}, ttls={'indices': 0})
+    first = cache.get('indices')
+    upstream.fail = True
+    with pytest.raises(ConnectionError):
+        cache.refresh('indices').result(timeout=5)
+    upstream.fail, upstream.data = False, {}
+    with pytest.raises(ValueError):
+        cache.refresh('indices').result(timeout=5)
+    assert cache.peek('indices') is first
+    assert cache.get_stats()['errors'] == 2
+
+    upstream.data = {'NIFTY': {'price': 22100.0}}
+    cache.refresh('indices').result(timeout=5)
+    assert cache.peek('indices').etag != first.etag
+    cache.shutdown()
+
+
+def test_failing_upstream_is_retried_once_per_delay():
+    upstream = Upstream()
+    cache = SnapshotCache({'indices': upstream}, ttls={'indices': 0.3}, retry_delay=30)
+    first = cache.get('indices')
+    time.sleep(0.3)
+    upstream.fail = True
+
+    for _ in range(3):  # three retry windows of min(ttl, retry_delay) = 0.3s
+        for _ in range(50):
+            assert cache.get('indices') is first
+            time.sleep(0.001)
+        time.sleep(0.3)
+    assert upstream.calls == 1 + 3
+    assert cache.get_stats()['errors'] == 3
+
+    upstream.fail = False
+    cache.get('indices')
+    cache.refresh('indices').result(timeout=5)
+    assert cache.peek('indices').version == 2 and not cache.backing_off('indices')
+    cache.shutdown()
+
+
+def test_concurrent_stats_are_not_lost():
+    cache = SnapshotCache({'indices': Upstream()}, ttls={'indices': 60})
+    cache.get('indices')
+
+    def hammer(_):
+        for _ in range(2000):
+            cache.get('indices')
+
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        list(pool.map(hammer, range(8)))
+    assert cache.get_stats()['hits'] == 16000
+    cache.shutdown()
+
+
+@pytest.fixture
+def api(tmp_path, monkeypatch):
+    # finance_data_api and realtime_finance_data import these at module level
+    for module in ("aiohttp", "dotenv", "flask", "flask_cors", "schedule", "requests", "yfinance"):
+        pytest.importorskip(module)
+    # Importing opens financial_data.log and financial_data.db in the working directory
+    monkeypatch.chdir(tmp_path)
+    api = importlib.import_module("finance_data_api")
+    cache = SnapshotCache({'indian_indices': Upstream()}, ttls={'indian_indices': 60})
+    monkeypatch.setattr(api, "market_cache", cache)
+    yield api
+    cache.shutdown()
+
+
+def test_endpoint_answers_if_none_match_with_304(api):
+    client = api.app.test_client()
+    response = client.get('/api/indices/indian')
+    assert response.status_code == 200
+    etag = response.headers['ETag']
+    assert response.get_json()['data'] == {'NIFTY': {'price': 22000.0}}
+    assert response.get_json()['version'] == 1
+
+    for header in (etag, etag[2:], f'"stale", {etag}'):
+        cached = client.get('/api/indices/indian', headers={'If-None-Match': header})
+        assert cached.status_code == 304 and cached.data == b''
+        assert cached.headers['ETag'] == etag
+        assert 0 < int(cached.headers['Cache-Control'].split('=')[1]) <= 60
+
+    changed = client.get('/api/indices/indian', headers={'If-None-Match': '"stale"'})
+    assert changed.status_code == 200 and changed.headers['ETag'] == etag
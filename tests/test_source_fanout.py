@@ -0,0 +1,85 @@
+#!/usr/bin/env python3
+"""
+Concurrent source fan-out: quorum agreement, per-source deadlines, blocking
+sources on an executor and cancellation of stragglers
+"""
+import sys
+import os
+import asyncio
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+# Add parent directory to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from source_fanout import agreeing_sources, fan_out
+
+
+def test_agreeing_sources():
+    prices = {'A': 100.0, 'B': 100.4, 'C': 100.3, 'D': 103.0, 'E': 99.0}
+    assert sorted(agreeing_sources(prices, 3)) == ['A', 'B', 'C']
+    assert agreeing_sources(prices, 4) == []
+    # 0.5% of the lowest price in the group
+    assert agreeing_sources({'A': 100.0, 'B': 100.6, 'C': 100.3}, 3) == []
+    assert sorted(agreeing_sources({'A': 100.0, 'B': 100.6, 'C': 100.3}, 3, tolerance=0.01)) == ['A', 'B', 'C']
+    assert agreeing_sources({}, 1) == []
+
+
+def source(name, price, delay, log):
+    async def fetch():
+        try:
+            await asyncio.sleep(delay)
+        except asyncio.CancelledError:
+            log.append(name)
+            raise
+        return {'source': name, 'price': price, 'success': price is not None}
+    return fetch
+
+
+def test_quorum_returns_early_and_cancels_stragglers():
+    cancelled = []
+    executor = ThreadPoolExecutor(max_workers=2)
+
+    def blocking():
+        time.sleep(0.05)
+        return {'source': 'Sync', 'price': 100.2, 'success': True}
+
+    async def run():
+        loop = asyncio.get_running_loop()
+        sources = {
+            'Fast': source('Fast', 100.0, 0.01, cancelled),
+            'Outlier': source('Outlier', 104.0, 0.02, cancelled),
+            'Broken': source('Broken', None, 0.03, cancelled),
+            'Sync': lambda: loop.run_in_executor(executor, blocking),
+            'Mid': source('Mid', 100.1, 0.08, cancelled),
+            'Slow': source('Slow', 100.0, 5.0, cancelled),
+        }
+        return await fan_out(sources, deadline=2.0, quorum=3)
+
+    outcome = asyncio.run(run())
+    executor.shutdown()
+    assert sorted(outcome.agreeing) == ['Fast', 'Mid', 'Sync']
+    assert outcome.cancelled == ['Slow'] and cancelled == ['Slow']
+    assert outcome.elapsed < 0.5
+    assert set(outcome.prices) == {'Fast', 'Outlier', 'Sync', 'Mid'}
+
+
+def test_deadlines_bound_the_wait_without_quorum():
+    async def failing():
+        raise ConnectionError("site down")
+
+    async def run():
+        sources = {
+            'A': source('A', 100.0, 0.01, []),
+            'B': source('B', 100.1, 0.3, []),
+            'Hung': source('Hung', 100.0, 10.0, []),
+            'Down': failing,
+        }
+        return await fan_out(sources, deadline=0.1, deadlines={'B': 0.5})
+
+    outcome = asyncio.run(run())
+    assert outcome.timed_out == ['Hung'] and outcome.agreeing == [] and outcome.cancelled == []
+    assert outcome.results['Hung'] == {'source': 'Hung', 'success': False, 'timed_out': True}
+    assert outcome.results['Down'] == {'source': 'Down', 'success': False}
+    assert set(outcome.prices) == {'A', 'B'}
+    assert outcome.elapsed < 1.0
@@ -0,0 +1,150 @@
+#!/usr/bin/env python3
+"""
+Streaming indicators against TA-Lib batch output over randomized bar series
+"""
+import sys
+import os
+import asyncio
+
+import numpy as np
+import pandas as pd
+import pytest
+
+talib = pytest.importorskip("talib")
+
+# Add parent directory to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from agents.streaming_indicators import (ADX, ATR, EMA, MACD, OBV, RSI, SMA, BBands,
+                                         IndicatorEngine, Stochastic)
+from agents.technical_analysis_agent import TechnicalAnalysisAgent
+
+
+def make_bars(n, seed, scale=100.0):
+    """Random walk with flat stretches, gaps and zero-volume bars"""
+    rng = np.random.default_rng(seed)
+    close = scale * np.cumprod(1 + rng.normal(0, rng.uniform(0.002, 0.04), n))
+    flat = rng.integers(0, n - 15)
+    close[flat:flat + 12] = close[flat]
+    high = close * (1 + rng.uniform(0, 0.02, n))
+    low = close * (1 - rng.uniform(0, 0.02, n))
+    high[flat:flat + 12] = low[flat:flat + 12] = close[flat]
+    volume = rng.integers(0, 10**6, n).astype(float)
+    volume[rng.random(n) < 0.05] = 0.0
+    index = pd.date_range("2024-01-01", periods=n, freq="B")
+    return pd.DataFrame({"Open": close, "High": high, "Low": low, "Close": close, "Volume": volume}, index=index)
+
+
+def stream(indicator, *columns):
+    out = []
+    for values in zip(*columns):
+        result = indicator.update(*values)
+        out.append(result)
+    return out
+
+
+def column(results, i=None):
+    return np.array([np.nan if r is None else (r if i is None else r[i]) for r in results], dtype=float)
+
+
+def assert_matches(expected, actual):
+    np.testing.assert_array_equal(np.isnan(expected), np.isnan(actual))
+    np.testing.assert_allclose(actual, expected, rtol=1e-9, atol=1e-9, equal_nan=True)
+
+
+@pytest.mark.parametrize("seed", range(8))
+@pytest.mark.parametrize("scale", [1.0, 100.0, 20000.0])
+def test_each_indicator_matches_talib(seed, scale):
+    df = make_bars(300, seed, scale)
+    o, h, l, c, v = (df[name].to_numpy() for name in ("Open", "High", "Low", "Close", "Volume"))
+
+    for period in (2, 20, 50):
+        assert_matches(talib.SMA(c, period), column(stream(SMA(period), c)))
+        assert_matches(talib.EMA(c, period), column(stream(EMA(period), c)))
+    assert_matches(talib.RSI(c, 14), column(stream(RSI(14), c)))
+
+    macd = stream(MACD(12, 26, 9), c)
+    for i, expected in enumerate(talib.MACD(c, 12, 26, 9)):
+        assert_matches(expected, column(macd, i))
+    bands = stream(BBands(20, 2.0), c)
+    for i, expected in enumerate(talib.BBANDS(c, 20, 2.0, 2.0)):
+        assert_matches(expected, column(bands, i))
+    stoch = stream(Stochastic(5, 3, 3), h, l, c)
+    for i, expected in enumerate(talib.STOCH(h, l, c)):
+        assert_matches(expected, column(stoch, i))
+
+    assert_matches(talib.ATR(h, l, c, 14), column(stream(ATR(14), h, l, c)))
+    assert_matches(talib.ADX(h, l, c, 14), column(stream(ADX(14), h, l, c)))
+    assert_matches(talib.OBV(c, v), column(stream(OBV(), c, v)))
+
+
+def test_sync_with_forming_bar_matches_batch():
+    df = make_bars(260, seed=42)
+    agent = TechnicalAnalysisAgent.__new__(TechnicalAnalysisAgent)
+    engine = IndicatorEngine()
+
+    # Growing history where the last bar is revised before the next one appears
+    for end in range(230, 261):
+        forming = df.iloc[:end].copy()
+        forming.iloc[-1, forming.columns.get_loc("Close")] *= 1.01
+        engine.sync(forming)
+        latest, previous = engine.sync(df.iloc[:end])
+        expected_latest, expected_previous = agent.batch_indicators(df.iloc[:end])
+        for name, value in expected_latest.items():
+            assert latest[name] == pytest.approx(value, rel=1e-9, abs=1e-9, nan_ok=True), name
+            assert previous[name] == pytest.approx(expected_previous[name], rel=1e-9, abs=1e-9, nan_ok=True), name
+    assert engine.bars == 259
+
+    # A frame without the last committed bar does not continue: start over from its first bar
+    latest, _ = engine.sync(df.iloc[100:200], forming=False)
+    assert engine.bars == 100
+    for name, value in agent.batch_indicators(df.iloc[100:200])[0].items():
+        assert latest[name] == pytest.approx(value, rel=1e-9, abs=1e-9, nan_ok=True), name
+
+
+def test_sliding_window_sync_processes_only_new_bars():
+    df = make_bars(400, seed=11)
+    agent = TechnicalAnalysisAgent.__new__(TechnicalAnalysisAgent)
+    engine = IndicatorEngine()
+    engine.sync(df.iloc[:250], forming=False)
+    anchor = engine.first_timestamp
+
+    updates = []
+    update = engine.update
+
+    def counted(*args, **kwargs):
+        updates.append(kwargs.get("commit", True))
+        return update(*args, **kwargs)
+
+    engine.update = counted
+    # A trailing window (e.g. the next day's "6mo") drops its first bar as a new one arrives
+    for start in range(1, 151):
+        updates.clear()
+        latest, previous = engine.sync(df.iloc[start:start + 250], forming=False)
+        assert updates == [True]
+    assert engine.bars == 400 and engine.first_timestamp == anchor
+
+    # Values run from the anchor bar, so they match the batch over the whole history
+    expected_latest, expected_previous = agent.batch_indicators(df)
+    for name, value in expected_latest.items():
+        assert latest[name] == pytest.approx(value, rel=1e-9, abs=1e-9, nan_ok=True), name
+        assert previous[name] == pytest.approx(expected_previous[name], rel=1e-9, abs=1e-9, nan_ok=True), name
+
+
+def test_agent_streaming_and_batch_indicators_agree():
+    df = make_bars(200, seed=7)
+    agent = TechnicalAnalysisAgent.__new__(TechnicalAnalysisAgent)
+    agent.indicator_engines = {}
+
+    async def both(frame):
+        return (await agent.calculate_indicators(frame, "TEST.NS"),
+                await agent.calculate_indicators(frame))
+
+    for end in (150, 151, 175, 200):
+        streamed, batch = asyncio.run(both(df.iloc[:end]))
+        assert streamed.keys() == batch.keys()
+        for name, value in batch.items():
+            if isinstance(value, float):
+                assert streamed[name] == pytest.approx(value, rel=1e-9, abs=1e-9, nan_ok=True), name
+            else:
+                assert streamed[name] == value, name
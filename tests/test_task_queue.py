@@ -0,0 +1,195 @@
+#!/usr/bin/env python3
+"""
+TaskQueue against fakeredis: the Lua batch dequeue, leases that are acked or
+re-queued when they expire, strict payload serialization and upgrading a
+queue left behind by the pickle-based version
+"""
+import sys
+import os
+import pickle
+from datetime import datetime
+
+import pytest
+
+fakeredis = pytest.importorskip("fakeredis")
+
+# Add parent directory to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import distributed_task_manager
+from distributed_task_manager import Task, TaskPriority, TaskQueue, Worker, dumps_payload
+
+
+@pytest.fixture
+def task_queue():
+    return TaskQueue(redis_client=fakeredis.FakeRedis())
+
+
+def make_task(task_id, priority=TaskPriority.MEDIUM):
+    return Task(id=task_id, name=task_id, function="market_data_fetch", kwargs={"symbol": "NIFTY"},
+                priority=priority)
+
+
+def test_batch_dequeue_in_priority_then_fifo_order(task_queue):
+    task_queue.put_batch([make_task("low-1", TaskPriority.LOW), make_task("medium-1"),
+                          make_task("low-2", TaskPriority.LOW)])
+    task_queue.put(make_task("critical", TaskPriority.CRITICAL))
+    task_queue.put(make_task("medium-2"))
+
+    first = task_queue.get_batch(3)
+    assert [task.id for task in first] == ["critical", "medium-1", "medium-2"]
+    assert first[1].kwargs == {"symbol": "NIFTY"} and first[1].priority is TaskPriority.MEDIUM
+    assert [task.id for task in task_queue.get_batch(10)] == ["low-1", "low-2"]
+    assert task_queue.get_batch(10) == []
+
+
+def test_dequeued_tasks_are_leased_until_acked(task_queue):
+    redis_client = task_queue.redis_client
+    task_queue.put_batch([make_task("a"), make_task("b")])
+    tasks = task_queue.get_batch(2)
+
+    assert redis_client.zcard(task_queue.queue_name) == 0
+    assert redis_client.zcard(task_queue.processing_key) == 2
+    assert redis_client.hlen(task_queue.payload_key) == 2  # kept until acked
+
+    task_queue.ack(*(task.id for task in tasks))
+    assert redis_client.zcard(task_queue.processing_key) == 0
+    assert redis_client.hlen(task_queue.leased_key) == 0
+    assert redis_client.hlen(task_queue.payload_key) == 0
+    assert task_queue.requeue_expired() == 0
+
+
+def test_expired_leases_go_back_in_their_place(task_queue):
+    task_queue.lease_seconds = -1  # every lease is already expired
+    task_queue.put_batch([make_task("first"), make_task("second"), make_task("third")])
+    assert [task.id for task in task_queue.get_batch(2)] == ["first", "second"]  # the worker dies here
+
+    assert task_queue.requeue_expired() == 2
+    assert task_queue.redis_client.zcard(task_queue.processing_key) == 0
+    assert [task.id for task in task_queue.get_batch(3)] == ["first", "second", "third"]
+
+
+def test_ack_after_retry_keeps_the_requeued_payload(task_queue):
+    task_queue.put(make_task("flaky"))
+    task = task_queue.get()
+    task.retry_count += 1
+    task_queue.put(task)  # what Worker._fail_task does before the execution is recorded
+    task_queue.ack(task.id)
+
+    retried = task_queue.get_batch(1)
+    assert [(t.id, t.retry_count) for t in retried] == [("flaky", 1)]
+
+
+def test_payloads_that_cannot_be_encoded_are_rejected(task_queue):
+    with pytest.raises(TypeError):
+        dumps_payload({"when": datetime(2024, 1, 1)})
+    task = make_task("bad")
+    task.kwargs = {"client": object()}
+    assert task_queue.put(task) is False
+    assert task_queue.get_queue_size() == 0
+
+
+def test_worker_prefetches_one_task_by_default(task_queue):
+    assert Worker("worker-0", task_queue, resource_monitor=None).prefetch == 1
+
+
+def test_blocking_dequeue_leases_the_task(task_queue):
+    task_queue.put(make_task("woken", TaskPriority.HIGH))
+    task_queue.get_batch(1)  # empty the queue first so the next call blocks
+    task_queue.put(make_task("blocked"))
+    original = task_queue._dequeue_batch
+    task_queue._dequeue_batch = lambda **kwargs: []  # force the BZPOPMIN path
+
+    task = task_queue.get(timeout=1)
+    task_queue._dequeue_batch = original
+    assert task.id == "blocked"
+    assert task_queue.redis_client.zscore(task_queue.processing_key, "blocked") is not None
+    assert task_queue.get_wakeup_stats()["count"] == 1
+
+    # Neither worker acks: once the leases run out both go back, in priority order
+    task_queue.redis_client.zadd(task_queue.processing_key, {"woken": 0, "blocked": 0})
+    assert task_queue.requeue_expired() == 2
+    assert [t.id for t in task_queue.get_batch(2)] == ["woken", "blocked"]
+
+
+def test_orphaned_payloads_are_requeued_on_second_sighting(task_queue):
+    redis_client = task_queue.redis_client
+    task_queue.put_batch([make_task("orphan", TaskPriority.HIGH), make_task("queued")])
+    # A worker died right after BZPOPMIN, before claiming the task
+    redis_client.bzpopmin(task_queue.queue_name, timeout=1)
+
+    assert task_queue.requeue_orphans() == 0  # first sighting: may still be claimed
+    assert task_queue.requeue_orphans() == 1
+    assert task_queue.requeue_orphans() == 0
+    assert [t.id for t in task_queue.get_batch(2)] == ["orphan", "queued"]
+
+
+def test_claimed_or_acked_tasks_are_not_orphans(task_queue):
+    task_queue.put(make_task("in-flight"))
+    redis_client = task_queue.redis_client
+    redis_client.bzpopmin(task_queue.queue_name, timeout=1)
+    assert task_queue.requeue_orphans() == 0
+    # Claimed and finished before the second sighting
+    task_queue.ack("in-flight")
+    assert task_queue.requeue_orphans() == 0
+    assert task_queue.get_queue_size() == 0
+
+
+def seed_old_queue(redis_client, tasks):
+    """Queue (task, queued_at) pairs the way the pickle-based put() did"""
+    for task, queued_at in tasks:
+        redis_client.zadd("ai_finance_tasks:priority", {task.id: task.priority.value + queued_at / 1000000})
+        redis_client.set(f"ai_finance_tasks:task:{task.id}", pickle.dumps(task), ex=3600)
+
+
+@pytest.mark.parametrize("upgrade_first", [True, False])
+def test_tasks_under_the_old_scores_are_rescored(monkeypatch, upgrade_first):
+    redis_client = fakeredis.FakeRedis()
+    queued_at = 1_700_000_000.0
+    seed_old_queue(redis_client, [(make_task(f"old-{n}", priority), queued_at + n) for n, priority
+                                  in enumerate([TaskPriority.BATCH, TaskPriority.HIGH, TaskPriority.HIGH])])
+    # Payload already in the hash under an old score (an upgraded worker re-queued it)
+    hashed = make_task("old-hashed", TaskPriority.LOW)
+    redis_client.hset("ai_finance_tasks:payloads", hashed.id, dumps_payload(hashed.to_dict()))
+    redis_client.zadd("ai_finance_tasks:priority", {hashed.id: TaskPriority.LOW.value + (queued_at + 3) / 1000000})
+    redis_client.zadd("ai_finance_tasks:priority", {"no-payload": 3.5})
+    if not upgrade_first:
+        # Re-scoring reads the pickled payloads itself
+        monkeypatch.setattr(TaskQueue, "upgrade_pickled_tasks", lambda self: 0)
+    task_queue = TaskQueue(redis_client=redis_client)  # migrates on connect
+    monkeypatch.undo()
+
+    assert task_queue.migrate_scores() == 0
+    assert redis_client.zscore(task_queue.queue_name, "old-1") == pytest.approx(
+        TaskQueue.score(TaskPriority.HIGH, queued_at + 1), abs=1e-3)
+    assert task_queue.get_depth_by_priority()[TaskPriority.HIGH] == 2
+    task_queue.upgrade_pickled_tasks()
+    task_queue.put(make_task("new-critical", TaskPriority.CRITICAL))
+    task_queue.put(make_task("new-medium"))
+    assert [t.id for t in task_queue.get_batch(10)] == ["new-critical", "old-1", "old-2", "new-medium",
+                                                          "old-hashed", "old-0"]
+
+
+def test_pickled_tasks_from_the_old_queue_are_upgraded(monkeypatch):
+    redis_client = fakeredis.FakeRedis()
+    prefix = "ai_finance_tasks"
+    # What put() wrote before the payload hash: a pickled Task under :task:<id>
+    for n in range(3):
+        task = make_task(f"pickled-{n}")
+        if n == 2:  # the manager ran as a script, so its Task pickled as __main__.Task
+            monkeypatch.setattr(Task, "__module__", "__main__")
+            monkeypatch.setattr(sys.modules["__main__"], "Task", Task, raising=False)
+        score = TaskPriority.MEDIUM.value + (1_700_000_000 + n) / 1000000
+        redis_client.zadd(f"{prefix}:priority", {task.id: score})
+        redis_client.set(f"{prefix}:task:{task.id}", pickle.dumps(task), ex=3600)
+        assert (b"__main__" in redis_client.get(f"{prefix}:task:{task.id}")) == (n == 2)
+        monkeypatch.undo()
+    redis_client.zadd(f"{prefix}:priority", {"expired": 3.5})
+
+    task_queue = TaskQueue(redis_client=redis_client)  # upgrades on connect
+    assert not redis_client.keys(f"{prefix}:task:*")
+    assert task_queue.upgrade_pickled_tasks() == 0
+    tasks = task_queue.get_batch(10)
+    assert [task.id for task in tasks] == ["pickled-0", "pickled-1", "pickled-2"]
+    assert tasks[2].kwargs == {"symbol": "NIFTY"} and tasks[2].priority is TaskPriority.MEDIUM
+    assert isinstance(tasks[2], distributed_task_manager.Task)
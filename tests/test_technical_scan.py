@@ -0,0 +1,87 @@
+#!/usr/bin/env python3
+"""
+Pipelined watchlist scan in TechnicalAnalysisAgent against the offline file
+provider
+"""
+import sys
+import os
+import asyncio
+import json
+import sqlite3
+
+import numpy as np
+import pandas as pd
+import pytest
+
+pytest.importorskip("talib")
+
+# Add parent directory to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from agents.ohlcv_store import FileProvider, OHLCVStore
+from agents.technical_analysis_agent import TechnicalAnalysisAgent
+
+SYMBOLS = ["RELIANCE.NS", "TCS.NS", "INFY.NS", "^NSEI"]
+
+
+def make_bars(days=140, seed=0):
+    rng = np.random.default_rng(seed)
+    index = pd.bdate_range(end=pd.Timestamp.now().normalize(), periods=days, tz="UTC")
+    close = 100 * np.cumprod(1 + rng.normal(0, 0.02, days))
+    return pd.DataFrame({"Open": close, "High": close * 1.01, "Low": close * 0.99,
+                         "Close": close, "Volume": rng.integers(10**5, 10**6, days)}, index=index)
+
+
+def make_agent(tmp_path, compute_workers):
+    provider = FileProvider(str(tmp_path / "source"))
+    for seed, symbol in enumerate(SYMBOLS):
+        provider.save(symbol, "1d", make_bars(seed=seed))
+    store = OHLCVStore(str(tmp_path / "store"), provider=provider)
+    return TechnicalAnalysisAgent(history_store=store, io_workers=4, compute_workers=compute_workers)
+
+
+def canonical(value):
+    return json.dumps(value, sort_keys=True, default=float)
+
+
+def stored_signals(agent):
+    conn = sqlite3.connect(agent.db_path)
+    rows = conn.execute("SELECT symbol, indicator FROM technical_signals ORDER BY id").fetchall()
+    conn.close()
+    return rows
+
+
+@pytest.fixture
+def workdir(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    os.makedirs("data")
+    return tmp_path
+
+
+@pytest.mark.parametrize("compute_workers", [0, 1])
+def test_scan_matches_sequential_analysis(workdir, compute_workers):
+    sequential = make_agent(workdir / "a", compute_workers)
+    expected = {symbol: asyncio.run(sequential.analyze_stock(symbol)) for symbol in SYMBOLS}
+    expected_signals = sorted(stored_signals(sequential))
+    os.remove(sequential.db_path)
+
+    agent = make_agent(workdir / "b", compute_workers)
+    try:
+        report = asyncio.run(agent.scan(SYMBOLS + ["MISSING.NS"]))
+    finally:
+        agent.close()
+
+    assert list(report.analyses) == SYMBOLS
+    assert set(report.failed) == {"MISSING.NS"}
+    for symbol in SYMBOLS:
+        for key in ("indicators", "signals", "trend", "support_resistance", "risk_metrics"):
+            assert canonical(report.analyses[symbol][key]) == canonical(expected[symbol][key]), (symbol, key)
+    # Engines came back from the workers, advanced as far as analyze_stock's
+    assert {symbol: engine.bars for symbol, engine in agent.indicator_engines.items()} == \
+        {symbol: engine.bars for symbol, engine in sequential.indicator_engines.items()}
+    assert sorted(stored_signals(agent)) == expected_signals
+
+    summary = report.stage_summary()
+    assert summary["fetch"]["count"] == len(SYMBOLS) + 1
+    assert summary["compute"]["count"] == summary["store"]["count"] == len(SYMBOLS)
+    assert "of 300s cadence" in report.describe(300)
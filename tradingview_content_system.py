@@ -6,6 +6,7 @@ Generates 10/10 quality content using live TradingView data
 
 import json
 from datetime import datetime
+from agents.indicators import RSI_OVERBOUGHT, RSI_OVERSOLD, rsi_zone
 from reliable_data_fetcher import ReliableDataFetcher
 from smart_hashtag_system import SmartHashtagGenerator
 import random
@@ -776,36 +777,30 @@ Market Sentiment: {self._get_market_sentiment(nifty_data['rsi'])}
     
     def _get_rsi_condition(self, rsi):
         """Get RSI condition description"""
-        if rsi < 30:
-            return "OVERSOLD - Historical support zone"
-        elif rsi > 70:
-            return "OVERBOUGHT - Historical resistance zone"
-        elif 45 <= rsi <= 55:
-            return "NEUTRAL - Balanced conditions"
-        elif rsi < 45:
-            return "WEAK - Below neutral zone"
-        else:
-            return "STRONG - Above neutral zone"
+        return {
+            'OVERSOLD': "OVERSOLD - Historical support zone",
+            'OVERBOUGHT': "OVERBOUGHT - Historical resistance zone",
+            'NEUTRAL': "NEUTRAL - Balanced conditions",
+            'WEAK': "WEAK - Below neutral zone",
+            'STRONG': "STRONG - Above neutral zone",
+        }[rsi_zone(rsi)]
     
     def _get_market_sentiment(self, rsi):
         """Get market sentiment based on RSI"""
-        if rsi < 30:
-            return "Extremely Oversold"
-        elif rsi < 45:
-            return "Moderately Weak"
-        elif rsi > 70:
-            return "Extremely Overbought"
-        elif rsi > 55:
-            return "Moderately Strong"
-        else:
-            return "Neutral"
+        return {
+            'OVERSOLD': "Extremely Oversold",
+            'WEAK': "Moderately Weak",
+            'OVERBOUGHT': "Extremely Overbought",
+            'STRONG': "Moderately Strong",
+            'NEUTRAL': "Neutral",
+        }[rsi_zone(rsi)]
     
     def _get_options_education(self, rsi):
         """Get educational note about options based on RSI"""
-        if rsi < 30:
-            return "Historically, oversold conditions (RSI<30) often see increased call option activity"
-        elif rsi > 70:
-            return "Overbought readings (RSI>70) typically correlate with put option hedging"
+        if rsi < RSI_OVERSOLD:
+            return f"Historically, oversold conditions (RSI<{RSI_OVERSOLD}) often see increased call option activity"
+        elif rsi > RSI_OVERBOUGHT:
+            return f"Overbought readings (RSI>{RSI_OVERBOUGHT}) typically correlate with put option hedging"
         else:
             return "Neutral RSI often sees balanced option activity"
     
@@ -819,7 +814,7 @@ Market Sentiment: {self._get_market_sentiment(nifty_data['rsi'])}
             ('SELL', 'normal'): "Downward pressure visible in technical indicators"
         }
         
-        rsi_state = 'oversold' if rsi < 30 else 'overbought' if rsi > 70 else 'normal'
+        rsi_state = {'OVERSOLD': 'oversold', 'OVERBOUGHT': 'overbought'}.get(rsi_zone(rsi), 'normal')
         return observations.get((signal, rsi_state), "Key levels being tested - observe price action")
     
     def _get_trading_plan(self, data):
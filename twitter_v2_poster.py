@@ -6,10 +6,10 @@ Uses the v2 API with your existing credentials
 """
 
 import os
-import requests
 import json
 from datetime import datetime
 from dotenv import load_dotenv
+from platform_transport import get_transport
 
 load_dotenv()
 
@@ -23,6 +23,10 @@ class TwitterV2Poster:
         self.access_token = os.getenv('TWITTER_ACCESS_TOKEN')
         self.access_secret = os.getenv('TWITTER_ACCESS_TOKEN_SECRET')
         
+        # Pooled keep-alive sessions shared with the other posters
+        self.transport = get_transport()
+        self._oauth_session = None
+        
         # OAuth 2.0 (if you have these)
         self.client_id = "Y0x2RjFCb1RqaHhuZ2xhN3JnSGQ6MTpjaQ"  # Your actual Client ID
         
@@ -43,7 +47,7 @@ class TwitterV2Poster:
                 return bearer
             
             # Generate bearer token from API key/secret
-            auth_url = "https://api.twitter.com/oauth2/token"
+            auth_url = self.transport.url('twitter', '/oauth2/token')
             
             import base64
             credentials = f"{self.api_key}:{self.api_secret}"
@@ -56,7 +60,7 @@ class TwitterV2Poster:
             
             data = {'grant_type': 'client_credentials'}
             
-            response = requests.post(auth_url, headers=headers, data=data)
+            response = self.transport.post('twitter', auth_url, headers=headers, data=data)
             if response.status_code == 200:
                 return response.json()['access_token']
             else:
@@ -73,16 +77,18 @@ class TwitterV2Poster:
             # Use requests-oauthlib for OAuth 1.0a
             from requests_oauthlib import OAuth1Session
             
-            # Create OAuth1 session
-            oauth = OAuth1Session(
-                self.api_key,
-                client_secret=self.api_secret,
-                resource_owner_key=self.access_token,
-                resource_owner_secret=self.access_secret
-            )
+            # Create the OAuth1 session once and keep its connections alive
+            if self._oauth_session is None:
+                self._oauth_session = OAuth1Session(
+                    self.api_key,
+                    client_secret=self.api_secret,
+                    resource_owner_key=self.access_token,
+                    resource_owner_secret=self.access_secret
+                )
+            oauth = self._oauth_session
             
             # v2 endpoint
-            url = "https://api.twitter.com/2/tweets"
+            url = self.transport.url('twitter', '/2/tweets')
             
             # Prepare tweet data
             payload = {
@@ -123,7 +129,7 @@ class TwitterV2Poster:
                 print("❌ No bearer token available")
                 return False
             
-            url = "https://api.twitter.com/2/tweets"
+            url = self.transport.url('twitter', '/2/tweets')
             headers = {
                 'Authorization': f'Bearer {self.bearer_token}',
                 'Content-Type': 'application/json'
@@ -133,7 +139,7 @@ class TwitterV2Poster:
                 "text": content[:280]
             }
             
-            response = requests.post(url, headers=headers, json=payload)
+            response = self.transport.post('twitter', url, headers=headers, json=payload)
             
             if response.status_code == 201:
                 tweet_data = response.json()